@@ -14,6 +14,7 @@ from redbot.core.bot import Red
 from redbot.core.utils.chat_formatting import bold
 
 from .constants import ACTION_NAMES
+from .store import QuarantineStore
 from .utils import is_above_in_hierarchy
 
 log = logging.getLogger("red.kirin-cogs.antinuke.actions")
@@ -30,9 +31,10 @@ class _LockEntry:
 class QuarantineActions:
     """Handles quarantine, restore, and notification actions."""
 
-    def __init__(self, bot: Red, config: Config) -> None:
+    def __init__(self, bot: Red, config: Config, store: QuarantineStore | None = None) -> None:
         self.bot = bot
         self.config = config
+        self.store = store if store is not None else QuarantineStore(config)
         self._background_tasks: set[asyncio.Task[Any]] = set()
         # Per-(guild, member) quarantine locks; idle entries are removed.
         self._quarantine_locks: dict[tuple[int, int], _LockEntry] = {}
@@ -81,6 +83,7 @@ class QuarantineActions:
             await asyncio.gather(*tasks, return_exceptions=True)
         self._background_tasks.clear()
         self._quarantine_locks.clear()
+        await self.store.drain()
 
     async def execute_quarantine(
         self,
@@ -140,10 +143,9 @@ class QuarantineActions:
             return False
 
         async with self._quarantine_lock(guild.id, user.id):
-            existing_users = await self.config.guild(guild).quarantined_users()
-            existing = existing_users.get(str(user.id)) if isinstance(existing_users, dict) else None
+            existing = await self.store.get(guild.id, user.id)
 
-            if isinstance(existing, dict):
+            if existing is not None:
                 # Records without a state predate the state model: those users
                 # are already quarantined, so preserve the first snapshot.
                 state = existing.get("state", "completed")
@@ -168,8 +170,7 @@ class QuarantineActions:
             }
 
             # Persist the pending transition BEFORE the Discord effect.
-            async with self.config.guild(guild).quarantined_users() as q_users:
-                q_users[str(user.id)] = quarantine_data
+            await self.store.put(guild.id, user.id, quarantine_data)
 
             try:
                 # SINGLE API CALL - Atomic role replacement
@@ -188,12 +189,12 @@ class QuarantineActions:
                 return False
 
             # Finalize only after Discord success.
-            async with self.config.guild(guild).quarantined_users() as q_users:
-                record = q_users.get(str(user.id))
-                if isinstance(record, dict):
-                    record["state"] = "completed"
-                    record["completed_at"] = datetime.datetime.now(datetime.UTC).isoformat()
-                    q_users[str(user.id)] = record
+            await self.store.update(
+                guild.id,
+                user.id,
+                state="completed",
+                completed_at=datetime.datetime.now(datetime.UTC).isoformat(),
+            )
 
             # Clear action cache for this user
             if action_cache:
@@ -218,12 +219,7 @@ class QuarantineActions:
 
     async def _mark_quarantine_failed(self, guild: discord.Guild, user_id: int, error: str) -> None:
         """Mark a pending quarantine as failed, retaining its snapshot for retry."""
-        async with self.config.guild(guild).quarantined_users() as q_users:
-            record = q_users.get(str(user_id))
-            if isinstance(record, dict):
-                record["state"] = "failed"
-                record["last_error"] = error
-                q_users[str(user_id)] = record
+        await self.store.update(guild.id, user_id, state="failed", last_error=error)
 
     async def restore_user(self, guild: discord.Guild, user: discord.Member, restored_by: str = "manual") -> bool:
         """
@@ -244,8 +240,7 @@ class QuarantineActions:
             True if successful, False otherwise.
         """
         # Get stored quarantine data
-        q_users = await self.config.guild(guild).quarantined_users()
-        user_data = q_users.get(str(user.id))
+        user_data = await self.store.get(guild.id, user.id)
 
         if not user_data:
             return False
@@ -285,9 +280,7 @@ class QuarantineActions:
             )
 
             # Remove from quarantine storage
-            async with self.config.guild(guild).quarantined_users() as q_users:
-                if str(user.id) in q_users:
-                    del q_users[str(user.id)]
+            await self.store.remove(guild.id, user.id)
 
             # Log restoration
             self._create_task(self.log_restoration(guild, user, restored_by, missing_roles))
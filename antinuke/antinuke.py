@@ -9,10 +9,11 @@ from redbot.core.utils.chat_formatting import inline
 
 from .actions import QuarantineActions
 from .audit import AuditLogHelper
-from .constants import CONFIG_IDENTIFIER, DEFAULT_GLOBAL, DEFAULT_GUILD
+from .constants import CONFIG_IDENTIFIER, DEFAULT_GLOBAL, DEFAULT_GUILD, QUARANTINE_GROUP
 from .events import EventHandlers
 from .migrations import migrate_guild_schemas
-from .utils import ActionCache
+from .store import QuarantineStore
+from .utils import ActionCache, GuildSnapshotCache
 
 log = logging.getLogger("red.kirin-cogs.antinuke")
 
@@ -53,13 +54,21 @@ class AntiNuke(
         self.config = Config.get_conf(self, identifier=CONFIG_IDENTIFIER, force_registration=True)
         self.config.register_global(**DEFAULT_GLOBAL)
         self.config.register_guild(**DEFAULT_GUILD)
+        self.config.init_custom(QUARANTINE_GROUP, 2)
 
         # Initialize components
         self.action_cache = ActionCache()
+        self.guild_snapshots = GuildSnapshotCache(self.config)
+        self.quarantine_store = QuarantineStore(self.config)
         self.audit_helper = AuditLogHelper(bot, self.config)
-        self.quarantine_actions = QuarantineActions(bot, self.config)
+        self.quarantine_actions = QuarantineActions(bot, self.config, self.quarantine_store)
         self.event_handlers = EventHandlers(
-            bot, self.config, self.action_cache, self.audit_helper, self.quarantine_actions
+            bot,
+            self.config,
+            self.action_cache,
+            self.audit_helper,
+            self.quarantine_actions,
+            self.guild_snapshots,
         )
 
         # Event listener references
@@ -74,6 +83,7 @@ class AntiNuke(
         """Called when the cog is unloaded."""
         await self.event_handlers.cancel_all_tasks()
         await self.quarantine_actions.cancel_all_tasks()
+        self.guild_snapshots.clear()
         log.info("AntiNuke cog unloaded")
 
     async def red_delete_data_for_user(  # pyright: ignore[reportIncompatibleMethodOverride]
@@ -96,6 +106,11 @@ class AntiNuke(
                 group = self.config.guild_from_id(guild_id)
                 await group.trusted_users.set(trusted)
                 await group.quarantined_users.set(quarantined)
+                self.guild_snapshots.invalidate(guild_id)
+
+        for guild_id, records in (await self.quarantine_store.all_guilds()).items():
+            if str(user_id) in records:
+                await self.quarantine_store.remove(guild_id, user_id)
 
     # Expose config for command classes
     @property
@@ -176,7 +191,7 @@ class AntiNuke(
 
     async def is_enabled(self, guild: discord.Guild) -> bool:
         """Check if AntiNuke is enabled for a guild."""
-        return await self.config.guild(guild).enabled()
+        return await self.event_handlers.is_enabled(guild)
 
     async def is_trusted(self, guild: discord.Guild, user: discord.Member) -> bool:
         """Check if a user is trusted."""
@@ -205,6 +220,7 @@ class AntiNuke(
         if not guild:
             return
         await self.config.guild(guild).enabled.set(True)
+        self.guild_snapshots.invalidate(guild.id)
         await ctx.send("✅ AntiNuke has been **enabled** for this server.")
 
     @antinuke.command(name="disable")
@@ -214,6 +230,7 @@ class AntiNuke(
         if not guild:
             return
         await self.config.guild(guild).enabled.set(False)
+        self.guild_snapshots.invalidate(guild.id)
         await ctx.send("❌ AntiNuke has been **disabled** for this server.")
 
     @antinuke.command(name="logchannel")
@@ -351,6 +368,7 @@ class AntiNuke(
             if action_type not in monitor:
                 monitor[action_type] = DEFAULT_MONITOR_CONFIG.copy()
             monitor[action_type]["enabled"] = True
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ Monitoring enabled for **{ACTION_NAMES[action_type]}**.")
 
@@ -371,6 +389,7 @@ class AntiNuke(
             if action_type not in monitor:
                 monitor[action_type] = DEFAULT_MONITOR_CONFIG.copy()
             monitor[action_type]["enabled"] = False
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"❌ Monitoring disabled for **{ACTION_NAMES[action_type]}**.")
 
@@ -406,6 +425,7 @@ class AntiNuke(
                 monitor[action_type] = DEFAULT_MONITOR_CONFIG.copy()
             monitor[action_type]["threshold"] = threshold
             monitor[action_type]["timeframe"] = timeframe
+        self.guild_snapshots.invalidate(guild.id)
 
         if threshold == 0:
             await ctx.send(f"✅ **{ACTION_NAMES[action_type]}** set to instant action.")
@@ -426,6 +446,7 @@ class AntiNuke(
             if "bot_add" not in monitor:
                 monitor["bot_add"] = DEFAULT_MONITOR_CONFIG.copy()
             monitor["bot_add"]["kick_bot"] = enabled
+        self.guild_snapshots.invalidate(guild.id)
 
         if enabled:
             await ctx.send("✅ Auto-kick for unauthorized bots is now **enabled**.")
@@ -457,6 +478,7 @@ class AntiNuke(
                 await ctx.send(f"❌ {user.mention} is already trusted.")
                 return
             trusted.append(user.id)
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ {user.mention} has been added to the trusted list.")
 
@@ -471,6 +493,7 @@ class AntiNuke(
                 await ctx.send(f"❌ {user.mention} is not in the trusted list.")
                 return
             trusted.remove(user.id)
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ {user.mention} has been removed from the trusted list.")
 
@@ -489,6 +512,7 @@ class AntiNuke(
                 await ctx.send(f"❌ {role.mention} is already trusted.")
                 return
             trusted.append(role.id)
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ {role.mention} has been added to the trusted roles.")
 
@@ -503,6 +527,7 @@ class AntiNuke(
                 await ctx.send(f"❌ {role.mention} is not in the trusted list.")
                 return
             trusted.remove(role.id)
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ {role.mention} has been removed from the trusted roles.")
 
@@ -562,6 +587,7 @@ class AntiNuke(
             return
         await self.config.guild(guild).trusted_users.set([])
         await self.config.guild(guild).trusted_roles.set([])
+        self.guild_snapshots.invalidate(guild.id)
         await ctx.send("✅ All trusted users and roles have been cleared.")
 
     # Quarantine group
@@ -580,7 +606,7 @@ class AntiNuke(
 
         from .constants import ACTION_NAMES
 
-        quarantined = await self.config.guild(guild).quarantined_users()
+        quarantined = await self.quarantine_store.all(guild.id)
 
         if not quarantined:
             await ctx.send("No users are currently quarantined.")
@@ -620,9 +646,7 @@ class AntiNuke(
         guild = ctx.guild
         if not guild:
             return
-        quarantined = await self.config.guild(guild).quarantined_users()
-
-        if str(user.id) not in quarantined:
+        if await self.quarantine_store.get(guild.id, user.id) is None:
             await ctx.send(f"❌ {user.mention} is not quarantined.")
             return
 
@@ -662,11 +686,9 @@ class AntiNuke(
         guild = ctx.guild
         if not guild:
             return
-        async with self.config.guild(guild).quarantined_users() as q_users:
-            if str(user.id) not in q_users:
-                await ctx.send(f"❌ {user.mention} is not in quarantine records.")
-                return
-            del q_users[str(user.id)]
+        if not await self.quarantine_store.remove(guild.id, user.id):
+            await ctx.send(f"❌ {user.mention} is not in quarantine records.")
+            return
 
         await ctx.send(f"✅ {user.mention} has been cleared from quarantine records.")
 
@@ -680,14 +702,12 @@ class AntiNuke(
 
         from .constants import ACTION_NAMES
 
-        quarantined = await self.config.guild(guild).quarantined_users()
+        data = await self.quarantine_store.get(guild.id, user.id)
 
-        if str(user.id) not in quarantined:
+        if data is None:
             await ctx.send(f"❌ {user.mention} is not quarantined.")
             return
 
-        data = quarantined[str(user.id)]
-
         trigger = ACTION_NAMES.get(data.get("trigger_action", "unknown"), "Unknown")
         reason = data.get("reason", "Unknown reason")
         timestamp = data.get("quarantined_at", "Unknown time")
@@ -744,19 +764,15 @@ class AntiNuke(
         guild = ctx.guild
         if not guild:
             return
-        quarantined = await self.config.guild(guild).quarantined_users()
+        quarantined = await self.quarantine_store.all(guild.id)
 
         if not quarantined:
             await ctx.send("No quarantined users to clean up.")
             return
 
-        removed = 0
-        async with self.config.guild(guild).quarantined_users() as q_users:
-            for user_id in list(q_users.keys()):
-                member = guild.get_member(int(user_id))
-                if not member:
-                    del q_users[user_id]
-                    removed += 1
+        departed = {user_id: None for user_id in quarantined if not guild.get_member(int(user_id))}
+        await self.quarantine_store.apply(guild.id, departed)
+        removed = len(departed)
 
         if removed:
             await ctx.send(f"✅ Cleaned up {removed} quarantine record(s) for users who left.")
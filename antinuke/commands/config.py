@@ -12,7 +12,7 @@ if TYPE_CHECKING:
     from redbot.core import Config
 
     from antinuke.actions import QuarantineActions
-    from antinuke.utils import ActionCache
+    from antinuke.utils import ActionCache, GuildSnapshotCache
 
 
 class AntiNukeConfigCommands(commands.Cog):
@@ -20,6 +20,7 @@ class AntiNukeConfigCommands(commands.Cog):
 
     config: "Config"
     action_cache: "ActionCache"
+    guild_snapshots: "GuildSnapshotCache"
     quarantine_actions: "QuarantineActions"
 
     @commands.group(name="antinuke", aliases=["an"])  # pyright: ignore[reportArgumentType]
@@ -36,6 +37,7 @@ class AntiNukeConfigCommands(commands.Cog):
         if not guild:
             return
         await self.config.guild(guild).enabled.set(True)
+        self.guild_snapshots.invalidate(guild.id)
         await ctx.send(f"✅ AntiNuke has been {bold('enabled')} for this server.")
 
     @antinuke.command(name="disable")
@@ -45,6 +47,7 @@ class AntiNukeConfigCommands(commands.Cog):
         if not guild:
             return
         await self.config.guild(guild).enabled.set(False)
+        self.guild_snapshots.invalidate(guild.id)
         await ctx.send(f"❌ AntiNuke has been {bold('disabled')} for this server.")
 
     @antinuke.command(name="logchannel")
@@ -197,6 +200,7 @@ class AntiNukeConfigCommands(commands.Cog):
             if action_type not in monitor:
                 monitor[action_type] = DEFAULT_MONITOR_CONFIG.copy()
             monitor[action_type]["enabled"] = True
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ Monitoring enabled for **{ACTION_NAMES[action_type]}**.")
 
@@ -216,6 +220,7 @@ class AntiNukeConfigCommands(commands.Cog):
             if action_type not in monitor:
                 monitor[action_type] = DEFAULT_MONITOR_CONFIG.copy()
             monitor[action_type]["enabled"] = False
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"❌ Monitoring disabled for **{ACTION_NAMES[action_type]}**.")
 
@@ -258,6 +263,7 @@ class AntiNukeConfigCommands(commands.Cog):
                 monitor[action_type] = DEFAULT_MONITOR_CONFIG.copy()
             monitor[action_type]["threshold"] = threshold
             monitor[action_type]["timeframe"] = timeframe
+        self.guild_snapshots.invalidate(guild.id)
 
         if threshold == 0:
             await ctx.send(f"✅ **{ACTION_NAMES[action_type]}** set to instant action.")
@@ -277,6 +283,7 @@ class AntiNukeConfigCommands(commands.Cog):
             if "bot_add" not in monitor:
                 monitor["bot_add"] = DEFAULT_MONITOR_CONFIG.copy()
             monitor["bot_add"]["kick_bot"] = enabled
+        self.guild_snapshots.invalidate(guild.id)
 
         if enabled:
             await ctx.send("✅ Auto-kick for unauthorized bots is now **enabled**.")
@@ -13,6 +13,7 @@ if TYPE_CHECKING:
     from redbot.core import Config
 
     from antinuke.actions import QuarantineActions
+    from antinuke.store import QuarantineStore
     from antinuke.utils import ActionCache
 
 
@@ -22,6 +23,7 @@ class AntiNukeQuarantineCommands(commands.Cog):
     config: "Config"
     action_cache: "ActionCache"
     quarantine_actions: "QuarantineActions"
+    quarantine_store: "QuarantineStore"
 
     @commands.group(name="antinuke", aliases=["an"])  # pyright: ignore[reportArgumentType]
     @commands.guild_only()
@@ -41,7 +43,7 @@ class AntiNukeQuarantineCommands(commands.Cog):
         guild = ctx.guild
         if not guild:
             return
-        quarantined = await self.config.guild(guild).quarantined_users()
+        quarantined = await self.quarantine_store.all(guild.id)
 
         if not quarantined:
             await ctx.send("No users are currently quarantined.")
@@ -86,9 +88,7 @@ class AntiNukeQuarantineCommands(commands.Cog):
         guild = ctx.guild
         if not guild:
             return
-        quarantined = await self.config.guild(guild).quarantined_users()
-
-        if str(user.id) not in quarantined:
+        if await self.quarantine_store.get(guild.id, user.id) is None:
             await ctx.send(f"❌ {user.mention} is not quarantined.")
             return
 
@@ -143,11 +143,9 @@ class AntiNukeQuarantineCommands(commands.Cog):
         guild = ctx.guild
         if not guild:
             return
-        async with self.config.guild(guild).quarantined_users() as q_users:
-            if str(user.id) not in q_users:
-                await ctx.send(f"❌ {user.mention} is not in quarantine records.")
-                return
-            del q_users[str(user.id)]
+        if not await self.quarantine_store.remove(guild.id, user.id):
+            await ctx.send(f"❌ {user.mention} is not in quarantine records.")
+            return
 
         await ctx.send(f"✅ {user.mention} has been cleared from quarantine records.")
 
@@ -158,14 +156,12 @@ class AntiNukeQuarantineCommands(commands.Cog):
         guild = ctx.guild
         if not guild:
             return
-        quarantined = await self.config.guild(guild).quarantined_users()
+        data = await self.quarantine_store.get(guild.id, user.id)
 
-        if str(user.id) not in quarantined:
+        if data is None:
             await ctx.send(f"❌ {user.mention} is not quarantined.")
             return
 
-        data = quarantined[str(user.id)]
-
         trigger = ACTION_NAMES.get(data.get("trigger_action", "unknown"), "Unknown")
         reason = data.get("reason", "Unknown reason")
         timestamp = data.get("quarantined_at", "Unknown time")
@@ -227,7 +223,7 @@ class AntiNukeQuarantineCommands(commands.Cog):
         guild = ctx.guild
         if not guild:
             return
-        quarantined = await self.config.guild(guild).quarantined_users()
+        quarantined = await self.quarantine_store.all(guild.id)
 
         if not quarantined:
             await ctx.send("No users are currently quarantined.")
@@ -256,19 +252,16 @@ class AntiNukeQuarantineCommands(commands.Cog):
         guild = ctx.guild
         if not guild:
             return
-        quarantined = await self.config.guild(guild).quarantined_users()
+        quarantined = await self.quarantine_store.all(guild.id)
 
         if not quarantined:
             await ctx.send("No quarantined users to clean up.")
             return
 
-        removed = 0
-        async with self.config.guild(guild).quarantined_users() as q_users:
-            for user_id in list(q_users.keys()):
-                member = guild.get_member(int(user_id))
-                if not member:
-                    del q_users[user_id]
-                    removed += 1
+        # Drop every departed member's record in a single batched write
+        departed = {user_id: None for user_id in quarantined if not guild.get_member(int(user_id))}
+        await self.quarantine_store.apply(guild.id, departed)
+        removed = len(departed)
 
         if removed:
             await ctx.send(f"✅ Cleaned up {removed} quarantine record(s) for users who left.")
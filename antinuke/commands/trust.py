@@ -10,7 +10,7 @@ if TYPE_CHECKING:
     from redbot.core import Config
 
     from ..actions import QuarantineActions
-    from ..utils import ActionCache
+    from ..utils import ActionCache, GuildSnapshotCache
 
 
 class AntiNukeTrustCommands(commands.Cog):
@@ -18,6 +18,7 @@ class AntiNukeTrustCommands(commands.Cog):
 
     config: "Config"
     action_cache: "ActionCache"
+    guild_snapshots: "GuildSnapshotCache"
     quarantine_actions: "QuarantineActions"
 
     @commands.group(name="antinuke", aliases=["an"])  # pyright: ignore[reportArgumentType]
@@ -59,6 +60,7 @@ class AntiNukeTrustCommands(commands.Cog):
                 await ctx.send(f"❌ {user.mention} is already trusted.")
                 return
             trusted.append(user.id)
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ {user.mention} has been added to the trusted list.")
 
@@ -74,6 +76,7 @@ class AntiNukeTrustCommands(commands.Cog):
                 await ctx.send(f"❌ {user.mention} is not in the trusted list.")
                 return
             trusted.remove(user.id)
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ {user.mention} has been removed from the trusted list.")
 
@@ -96,6 +99,7 @@ class AntiNukeTrustCommands(commands.Cog):
                 await ctx.send(f"❌ {role.mention} is already trusted.")
                 return
             trusted.append(role.id)
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ {role.mention} has been added to the trusted roles.")
 
@@ -111,6 +115,7 @@ class AntiNukeTrustCommands(commands.Cog):
                 await ctx.send(f"❌ {role.mention} is not in the trusted list.")
                 return
             trusted.remove(role.id)
+        self.guild_snapshots.invalidate(guild.id)
 
         await ctx.send(f"✅ {role.mention} has been removed from the trusted roles.")
 
@@ -172,4 +177,5 @@ class AntiNukeTrustCommands(commands.Cog):
             return
         await self.config.guild(guild).trusted_users.set([])
         await self.config.guild(guild).trusted_roles.set([])
+        self.guild_snapshots.invalidate(guild.id)
         await ctx.send("✅ All trusted users and roles have been cleared.")
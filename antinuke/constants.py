@@ -123,10 +123,14 @@ DEFAULT_GUILD: dict[str, Any] = {
             "kick_bot": True,
         },
     },
-    # Quarantine Data (persistent)
+    # Legacy quarantine data; records now live in the QUARANTINE_GROUP custom
+    # group (see migrations.py) and this key is kept only for rollback safety.
     "quarantined_users": {},
 }
 
+# Config custom group holding one quarantine record per (guild_id, user_id)
+QUARANTINE_GROUP = "QUARANTINE"
+
 # Global config (if needed for bot-wide settings)
 DEFAULT_GLOBAL: dict[str, Any] = {}
 
@@ -12,7 +12,7 @@ from redbot.core.bot import Red
 from .actions import QuarantineActions
 from .audit import AuditLogHelper
 from .constants import DANGEROUS_PERMISSIONS
-from .utils import ActionCache, has_dangerous_permission
+from .utils import ActionCache, GuildSnapshotCache, has_dangerous_permission
 
 log = logging.getLogger("red.kirin-cogs.antinuke.events")
 
@@ -27,12 +27,14 @@ class EventHandlers:
         action_cache: ActionCache,
         audit_helper: AuditLogHelper,
         quarantine_actions: QuarantineActions,
+        snapshots: GuildSnapshotCache | None = None,
     ) -> None:
         self.bot = bot
         self.config = config
         self.action_cache = action_cache
         self.audit_helper = audit_helper
         self.quarantine_actions = quarantine_actions
+        self.snapshots = snapshots if snapshots is not None else GuildSnapshotCache(config)
         self._background_tasks: set[asyncio.Task[Any]] = set()
 
     def _create_task(self, coro: Coroutine[Any, Any, Any]) -> None:
@@ -60,7 +62,7 @@ class EventHandlers:
 
     async def is_enabled(self, guild: discord.Guild) -> bool:
         """Check if AntiNuke is enabled for the guild."""
-        return await self.config.guild(guild).enabled()
+        return (await self.snapshots.get(guild)).enabled
 
     async def is_trusted(self, guild: discord.Guild, user: discord.Member) -> bool:
         """Check if a user is trusted (bypasses AntiNuke)."""
@@ -68,20 +70,11 @@ class EventHandlers:
         if guild.owner_id == user.id:
             return True
 
-        # Check trusted users
-        trusted_users = await self.config.guild(guild).trusted_users()
-        if user.id in trusted_users:
-            return True
-
-        # Check trusted roles
-        trusted_roles = await self.config.guild(guild).trusted_roles()
-        user_role_ids = [role.id for role in user.roles]
-        return bool(any(role_id in trusted_roles for role_id in user_role_ids))
+        return (await self.snapshots.get(guild)).trusts(user)
 
     async def get_monitor_config(self, guild: discord.Guild, action_type: str) -> dict:
         """Get monitor configuration for an action type."""
-        monitor = await self.config.guild(guild).monitor()
-        return monitor.get(action_type, {})
+        return (await self.snapshots.get(guild)).monitor_config(action_type)
 
     async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
         """Handle channel deletion events."""
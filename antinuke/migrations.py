@@ -10,6 +10,8 @@ from __future__ import annotations
 import logging
 from typing import Any, Protocol
 
+from .constants import QUARANTINE_GROUP
+
 log = logging.getLogger("red.kirin-cogs.antinuke.migrations")
 
 
@@ -21,10 +23,11 @@ class GuildConfigLike(Protocol):
 
     async def all_guilds(self) -> dict[int, Any]: ...
     def guild_from_id(self, guild_id: int) -> Any: ...
+    def custom(self, group_identifier: str, *identifiers: str) -> Any: ...
 
 
 #: Current guild-scope schema version. Bump when adding a migration step.
-GUILD_SCHEMA_VERSION = 1
+GUILD_SCHEMA_VERSION = 2
 
 
 def normalize_version(value: Any) -> int:
@@ -37,8 +40,9 @@ def normalize_version(value: Any) -> int:
 async def migrate_guild_schemas(config: GuildConfigLike) -> None:
     """Bring every stored guild record up to :data:`GUILD_SCHEMA_VERSION`.
 
-    v0 → v1 is marker-only; later migration steps are appended before the
-    stamping write.
+    v0 → v1 is marker-only. v1 → v2 copies the legacy ``quarantined_users``
+    dict into the per-member :data:`QUARANTINE_GROUP` custom group. Later
+    migration steps are appended before the stamping write.
     """
     guilds = await config.all_guilds()
     for guild_id, data in guilds.items():
@@ -48,6 +52,8 @@ async def migrate_guild_schemas(config: GuildConfigLike) -> None:
         version = normalize_version(data.get("schema_version"))
         if version >= GUILD_SCHEMA_VERSION:
             continue
+        if version < 2:
+            await _copy_quarantine_records(config, guild_id, data.get("quarantined_users"))
         await config.guild_from_id(guild_id).schema_version.set(GUILD_SCHEMA_VERSION)
         log.info(
             "Migrated guild %s config schema v%s -> v%s",
@@ -55,3 +61,25 @@ async def migrate_guild_schemas(config: GuildConfigLike) -> None:
             version,
             GUILD_SCHEMA_VERSION,
         )
+
+
+async def _copy_quarantine_records(config: GuildConfigLike, guild_id: int, legacy: Any) -> None:
+    """Copy legacy quarantine records into the custom group (v1 → v2).
+
+    Records already present in the custom group win, so re-running after a
+    partial migration never overwrites newer state.
+    """
+    if not isinstance(legacy, dict):
+        return
+    group = config.custom(QUARANTINE_GROUP, str(guild_id))
+    existing = await group.all()
+    missing = {
+        str(user_id): record
+        for user_id, record in legacy.items()
+        if isinstance(record, dict) and str(user_id) not in existing
+    }
+    if not missing:
+        return
+    async with group.all() as records:
+        records.update(missing)
+    log.info("Copied %s legacy quarantine record(s) for guild %s", len(missing), guild_id)
@@ -0,0 +1,213 @@
+"""Per-member quarantine record storage for the AntiNuke cog."""
+
+import asyncio
+import logging
+from collections.abc import Mapping
+from copy import deepcopy
+from typing import Any
+
+from redbot.core import Config
+
+from .constants import QUARANTINE_GROUP
+
+log = logging.getLogger("red.kirin-cogs.antinuke.store")
+
+#: A staged change: the full record to store, or ``None`` to delete it.
+RecordChange = dict[str, Any] | None
+
+
+class QuarantineStore:
+    """
+    Quarantine records keyed by ``(guild_id, user_id)`` in a Config custom group.
+
+    Writes go through :meth:`apply`, which group-commits: changes staged while
+    a guild's previous write is still in flight are persisted together in the
+    next write, so a burst of quarantines costs one write per batch instead of
+    two whole-dict rewrites per member. Every caller still waits until its own
+    change is persisted, so the ``pending`` record is durable before the
+    Discord edit and ``completed``/``failed`` only after it.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        # Staged-but-unwritten changes, per guild, keyed by str(user_id).
+        self._pending: dict[int, dict[str, RecordChange]] = {}
+        # The batch currently being written, per guild, so reads never miss it.
+        self._inflight: dict[int, dict[str, RecordChange]] = {}
+        # Future resolved by the next flush of each guild's staged changes.
+        self._flushes: dict[int, asyncio.Future[None]] = {}
+        self._write_locks: dict[int, asyncio.Lock] = {}
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+
+    def _group(self, guild_id: int) -> Any:
+        return self.config.custom(QUARANTINE_GROUP, str(guild_id))
+
+    def _unwritten(self, guild_id: int) -> list[dict[str, RecordChange]]:
+        """Staged changes not yet in Config, oldest first."""
+        return [self._inflight.get(guild_id, {}), self._pending.get(guild_id, {})]
+
+    async def get(self, guild_id: int, user_id: int) -> dict[str, Any] | None:
+        """
+        Return one member's quarantine record, or None if there is none.
+
+        Parameters
+        ----------
+        guild_id : int
+            The guild ID.
+        user_id : int
+            The member ID.
+
+        Returns
+        -------
+        Optional[dict]
+            A copy of the stored record, including staged changes.
+        """
+        key = str(user_id)
+        for staged in reversed(self._unwritten(guild_id)):
+            if key in staged:
+                return deepcopy(staged[key])
+        record = await self._group(guild_id).get_raw(key, default=None)
+        return record if isinstance(record, dict) else None
+
+    async def all(self, guild_id: int) -> dict[str, dict[str, Any]]:
+        """
+        Return every quarantine record for a guild keyed by ``str(user_id)``.
+
+        Parameters
+        ----------
+        guild_id : int
+            The guild ID.
+
+        Returns
+        -------
+        dict
+            Records for the guild, including staged changes.
+        """
+        stored = await self._group(guild_id).all()
+        records = {key: value for key, value in stored.items() if isinstance(value, dict)}
+        for staged in self._unwritten(guild_id):
+            for key, change in staged.items():
+                if change is None:
+                    records.pop(key, None)
+                else:
+                    records[key] = deepcopy(change)
+        return records
+
+    async def all_guilds(self) -> dict[int, dict[str, dict[str, Any]]]:
+        """Return every stored record grouped by guild ID."""
+        stored = await self.config.custom(QUARANTINE_GROUP).all()
+        result: dict[int, dict[str, dict[str, Any]]] = {}
+        for guild_id, records in stored.items():
+            if isinstance(records, dict):
+                result[int(guild_id)] = {key: value for key, value in records.items() if isinstance(value, dict)}
+        return result
+
+    async def put(self, guild_id: int, user_id: int, record: dict[str, Any]) -> None:
+        """Persist a member's full record, replacing any existing one."""
+        await self.apply(guild_id, {user_id: record})
+
+    async def update(self, guild_id: int, user_id: int, **fields: Any) -> bool:
+        """
+        Merge fields into an existing record.
+
+        Callers must serialize updates to the same member (AntiNuke holds the
+        per-member quarantine lock).
+
+        Returns
+        -------
+        bool
+            True if a record existed and was updated, False otherwise.
+        """
+        record = await self.get(guild_id, user_id)
+        if record is None:
+            return False
+        record.update(fields)
+        await self.apply(guild_id, {user_id: record})
+        return True
+
+    async def remove(self, guild_id: int, user_id: int) -> bool:
+        """
+        Delete a member's record.
+
+        Returns
+        -------
+        bool
+            True if a record existed, False otherwise.
+        """
+        if await self.get(guild_id, user_id) is None:
+            return False
+        await self.apply(guild_id, {user_id: None})
+        return True
+
+    async def apply(self, guild_id: int, changes: Mapping[int | str, RecordChange]) -> None:
+        """
+        Stage a batch of record changes and wait until they are persisted.
+
+        This is the batch state-transition API: all ``changes`` (and any other
+        changes staged for the same guild before the write starts) are written
+        together.
+
+        Parameters
+        ----------
+        guild_id : int
+            The guild ID.
+        changes : Mapping[int | str, Optional[dict]]
+            Member ID to the new full record, or None to delete it.
+        """
+        if not changes:
+            return
+        staged = self._pending.setdefault(guild_id, {})
+        for user_id, change in changes.items():
+            staged[str(user_id)] = deepcopy(change)
+
+        future = self._flushes.get(guild_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._flushes[guild_id] = future
+            task = asyncio.create_task(self._flush(guild_id, future))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        await asyncio.shield(future)
+
+    async def _flush(self, guild_id: int, future: asyncio.Future[None]) -> None:
+        """Write everything staged for a guild once its previous write finishes."""
+        lock = self._write_locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            # Detach the batch: changes staged from now on join the next flush.
+            if self._flushes.get(guild_id) is future:
+                del self._flushes[guild_id]
+            batch = self._pending.pop(guild_id, {})
+            self._inflight[guild_id] = batch
+            try:
+                await self._write(guild_id, batch)
+            except Exception as exc:
+                log.error("Failed to persist %s quarantine record(s) in guild %s", len(batch), guild_id)
+                future.set_exception(exc)
+            else:
+                future.set_result(None)
+            finally:
+                del self._inflight[guild_id]
+
+    async def _write(self, guild_id: int, batch: dict[str, RecordChange]) -> None:
+        group = self._group(guild_id)
+        if len(batch) == 1:
+            # Single-record writes touch only that member's key.
+            ((key, change),) = batch.items()
+            if change is None:
+                await group.clear_raw(key)
+            else:
+                await group.set_raw(key, value=change)
+            return
+
+        async with group.all() as records:
+            for key, change in batch.items():
+                if change is None:
+                    records.pop(key, None)
+                else:
+                    records[key] = change
+
+    async def drain(self) -> None:
+        """Wait for every in-flight write to finish (unload path)."""
+        tasks = list(self._flush_tasks)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
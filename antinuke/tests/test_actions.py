@@ -1,6 +1,6 @@
 """Unit tests for the QuarantineActions class."""
 
-from typing import cast
+from typing import Any, cast
 from unittest.mock import AsyncMock, MagicMock
 
 import discord
@@ -9,6 +9,9 @@ from redbot.core import Config
 from redbot.core.bot import Red
 
 from antinuke.actions import QuarantineActions
+from antinuke.constants import QUARANTINE_GROUP
+from antinuke.store import QuarantineStore
+from testutils.migration import DictConfig
 
 
 @pytest.fixture
@@ -23,38 +26,27 @@ def config_mock() -> MagicMock:
     # Mocking Config.guild(guild).quarantine_role() which is awaited
     config.guild.return_value.quarantine_role = AsyncMock(return_value=999)
 
-    # Needs to support both `await` and `async with`
-    class ConfigGroupMock(dict):
-        async def __aenter__(self) -> "ConfigGroupMock":
-            return self
-
-        async def __aexit__(
-            self,
-            exc_type: object,
-            exc: object,
-            tb: object,
-        ) -> None:
-            pass
+    return config
 
-        def __await__(self):  # type: ignore[override]
-            async def get_dict() -> "ConfigGroupMock":
-                return self
 
-            return get_dict().__await__()
+@pytest.fixture
+def store_config() -> DictConfig:
+    return DictConfig()
 
-    group_mock: ConfigGroupMock = ConfigGroupMock()
-    config.guild.return_value.quarantined_users = MagicMock(return_value=group_mock)
 
-    return config
+@pytest.fixture
+def q_users(store_config: DictConfig) -> dict[str, Any]:
+    """Live view of guild 1's stored quarantine records."""
+    return store_config.custom(QUARANTINE_GROUP, 1).raw()
 
 
 @pytest.fixture
-def actions(bot_mock: MagicMock, config_mock: MagicMock) -> QuarantineActions:
-    return QuarantineActions(bot_mock, config_mock)
+def actions(bot_mock: MagicMock, config_mock: MagicMock, store_config: DictConfig) -> QuarantineActions:
+    return QuarantineActions(bot_mock, config_mock, QuarantineStore(store_config))  # type: ignore[arg-type]
 
 
 @pytest.mark.asyncio
-async def test_execute_quarantine_success(actions: QuarantineActions, config_mock: MagicMock) -> None:
+async def test_execute_quarantine_success(actions: QuarantineActions, q_users: dict[str, Any]) -> None:
     guild = MagicMock(spec=discord.Guild)
     guild.id = 1
 
@@ -94,9 +86,8 @@ async def test_execute_quarantine_success(actions: QuarantineActions, config_moc
     assert result is True
     user.edit.assert_called_once_with(roles=[q_role], reason="AntiNuke: Channel Deletion threshold exceeded")
 
-    q_users_ctx = config_mock.guild.return_value.quarantined_users.return_value
-    assert str(user.id) in q_users_ctx
-    assert q_users_ctx[str(user.id)]["roles"] == [101, 102]
+    assert str(user.id) in q_users
+    assert q_users[str(user.id)]["roles"] == [101, 102]
 
 
 @pytest.mark.asyncio
@@ -173,7 +164,7 @@ async def test_execute_quarantine_role_above_bot(actions: QuarantineActions, con
 
 
 @pytest.mark.asyncio
-async def test_restore_user_success(actions: QuarantineActions, config_mock: MagicMock) -> None:
+async def test_restore_user_success(actions: QuarantineActions, q_users: dict[str, Any]) -> None:
     guild = MagicMock(spec=discord.Guild)
     guild.id = 1
 
@@ -186,8 +177,7 @@ async def test_restore_user_success(actions: QuarantineActions, config_mock: Mag
     user.id = 123
 
     # Setup stored quarantine data
-    q_users_dict = config_mock.guild.return_value.quarantined_users.return_value
-    q_users_dict[str(user.id)] = {"roles": [101, 102]}
+    q_users[str(user.id)] = {"roles": [101, 102]}
 
     role1 = MagicMock(spec=discord.Role)
     role1.id = 101
@@ -219,4 +209,4 @@ async def test_restore_user_success(actions: QuarantineActions, config_mock: Mag
     assert role1 in kwargs["roles"]
     assert role2 in kwargs["roles"]
 
-    assert str(user.id) not in q_users_dict
+    assert str(user.id) not in q_users
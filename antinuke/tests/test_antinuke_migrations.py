@@ -4,7 +4,7 @@ from typing import Any
 
 import pytest
 
-from antinuke.constants import DEFAULT_GUILD
+from antinuke.constants import DEFAULT_GUILD, QUARANTINE_GROUP
 from antinuke.migrations import GUILD_SCHEMA_VERSION, migrate_guild_schemas
 from testutils.migration import DictConfig, assert_idempotent, historical_variants
 
@@ -73,3 +73,25 @@ async def test_migration_skips_current_records() -> None:
 )
 async def test_migration_tolerates_malformed_history(snapshot: dict[str, Any]) -> None:
     await assert_idempotent(migrate_guild_schemas, DictConfig(snapshot))
+
+
+@pytest.mark.asyncio
+async def test_v2_copies_legacy_quarantine_records_to_custom_group() -> None:
+    config = _config()
+    await migrate_guild_schemas(config)
+    assert config.custom(QUARANTINE_GROUP, GUILD_ID).raw() == {"42": {"roles": [7, 8], "reason": "ban"}}
+
+
+@pytest.mark.asyncio
+async def test_v2_does_not_overwrite_existing_custom_records() -> None:
+    record = dict(LEGACY_GUILD_RECORD)
+    record["schema_version"] = 1
+    config = DictConfig(
+        {
+            "guild": {GUILD_ID: record},
+            "custom": {QUARANTINE_GROUP: {str(GUILD_ID): {"42": {"roles": [9], "state": "completed"}}}},
+        }
+    )
+    await migrate_guild_schemas(config)
+    assert config.custom(QUARANTINE_GROUP, GUILD_ID).raw() == {"42": {"roles": [9], "state": "completed"}}
+    assert config.guild_from_id(GUILD_ID).raw()["schema_version"] == GUILD_SCHEMA_VERSION
@@ -162,11 +162,72 @@ async def test_is_trusted(event_handlers: EventHandlers) -> None:
 
     guild_group = event_handlers.config.guild.return_value  # type: ignore[union-attr]
 
-    # Trusted by explicit user ID
+    # Trusted by explicit user ID (commands invalidate the snapshot on write)
     guild_group.trusted_users = AsyncMock(return_value=[2])
+    event_handlers.snapshots.invalidate(guild.id)
     assert await event_handlers.is_trusted(guild, user2) is True
     guild_group.trusted_users = AsyncMock(return_value=[])
 
     # Trusted by role ID
     guild_group.trusted_roles = AsyncMock(return_value=[10])
+    event_handlers.snapshots.invalidate(guild.id)
     assert await event_handlers.is_trusted(guild, user2) is True
+
+
+@pytest.mark.asyncio
+async def test_snapshot_serves_events_without_config_reads(event_handlers: EventHandlers) -> None:
+    """After the first load, enabled/monitor/trust checks never touch Config."""
+    guild = MagicMock(spec=discord.Guild)
+    guild.id = 1
+    guild.owner_id = 999
+    guild_group = event_handlers.config.guild.return_value  # type: ignore[union-attr]
+    guild_group.monitor = AsyncMock(return_value={"ban": {"threshold": 5}})
+    guild_group.trusted_roles = AsyncMock(return_value=[10])
+
+    member = MagicMock(spec=discord.Member)
+    member.id = 2
+    member.roles = [MagicMock(id=10)]
+
+    assert await event_handlers.is_enabled(guild) is True
+    for _ in range(5):
+        assert await event_handlers.is_enabled(guild) is True
+        assert await event_handlers.get_monitor_config(guild, "ban") == {"threshold": 5}
+        assert await event_handlers.is_trusted(guild, member) is True
+
+    assert guild_group.enabled.await_count == 1
+    assert guild_group.monitor.await_count == 1
+    assert guild_group.trusted_users.await_count == 1
+    assert guild_group.trusted_roles.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_invalidate_reloads(event_handlers: EventHandlers) -> None:
+    guild = MagicMock(spec=discord.Guild)
+    guild.id = 1
+    guild_group = event_handlers.config.guild.return_value  # type: ignore[union-attr]
+
+    assert await event_handlers.is_enabled(guild) is True
+    guild_group.enabled = AsyncMock(return_value=False)
+    assert await event_handlers.is_enabled(guild) is True
+
+    event_handlers.snapshots.invalidate(guild.id)
+    assert await event_handlers.is_enabled(guild) is False
+
+
+@pytest.mark.asyncio
+async def test_snapshot_load_racing_invalidate_is_not_cached(event_handlers: EventHandlers) -> None:
+    """A load that straddles an invalidation must not pin the stale snapshot."""
+    guild = MagicMock(spec=discord.Guild)
+    guild.id = 1
+    guild_group = event_handlers.config.guild.return_value  # type: ignore[union-attr]
+
+    async def _monitor_then_write() -> dict:
+        event_handlers.snapshots.invalidate(guild.id)
+        return {}
+
+    guild_group.monitor = AsyncMock(side_effect=_monitor_then_write)
+    await event_handlers.is_enabled(guild)
+
+    guild_group.monitor = AsyncMock(return_value={})
+    guild_group.enabled = AsyncMock(return_value=False)
+    assert await event_handlers.is_enabled(guild) is False
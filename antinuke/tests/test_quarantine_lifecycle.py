@@ -10,29 +10,16 @@ from redbot.core import Config
 from redbot.core.bot import Red
 
 from antinuke.actions import QuarantineActions
+from antinuke.constants import QUARANTINE_GROUP
 from antinuke.events import EventHandlers
+from antinuke.store import QuarantineStore
+from testutils.migration import DictConfig
 
 # ---------------------------------------------------------------------------
 # Fixtures and builders
 # ---------------------------------------------------------------------------
 
 
-class ConfigGroupMock(dict):
-    """Supports both ``await group()`` and ``async with group()``."""
-
-    async def __aenter__(self) -> "ConfigGroupMock":
-        return self
-
-    async def __aexit__(self, exc_type: object, exc: object, tb: object) -> None:
-        pass
-
-    def __await__(self):  # type: ignore[override]
-        async def get_dict() -> "ConfigGroupMock":
-            return self
-
-        return get_dict().__await__()
-
-
 @pytest.fixture
 def bot_mock() -> MagicMock:
     return MagicMock(spec=Red)
@@ -43,14 +30,23 @@ def config_mock() -> MagicMock:
     config = MagicMock(spec=Config)
     config.guild.return_value.quarantine_role = AsyncMock(return_value=999)
     config.guild.return_value.log_channel = AsyncMock(return_value=None)
-    group_mock: ConfigGroupMock = ConfigGroupMock()
-    config.guild.return_value.quarantined_users = MagicMock(return_value=group_mock)
     return config
 
 
 @pytest.fixture
-def actions(bot_mock: MagicMock, config_mock: MagicMock) -> QuarantineActions:
-    qa = QuarantineActions(bot_mock, config_mock)
+def store_config() -> DictConfig:
+    return DictConfig()
+
+
+@pytest.fixture
+def q_users(store_config: DictConfig) -> dict[str, Any]:
+    """Live view of guild 1's stored quarantine records."""
+    return store_config.custom(QUARANTINE_GROUP, 1).raw()
+
+
+@pytest.fixture
+def actions(bot_mock: MagicMock, config_mock: MagicMock, store_config: DictConfig) -> QuarantineActions:
+    qa = QuarantineActions(bot_mock, config_mock, QuarantineStore(store_config))  # type: ignore[arg-type]
     qa.notify_owner_hierarchy_issue = AsyncMock()  # type: ignore[method-assign]
     qa.log_quarantine = AsyncMock()  # type: ignore[method-assign]
     qa.log_restoration = AsyncMock()  # type: ignore[method-assign]
@@ -104,7 +100,7 @@ async def _drain(actions: QuarantineActions) -> None:
 
 
 @pytest.mark.asyncio
-async def test_concurrent_quarantine_keeps_first_snapshot(actions: QuarantineActions, config_mock: MagicMock) -> None:
+async def test_concurrent_quarantine_keeps_first_snapshot(actions: QuarantineActions, q_users: dict[str, Any]) -> None:
     """Two overlapping quarantines: one edit, one snapshot, state completed."""
     guild = _guild()
     original_roles = [guild.default_role, _role(101), _role(102)]
@@ -131,7 +127,7 @@ async def test_concurrent_quarantine_keeps_first_snapshot(actions: QuarantineAct
     assert results == [True, True]
     assert edits == 1  # exactly one Discord edit captured the snapshot
 
-    stored = config_mock.guild.return_value.quarantined_users.return_value[str(user.id)]
+    stored = q_users[str(user.id)]
     assert stored["roles"] == [101, 102]
     assert stored["state"] == "completed"
     assert "completed_at" in stored
@@ -141,7 +137,7 @@ async def test_concurrent_quarantine_keeps_first_snapshot(actions: QuarantineAct
 
 
 @pytest.mark.asyncio
-async def test_completed_quarantine_is_idempotent(actions: QuarantineActions, config_mock: MagicMock) -> None:
+async def test_completed_quarantine_is_idempotent(actions: QuarantineActions, q_users: dict[str, Any]) -> None:
     """A second quarantine after completion preserves the original snapshot."""
     guild = _guild()
     user = _member(roles=[guild.default_role, _role(101)])
@@ -153,20 +149,19 @@ async def test_completed_quarantine_is_idempotent(actions: QuarantineActions, co
     assert await actions.execute_quarantine(guild, user, "kick") is True
     user.edit.assert_awaited_once()  # no second Discord edit
 
-    stored = config_mock.guild.return_value.quarantined_users.return_value[str(user.id)]
+    stored = q_users[str(user.id)]
     assert stored["roles"] == [101]
     await _drain(actions)
 
 
 @pytest.mark.asyncio
 async def test_legacy_record_without_state_is_treated_completed(
-    actions: QuarantineActions, config_mock: MagicMock
+    actions: QuarantineActions, q_users: dict[str, Any]
 ) -> None:
     """Pre-state-model records are already-quarantined and never overwritten."""
     guild = _guild()
     user = _member(roles=[_role(0), _role(999)])
 
-    q_users = config_mock.guild.return_value.quarantined_users.return_value
     q_users[str(user.id)] = {"roles": [555], "reason": "legacy"}  # no "state" key
 
     assert await actions.execute_quarantine(guild, user, "ban") is True
@@ -181,7 +176,7 @@ async def test_legacy_record_without_state_is_treated_completed(
 
 @pytest.mark.asyncio
 async def test_discord_failure_marks_failed_and_retains_snapshot(
-    actions: QuarantineActions, config_mock: MagicMock
+    actions: QuarantineActions, q_users: dict[str, Any]
 ) -> None:
     """A failed edit leaves no completed marker and supports a safe retry."""
     guild = _guild()
@@ -191,7 +186,7 @@ async def test_discord_failure_marks_failed_and_retains_snapshot(
     result = await actions.execute_quarantine(guild, user, "ban")
     assert result is False
 
-    stored = config_mock.guild.return_value.quarantined_users.return_value[str(user.id)]
+    stored = q_users[str(user.id)]
     assert stored["state"] == "failed"
     assert stored["roles"] == [101, 102]
     assert "completed_at" not in stored
@@ -202,14 +197,14 @@ async def test_discord_failure_marks_failed_and_retains_snapshot(
     result = await actions.execute_quarantine(guild, user, "ban")
     assert result is True
 
-    stored = config_mock.guild.return_value.quarantined_users.return_value[str(user.id)]
+    stored = q_users[str(user.id)]
     assert stored["state"] == "completed"
     assert stored["roles"] == [101, 102]  # first snapshot survived the retry
     await _drain(actions)
 
 
 @pytest.mark.asyncio
-async def test_forbidden_marks_failed_and_notifies(actions: QuarantineActions, config_mock: MagicMock) -> None:
+async def test_forbidden_marks_failed_and_notifies(actions: QuarantineActions, q_users: dict[str, Any]) -> None:
     guild = _guild()
     user = _member(roles=[guild.default_role, _role(101)])
     user.edit = AsyncMock(side_effect=discord.Forbidden(MagicMock(), "missing access"))
@@ -217,7 +212,7 @@ async def test_forbidden_marks_failed_and_notifies(actions: QuarantineActions, c
     result = await actions.execute_quarantine(guild, user, "ban")
     assert result is False
 
-    stored = config_mock.guild.return_value.quarantined_users.return_value[str(user.id)]
+    stored = q_users[str(user.id)]
     assert stored["state"] == "failed"
     assert stored["last_error"] == "forbidden"
     actions.notify_owner_hierarchy_issue.assert_awaited_once()  # type: ignore[attr-defined]
@@ -272,7 +267,7 @@ async def test_stripped_count_excludes_unmanageable_roles(actions: QuarantineAct
 
 
 @pytest.mark.asyncio
-async def test_restore_after_completed_quarantine(actions: QuarantineActions, config_mock: MagicMock) -> None:
+async def test_restore_after_completed_quarantine(actions: QuarantineActions, q_users: dict[str, Any]) -> None:
     guild = _guild(role_map={101: _role(101), 102: _role(102)})
     user = _member(roles=[guild.default_role, _role(101), _role(102)])
 
@@ -281,7 +276,6 @@ async def test_restore_after_completed_quarantine(actions: QuarantineActions, co
 
     assert await actions.restore_user(guild, user, "test") is True
 
-    q_users = config_mock.guild.return_value.quarantined_users.return_value
     assert str(user.id) not in q_users
 
     # Final role set restored both original roles
@@ -0,0 +1,159 @@
+"""Tests for the per-member QuarantineStore and its group-commit batching."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from antinuke.constants import QUARANTINE_GROUP
+from antinuke.store import QuarantineStore
+from testutils.migration import DictConfig, DictGroup
+
+GUILD_ID = 1
+
+
+class CountingDictConfig(DictConfig):
+    """DictConfig whose custom-group writes are counted and can be gated."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+        self.gate: asyncio.Event | None = None
+
+    def custom(self, group_identifier: str, *identifiers: Any) -> DictGroup:
+        group = super().custom(group_identifier, *identifiers)
+        outer = self
+
+        class _Group(DictGroup):
+            async def set_raw(self, *path: Any, value: Any) -> None:
+                await outer._count()
+                await super().set_raw(*path, value=value)
+
+            async def clear_raw(self, *path: Any) -> None:
+                await outer._count()
+                await super().clear_raw(*path)
+
+            def all(self) -> Any:
+                ctx = super().all()
+
+                class _Ctx:
+                    def __await__(self):  # type: ignore[no-untyped-def]
+                        return ctx.__await__()
+
+                    async def __aenter__(self) -> dict[str, Any]:
+                        await outer._count()
+                        return await ctx.__aenter__()
+
+                    async def __aexit__(self, *exc: object) -> None:
+                        return None
+
+                return _Ctx()
+
+        return _Group(group.raw())
+
+    async def _count(self) -> None:
+        self.writes += 1
+        if self.gate is not None:
+            await self.gate.wait()
+
+
+@pytest.mark.asyncio
+async def test_put_get_update_remove_roundtrip() -> None:
+    config = DictConfig()
+    store = QuarantineStore(config)  # type: ignore[arg-type]
+
+    assert await store.get(GUILD_ID, 5) is None
+    await store.put(GUILD_ID, 5, {"roles": [1], "state": "pending"})
+    assert await store.update(GUILD_ID, 5, state="completed") is True
+    assert await store.get(GUILD_ID, 5) == {"roles": [1], "state": "completed"}
+    assert config.custom(QUARANTINE_GROUP, GUILD_ID).raw() == {"5": {"roles": [1], "state": "completed"}}
+
+    assert await store.remove(GUILD_ID, 5) is True
+    assert await store.remove(GUILD_ID, 5) is False
+    assert await store.update(GUILD_ID, 5, state="failed") is False
+    assert await store.all(GUILD_ID) == {}
+
+
+@pytest.mark.asyncio
+async def test_single_transition_writes_only_its_record() -> None:
+    config = CountingDictConfig()
+    store = QuarantineStore(config)  # type: ignore[arg-type]
+
+    await store.put(GUILD_ID, 5, {"state": "pending"})
+    await store.update(GUILD_ID, 5, state="completed")
+
+    assert config.writes == 2
+
+
+@pytest.mark.asyncio
+async def test_burst_of_transitions_is_group_committed() -> None:
+    """Transitions staged while a write is in flight share the next write."""
+    config = CountingDictConfig()
+    config.gate = asyncio.Event()
+    store = QuarantineStore(config)  # type: ignore[arg-type]
+
+    first = asyncio.create_task(store.put(GUILD_ID, 1, {"state": "pending"}))
+    await asyncio.sleep(0.01)  # first write is now blocked on the gate
+    burst = [asyncio.create_task(store.put(GUILD_ID, user_id, {"state": "pending"})) for user_id in range(2, 12)]
+    await asyncio.sleep(0.01)
+
+    # Every staged record is already visible to readers
+    assert set(await store.all(GUILD_ID)) == {str(user_id) for user_id in range(1, 12)}
+    assert not any(task.done() for task in burst)
+
+    config.gate.set()
+    await asyncio.gather(first, *burst)
+
+    assert config.writes == 2  # the first record, then one write for the burst
+    assert set(config.custom(QUARANTINE_GROUP, GUILD_ID).raw()) == {str(user_id) for user_id in range(1, 12)}
+
+
+@pytest.mark.asyncio
+async def test_apply_persists_a_batch_in_one_write() -> None:
+    config = CountingDictConfig()
+    store = QuarantineStore(config)  # type: ignore[arg-type]
+    await store.apply(GUILD_ID, {1: {"state": "completed"}, 2: {"state": "completed"}, 3: {"state": "failed"}})
+    assert config.writes == 1
+
+    await store.apply(GUILD_ID, {1: None, 2: None})
+    assert config.writes == 2
+    assert config.custom(QUARANTINE_GROUP, GUILD_ID).raw() == {"3": {"state": "failed"}}
+
+
+@pytest.mark.asyncio
+async def test_caller_waits_for_persistence() -> None:
+    """put() only returns once its record is durable (pending-before-edit)."""
+    config = CountingDictConfig()
+    config.gate = asyncio.Event()
+    store = QuarantineStore(config)  # type: ignore[arg-type]
+
+    task = asyncio.create_task(store.put(GUILD_ID, 1, {"state": "pending"}))
+    await asyncio.sleep(0.01)
+    assert not task.done()
+    assert config.custom(QUARANTINE_GROUP, GUILD_ID).raw() == {}
+
+    config.gate.set()
+    await task
+    assert config.custom(QUARANTINE_GROUP, GUILD_ID).raw() == {"1": {"state": "pending"}}
+
+
+@pytest.mark.asyncio
+async def test_write_failure_propagates_to_every_waiter() -> None:
+    class BrokenConfig(CountingDictConfig):
+        async def _count(self) -> None:
+            raise RuntimeError("disk full")
+
+    store = QuarantineStore(BrokenConfig())  # type: ignore[arg-type]
+    results = await asyncio.gather(
+        store.put(GUILD_ID, 1, {"state": "pending"}),
+        store.put(GUILD_ID, 2, {"state": "pending"}),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_all_guilds_groups_records() -> None:
+    config = DictConfig({"custom": {QUARANTINE_GROUP: {"1": {"5": {"roles": []}}, "2": {"6": {"roles": [3]}}}}})
+    store = QuarantineStore(config)  # type: ignore[arg-type]
+    assert await store.all_guilds() == {1: {"5": {"roles": []}}, 2: {"6": {"roles": [3]}}}
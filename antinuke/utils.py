@@ -2,8 +2,11 @@
 
 import time
 from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
 
 import discord
+from redbot.core import Config
 
 
 class ActionCache:
@@ -108,6 +111,93 @@ class ActionCache:
             del self._cache[guild_id]
 
 
+@dataclass(frozen=True)
+class GuildSnapshot:
+    """Immutable view of the guild settings consulted on every gateway event.
+
+    ``monitor`` is shared with the cache and must be treated as read-only.
+    """
+
+    enabled: bool = False
+    monitor: dict[str, dict[str, Any]] = field(default_factory=dict)
+    trusted_users: frozenset[int] = frozenset()
+    trusted_roles: frozenset[int] = frozenset()
+
+    def monitor_config(self, action_type: str) -> dict[str, Any]:
+        """Return the monitor settings for ``action_type`` (empty if unset)."""
+        return self.monitor.get(action_type, {})
+
+    def trusts(self, member: discord.Member) -> bool:
+        """Whether ``member`` is trusted by ID or by any of their roles."""
+        if member.id in self.trusted_users:
+            return True
+        return not self.trusted_roles.isdisjoint(role.id for role in member.roles)
+
+
+class GuildSnapshotCache:
+    """
+    Per-guild in-memory snapshot of ``enabled``, ``monitor`` and trust lists.
+
+    Event handlers read the snapshot instead of awaiting Config on every
+    event. A snapshot is loaded lazily on first use and dropped by
+    :meth:`invalidate` whenever a command writes one of those settings.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self._snapshots: dict[int, GuildSnapshot] = {}
+        # Bumped on invalidation so a load that raced a write is not cached.
+        self._generations: dict[int, int] = defaultdict(int)
+
+    async def get(self, guild: discord.Guild) -> GuildSnapshot:
+        """
+        Return the cached snapshot for a guild, loading it on a miss.
+
+        Parameters
+        ----------
+        guild : discord.Guild
+            The guild to look up.
+
+        Returns
+        -------
+        GuildSnapshot
+            The guild's current settings snapshot.
+        """
+        snapshot = self._snapshots.get(guild.id)
+        if snapshot is not None:
+            return snapshot
+
+        generation = self._generations[guild.id]
+        group = self.config.guild(guild)
+        monitor = await group.monitor()
+        snapshot = GuildSnapshot(
+            enabled=bool(await group.enabled()),
+            monitor=monitor if isinstance(monitor, dict) else {},
+            trusted_users=frozenset(await group.trusted_users() or ()),
+            trusted_roles=frozenset(await group.trusted_roles() or ()),
+        )
+        if self._generations[guild.id] == generation:
+            self._snapshots[guild.id] = snapshot
+        return snapshot
+
+    def invalidate(self, guild_id: int) -> None:
+        """
+        Drop a guild's snapshot so the next event reloads it from Config.
+
+        Parameters
+        ----------
+        guild_id : int
+            The guild ID to invalidate.
+        """
+        self._snapshots.pop(guild_id, None)
+        self._generations[guild_id] += 1
+
+    def clear(self) -> None:
+        """Drop every cached snapshot."""
+        for guild_id in set(self._snapshots) | set(self._generations):
+            self.invalidate(guild_id)
+
+
 def has_dangerous_permission(
     before: discord.Permissions, after: discord.Permissions, dangerous_perms: list[str]
 ) -> str | None:
@@ -0,0 +1,88 @@
+"""
+Per-key cooldowns with timing-wheel expiry for custom command triggers.
+
+Same structure as Unicornia's cooldown tracker (cogs are installed
+independently, so it is not shared): a dict lookup to check and start a
+cooldown, and one-second time buckets dropped whole once they have cooled
+down, so only recently used triggers are kept.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class CooldownTracker(Generic[K]):
+    """Tracks when each key last started its cooldown."""
+
+    def __init__(self, cooldown: float, *, resolution: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.cooldown = cooldown
+        self.resolution = resolution
+        self.clock = clock
+        self._started: dict[K, tuple[float, set[K]]] = {}
+        self._wheel: deque[tuple[int, set[K]]] = deque()  # (bucket index, keys), oldest first
+
+    def __len__(self) -> int:
+        return len(self._started)
+
+    def __contains__(self, key: object) -> bool:
+        return self.active(key)  # type: ignore[arg-type]
+
+    def _expire(self, now: float) -> None:
+        # A bucket's keys started before (index + 1) * resolution
+        while self._wheel and (self._wheel[0][0] + 1) * self.resolution + self.cooldown <= now:
+            _index, keys = self._wheel.popleft()
+            for key in keys:
+                del self._started[key]
+
+    def remaining(self, key: K) -> float:
+        """Seconds until ``key`` may act again; 0 when it is not cooling down."""
+        now = self.clock()
+        self._expire(now)
+        entry = self._started.get(key)
+        if entry is None:
+            return 0.0
+        return max(0.0, entry[0] + self.cooldown - now)
+
+    def active(self, key: K) -> bool:
+        return self.remaining(key) > 0
+
+    def start(self, key: K) -> None:
+        """Start (or restart) ``key``'s cooldown now."""
+        now = self.clock()
+        self._expire(now)
+        previous = self._started.get(key)
+        if previous is not None:
+            previous[1].discard(key)
+
+        index = int(now // self.resolution)
+        if not self._wheel or self._wheel[-1][0] < index:
+            self._wheel.append((index, set()))
+        bucket = self._wheel[-1][1]
+        bucket.add(key)
+        self._started[key] = (now, bucket)
+
+    def try_start(self, key: K) -> bool:
+        """Start ``key``'s cooldown unless it is already cooling down; True if it started."""
+        if self.active(key):
+            return False
+        self.start(key)
+        return True
+
+    def discard(self, key: K) -> None:
+        entry = self._started.pop(key, None)
+        if entry is not None:
+            entry[1].discard(key)
+
+    def discard_where(self, predicate: Callable[[K], bool]) -> None:
+        for key in [key for key in self._started if predicate(key)]:
+            self.discard(key)
+
+    def clear(self) -> None:
+        self._started.clear()
+        self._wheel.clear()
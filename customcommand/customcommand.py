@@ -8,6 +8,11 @@ import discord
 from redbot.core import Config, commands
 from redbot.core.utils.chat_formatting import box, pagify
 
+from .cooldowns import CooldownTracker
+
+# Seconds between two responses to the same trigger in one channel
+TRIGGER_COOLDOWN = 60
+
 
 @dataclass
 class _LockEntry:
@@ -30,7 +35,8 @@ class CustomCommand(commands.Cog):
         default_guild = {"commands": {}, "command_owners": {}, "user_limits": {}}
         self.config.register_guild(**default_guild)
         self.role_id = 700121551483437128
-        self.trigger_cooldowns = {}  # (guild_id, trigger): CooldownMapping
+        # (guild_id, trigger, channel_id) -> last response
+        self.trigger_cooldowns: CooldownTracker[tuple[int, str, int]] = CooldownTracker(TRIGGER_COOLDOWN)
         self.command_cache = {}  # guild_id: {trigger: response}
         # Per-guild creation locks; idle entries are removed.
         self._guild_locks: dict[int, _LockEntry] = {}
@@ -106,9 +112,7 @@ class CustomCommand(commands.Cog):
             del self.command_cache[guild.id]
 
         # Clear cooldowns for this guild
-        keys_to_remove = [k for k in self.trigger_cooldowns if k[0] == guild.id]
-        for k in keys_to_remove:
-            del self.trigger_cooldowns[k]
+        self.trigger_cooldowns.discard_where(lambda key: key[0] == guild.id)
 
     async def log_action(self, ctx, action: str, trigger: str, response: str | None = None):
         """Log custom command actions to the hardcoded channel."""
@@ -317,8 +321,7 @@ class CustomCommand(commands.Cog):
                     del self.command_cache[guild.id][trigger]
 
                 # Cleanup cooldown
-                if (guild.id, trigger) in self.trigger_cooldowns:
-                    del self.trigger_cooldowns[(guild.id, trigger)]
+                self.trigger_cooldowns.discard_where(lambda key: key[:2] == (guild.id, trigger))
 
                 if owner_found:
                     triggers = command_owners[owner_found]
@@ -371,8 +374,7 @@ class CustomCommand(commands.Cog):
             del self.command_cache[guild.id][trigger]
 
         # Cleanup cooldown
-        if (guild.id, trigger) in self.trigger_cooldowns:
-            del self.trigger_cooldowns[(guild.id, trigger)]
+        self.trigger_cooldowns.discard_where(lambda key: key[:2] == (guild.id, trigger))
 
         user_commands.remove(trigger)
         if not user_commands:
@@ -395,15 +397,7 @@ class CustomCommand(commands.Cog):
         trigger = message.content.strip().lower()
 
         if trigger in guild_commands:
-            cooldown_key = (message.guild.id, trigger)
-            if cooldown_key not in self.trigger_cooldowns:
-                self.trigger_cooldowns[cooldown_key] = commands.CooldownMapping.from_cooldown(
-                    1, 60, commands.BucketType.channel
-                )
-
-            bucket = self.trigger_cooldowns[cooldown_key].get_bucket(message)
-            retry_after = bucket.update_rate_limit()
-            if retry_after:
+            if not self.trigger_cooldowns.try_start((message.guild.id, trigger, message.channel.id)):
                 return
             response = guild_commands[trigger]
             # Stored responses are user-controlled text: never let them ping.
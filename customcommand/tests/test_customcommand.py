@@ -172,12 +172,12 @@ async def test_cog_load_populates_cache(config_mock: MagicMock) -> None:
 @pytest.mark.asyncio
 async def test_cog_unload_clears_state(cog: Any) -> None:
     cog.command_cache[1] = {"hi": "there"}
-    cog.trigger_cooldowns[(1, "hi")] = MagicMock()
+    cog.trigger_cooldowns.start((1, "hi", 10))
 
     await cog.cog_unload()
 
     assert cog.command_cache == {}
-    assert cog.trigger_cooldowns == {}
+    assert len(cog.trigger_cooldowns) == 0
 
 
 @pytest.mark.asyncio
@@ -186,15 +186,15 @@ async def test_on_guild_remove_clears_guild_cache(cog: Any) -> None:
     guild.id = 99
 
     cog.command_cache[99] = {"cmd": "resp"}
-    cog.trigger_cooldowns[(99, "cmd")] = MagicMock()
-    cog.trigger_cooldowns[(1, "other")] = MagicMock()
+    cog.trigger_cooldowns.start((99, "cmd", 10))
+    cog.trigger_cooldowns.start((1, "other", 10))
 
     await cog.on_guild_remove(guild)
 
     assert 99 not in cog.command_cache
-    assert (99, "cmd") not in cog.trigger_cooldowns
+    assert (99, "cmd", 10) not in cog.trigger_cooldowns
     # unrelated key preserved
-    assert (1, "other") in cog.trigger_cooldowns
+    assert (1, "other", 10) in cog.trigger_cooldowns
 
 
 # ---------------------------------------------------------------------------
@@ -730,6 +730,38 @@ async def test_on_message_respects_cooldown(cog: Any) -> None:
     msg2.channel.send.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_trigger_cooldown_is_per_channel_and_expires(cog: Any) -> None:
+    """The same trigger in another channel is answered; entries expire after the window."""
+    guild = MagicMock(spec=discord.Guild)
+    guild.id = 1
+    cog.command_cache[1] = {"hello": "world"}
+    now = [1000.0]
+    cog.trigger_cooldowns.clock = lambda: now[0]
+
+    def _make_message(channel_id: int):
+        message = MagicMock(spec=discord.Message)
+        message.author.bot = False
+        message.guild = guild
+        message.content = "hello"
+        message.channel = MagicMock()
+        message.channel.send = AsyncMock()
+        message.channel.id = channel_id
+        return message
+
+    first, other_channel = _make_message(10), _make_message(11)
+    await cog.on_message_without_command(first)
+    await cog.on_message_without_command(other_channel)
+    _assert_send_no_mentions(other_channel.channel.send, "world")
+    assert len(cog.trigger_cooldowns) == 2
+
+    now[0] += 61
+    later = _make_message(10)
+    await cog.on_message_without_command(later)
+    _assert_send_no_mentions(later.channel.send, "world")
+    assert len(cog.trigger_cooldowns) == 1
+
+
 # ---------------------------------------------------------------------------
 # log_action — channel not found (silent)
 # ---------------------------------------------------------------------------
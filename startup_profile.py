@@ -0,0 +1,154 @@
+"""
+Startup profiler for the cogs in this repository.
+
+Reports, per cog:
+
+* import cost, from ``python -X importtime`` in a fresh interpreter, as the
+  total plus the most expensive modules grouped by top-level package;
+* cog load cost: ``setup(bot)`` and ``cog_load()`` run against a mocked bot
+  and a throwaway Red data directory, with the cog's own log lines (such as
+  Unicornia's per-phase breakdown) echoed underneath.
+
+The cog is copied into a temporary directory first, so databases, downloaded
+fonts and other files it creates on load never touch the working tree.
+
+    python startup_profile.py unicornia unimod
+    python startup_profile.py --top 15 --no-load unicornia
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+ROOT = Path(__file__).resolve().parent
+# Databases, backups and tests are not needed to load a cog
+COPY_IGNORE = shutil.ignore_patterns("*.db", "*.db-wal", "*.db-shm", "backups", "__pycache__", "tests")
+
+
+@dataclass
+class ImportEntry:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def import_costs(package: str, cwd: Path = ROOT) -> list[ImportEntry]:
+    """Import ``package`` in a fresh interpreter and parse its ``-X importtime`` report."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {package}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        # import time:       self [us] |  cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        entries.append(ImportEntry(module.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def print_import_report(package: str, entries: list[ImportEntry], top: int) -> None:
+    total = next((e.cumulative_us for e in entries if e.module == package), sum(e.self_us for e in entries))
+    by_package: dict[str, int] = defaultdict(int)
+    for entry in entries:
+        by_package[entry.module.split(".")[0]] += entry.self_us
+
+    print(f"\n== {package}: import {total / 1000:.1f} ms ({len(entries)} modules)")
+    print("  by top-level package (self time):")
+    for name, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {us / 1000:8.1f} ms  {name}")
+    print("  slowest modules (self time):")
+    for entry in sorted(entries, key=lambda e: -e.self_us)[:top]:
+        print(f"    {entry.self_us / 1000:8.1f} ms  {entry.module}")
+
+
+class _EchoHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        print(f"    [{record.name}] {record.getMessage()}")
+
+
+async def _load_cog(package: str) -> dict[str, float]:
+    module = importlib.import_module(package)
+    added = []
+    bot = MagicMock()
+    bot.wait_until_ready = AsyncMock()
+    bot.add_cog = AsyncMock(side_effect=added.append)
+    bot.get_shared_api_tokens = AsyncMock(return_value={})
+    bot.guilds = []
+
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+    await module.setup(bot)
+    timings["setup"] = time.perf_counter() - start
+    for cog in added:
+        if hasattr(cog, "cog_load"):
+            start = time.perf_counter()
+            await cog.cog_load()
+            timings["cog_load"] = time.perf_counter() - start
+        # Give background warm-up tasks a moment, then unload
+        await asyncio.sleep(0.5)
+        if hasattr(cog, "cog_unload"):
+            await cog.cog_unload()
+    return timings
+
+
+def profile_cog_load(package: str, workdir: Path) -> dict[str, float]:
+    """Run ``setup`` and ``cog_load`` for a copy of ``package`` inside ``workdir``."""
+    from redbot.core import data_manager
+
+    data_manager.basic_config = dict(data_manager.basic_config_default, DATA_PATH=str(workdir / "red"))
+    sys.path.insert(0, str(workdir))
+    handler = _EchoHandler(logging.INFO)
+    logger = logging.getLogger("red")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        return asyncio.run(_load_cog(package))
+    finally:
+        logger.removeHandler(handler)
+        sys.path.remove(str(workdir))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cogs", nargs="+", help="cog packages to profile, e.g. unicornia")
+    parser.add_argument("--top", type=int, default=10, help="rows per report section")
+    parser.add_argument("--no-load", action="store_true", help="only measure imports")
+    args = parser.parse_args()
+
+    for package in args.cogs:
+        with tempfile.TemporaryDirectory(prefix=f"{package}-profile-") as tmp:
+            workdir = Path(tmp)
+            shutil.copytree(ROOT / package, workdir / package, ignore=COPY_IGNORE)
+            print_import_report(package, import_costs(package, cwd=workdir), args.top)
+            if args.no_load:
+                continue
+            print("  cog load:")
+            try:
+                timings = profile_cog_load(package, workdir)
+            except Exception as e:
+                print(f"    failed: {e!r}")
+                continue
+            finally:
+                for name in [m for m in sys.modules if m == package or m.startswith(f"{package}.")]:
+                    del sys.modules[name]
+            for phase, seconds in timings.items():
+                print(f"    {seconds * 1000:8.1f} ms  {phase}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from redbot.core.bot import Red
 
 from .migrations import migrate_global_schema
 from .views import StickyView
+from .voters import VoterIndex, VoteState, other_kind
 
 log = logging.getLogger("red.kirin_cogs.suggest")
 
@@ -26,14 +27,18 @@ def vote_emoji_kind(emoji: object) -> str | None:
     """Classify a vote reaction emoji as "up"/"down"/None.
 
     Recognizes both the configured custom emojis and the Unicode fallbacks
-    used when the custom emojis are unavailable.
+    used when the custom emojis are unavailable. Raw reaction events carry
+    Unicode emojis as a ``PartialEmoji`` without an ID.
     """
     if isinstance(emoji, (discord.Emoji, discord.PartialEmoji)):
         if emoji.id == UP_EMOJI_ID:
             return "up"
         if emoji.id == DOWN_EMOJI_ID:
             return "down"
-    elif isinstance(emoji, str):
+        if emoji.id is not None:
+            return None
+        emoji = emoji.name
+    if isinstance(emoji, str):
         if emoji == UP_EMOJI_FALLBACK:
             return "up"
         if emoji == DOWN_EMOJI_FALLBACK:
@@ -73,24 +78,34 @@ class Suggest(commands.Cog):
             msg_id=0,
             status="pending",
             reason=None,
+            votes=None,  # {"up": [user ids], "down": [user ids]}; None until backfilled
         )
 
         self.locked_channels: set[discord.TextChannel] = set()
         self._channel_cvs: dict[discord.TextChannel, asyncio.Condition] = {}
         # Per-guild identifier-allocation locks; idle entries are removed.
         self._id_locks: dict[int, _LockEntry] = {}
+        self.voters = VoterIndex()
         self.bot.add_view(StickyView(self))
 
     async def red_delete_data_for_user(  # pyright: ignore[reportIncompatibleMethodOverride]
         self, *, requester, user_id: int
     ) -> None:
-        """Delete stored suggestions authored by a Discord user ID."""
+        """Delete stored suggestions authored by a Discord user ID and their recorded votes."""
+        for msg_id in self.voters.forget_user(user_id):
+            state = self.voters.get(msg_id)
+            if state is not None:
+                await self._save_votes(msg_id, state)
+
         suggestions = await self.config.custom("SUGGESTION").all()
         if not isinstance(suggestions, dict):
             return
         for suggestion_id, data in suggestions.items():
             if isinstance(data, dict) and str(data.get("author_id")) == str(user_id):
                 await self.config.custom("SUGGESTION", str(suggestion_id)).clear()
+                msg_id = data.get("msg_id")
+                if isinstance(msg_id, int):
+                    self.voters.unregister(msg_id)
 
     @asynccontextmanager
     async def _id_lock(self, guild_id: int) -> AsyncGenerator[asyncio.Lock, None]:
@@ -118,6 +133,20 @@ class Suggest(commands.Cog):
         current_id = await self.config.next_id()
         if not isinstance(current_id, int) or isinstance(current_id, bool) or current_id < 132:
             await self.config.next_id.set(132)
+        await self._load_voters()
+
+    async def _load_voters(self) -> None:
+        """Index suggestion messages and any votes persisted for them."""
+        suggestions = await self.config.custom("SUGGESTION").all()
+        if not isinstance(suggestions, dict):
+            return
+        for suggestion_id, data in suggestions.items():
+            if not isinstance(data, dict):
+                continue
+            msg_id = data.get("msg_id")
+            if not isinstance(msg_id, int) or isinstance(msg_id, bool) or not msg_id:
+                continue
+            self.voters.register(msg_id, str(suggestion_id), VoteState.from_config(data.get("votes")))
 
     async def get_suggestion_channel(self) -> discord.TextChannel | None:
         channel = self.bot.get_channel(SUGGEST_CHANNEL_ID)
@@ -162,6 +191,8 @@ class Suggest(commands.Cog):
             data["content"] = content
             data["msg_id"] = msg.id
             data["status"] = "pending"
+            data["votes"] = VoteState().to_config()
+        self.voters.register(msg.id, str(s_id), VoteState())
 
         await interaction.response.send_message("Suggestion submitted!", ephemeral=True)
         await self._maybe_repost_sticky(channel)
@@ -227,12 +258,17 @@ class Suggest(commands.Cog):
         up_count = 0
         down_count = 0
 
-        for reaction in msg.reactions:
-            kind = vote_emoji_kind(reaction.emoji)
-            if kind == "up":
-                up_count = reaction.count - 1 if reaction.me else reaction.count
-            elif kind == "down":
-                down_count = reaction.count - 1 if reaction.me else reaction.count
+        state = self.voters.get(msg_id)
+        if state is not None:
+            up_count, down_count = state.tally()
+        else:
+            # Never backfilled: count the reactions on the fetched message instead
+            for reaction in msg.reactions:
+                kind = vote_emoji_kind(reaction.emoji)
+                if kind == "up":
+                    up_count = reaction.count - 1 if reaction.me else reaction.count
+                elif kind == "down":
+                    down_count = reaction.count - 1 if reaction.me else reaction.count
 
         embed.add_field(name="Results", value=f"{up_emoji} {up_count} - {down_count} {down_emoji}", inline=False)
         embed.set_footer(text=f"{status_text}")
@@ -257,30 +293,123 @@ class Suggest(commands.Cog):
         except Exception:
             pass
 
+    def _is_vote_event(self, payload: discord.RawReactionActionEvent) -> bool:
+        if payload.channel_id != SUGGEST_CHANNEL_ID or payload.message_id not in self.voters:
+            return False
+        if self.bot.user is not None and payload.user_id == self.bot.user.id:
+            return False
+        return payload.member is None or not payload.member.bot
+
+    def _default_vote_emoji(self, kind: str) -> str:
+        if kind == "up":
+            return str(self.bot.get_emoji(UP_EMOJI_ID) or UP_EMOJI_FALLBACK)
+        return str(self.bot.get_emoji(DOWN_EMOJI_ID) or DOWN_EMOJI_FALLBACK)
+
+    async def _vote_state(self, msg_id: int) -> VoteState | None:
+        """Return the message's voters, backfilling them from its reactions the first time."""
+        state = self.voters.get(msg_id)
+        if state is not None:
+            return state
+
+        channel = await self.get_suggestion_channel()
+        if channel is None:
+            return None
+        try:
+            msg = await channel.fetch_message(msg_id)
+        except discord.HTTPException as e:
+            log.warning(f"Could not backfill votes for message {msg_id}: {e}")
+            return None
+
+        state = VoteState()
+        for reaction in msg.reactions:
+            kind = vote_emoji_kind(reaction.emoji)
+            if kind is None:
+                continue
+            state.emojis[kind] = str(reaction.emoji)
+            async for user in reaction.users():
+                if not user.bot:
+                    state.voters(kind).add(user.id)
+        self.voters.store(msg_id, state)
+        await self._save_votes(msg_id, state)
+        return state
+
+    async def _save_votes(self, msg_id: int, state: VoteState) -> None:
+        suggestion_id = self.voters.suggestion_id(msg_id)
+        if suggestion_id is not None:
+            await self.config.custom("SUGGESTION", suggestion_id).votes.set(state.to_config())
+
+    async def _remove_vote(self, msg_id: int, kind: str, user_id: int, state: VoteState) -> None:
+        channel = await self.get_suggestion_channel()
+        if channel is None:
+            return
+        emoji = state.emojis.get(kind) or self._default_vote_emoji(kind)
+        try:
+            await channel.get_partial_message(msg_id).remove_reaction(emoji, discord.Object(user_id))
+        except discord.HTTPException as e:
+            log.warning(f"Failed to remove {kind} vote of {user_id} on {msg_id}: {e}")
+
     @commands.Cog.listener()
-    async def on_reaction_add(self, reaction: discord.Reaction, user: discord.Member):
-        if user.bot:
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        if not self._is_vote_event(payload):
             return
-        if reaction.message.channel.id != SUGGEST_CHANNEL_ID:
+        # Only voting reactions matter (custom emojis or Unicode fallbacks)
+        kind = vote_emoji_kind(payload.emoji)
+        if kind is None:
             return
 
-        # Only voting reactions matter (custom emojis or Unicode fallbacks)
-        added_kind = vote_emoji_kind(reaction.emoji)
-        if added_kind is None:
+        async with self.voters.lock(payload.message_id):
+            state = await self._vote_state(payload.message_id)
+            if state is None:
+                return
+            state.voters(kind).add(payload.user_id)
+            state.emojis[kind] = str(payload.emoji)
+
+            # Ensure mutually exclusive
+            opposite = other_kind(kind)
+            if payload.user_id in state.voters(opposite):
+                state.voters(opposite).discard(payload.user_id)
+                await self._remove_vote(payload.message_id, opposite, payload.user_id, state)
+            await self._save_votes(payload.message_id, state)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        if not self._is_vote_event(payload):
+            return
+        kind = vote_emoji_kind(payload.emoji)
+        if kind is None:
             return
 
-        # Ensure mutually exclusive
-        msg = reaction.message
-        for r in msg.reactions:
-            if r.emoji == reaction.emoji:
-                continue
+        async with self.voters.lock(payload.message_id):
+            state = self.voters.get(payload.message_id)
+            if state is None:
+                # Backfilling now reads the reactions as they are after the removal
+                await self._vote_state(payload.message_id)
+                return
+            if payload.user_id in state.voters(kind):
+                state.voters(kind).discard(payload.user_id)
+                await self._save_votes(payload.message_id, state)
 
-            # Check if this other reaction is a voting emoji too
-            if vote_emoji_kind(r.emoji) is not None:
-                # Check if user reacted to this one too
-                async for u in r.users():
-                    if u.id == user.id:
-                        await r.remove(user)
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear(self, payload: discord.RawReactionClearEvent):
+        if payload.channel_id != SUGGEST_CHANNEL_ID or payload.message_id not in self.voters:
+            return
+        async with self.voters.lock(payload.message_id):
+            state = VoteState()
+            self.voters.store(payload.message_id, state)
+            await self._save_votes(payload.message_id, state)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear_emoji(self, payload: discord.RawReactionClearEmojiEvent):
+        if payload.channel_id != SUGGEST_CHANNEL_ID or payload.message_id not in self.voters:
+            return
+        kind = vote_emoji_kind(payload.emoji)
+        if kind is None:
+            return
+        async with self.voters.lock(payload.message_id):
+            state = self.voters.get(payload.message_id)
+            if state is not None:
+                state.voters(kind).clear()
+                await self._save_votes(payload.message_id, state)
 
     # Sticky Logic
     @commands.Cog.listener()
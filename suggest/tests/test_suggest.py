@@ -11,6 +11,7 @@ from redbot.core.commands import Context
 
 from suggest.suggest import DOWN_EMOJI_ID, SUGGEST_CHANNEL_ID, UP_EMOJI_ID, Suggest
 from suggest.views import StickyView, SuggestionModal
+from suggest.voters import VoterIndex, VoteState
 
 
 @pytest.fixture
@@ -336,66 +337,132 @@ async def test_approve_suggestion_success(cog: Suggest, ctx_mock: MagicMock, bot
     user_mock.send.assert_called_once_with("Your suggestion #132 has been approved!\nReason: Great idea.")
 
 
-@pytest.mark.asyncio
-async def test_on_reaction_add_ignores_bots(cog: Suggest) -> None:
-    reaction_mock = MagicMock(spec=discord.Reaction)
-    user_mock = MagicMock(spec=discord.Member)
-    user_mock.bot = True
+def _reaction_payload(
+    emoji: discord.PartialEmoji, user_id: int = 555, message_id: int = 888, bot: bool = False
+) -> MagicMock:
+    payload = MagicMock(spec=discord.RawReactionActionEvent)
+    payload.channel_id = SUGGEST_CHANNEL_ID
+    payload.message_id = message_id
+    payload.user_id = user_id
+    payload.emoji = emoji
+    payload.member = MagicMock(spec=discord.Member)
+    payload.member.bot = bot
+    return payload
+
 
-    await cog.on_reaction_add(reaction_mock, user_mock)
+UP = discord.PartialEmoji(name="up", id=UP_EMOJI_ID)
+DOWN = discord.PartialEmoji(name="down", id=DOWN_EMOJI_ID)
 
-    # No changes should happen
-    assert not reaction_mock.message.channel.id.called
+
+@pytest.fixture
+def voting(cog: Suggest, bot_mock: MagicMock) -> MagicMock:
+    """Register suggestion message 888 and return the suggestion channel mock."""
+    cog.voters.register(888, "132")
+    cog.config.custom = MagicMock()  # type: ignore[attr-defined]
+    cog.config.custom.return_value.votes.set = AsyncMock()  # type: ignore[attr-defined]
+    channel = MagicMock(spec=discord.TextChannel)
+    channel.fetch_message = AsyncMock()
+    channel.get_partial_message.return_value.remove_reaction = AsyncMock()
+    bot_mock.get_channel.return_value = channel
+    return channel
 
 
 @pytest.mark.asyncio
-async def test_on_reaction_add_wrong_channel(cog: Suggest) -> None:
-    reaction_mock = MagicMock(spec=discord.Reaction)
-    reaction_mock.message.channel.id = 1111111
-    user_mock = MagicMock(spec=discord.Member)
-    user_mock.bot = False
+async def test_raw_reaction_ignores_bots_and_other_messages(cog: Suggest, voting: MagicMock) -> None:
+    await cog.on_raw_reaction_add(_reaction_payload(UP, bot=True))
+    await cog.on_raw_reaction_add(_reaction_payload(UP, user_id=999999))  # the bot itself
+    await cog.on_raw_reaction_add(_reaction_payload(UP, message_id=1))  # not a suggestion
+    other_channel = _reaction_payload(UP)
+    other_channel.channel_id = 1111111
+    await cog.on_raw_reaction_add(other_channel)
 
-    await cog.on_reaction_add(reaction_mock, user_mock)
+    voting.fetch_message.assert_not_called()
+    assert cog.voters.get(888) is None
 
-    # It should return early instead of checking emoji or looping
-    # To test this, we ensure no further accesses were made
-    assert "emoji" not in [c[0] for c in reaction_mock.mock_calls]
+
+@pytest.mark.asyncio
+async def test_first_vote_backfills_once_and_switching_removes_old_vote(cog: Suggest, voting: MagicMock) -> None:
+    voter = MagicMock(id=555, bot=False)
+    bot_user = MagicMock(id=999999, bot=True)
+
+    def _reaction(emoji: discord.PartialEmoji, users: list[MagicMock]) -> MagicMock:
+        async def _users():
+            for user in users:
+                yield user
+
+        reaction = MagicMock(spec=discord.Reaction)
+        reaction.emoji = emoji
+        reaction.users = MagicMock(side_effect=_users)
+        return reaction
+
+    message = MagicMock(spec=discord.Message)
+    message.reactions = [_reaction(UP, [bot_user]), _reaction(DOWN, [bot_user, voter])]
+    voting.fetch_message.return_value = message
+
+    # 555 already voted down before the index existed, then votes up
+    await cog.on_raw_reaction_add(_reaction_payload(UP))
+    voting.fetch_message.assert_awaited_once_with(888)
+    voting.get_partial_message.return_value.remove_reaction.assert_awaited_once()
+    emoji, member = voting.get_partial_message.return_value.remove_reaction.call_args.args
+    assert emoji == str(DOWN) and member.id == 555
+
+    state = cog.voters.get(888)
+    assert state is not None and state.tally() == (1, 0)
+    cog.config.custom.return_value.votes.set.assert_awaited_with({"up": [555], "down": []})  # type: ignore[attr-defined]
+
+    # Later votes are pure index lookups
+    await cog.on_raw_reaction_add(_reaction_payload(UP, user_id=777))
+    await cog.on_raw_reaction_remove(_reaction_payload(UP))
+    voting.fetch_message.assert_awaited_once()
+    assert state.tally() == (1, 0)
+    assert voting.get_partial_message.return_value.remove_reaction.await_count == 1
 
 
 @pytest.mark.asyncio
-async def test_on_reaction_add_mutually_exclusive(cog: Suggest) -> None:
-    # Suppose user reacted UP. We want to clear their DOWN reaction.
-    reaction_mock = MagicMock(spec=discord.Reaction)
+async def test_unicode_fallback_votes_are_exclusive(cog: Suggest, voting: MagicMock) -> None:
+    cog.voters.register(888, "132", VoteState(down={555}))
 
-    up_emoji = discord.PartialEmoji(name="up", id=UP_EMOJI_ID)
-    reaction_mock.emoji = up_emoji
+    await cog.on_raw_reaction_add(_reaction_payload(discord.PartialEmoji(name="✅")))
 
-    user_mock = MagicMock(spec=discord.Member)
-    user_mock.bot = False
-    user_mock.id = 555
+    voting.fetch_message.assert_not_called()
+    voting.get_partial_message.return_value.remove_reaction.assert_awaited_once()
+    state = cog.voters.get(888)
+    assert state is not None and (state.up, state.down) == ({555}, set())
 
-    # Message has both reactions
-    msg_mock = MagicMock(spec=discord.Message)
-    msg_mock.channel.id = SUGGEST_CHANNEL_ID
-    reaction_mock.message = msg_mock
 
-    down_reaction = AsyncMock(spec=discord.Reaction)
-    down_emoji = discord.PartialEmoji(name="down", id=DOWN_EMOJI_ID)
-    down_reaction.emoji = down_emoji
+@pytest.mark.asyncio
+async def test_resolve_reads_tally_from_index(cog: Suggest, ctx_mock: MagicMock, bot_mock: MagicMock) -> None:
+    custom_data = {"msg_id": 888, "status": "pending", "author_id": 1}
+    cog.config.custom = MagicMock(return_value=_custom_wrapper(custom_data))
+    cog.voters.register(888, "132", VoteState(up={1, 2, 3}, down={4}))
 
-    # Setup users for the DOWN reaction to include our user
-    async def _async_gen():
-        yield user_mock
+    channel_mock = AsyncMock(spec=discord.TextChannel)
+    bot_mock.get_channel.return_value = channel_mock
+    msg_mock = AsyncMock(spec=discord.Message)
+    msg_mock.embeds = [MagicMock(spec=discord.Embed)]
+    msg_mock.reactions = []
+    channel_mock.fetch_message.return_value = msg_mock
+    bot_mock.get_emoji.side_effect = lambda emoji_id: str(emoji_id)
 
-    down_reaction.users = MagicMock(return_value=_async_gen())
+    await getattr(cog.approve, "callback")(cog, ctx_mock, 132)  # noqa: B009
 
-    msg_mock.reactions = [reaction_mock, down_reaction]
+    embed = msg_mock.edit.call_args.kwargs["embed"]
+    embed.add_field.assert_any_call(name="Results", value=f"{UP_EMOJI_ID} 3 - 1 {DOWN_EMOJI_ID}", inline=False)
 
-    # Run
-    await cog.on_reaction_add(reaction_mock, user_mock)
 
-    # The down reaction should be removed for this user
-    down_reaction.remove.assert_called_once_with(user_mock)
+def test_votes_persist_round_trip() -> None:
+    state = VoteState(up={3, 1}, down={2})
+    assert state.to_config() == {"up": [1, 3], "down": [2]}
+    restored = VoteState.from_config(state.to_config())
+    assert restored is not None and restored.tally() == (2, 1)
+    assert VoteState.from_config(None) is None
+    assert VoteState.from_config({"up": [1]}) is None
+
+    index = VoterIndex()
+    index.register(10, "132", VoteState(up={5}))
+    index.register(11, "133", VoteState(down={5, 6}))
+    assert sorted(index.forget_user(5)) == [10, 11]
+    assert index.get(11) == VoteState(down={6})
 
 
 @pytest.mark.asyncio
@@ -546,34 +613,6 @@ async def test_resolve_message_without_embed_is_safe(cog: Suggest, ctx_mock: Mag
     assert custom_data["status"] == "pending"  # unchanged
 
 
-@pytest.mark.asyncio
-async def test_on_reaction_add_unicode_fallback_mutually_exclusive(cog: Suggest) -> None:
-    """Unicode fallback reactions enforce the same mutual-exclusion behavior."""
-    reaction_mock = MagicMock(spec=discord.Reaction)
-    reaction_mock.emoji = "✅"  # Unicode fallback up-vote
-
-    user_mock = MagicMock(spec=discord.Member)
-    user_mock.bot = False
-    user_mock.id = 555
-
-    msg_mock = MagicMock(spec=discord.Message)
-    msg_mock.channel.id = SUGGEST_CHANNEL_ID
-    reaction_mock.message = msg_mock
-
-    down_reaction = AsyncMock(spec=discord.Reaction)
-    down_reaction.emoji = "❌"  # Unicode fallback down-vote
-
-    async def _async_gen():
-        yield user_mock
-
-    down_reaction.users = MagicMock(return_value=_async_gen())
-    msg_mock.reactions = [reaction_mock, down_reaction]
-
-    await cog.on_reaction_add(reaction_mock, user_mock)
-
-    down_reaction.remove.assert_called_once_with(user_mock)
-
-
 @pytest.mark.parametrize(
     "emoji, expected",
     [
@@ -581,10 +620,11 @@ async def test_on_reaction_add_unicode_fallback_mutually_exclusive(cog: Suggest)
         (discord.PartialEmoji(name="down", id=DOWN_EMOJI_ID), "down"),
         ("✅", "up"),
         ("❌", "down"),
+        (discord.PartialEmoji(name="✅"), "up"),
         ("🍕", None),
         (discord.PartialEmoji(name="other", id=1), None),
     ],
-    ids=["custom_up", "custom_down", "unicode_up", "unicode_down", "unicode_other", "custom_other"],
+    ids=["custom_up", "custom_down", "unicode_up", "unicode_down", "raw_unicode_up", "unicode_other", "custom_other"],
 )
 def test_vote_emoji_kind(emoji: object, expected: str | None) -> None:
     from suggest.suggest import vote_emoji_kind
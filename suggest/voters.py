@@ -0,0 +1,98 @@
+"""In-memory index of who voted which way on each suggestion.
+
+The index is fed by raw reaction events and persisted per suggestion, so
+enforcing one vote per user is a set lookup instead of paging through every
+voting reaction's users over REST.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any
+
+VOTE_KINDS = ("up", "down")
+
+
+def other_kind(kind: str) -> str:
+    return "down" if kind == "up" else "up"
+
+
+@dataclass
+class VoteState:
+    """Voters of one suggestion message, split by vote kind."""
+
+    up: set[int] = field(default_factory=set)
+    down: set[int] = field(default_factory=set)
+    # Emoji actually used for each kind on this message (custom or Unicode fallback)
+    emojis: dict[str, str] = field(default_factory=dict)
+
+    def voters(self, kind: str) -> set[int]:
+        return self.up if kind == "up" else self.down
+
+    def tally(self) -> tuple[int, int]:
+        return len(self.up), len(self.down)
+
+    def to_config(self) -> dict[str, list[int]]:
+        return {"up": sorted(self.up), "down": sorted(self.down)}
+
+    @classmethod
+    def from_config(cls, data: Any) -> VoteState | None:
+        """Rebuild a persisted state, or None if nothing usable was stored."""
+        if not isinstance(data, dict):
+            return None
+        state = cls()
+        for kind in VOTE_KINDS:
+            ids = data.get(kind)
+            if not isinstance(ids, list):
+                return None
+            state.voters(kind).update(i for i in ids if isinstance(i, int) and not isinstance(i, bool))
+        return state
+
+
+class VoterIndex:
+    """Voter states keyed by suggestion message ID.
+
+    Only messages registered as suggestions are tracked. A registered message
+    without a state has not been backfilled from its reactions yet.
+    """
+
+    def __init__(self) -> None:
+        self._suggestions: dict[int, str] = {}  # msg_id -> suggestion_id
+        self._states: dict[int, VoteState] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    def register(self, msg_id: int, suggestion_id: str, state: VoteState | None = None) -> None:
+        self._suggestions[msg_id] = suggestion_id
+        if state is not None:
+            self._states[msg_id] = state
+
+    def unregister(self, msg_id: int) -> None:
+        self._suggestions.pop(msg_id, None)
+        self._states.pop(msg_id, None)
+        self._locks.pop(msg_id, None)
+
+    def suggestion_id(self, msg_id: int) -> str | None:
+        return self._suggestions.get(msg_id)
+
+    def get(self, msg_id: int) -> VoteState | None:
+        return self._states.get(msg_id)
+
+    def store(self, msg_id: int, state: VoteState) -> None:
+        self._states[msg_id] = state
+
+    def lock(self, msg_id: int) -> asyncio.Lock:
+        return self._locks.setdefault(msg_id, asyncio.Lock())
+
+    def forget_user(self, user_id: int) -> list[int]:
+        """Drop a user's votes everywhere; returns the message IDs that changed."""
+        changed = []
+        for msg_id, state in self._states.items():
+            if user_id in state.up or user_id in state.down:
+                state.up.discard(user_id)
+                state.down.discard(user_id)
+                changed.append(msg_id)
+        return changed
+
+    def __contains__(self, msg_id: object) -> bool:
+        return msg_id in self._suggestions
@@ -45,11 +45,20 @@ class DictValue:
 
 
 class _GroupContext:
-    """Async context manager yielding a group's raw mutable mapping."""
+    """Async context manager yielding a group's raw mutable mapping.
+
+    Awaiting it returns a deep copy instead, mirroring Red's ``Group.all()``.
+    """
 
     def __init__(self, store: dict[str, Any]) -> None:
         self._store = store
 
+    def __await__(self):
+        async def _copy() -> dict[str, Any]:
+            return deepcopy(self._store)
+
+        return _copy().__await__()
+
     async def __aenter__(self) -> dict[str, Any]:
         return self._store
 
@@ -71,14 +80,37 @@ class DictGroup:
     def __call__(self) -> _GroupContext:
         return _GroupContext(self._store)
 
-    async def all(self) -> dict[str, Any]:
-        return deepcopy(self._store)
+    def all(self) -> _GroupContext:
+        return _GroupContext(self._store)
 
     async def set(self, value: dict[str, Any]) -> None:
         """Replace the whole group record (mirrors Red's ``Group.set``)."""
         self._store.clear()
         self._store.update(deepcopy(value))
 
+    async def get_raw(self, *path: Any, default: Any = ...) -> Any:
+        node: Any = self._store
+        for key in path:
+            if not isinstance(node, dict) or str(key) not in node:
+                if default is ...:
+                    raise KeyError(str(key))
+                return default
+            node = node[str(key)]
+        return deepcopy(node)
+
+    async def set_raw(self, *path: Any, value: Any) -> None:
+        node = self._store
+        for key in path[:-1]:
+            node = node.setdefault(str(key), {})
+        node[str(path[-1])] = deepcopy(value)
+
+    async def clear_raw(self, *path: Any) -> None:
+        node: Any = self._store
+        for key in path[:-1]:
+            node = node.get(str(key)) if isinstance(node, dict) else None
+        if isinstance(node, dict):
+            node.pop(str(path[-1]), None)
+
     def raw(self) -> dict[str, Any]:
         """Direct access to the underlying store (test assertions only)."""
         return self._store
@@ -99,6 +131,7 @@ class DictConfig:
             "guild": {guild_id: {...}},
             "user": {user_id: {...}},
             "member": {guild_id: {member_id: {...}}},
+            "custom": {group_identifier: {key: {...}}},
         }
     """
 
@@ -111,6 +144,9 @@ class DictConfig:
             int(g): {int(m): (v or {}) for m, v in (members or {}).items()}
             for g, members in (snap.get("member") or {}).items()
         }
+        self._custom: dict[str, dict[str, Any]] = {
+            str(group): (records or {}) for group, records in (snap.get("custom") or {}).items()
+        }
 
     # -- global scope (Config exposes global values on the instance) ---------
 
@@ -144,6 +180,18 @@ class DictConfig:
         guild_members = self._members.setdefault(int(guild_id), {})
         return DictGroup(guild_members.setdefault(int(member_id), {}))
 
+    def init_custom(self, group_identifier: str, identifier_count: int) -> None:
+        self._custom.setdefault(group_identifier, {})
+
+    def register_custom(self, group_identifier: str, **defaults: Any) -> None:
+        self._custom.setdefault(group_identifier, {})
+
+    def custom(self, group_identifier: str, *identifiers: Any) -> DictGroup:
+        node = self._custom.setdefault(group_identifier, {})
+        for identifier in identifiers:
+            node = node.setdefault(str(identifier), {})
+        return DictGroup(node)
+
     # -- bulk reads (deep copies, matching Red semantics) ---------------------
 
     async def all(self) -> dict[str, Any]:
@@ -167,6 +215,7 @@ class DictConfig:
             "guild": deepcopy(self._guilds),
             "user": deepcopy(self._users),
             "member": deepcopy(self._members),
+            "custom": deepcopy(self._custom),
         }
 
 
@@ -0,0 +1,142 @@
+"""Event-fed rolling message history for UnicornAI channels."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import discord
+
+
+@dataclass(slots=True)
+class HistoryEntry:
+    """A message already formatted for the model prompt."""
+
+    author_id: int
+    role: str
+    text: str  # "Name: content", empty when the message has no text
+
+    def as_prompt(self) -> dict:
+        return {"role": self.role, "parts": [{"text": self.text}]}
+
+
+def format_message(message: discord.Message, bot_user_id: int) -> HistoryEntry:
+    role = "model" if message.author.id == bot_user_id else "user"
+    content = message.clean_content
+    text = f"{message.author.display_name}: {content}" if content else ""
+    return HistoryEntry(message.author.id, role, text)
+
+
+class ChannelHistory:
+    """Newest-last window of one channel's messages, keyed by message ID."""
+
+    __slots__ = ("backfilled", "entries", "loading", "tombstones")
+
+    def __init__(self) -> None:
+        self.entries: OrderedDict[int, HistoryEntry] = OrderedDict()
+        # Number of messages the REST backfill covered; 0 until it has run
+        self.backfilled = 0
+        self.loading: asyncio.Lock = asyncio.Lock()
+        # Deletes seen while a backfill is in flight, so fetched copies are dropped
+        self.tombstones: set[int] | None = None
+
+    def prune(self, capacity: int) -> None:
+        while len(self.entries) > capacity:
+            self.entries.popitem(last=False)
+
+
+class HistoryCache:
+    """
+    Per-channel rolling history fed by gateway events.
+
+    A channel is backfilled from the REST history endpoint the first time it
+    is asked for, then kept current by message create, edit and delete
+    events. Only channels that have been asked for are tracked.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._channels: dict[int, ChannelHistory] = {}
+        self.backfills = 0
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._channels
+
+    def grow(self, capacity: int) -> None:
+        """Raise the per-channel window; it never shrinks below the largest limit in use."""
+        self.capacity = max(self.capacity, capacity)
+
+    def add(self, message: discord.Message, bot_user_id: int) -> None:
+        history = self._channels.get(message.channel.id)
+        if history is None:
+            return
+        history.entries[message.id] = format_message(message, bot_user_id)
+        history.prune(self.capacity)
+
+    def edit(self, message: discord.Message, bot_user_id: int) -> None:
+        history = self._channels.get(message.channel.id)
+        if history is not None and message.id in history.entries:
+            history.entries[message.id] = format_message(message, bot_user_id)
+
+    def delete(self, channel_id: int, message_ids: Iterable[int]) -> None:
+        history = self._channels.get(channel_id)
+        if history is None:
+            return
+        for message_id in message_ids:
+            history.entries.pop(message_id, None)
+            if history.tombstones is not None:
+                history.tombstones.add(message_id)
+
+    def forget_author(self, user_id: int) -> None:
+        for history in self._channels.values():
+            for message_id in [mid for mid, entry in history.entries.items() if entry.author_id == user_id]:
+                del history.entries[message_id]
+
+    async def recent(
+        self,
+        channel: discord.TextChannel | discord.Thread,
+        limit: int,
+        bot_user_id: int,
+    ) -> list[HistoryEntry]:
+        """Return up to ``limit`` of the channel's latest entries, oldest first."""
+        self.grow(limit)
+        history = self._channels.setdefault(channel.id, ChannelHistory())
+        if history.backfilled < limit:
+            async with history.loading:
+                if history.backfilled < limit:
+                    await self._backfill(channel, history, bot_user_id)
+        entries = list(history.entries.values())
+        return entries[-limit:]
+
+    async def _backfill(
+        self,
+        channel: discord.TextChannel | discord.Thread,
+        history: ChannelHistory,
+        bot_user_id: int,
+    ) -> None:
+        capacity = self.capacity
+        history.tombstones = set()
+        try:
+            fetched = [m async for m in channel.history(limit=capacity)]
+        except BaseException:
+            if not history.backfilled and not history.entries:
+                self._channels.pop(channel.id, None)
+            raise
+        finally:
+            tombstones, history.tombstones = history.tombstones, None
+        self.backfills += 1
+
+        fetched.reverse()  # Oldest first
+        merged: OrderedDict[int, HistoryEntry] = OrderedDict(
+            (m.id, format_message(m, bot_user_id)) for m in fetched if m.id not in tombstones
+        )
+        newest = fetched[-1].id if fetched else 0
+        # Events that arrived during the fetch are at least as fresh as the REST copy
+        for message_id, entry in history.entries.items():
+            if message_id in merged or message_id > newest:
+                merged[message_id] = entry
+        history.entries = merged
+        history.backfilled = capacity
+        history.prune(capacity)
@@ -1,27 +1,41 @@
+import json
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
 import aiohttp
 
+from .streaming import iter_sse_data
+
 log = logging.getLogger("red.unicorn_ai.openai")
 
+# Keep-alive connections shared by every generation against the provider
+POOL_LIMIT = 4
+
 
 class OpenAIClient:
     def __init__(self, bot):
         self.bot = bot
+        self._session: aiohttp.ClientSession | None = None
 
-    async def generate_response(
-        self,
-        endpoint: str,
-        api_key: str,
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=POOL_LIMIT))
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @staticmethod
+    def _build_payload(
         model: str,
         system_instruction: str,
         history: list[dict[str, Any]],
-        after_context: str | None = None,
-    ) -> str | None:
-        """
-        Generates a response from OpenAI-compatible endpoint.
-        """
+        after_context: str | None,
+    ) -> dict[str, Any]:
         # Convert Vertex format to OpenAI format
         messages = []
 
@@ -43,8 +57,7 @@ class OpenAIClient:
         if after_context:
             messages.append({"role": "user", "content": after_context})
 
-        # Construct payload
-        payload = {
+        return {
             "model": model,
             "messages": messages,
             "temperature": 0.95,
@@ -53,30 +66,86 @@ class OpenAIClient:
             "max_tokens": 8192,
         }
 
+    async def generate_response(
+        self,
+        endpoint: str,
+        api_key: str,
+        model: str,
+        system_instruction: str,
+        history: list[dict[str, Any]],
+        after_context: str | None = None,
+    ) -> str | None:
+        """
+        Generates a response from OpenAI-compatible endpoint.
+        """
+        payload = self._build_payload(model, system_instruction, history, after_context)
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(endpoint, json=payload, headers=headers) as resp:
-                    if resp.status != 200:
-                        error_text = await resp.text()
-                        log.error(f"OpenAI API Error {resp.status}: {error_text}")
-                        return f"Error {resp.status}: {error_text}"
+        try:
+            async with self._get_session().post(endpoint, json=payload, headers=headers) as resp:
+                if resp.status != 200:
+                    error_text = await resp.text()
+                    log.error(f"OpenAI API Error {resp.status}: {error_text}")
+                    return f"Error {resp.status}: {error_text}"
 
-                    data = await resp.json()
+                data = await resp.json()
+
+                # Extract text from OpenAI format
+                try:
+                    choices = data.get("choices", [])
+                    if not choices:
+                        return None
+
+                    content = choices[0].get("message", {}).get("content", "")
+                    return content
+                except Exception as e:
+                    log.error(f"Failed to parse response: {e}")
+                    return f"Error parsing response: {e}"
+
+        except Exception as e:
+            log.error(f"Request failed: {e}")
+            return f"Request failed: {e}"
+
+    async def stream_response(
+        self,
+        endpoint: str,
+        api_key: str,
+        model: str,
+        system_instruction: str,
+        history: list[dict[str, Any]],
+        after_context: str | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Streams a response from an OpenAI-compatible endpoint, yielding text deltas.
+        Errors are yielded as text, the same way generate_response returns them.
+        """
+        payload = self._build_payload(model, system_instruction, history, after_context)
+        payload["stream"] = True
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
-                    # Extract text from OpenAI format
+        started = False
+        try:
+            async with self._get_session().post(endpoint, json=payload, headers=headers) as resp:
+                if resp.status != 200:
+                    error_text = await resp.text()
+                    log.error(f"OpenAI API Error {resp.status}: {error_text}")
+                    yield f"Error {resp.status}: {error_text}"
+                    return
+
+                async for data in iter_sse_data(resp):
+                    if data == "[DONE]":
+                        break
                     try:
-                        choices = data.get("choices", [])
-                        if not choices:
-                            return None
-
-                        content = choices[0].get("message", {}).get("content", "")
-                        return content
-                    except Exception as e:
-                        log.error(f"Failed to parse response: {e}")
-                        return f"Error parsing response: {e}"
-
-            except Exception as e:
-                log.error(f"Request failed: {e}")
-                return f"Request failed: {e}"
+                        choices = json.loads(data).get("choices") or []
+                    except ValueError:
+                        log.warning(f"Skipping malformed stream chunk: {data[:200]}")
+                        continue
+                    delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                    if delta:
+                        started = True
+                        yield delta
+
+        except Exception as e:
+            log.error(f"Request failed: {e}")
+            if not started:
+                yield f"Request failed: {e}"
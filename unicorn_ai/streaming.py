@@ -0,0 +1,98 @@
+"""Server-sent event parsing and progressive reply posting for streamed generations."""
+
+from __future__ import annotations
+
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+import aiohttp
+import discord
+
+MAX_MESSAGE_LENGTH = 2000
+# Discord allows roughly five edits per five seconds per channel
+EDIT_INTERVAL = 1.5
+
+_THINK_RE = re.compile(r"<think>.*?(?:</think>|$)", flags=re.DOTALL)
+
+
+def strip_thinking(text: str) -> str:
+    """Strip <think> blocks, including one that is still open."""
+    return _THINK_RE.sub("", text).strip()
+
+
+def truncate(content: str) -> str:
+    """Truncate content to Discord's message limit."""
+    if len(content) > MAX_MESSAGE_LENGTH:
+        return content[: MAX_MESSAGE_LENGTH - 3] + "..."
+    return content
+
+
+async def iter_sse_data(resp: aiohttp.ClientResponse) -> AsyncIterator[str]:
+    """Yield the ``data:`` payload of each server-sent event in a response."""
+    data: list[str] = []
+    async for raw in resp.content:
+        line = raw.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip(" "))
+    if data:
+        yield "\n".join(data)
+
+
+class StreamingReply:
+    """
+    Posts a reply as soon as text arrives and edits it as the stream grows.
+
+    Edits are throttled to one per ``interval`` seconds; the final text is
+    always written by :meth:`finish`.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[Any]],
+        *,
+        clean: Callable[[str], str] | None = None,
+        interval: float | None = None,
+    ):
+        self._send = send
+        self._clean = clean or str.strip
+        self.interval = EDIT_INTERVAL if interval is None else interval
+        self.text = ""
+        self.message: Any = None
+        self._shown = ""
+        self._last_update = 0.0
+        self.edits = 0
+
+    def _visible(self) -> str:
+        return truncate(self._clean(self.text))
+
+    async def _show(self, content: str) -> None:
+        if self.message is None:
+            self.message = await self._send(content)
+        else:
+            await self.message.edit(content=content, allowed_mentions=discord.AllowedMentions.none())
+            self.edits += 1
+        self._shown = content
+        self._last_update = time.monotonic()
+
+    async def feed(self, delta: str) -> None:
+        self.text += delta
+        if time.monotonic() - self._last_update < self.interval:
+            return
+        content = self._visible()
+        if content and content != self._shown:
+            await self._show(content)
+
+    async def finish(self) -> str | None:
+        """Write the final text; returns it, or None if nothing was generated."""
+        content = self._visible()
+        if not content:
+            return None
+        if content != self._shown:
+            await self._show(content)
+        return content
@@ -0,0 +1,161 @@
+"""Tests for the event-fed UnicornAI history cache."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+
+from unicorn_ai.history_cache import HistoryCache
+from unicorn_ai.persona import Persona
+from unicorn_ai.unicorn_ai import UnicornAI
+
+BOT_ID = 999
+
+
+class FakeChannel:
+    """Channel whose REST history is a list, newest last, with call counting."""
+
+    def __init__(self, channel_id: int = 1) -> None:
+        self.id = channel_id
+        self.messages: list[Any] = []
+        self.history_calls: list[int] = []
+        self.gate: asyncio.Event | None = None
+
+    def post(self, message_id: int, author_id: int, content: str, name: str = "User") -> Any:
+        message = SimpleNamespace(
+            id=message_id,
+            channel=self,
+            clean_content=content,
+            author=SimpleNamespace(id=author_id, display_name=name),
+        )
+        self.messages.append(message)
+        return message
+
+    async def history(self, limit: int):
+        self.history_calls.append(limit)
+        snapshot = list(reversed(self.messages))[:limit]
+        if self.gate is not None:
+            await self.gate.wait()
+        for message in snapshot:
+            yield message
+
+
+def _texts(entries) -> list[str]:
+    return [entry.text for entry in entries]
+
+
+@pytest.mark.asyncio
+async def test_backfills_once_then_follows_events() -> None:
+    cache = HistoryCache(5)
+    channel = FakeChannel()
+    for i in range(1, 4):
+        channel.post(i, 10, f"m{i}")
+
+    assert _texts(await cache.recent(channel, 5, BOT_ID)) == ["User: m1", "User: m2", "User: m3"]  # type: ignore[arg-type]
+
+    cache.add(channel.post(4, BOT_ID, "reply", "Bot"), BOT_ID)  # type: ignore[arg-type]
+    edited = channel.post(2, 10, "m2 (edited)")
+    cache.edit(edited, BOT_ID)  # type: ignore[arg-type]
+    cache.delete(channel.id, [1])
+
+    entries = await cache.recent(channel, 5, BOT_ID)  # type: ignore[arg-type]
+    assert _texts(entries) == ["User: m2 (edited)", "User: m3", "Bot: reply"]
+    assert entries[-1].as_prompt() == {"role": "model", "parts": [{"text": "Bot: reply"}]}
+    assert channel.history_calls == [5]
+
+
+@pytest.mark.asyncio
+async def test_window_is_pruned_to_the_largest_limit() -> None:
+    cache = HistoryCache(3)
+    channel = FakeChannel()
+    await cache.recent(channel, 2, BOT_ID)  # type: ignore[arg-type]
+    for i in range(1, 11):
+        cache.add(channel.post(i, 10, f"m{i}"), BOT_ID)  # type: ignore[arg-type]
+
+    assert _texts(await cache.recent(channel, 2, BOT_ID)) == ["User: m9", "User: m10"]  # type: ignore[arg-type]
+    assert len(await cache.recent(channel, 3, BOT_ID)) == 3  # type: ignore[arg-type]
+    assert channel.history_calls == [3]
+
+    # A wider persona limit refetches once, then is kept up to date by events
+    assert len(await cache.recent(channel, 8, BOT_ID)) == 8  # type: ignore[arg-type]
+    cache.add(channel.post(11, 10, "m11"), BOT_ID)  # type: ignore[arg-type]
+    assert _texts(await cache.recent(channel, 8, BOT_ID))[-1] == "User: m11"  # type: ignore[arg-type]
+    assert channel.history_calls == [3, 8]
+
+
+@pytest.mark.asyncio
+async def test_untracked_channels_are_ignored() -> None:
+    cache = HistoryCache(5)
+    channel = FakeChannel()
+    cache.add(channel.post(1, 10, "hello"), BOT_ID)  # type: ignore[arg-type]
+    assert channel.id not in cache
+
+
+@pytest.mark.asyncio
+async def test_events_during_backfill_are_merged() -> None:
+    cache = HistoryCache(10)
+    channel = FakeChannel()
+    for i in range(1, 4):
+        channel.post(i, 10, f"m{i}")
+    channel.gate = asyncio.Event()
+
+    task = asyncio.create_task(cache.recent(channel, 10, BOT_ID))  # type: ignore[arg-type]
+    await asyncio.sleep(0)
+    cache.add(channel.post(4, 10, "m4"), BOT_ID)  # type: ignore[arg-type]
+    cache.delete(channel.id, [2])
+    channel.gate.set()
+
+    assert _texts(await task) == ["User: m1", "User: m3", "User: m4"]
+
+
+@pytest.mark.asyncio
+async def test_failed_backfill_is_retried() -> None:
+    cache = HistoryCache(5)
+    channel = FakeChannel()
+    channel.history = MagicMock(side_effect=RuntimeError("boom"))  # type: ignore[method-assign]
+
+    with pytest.raises(RuntimeError):
+        await cache.recent(channel, 5, BOT_ID)  # type: ignore[arg-type]
+    assert channel.id not in cache
+
+
+@pytest.mark.asyncio
+async def test_trigger_uses_cache_and_filters_opt_outs() -> None:
+    bot = MagicMock()
+    bot.user = SimpleNamespace(id=BOT_ID)
+    with patch("discord.ext.tasks.Loop.start"):
+        cog = UnicornAI(bot)
+    persona = Persona(name="Test", description="", system_prompt="sys", personality="", history_limit=10)
+    cog.personas = MagicMock(load_persona=MagicMock(return_value=persona))
+    cog.config = MagicMock()
+    cog.config.channel.return_value.all = AsyncMock(return_value={"enabled": True, "active_persona": "Test"})
+    cog.config.all = AsyncMock(return_value={"history_limit": 20})
+    opted_out = {11}
+    cog.config.user_from_id.side_effect = lambda uid: SimpleNamespace(
+        opt_out=AsyncMock(return_value=uid in opted_out), clear=AsyncMock()
+    )
+    cog._do_generate_and_send = AsyncMock()  # type: ignore[method-assign]
+
+    channel = FakeChannel()
+    text_channel = MagicMock(spec=discord.TextChannel, id=channel.id, history=channel.history)
+    channel.post(1, 10, "visible")
+    channel.post(2, 11, "hidden")
+    channel.post(3, 10, "")
+
+    await cog._trigger_ai_claimed(text_channel)
+    await cog.on_message(channel.post(4, 11, "still hidden"))  # type: ignore[arg-type]
+    await cog.on_message(channel.post(5, BOT_ID, "reply", "Bot"))  # type: ignore[arg-type]
+    await cog._trigger_ai_claimed(text_channel)
+
+    assert channel.history_calls == [20]
+    history = cog._do_generate_and_send.await_args.args[3]  # type: ignore[union-attr]
+    assert history == [
+        {"role": "user", "parts": [{"text": "User: visible"}]},
+        {"role": "model", "parts": [{"text": "Bot: reply"}]},
+    ]
+
+    await cog.red_delete_data_for_user(requester="user", user_id=10)  # type: ignore[arg-type]
+    assert [e.author_id for e in await cog.history.recent(channel, 10, BOT_ID)] == [11, 11, BOT_ID]  # type: ignore[arg-type]
@@ -1,9 +1,14 @@
 """Tests for the OpenAI client integration in unicorn_ai."""
 
+import json
+from collections.abc import AsyncGenerator
 from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from redbot.core.bot import Red
 
 from unicorn_ai.openai import OpenAIClient
@@ -99,3 +104,90 @@ async def test_generate_response_missing_choices(post_mock: MagicMock, client: O
     result = await client.generate_response(endpoint="", api_key="", model="", system_instruction="", history=[])
 
     assert result is None
+
+
+class FakeOpenAI:
+    """Local OpenAI-compatible server recording requests and their connections."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict[str, Any]] = []
+        self.peers: list[object] = []
+        self.chunks = ["Hel", "lo ", "there"]
+        self.status = 200
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.requests.append(body)
+        assert request.transport is not None
+        self.peers.append(request.transport.get_extra_info("peername"))
+        if self.status != 200:
+            return web.Response(status=self.status, text="Rate limited")
+        if not body.get("stream"):
+            return web.json_response({"choices": [{"message": {"content": "".join(self.chunks)}}]})
+
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        await resp.write(b": keep-alive\n\n")
+        for chunk in self.chunks:
+            event = {"choices": [{"delta": {"content": chunk}}]}
+            await resp.write(f"data: {json.dumps(event)}\n\n".encode())
+        await resp.write(b'data: {"choices": [{"delta": {}, "finish_reason": "stop"}]}\n\n')
+        await resp.write(b"data: [DONE]\n\n")
+        await resp.write_eof()
+        return resp
+
+
+@pytest_asyncio.fixture
+async def fake_api(client: OpenAIClient) -> AsyncGenerator[tuple[FakeOpenAI, str], None]:
+    api = FakeOpenAI()
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", api.handle)
+    server = TestServer(app)
+    await server.start_server()
+    yield api, str(server.make_url("/v1/chat/completions"))
+    await client.close()
+    await server.close()
+
+
+def _request(endpoint: str) -> dict[str, Any]:
+    return {
+        "endpoint": endpoint,
+        "api_key": "secret",
+        "model": "glm",
+        "system_instruction": "sys",
+        "history": [{"role": "user", "parts": [{"text": "Hi"}]}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_generations_share_one_pooled_connection(client: OpenAIClient, fake_api: tuple[FakeOpenAI, str]) -> None:
+    api, endpoint = fake_api
+    for _ in range(3):
+        assert await client.generate_response(**_request(endpoint)) == "Hello there"
+    assert [d async for d in client.stream_response(**_request(endpoint))] == ["Hel", "lo ", "there"]
+
+    assert len(api.requests) == 4
+    assert len(set(api.peers)) == 1
+    assert "stream" not in api.requests[0]
+    assert api.requests[-1]["stream"] is True
+    assert api.requests[-1]["messages"] == api.requests[0]["messages"]
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_error_text(client: OpenAIClient, fake_api: tuple[FakeOpenAI, str]) -> None:
+    api, endpoint = fake_api
+    api.status = 429
+    assert [d async for d in client.stream_response(**_request(endpoint))] == ["Error 429: Rate limited"]
+
+
+@pytest.mark.asyncio
+async def test_close_releases_session(client: OpenAIClient, fake_api: tuple[FakeOpenAI, str]) -> None:
+    _api, endpoint = fake_api
+    await client.generate_response(**_request(endpoint))
+    session = client._session
+    assert session is not None
+
+    await client.close()
+
+    assert session.closed
+    assert client._session is None
@@ -0,0 +1,165 @@
+"""Tests for streamed replies and provider token caching."""
+
+import asyncio
+import datetime
+import json
+from collections.abc import AsyncGenerator
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from unicorn_ai.persona import Persona
+from unicorn_ai.streaming import StreamingReply, strip_thinking
+from unicorn_ai.unicorn_ai import UnicornAI
+from unicorn_ai.vertex import VertexClient
+
+
+class FakeMessage:
+    def __init__(self, content: str) -> None:
+        self.content = content
+        self.history = [content]
+
+    async def edit(self, *, content: str, allowed_mentions: object) -> None:
+        self.content = content
+        self.history.append(content)
+
+
+def _sender() -> tuple[list[FakeMessage], AsyncMock]:
+    sent: list[FakeMessage] = []
+
+    async def send(content: str) -> FakeMessage:
+        sent.append(FakeMessage(content))
+        return sent[-1]
+
+    return sent, AsyncMock(side_effect=send)
+
+
+def test_strip_thinking_handles_open_blocks() -> None:
+    assert strip_thinking("<think>plan</think> Hi!") == "Hi!"
+    assert strip_thinking("Hi <think>still going") == "Hi"
+
+
+@pytest.mark.asyncio
+async def test_reply_posts_first_chunk_and_throttles_edits() -> None:
+    sent, send = _sender()
+    reply = StreamingReply(send, interval=60)
+
+    for delta in ["Hello", " there", " friend"]:
+        await reply.feed(delta)
+
+    # Posted as soon as text arrived; later chunks wait for the edit interval
+    assert [m.content for m in sent] == ["Hello"]
+    assert await reply.finish() == "Hello there friend"
+    assert sent[0].history == ["Hello", "Hello there friend"]
+    assert reply.edits == 1
+
+
+@pytest.mark.asyncio
+async def test_reply_hides_thinking_and_skips_empty_streams() -> None:
+    sent, send = _sender()
+    reply = StreamingReply(send, clean=strip_thinking, interval=0)
+    for delta in ["<think>hmm", "...</think>", "Answer"]:
+        await reply.feed(delta)
+    assert await reply.finish() == "Answer"
+    assert sent[0].history == ["Answer"]
+
+    _sent, send = _sender()
+    empty = StreamingReply(send, clean=strip_thinking)
+    await empty.feed("<think>never closed")
+    assert await empty.finish() is None
+    send.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_reply_truncates_to_discord_limit() -> None:
+    _sent, send = _sender()
+    reply = StreamingReply(send, interval=0)
+    await reply.feed("x" * 1990)
+    await reply.feed("y" * 50)
+    await reply.feed("z" * 50)
+
+    final = await reply.finish()
+    assert final is not None and len(final) == 2000 and final.endswith("...")
+    assert reply.edits == 1  # no further edits once the message is full
+
+
+async def _sse(request: web.Request) -> web.StreamResponse:
+    resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await resp.prepare(request)
+    for chunk in ["Once ", "upon ", "a time"]:
+        await resp.write(f"data: {json.dumps({'choices': [{'delta': {'content': chunk}}]})}\n\n".encode())
+        await asyncio.sleep(0.01)
+    await resp.write(b"data: [DONE]\n\n")
+    return resp
+
+
+@pytest_asyncio.fixture
+async def endpoint() -> AsyncGenerator[str, None]:
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", _sse)
+    server = TestServer(app)
+    await server.start_server()
+    yield str(server.make_url("/v1/chat/completions"))
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_cog_streams_reply_into_one_message(endpoint: str) -> None:
+    bot = MagicMock()
+    bot.get_shared_api_tokens = AsyncMock(return_value={"api_key": "key"})
+    with patch("discord.ext.tasks.Loop.start"):
+        cog = UnicornAI(bot)
+    cog.config = MagicMock()
+    cog.config.channel.return_value.last_run.set = AsyncMock()
+    sent, send = _sender()
+
+    async def send_response(_channel: object, content: str, _persona: object) -> FakeMessage:
+        return await send(content)
+
+    cog._send_response = send_response  # type: ignore[method-assign]
+    persona = Persona(name="Teller", description="", system_prompt="sys", personality="")
+    settings = {"provider": "openai", "openai_endpoint": endpoint, "openai_model": "m", "stream_responses": True}
+
+    with patch("unicorn_ai.streaming.EDIT_INTERVAL", 0):
+        await cog._do_generate_and_send(None, SimpleNamespace(id=1), settings, [], persona)
+    await cog.cog_unload()
+
+    (message,) = sent
+    assert message.history[0] == "Once"
+    assert message.content == "Once upon a time"
+    cog.config.channel.return_value.last_run.set.assert_awaited_once()
+
+
+class FakeCredentials:
+    def __init__(self) -> None:
+        self.token: str | None = None
+        self.expiry: datetime.datetime | None = None
+        self.refreshes = 0
+        self.lifetime = datetime.timedelta(hours=1)
+
+    def refresh(self, _request: object) -> None:
+        self.refreshes += 1
+        self.token = f"token-{self.refreshes}"
+        self.expiry = datetime.datetime.now(datetime.UTC).replace(tzinfo=None) + self.lifetime
+
+
+@pytest.mark.asyncio
+async def test_vertex_token_is_cached_until_near_expiry(tmp_path) -> None:
+    client = VertexClient(str(tmp_path))
+    creds = FakeCredentials()
+    client._creds = creds  # type: ignore[assignment]
+    client._load_credentials = AsyncMock(return_value=True)  # type: ignore[method-assign]
+
+    tokens = await asyncio.gather(*(client._get_access_token() for _ in range(5)))
+    assert tokens == ["token-1"] * 5
+    assert creds.refreshes == 1
+
+    # Inside the refresh margin the token is renewed before it actually expires
+    creds.expiry = datetime.datetime.now(datetime.UTC).replace(tzinfo=None) + datetime.timedelta(minutes=2)
+    assert await client._get_access_token() == "token-2"
+    assert await client._get_access_token() == "token-2"
+    client._load_credentials.assert_not_awaited()
@@ -144,6 +144,7 @@ async def cog(bot_mock: MagicMock, persona_mock: Persona) -> UnicornAI:
             return OptOutWrapper()
 
     config_mock.user = MagicMock(return_value=UserConfigWrapper())
+    config_mock.user_from_id = MagicMock(return_value=UserConfigWrapper())
 
     cog_instance.config = config_mock
 
@@ -284,11 +285,13 @@ async def test_trigger_ai_vertex(
 ) -> None:
     # Setup history
     msg_user = MagicMock(spec=discord.Message)
+    msg_user.id = 2
     msg_user.author.id = 54321
     msg_user.author.display_name = "User"
     msg_user.clean_content = "Hello there"
 
     msg_bot = MagicMock(spec=discord.Message)
+    msg_bot.id = 1
     msg_bot.author.id = 999999
     msg_bot.author.display_name = "Bot"
     msg_bot.clean_content = "General Kenobi"
@@ -302,8 +305,8 @@ async def test_trigger_ai_vertex(
     # Run
     await cog._trigger_ai(ctx=ctx_mock)
 
-    # Verify history limit and order
-    ctx_mock.channel.history.assert_called_once_with(limit=10)
+    # History is backfilled once, wide enough for the global limit
+    ctx_mock.channel.history.assert_called_once_with(limit=50)
 
     # Verify vertex provider was called
     vertex_mock: MagicMock = cog.vertex  # type: ignore
@@ -335,7 +338,7 @@ async def test_trigger_ai_openai(send_mock: AsyncMock, cog: UnicornAI, ctx_mock:
     cog.config.all.return_value = GlobalWrapper()  # type: ignore
 
     async def history_gen(*args, **kwargs):
-        yield MagicMock(spec=discord.Message)
+        yield MagicMock(spec=discord.Message, id=1)
 
     ctx_mock.channel.history = MagicMock(return_value=history_gen())
 
@@ -10,8 +10,10 @@ import discord
 from discord.ext import tasks
 from redbot.core import Config, app_commands, commands
 
+from .history_cache import HistoryCache
 from .openai import OpenAIClient
 from .persona import PersonaManager
+from .streaming import StreamingReply, strip_thinking, truncate
 from .vertex import VertexClient
 
 log = logging.getLogger("red.unicorn_ai")
@@ -37,6 +39,7 @@ class GlobalSettings(TypedDict):
     model: str
     openai_endpoint: str
     openai_model: str
+    stream_responses: bool
 
 
 def _bounded_int(value: object, *, default: int, minimum: int, maximum: int) -> int:
@@ -95,6 +98,7 @@ def normalize_global_settings(value: object) -> GlobalSettings:
         "model": model,
         "openai_endpoint": openai_endpoint,
         "openai_model": openai_model,
+        "stream_responses": raw.get("stream_responses") is True,
     }
 
 
@@ -140,6 +144,7 @@ class UnicornAI(commands.Cog):
             "provider": "vertex",
             "openai_endpoint": "https://integrate.api.nvidia.com/v1/chat/completions",
             "openai_model": "z-ai/glm5",
+            "stream_responses": False,
         }
         self.config.register_global(**default_global)
 
@@ -153,6 +158,7 @@ class UnicornAI(commands.Cog):
         self.vertex = VertexClient(self.cog_path)
         self.openai = OpenAIClient(self.bot)
         self.personas = PersonaManager(self.data_path)
+        self.history = HistoryCache(MIN_HISTORY)
 
         # Start loop
         self.auto_message_loop.start()
@@ -164,12 +170,15 @@ class UnicornAI(commands.Cog):
             task.cancel()
         if tasks_to_cancel:
             await asyncio.gather(*tasks_to_cancel, return_exceptions=True)
+        await self.openai.close()
+        await self.vertex.close()
 
     async def red_delete_data_for_user(  # pyright: ignore[reportIncompatibleMethodOverride]
         self, *, requester, user_id: int
     ) -> None:
-        """Delete the user's persistent AI opt-out preference."""
+        """Delete the user's persistent AI opt-out preference and cached messages."""
         await self.config.user_from_id(user_id).clear()
+        self.history.forget_author(user_id)
 
     def _track_task(self, coroutine) -> None:
         task = asyncio.create_task(coroutine)
@@ -221,6 +230,24 @@ class UnicornAI(commands.Cog):
 
                     self._track_task(self._trigger_ai(channel=channel))
 
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.channel.id in self.history and self.bot.user is not None:
+            self.history.add(message, self.bot.user.id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if payload.channel_id in self.history and self.bot.user is not None:
+            self.history.edit(payload.message, self.bot.user.id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        self.history.delete(payload.channel_id, (payload.message_id,))
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        self.history.delete(payload.channel_id, payload.message_ids)
+
     @auto_message_loop.before_loop
     async def before_loop(self):
         await self.bot.wait_until_ready()
@@ -311,8 +338,10 @@ class UnicornAI(commands.Cog):
                     await ctx.send("Cannot fetch history from this channel type.")
                 return
 
-            messages = [m async for m in target_channel.history(limit=limit)]
-            messages.reverse()  # Oldest first
+            # Keep the window wide enough for the global limit as well as this persona's
+            self.history.grow(global_settings["history_limit"])
+            assert self.bot.user is not None
+            entries = await self.history.recent(target_channel, limit, self.bot.user.id)
         except Exception as e:
             log.error(f"Failed to fetch history: {e}")
             if ctx:
@@ -320,18 +349,20 @@ class UnicornAI(commands.Cog):
             return
 
         # 3. Format History for Gemini (With Opt-Out Check)
+        opted_out: dict[int, bool] = {}
         formatted_history = []
-        for msg in messages:
-            # Check opt-out status for user messages
-            if msg.author.id != self.bot.user.id and await self.config.user(msg.author).opt_out():
-                continue
-
-            role = "model" if msg.author.id == self.bot.user.id else "user"
-            content = msg.clean_content
-            if not content:
+        for entry in entries:
+            if not entry.text:
                 continue  # Skip empty messages
 
-            formatted_history.append({"role": role, "parts": [{"text": f"{msg.author.display_name}: {content}"}]})
+            # Check opt-out status for user messages
+            if entry.role == "user":
+                if entry.author_id not in opted_out:
+                    opted_out[entry.author_id] = await self.config.user_from_id(entry.author_id).opt_out()
+                if opted_out[entry.author_id]:
+                    continue
+
+            formatted_history.append(entry.as_prompt())
 
         # 4. Generate Response
         if ctx:
@@ -352,23 +383,28 @@ class UnicornAI(commands.Cog):
                     await ctx.send(error_msg)
                 return
 
-            response = await self.openai.generate_response(
-                endpoint=global_settings.get("openai_endpoint", "https://nano-gpt.com/api/v1/chat/completions"),
-                api_key=api_key["api_key"],
-                model=global_settings.get("openai_model", "zai-org/glm-5:thinking"),
-                system_instruction=persona.system_prompt,
-                history=formatted_history,
-                after_context=persona.after_context,
-            )
+            client = self.openai
+            request = {
+                "endpoint": global_settings.get("openai_endpoint", "https://nano-gpt.com/api/v1/chat/completions"),
+                "api_key": api_key["api_key"],
+                "model": global_settings.get("openai_model", "zai-org/glm-5:thinking"),
+            }
+            clean = None
         else:  # vertex (default)
-            response = await self.vertex.generate_response(
-                model=global_settings["model"],
-                location="global",
-                api_version="v1beta1",
-                system_instruction=persona.system_prompt,
-                history=formatted_history,
-                after_context=persona.after_context,
-            )
+            client = self.vertex
+            request = {"model": global_settings["model"], "location": "global", "api_version": "v1beta1"}
+            clean = strip_thinking
+        request.update(
+            system_instruction=persona.system_prompt,
+            history=formatted_history,
+            after_context=persona.after_context,
+        )
+
+        if global_settings.get("stream_responses"):
+            await self._stream_and_send(ctx, target_channel, client.stream_response(**request), persona, clean)
+            return
+
+        response = await client.generate_response(**request)
 
         if not response:
             if ctx:
@@ -384,26 +420,47 @@ class UnicornAI(commands.Cog):
             if ctx:
                 await ctx.send(f"Failed to send message: {e}")
 
+    async def _stream_and_send(self, ctx, target_channel, stream, persona, clean=None):
+        """
+        Posts the reply as soon as the first tokens arrive, then edits it as the rest stream in.
+        """
+        reply = StreamingReply(lambda content: self._send_response(target_channel, content, persona), clean=clean)
+        try:
+            async for delta in stream:
+                await reply.feed(delta)
+            response = await reply.finish()
+        except Exception as e:
+            log.error(f"Streamed send failed: {e}")
+            if ctx:
+                await ctx.send(f"Failed to send message: {e}")
+            return
+        finally:
+            await stream.aclose()
+
+        if not response:
+            if ctx:
+                await ctx.send("Failed to generate response (empty or error).")
+            return
+        await self.config.channel(target_channel).last_run.set(time.time())
+
     async def _send_response(self, channel, content: str, persona):
         """
         Sends the response via Webhook if possible (for persona impersonation),
         otherwise falls back to standard message.
+        Returns the sent message so streamed replies can edit it.
         """
         # Truncate content to 2000 chars to avoid Discord 400s
-        if len(content) > 2000:
-            content = content[:1997] + "..."
+        content = truncate(content)
 
         allowed_mentions = discord.AllowedMentions.none()
 
         # Check if we can use webhooks (Guild channels only)
         if not hasattr(channel, "guild"):
-            await channel.send(content, allowed_mentions=allowed_mentions)
-            return
+            return await channel.send(content, allowed_mentions=allowed_mentions)
 
         perms = channel.permissions_for(channel.guild.me)
         if not perms.manage_webhooks:
-            await channel.send(content, allowed_mentions=allowed_mentions)
-            return
+            return await channel.send(content, allowed_mentions=allowed_mentions)
 
         try:
             # Handle Threads
@@ -415,8 +472,7 @@ class UnicornAI(commands.Cog):
                 thread_obj = channel
 
             if not isinstance(target_channel, discord.TextChannel):
-                await channel.send(content, allowed_mentions=allowed_mentions)
-                return
+                return await channel.send(content, allowed_mentions=allowed_mentions)
 
             # Fetch or create webhook
             webhooks = await target_channel.webhooks()
@@ -427,17 +483,18 @@ class UnicornAI(commands.Cog):
                 webhook = await target_channel.create_webhook(name="UnicornAI Webhook")
 
             # Send via webhook
-            await webhook.send(
+            return await webhook.send(
                 content=content,
                 username=persona.name,
                 avatar_url=persona.avatar_url or self.bot.user.display_avatar.url,
                 thread=thread_obj,
                 allowed_mentions=allowed_mentions,
+                wait=True,
             )
         except Exception as e:
             log.error(f"Webhook send failed: {e}")
             # Fallback
-            await channel.send(content, allowed_mentions=allowed_mentions)
+            return await channel.send(content, allowed_mentions=allowed_mentions)
 
     # --- Commands ---
 
@@ -561,6 +618,7 @@ class UnicornAI(commands.Cog):
     async def ai_history(self, ctx, limit: commands.Range[int, 1, 200]):
         """Set the global history limit (max messages to read)."""
         await self.config.history_limit.set(limit)
+        self.history.grow(limit)
         await ctx.send(f"Global history limit set to {limit} messages.")
 
     @ai_group.command(name="model")
@@ -589,6 +647,14 @@ class UnicornAI(commands.Cog):
         else:
             await ctx.send("Provider set to **Vertex AI**.")
 
+    @ai_group.command(name="stream")
+    @commands.is_owner()
+    async def ai_stream(self, ctx):
+        """Toggle streaming replies (post early and edit as the answer arrives)."""
+        new_state = not await self.config.stream_responses()
+        await self.config.stream_responses.set(new_state)
+        await ctx.send(f"Streaming replies are now {'**Enabled**' if new_state else '**Disabled**'}.")
+
     @ai_group.command(name="openai_model")
     @commands.is_owner()
     async def ai_openai_model(self, ctx, name: str):
@@ -1,16 +1,24 @@
 import asyncio
+import datetime
 import json
 import logging
 import os
-import re
+from collections.abc import AsyncIterator
 from typing import Any
 
 import aiohttp
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 
+from .streaming import iter_sse_data, strip_thinking
+
 log = logging.getLogger("red.unicorn_ai.vertex")
 
+# Keep-alive connections shared by every generation against Vertex
+POOL_LIMIT = 4
+# Refresh the access token this long before it expires
+TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=5)
+
 
 class VertexClient:
     def __init__(self, cog_path: str):
@@ -18,6 +26,18 @@ class VertexClient:
         self._creds = None
         self._project_id = None
         self._token_lock = asyncio.Lock()
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=POOL_LIMIT))
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     async def _load_credentials(self) -> bool:
         """
@@ -53,49 +73,67 @@ class VertexClient:
             log.error(f"Failed to load credentials: {e}")
             return False
 
+    def _cached_token(self) -> str | None:
+        """Return the current token if it stays valid past the refresh margin."""
+        creds = self._creds
+        if creds is None or not creds.token:
+            return None
+        if creds.expiry is None:
+            return creds.token
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        if creds.expiry - TOKEN_REFRESH_MARGIN <= now:
+            return None
+        return creds.token
+
     async def _get_access_token(self) -> str | None:
         """
-        Refreshes and returns the OAuth2 access token.
+        Returns the cached OAuth2 access token, refreshing it shortly before expiry.
         """
+        token = self._cached_token()
+        if token:
+            return token
+
         async with self._token_lock:
+            # Another caller may have refreshed while we waited
+            token = self._cached_token()
+            if token:
+                return token
+
             if not self._creds and not await self._load_credentials():
                 return None
 
             if self._creds is None:
                 return None
 
-            if not self._creds.valid:
-                try:
-                    # Refresh token in thread
-                    await asyncio.to_thread(self._creds.refresh, Request())
-                except Exception as e:
-                    log.error(f"Failed to refresh token: {e}")
-                    return None
+            try:
+                # Refresh token in thread
+                await asyncio.to_thread(self._creds.refresh, Request())
+            except Exception as e:
+                log.error(f"Failed to refresh token: {e}")
+                return None
 
             return self._creds.token
 
-    async def generate_response(
+    def _build_request(
         self,
         model: str,
         location: str,
         api_version: str,
         system_instruction: str,
         history: list[dict[str, Any]],
-        after_context: str | None = None,
-    ) -> str | None:
+        after_context: str | None,
+        method: str,
+    ) -> tuple[str, dict[str, Any]]:
         """
-        Generates a response from Vertex AI.
+        Returns the request URL and payload for a generation call.
         """
-        token = await self._get_access_token()
-        if not token or not self._project_id:
-            return "Error: Authentication failed or missing Service Account."
-
         # Handle global vs regional endpoints
         if location == "ai-studio":
             # Google AI Studio (Generative Language API) - uses v1beta by default usually, but we can respect api_version if valid
             # AI Studio path: v1beta/models/{model}
             version = api_version if api_version else "v1beta"
-            url = f"https://generativelanguage.googleapis.com/{version}/models/{model}:generateContent"
+            url = f"https://generativelanguage.googleapis.com/{version}/models/{model}:{method}"
 
         elif location == "global":
             # Vertex AI Express / Global
@@ -103,7 +141,7 @@ class VertexClient:
             url = (
                 f"https://{hostname}/{api_version}/"
                 f"projects/{self._project_id}/locations/{location}/"
-                f"publishers/google/models/{model}:generateContent"
+                f"publishers/google/models/{model}:{method}"
             )
         else:
             # Vertex AI Regional
@@ -111,7 +149,7 @@ class VertexClient:
             url = (
                 f"https://{hostname}/{api_version}/"
                 f"projects/{self._project_id}/locations/{location}/"
-                f"publishers/google/models/{model}:generateContent"
+                f"publishers/google/models/{model}:{method}"
             )
 
         # Append after_context if present
@@ -141,36 +179,106 @@ class VertexClient:
                 {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
             ],
         }
+        return url, payload
 
+    @staticmethod
+    def _candidate_text(data: dict[str, Any]) -> str | None:
+        candidates = data.get("candidates", [])
+        if not candidates:
+            return None
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join([p.get("text", "") for p in parts])
+
+    async def generate_response(
+        self,
+        model: str,
+        location: str,
+        api_version: str,
+        system_instruction: str,
+        history: list[dict[str, Any]],
+        after_context: str | None = None,
+    ) -> str | None:
+        """
+        Generates a response from Vertex AI.
+        """
+        token = await self._get_access_token()
+        if not token or not self._project_id:
+            return "Error: Authentication failed or missing Service Account."
+
+        url, payload = self._build_request(
+            model, location, api_version, system_instruction, history, after_context, "generateContent"
+        )
         headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json; charset=utf-8"}
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(url, json=payload, headers=headers) as resp:
-                    if resp.status != 200:
-                        error_text = await resp.text()
-                        log.error(f"Vertex AI Error {resp.status}: {error_text}")
-                        return f"Error {resp.status}: {error_text}"
+        try:
+            async with self._get_session().post(url, json=payload, headers=headers) as resp:
+                if resp.status != 200:
+                    error_text = await resp.text()
+                    log.error(f"Vertex AI Error {resp.status}: {error_text}")
+                    return f"Error {resp.status}: {error_text}"
 
-                    data = await resp.json()
+                data = await resp.json()
 
-                    # Extract text
-                    try:
-                        candidates = data.get("candidates", [])
-                        if not candidates:
-                            return None
+                # Extract text
+                try:
+                    text_response = self._candidate_text(data)
+                    if text_response is None:
+                        return None
 
-                        parts = candidates[0].get("content", {}).get("parts", [])
-                        text_response = "".join([p.get("text", "") for p in parts])
+                    # Process response: Strip <think> tags (handling closed and unclosed)
+                    return strip_thinking(text_response)
 
-                        # Process response: Strip <think> tags (handling closed and unclosed)
-                        cleaned_text = re.sub(r"<think>.*?(?:</think>|$)", "", text_response, flags=re.DOTALL)
-                        return cleaned_text.strip()
+                except Exception as e:
+                    log.error(f"Failed to parse response: {e}")
+                    return f"Error parsing response: {e}"
 
-                    except Exception as e:
-                        log.error(f"Failed to parse response: {e}")
-                        return f"Error parsing response: {e}"
+        except Exception as e:
+            log.error(f"Request failed: {e}")
+            return f"Request failed: {e}"
 
-            except Exception as e:
-                log.error(f"Request failed: {e}")
-                return f"Request failed: {e}"
+    async def stream_response(
+        self,
+        model: str,
+        location: str,
+        api_version: str,
+        system_instruction: str,
+        history: list[dict[str, Any]],
+        after_context: str | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Streams a response from Vertex AI, yielding raw text deltas.
+        <think> blocks are left in place; strip them from the accumulated text.
+        """
+        token = await self._get_access_token()
+        if not token or not self._project_id:
+            yield "Error: Authentication failed or missing Service Account."
+            return
+
+        url, payload = self._build_request(
+            model, location, api_version, system_instruction, history, after_context, "streamGenerateContent"
+        )
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json; charset=utf-8"}
+
+        started = False
+        try:
+            async with self._get_session().post(url, params={"alt": "sse"}, json=payload, headers=headers) as resp:
+                if resp.status != 200:
+                    error_text = await resp.text()
+                    log.error(f"Vertex AI Error {resp.status}: {error_text}")
+                    yield f"Error {resp.status}: {error_text}"
+                    return
+
+                async for data in iter_sse_data(resp):
+                    try:
+                        delta = self._candidate_text(json.loads(data))
+                    except ValueError:
+                        log.warning(f"Skipping malformed stream chunk: {data[:200]}")
+                        continue
+                    if delta:
+                        started = True
+                        yield delta
+
+        except Exception as e:
+            log.error(f"Request failed: {e}")
+            if not started:
+                yield f"Request failed: {e}"
@@ -5,7 +5,9 @@ from .unicornia import Unicornia
 
 __red_end_user_data_statement__ = (
     "This cog stores user level, XP, currency, inventory, game, relationship, and financial history data "
-    "in SQLite. Deletion removes operational state and anonymizes retained accounting records."
+    "in SQLite. Deletion removes operational state and anonymizes retained accounting records. "
+    "Database snapshots are not rewritten on deletion and keep deleted data until they are rotated out "
+    "(about 7 days with the default backup settings)."
 )
 
 
@@ -2,6 +2,7 @@ import discord
 from redbot.core import checks, commands
 from redbot.core.utils.chat_formatting import box, humanize_number
 from redbot.core.utils.menus import DEFAULT_CONTROLS, menu
+from redbot.core.utils.views import ConfirmView
 
 from ..gambling import RTP_TARGET
 from ..mixins import UnicorniaMixinBase
@@ -155,10 +156,165 @@ class AdminCommands(UnicorniaMixinBase):
                 self.db.nadeko_db_path = nadeko_path
 
             await self.db.migrate_from_nadeko()
+            if self.shop_system:
+                self.shop_system.catalogs.clear()
             await ctx.send("✅ Migration completed successfully!")
         except Exception as e:
             await ctx.send(f"❌ Migration failed: {e}")
 
+    @unicornia_group.group(name="backup")
+    @checks.is_owner()
+    async def backup_group(self, ctx):
+        """
+        Manage database snapshots.
+
+        Snapshots are taken online without pausing the bot.
+        **Owner only.**
+        """
+        pass
+
+    @backup_group.command(name="now")
+    async def backup_now(self, ctx):
+        """
+        Take a database snapshot now.
+
+        Uses the configured compression and retention.
+        **Owner only.**
+
+        **Syntax**
+        `[p]unicornia backup now`
+        """
+        async with ctx.typing():
+            try:
+                snapshot = await self.db.backups.create(
+                    compress=await self.config.backup_compress(), keep=await self.config.backup_keep()
+                )
+            except Exception as e:
+                await ctx.send(f"❌ Backup failed: {e}")
+                return
+        await ctx.send(f"✅ Snapshot saved: `{snapshot.path.name}` ({humanize_number(snapshot.size)} bytes)")
+
+    @backup_group.command(name="list")
+    async def backup_list(self, ctx):
+        """
+        List database snapshots, newest first.
+
+        **Owner only.**
+
+        **Syntax**
+        `[p]unicornia backup list`
+        """
+        snapshots = self.db.backups.snapshots()
+        if not snapshots:
+            await ctx.send("No snapshots yet.")
+            return
+        lines = [f"Snapshots in `{self.db.backups.directory}`:"]
+        lines.extend(
+            f"`{snapshot.path.name}` - {snapshot.created:%Y-%m-%d %H:%M} UTC, {humanize_number(snapshot.size)} bytes"
+            for snapshot in snapshots
+        )
+        await _send_lines_in_chunks(ctx, lines)
+
+    @backup_group.command(name="verify")
+    async def backup_verify(self, ctx, name: str = "latest"):
+        """
+        Check that a snapshot can be restored.
+
+        Opens the snapshot read-only, runs an integrity check and compares
+        its row counts with the live database.
+        **Owner only.**
+
+        **Syntax**
+        `[p]unicornia backup verify [snapshot]`
+        """
+        snapshot = self.db.backups.find(name)
+        if snapshot is None:
+            await ctx.send(f"❌ Snapshot `{name}` not found. See `{ctx.clean_prefix}unicornia backup list`.")
+            return
+
+        async with ctx.typing():
+            report = await self.db.backups.verify(snapshot)
+
+        status = "✅ Restorable" if report.ok else "❌ Not restorable"
+        lines = [f"{status}: `{snapshot.path.name}` (integrity: {report.integrity})"]
+        if report.missing_tables:
+            lines.append(f"Missing tables: {', '.join(report.missing_tables)}")
+        if report.changed_tables:
+            lines.append("Row counts changed since the snapshot (snapshot → live):")
+            lines.extend(
+                f"`{name}`: {report.tables[name][0]:,} → {report.tables[name][1]:,}" for name in report.changed_tables
+            )
+        elif report.ok:
+            lines.append(f"All {len(report.tables)} tables match the live row counts.")
+        await _send_lines_in_chunks(ctx, lines)
+
+    @unicornia_group.command(name="export")
+    @checks.is_owner()
+    async def export_users(self, ctx, *user_ids: commands.RawUserIdConverter):
+        """
+        Export everything stored about one or more users.
+
+        Writes a gzip-compressed JSON lines file to the cog's `data/exports` folder.
+        Users may be mentions or IDs, including users who left Discord.
+        **Owner only.**
+
+        **Syntax**
+        `[p]unicornia export <user> [user...]`
+        """
+        if not user_ids:
+            await ctx.send_help()
+            return
+        async with ctx.typing():
+            try:
+                summary = await self.db.exports.export_to_file(user_ids)
+            except Exception as e:
+                await ctx.send(f"❌ Export failed: {e}")
+                return
+        await ctx.send(
+            f"✅ Exported {humanize_number(summary.total_rows)} row(s) for {len(summary.users)} user(s) "
+            f"to `{summary.path}`"
+        )
+
+    @unicornia_group.command(name="forget")
+    @checks.is_owner()
+    async def forget_users(self, ctx, *user_ids: commands.RawUserIdConverter):
+        """
+        Delete everything stored about one or more users.
+
+        Shows how many rows would change per table and asks for confirmation
+        first. Transaction history is kept but anonymized, as for Red's data
+        deletion requests.
+        **Owner only.**
+
+        **Syntax**
+        `[p]unicornia forget <user> [user...]`
+        """
+        if not user_ids:
+            await ctx.send_help()
+            return
+        preview = await self.db.delete_users_data(user_ids, dry_run=True)
+        if not preview:
+            await ctx.send(f"Nothing is stored about {len(set(user_ids))} user(s).")
+            return
+
+        lines = [f"`{table}`: {humanize_number(count)}" for table, count in sorted(preview.items())]
+        await _send_lines_in_chunks(ctx, [f"Rows to delete or anonymize for {len(set(user_ids))} user(s):", *lines])
+        view = ConfirmView(ctx.author, disable_buttons=True)
+        view.message = await ctx.send("⚠️ Delete this data? This cannot be undone.", view=view)
+        await view.wait()
+        if not view.result:
+            await ctx.send("Cancelled.")
+            return
+
+        try:
+            deleted = await self.db.delete_users_data(user_ids)
+        except Exception as e:
+            await ctx.send(f"❌ Deletion failed: {e}")
+            return
+        if self.shop_system:
+            self.shop_system.catalogs.clear()
+        await ctx.send(f"✅ Changed {humanize_number(sum(deleted.values()))} row(s) across {len(deleted)} table(s).")
+
     @unicornia_group.group(name="gen")
     @checks.is_owner()
     async def gen_group(self, ctx):
@@ -263,6 +419,9 @@ class AdminCommands(UnicorniaMixinBase):
             "gambling_max_bet",
             "reservation_recovery_seconds",
             "dividend_period_hours",
+            "backup_interval_hours",
+            "backup_keep",
+            "backup_compress",
         ]
 
         if setting is None:
@@ -313,6 +472,11 @@ class AdminCommands(UnicorniaMixinBase):
             settings_display.append(f"Reservation Recovery: {await get_val('reservation_recovery_seconds')}s")
             settings_display.append(f"Dividend Period:     {await get_val('dividend_period_hours')}h")
 
+            settings_display.append("\n[Backups]")
+            settings_display.append(f"Interval:            {await get_val('backup_interval_hours')}h")
+            settings_display.append(f"Snapshots Kept:      {await get_val('backup_keep')}")
+            settings_display.append(f"Compression:         {await get_val('backup_compress')}")
+
             await ctx.send(box("\n".join(settings_display), lang="ini"))
             return
 
@@ -337,6 +501,7 @@ class AdminCommands(UnicorniaMixinBase):
                 "shop_enabled",
                 "currency_generation_enabled",
                 "generation_has_password",
+                "backup_compress",
             ]:
                 enabled = value.lower() in ["true", "yes", "1", "on"]
                 await getattr(self.config, setting).set(enabled)
@@ -356,11 +521,16 @@ class AdminCommands(UnicorniaMixinBase):
                 "gambling_max_bet",
                 "reservation_recovery_seconds",
                 "dividend_period_hours",
+                "backup_interval_hours",
+                "backup_keep",
             ]:
                 amount = int(value)
                 if amount < 0:
                     await ctx.send("❌ Amount must be positive.")
                     return
+                if setting == "backup_keep" and amount < 1:
+                    await ctx.send("❌ At least one snapshot must be kept. Set backup_interval_hours to 0 to disable.")
+                    return
                 await getattr(self.config, setting).set(amount)
                 await ctx.send(f"✅ {setting} updated to {amount}")
             elif setting == "generation_chance":
@@ -465,6 +635,8 @@ class AdminCommands(UnicorniaMixinBase):
         if channel.id not in included:
             included.append(channel.id)
             await self.config.guild(ctx.guild).xp_included_channels.set(included)
+            if self.xp_system:
+                await self.xp_system.refresh_voice_settings(ctx.guild)
             await ctx.send(f"✅ {channel.mention} added to XP whitelist.")
         else:
             await ctx.send(f"❌ {channel.mention} is already in the XP whitelist.")
@@ -483,6 +655,8 @@ class AdminCommands(UnicorniaMixinBase):
         if channel.id in included:
             included.remove(channel.id)
             await self.config.guild(ctx.guild).xp_included_channels.set(included)
+            if self.xp_system:
+                await self.xp_system.refresh_voice_settings(ctx.guild)
             await ctx.send(f"✅ {channel.mention} removed from XP whitelist.")
         else:
             await ctx.send(f"❌ {channel.mention} is not in the XP whitelist.")
@@ -536,6 +710,8 @@ class AdminCommands(UnicorniaMixinBase):
         if channel.id not in double_channels:
             double_channels.append(channel.id)
             await self.config.guild(ctx.guild).xp_double_channels.set(double_channels)
+            if self.xp_system:
+                await self.xp_system.refresh_voice_settings(ctx.guild)
             await ctx.send(f"✅ {channel.mention} added to Double XP list.")
         else:
             await ctx.send(f"❌ {channel.mention} is already in the Double XP list.")
@@ -554,6 +730,8 @@ class AdminCommands(UnicorniaMixinBase):
         if channel.id in double_channels:
             double_channels.remove(channel.id)
             await self.config.guild(ctx.guild).xp_double_channels.set(double_channels)
+            if self.xp_system:
+                await self.xp_system.refresh_voice_settings(ctx.guild)
             await ctx.send(f"✅ {channel.mention} removed from Double XP list.")
         else:
             await ctx.send(f"❌ {channel.mention} is not in the Double XP list.")
@@ -598,6 +776,8 @@ class AdminCommands(UnicorniaMixinBase):
             return
 
         await self.db.xp.add_xp_role_reward(ctx.guild.id, level, role.id, remove)
+        if self.xp_system:
+            self.xp_system.level_rewards.invalidate(ctx.guild.id)
         action = "removed from" if remove else "given to"
         await ctx.send(f"✅ Users reaching level {level} will have {role.mention} {action} them.")
 
@@ -612,6 +792,8 @@ class AdminCommands(UnicorniaMixinBase):
         `[p]unicornia guild removerolereward <level> <role>`
         """
         await self.db.xp.remove_xp_role_reward(ctx.guild.id, level, role.id)
+        if self.xp_system:
+            self.xp_system.level_rewards.invalidate(ctx.guild.id)
         await ctx.send(f"✅ Removed role reward {role.mention} at level {level}.")
 
     @guild_config.command(name="currencyreward")
@@ -634,6 +816,8 @@ class AdminCommands(UnicorniaMixinBase):
             return
 
         await self.db.xp.add_xp_currency_reward(ctx.guild.id, level, amount)
+        if self.xp_system:
+            self.xp_system.level_rewards.invalidate(ctx.guild.id)
         currency_symbol = await self.config.currency_symbol()
 
         if amount == 0:
@@ -7,7 +7,7 @@ from ..market_views import (
     StockPortfolioView,
 )
 from ..mixins import UnicorniaMixinBase
-from ..stock_market import UnwindOutcome
+from ..stock_market import CANDLE_RESOLUTIONS, UnwindOutcome, sparkline
 
 
 def format_unwind_outcome(outcome: UnwindOutcome, *, confirmed: bool) -> str:
@@ -144,6 +144,50 @@ class StockCommands(UnicorniaMixinBase):
         else:
             await ctx.send(f"❌ {msg}")
 
+    @stock_group.command(name="history", aliases=["chart", "trend"])
+    @app_commands.describe(ticker="Stock Symbol", resolution="hour, day or week")
+    @app_commands.autocomplete(ticker=ticker_autocomplete)  # type: ignore[arg-type]
+    async def stock_history(self, ctx, ticker: str, resolution: str = "day"):
+        """
+        View a stock's price trend.
+
+        Shows a chart of closing prices, the range for the period and the
+        change within the latest bucket.
+
+        **Syntax**
+        `[p]stock history <ticker> [hour|day|week]`
+
+        **Examples**
+        `[p]stock history UNI`
+        `[p]stock history UNI week`
+        """
+        symbol = ticker.upper()
+        resolution = resolution.lower()
+        if symbol not in self.market_system.stocks_cache:
+            await ctx.send("❌ Stock not found.")
+            return
+        if resolution not in CANDLE_RESOLUTIONS:
+            await ctx.send(f"❌ Resolution must be one of: {', '.join(CANDLE_RESOLUTIONS)}.")
+            return
+
+        periods = {"hour": 24, "day": 30, "week": 26}[resolution]
+        candles = await self.market_system.get_price_history(symbol, resolution, periods)
+        if not candles:
+            await ctx.send(f"No price history for **{symbol}** yet.")
+            return
+
+        currency = self.market_system.currency_symbol
+        first, last = candles[0], candles[-1]
+        change = (last.close - first.open) / first.open * 100 if first.open > 0 else 0.0
+        lines = [
+            f"## {symbol} — last {len(candles)} {resolution}(s)",
+            f"`{sparkline([c.close for c in candles])}`",
+            f"Open {first.open:,.2f} {currency} → Close {last.close:,.2f} {currency} ({change:+.2f}%)",
+            f"High {max(c.high for c in candles):,.2f} {currency} · Low {min(c.low for c in candles):,.2f} {currency}",
+            f"This {resolution}: {last.change_pct:+.2f}%",
+        ]
+        await ctx.send("\n".join(lines))
+
     @stock_group.command(name="unwind")
     @checks.is_owner()
     async def stock_unwind(self, ctx, confirmation: str | None = None):
@@ -222,10 +266,8 @@ class StockCommands(UnicorniaMixinBase):
         view = StockDashboardView(self.market_system)
         msg = await channel.send(view=view)  # No embed, components only
 
-        # Save to Config
-        cog = ctx.cog  # ctx.cog is Unicornia
-        await cog.config.guild(ctx.guild).market_channel.set(channel.id)
-        await cog.config.guild(ctx.guild).market_message.set(msg.id)
+        # Save to Config and start tracking it for hourly updates
+        await self.market_system.set_dashboard(ctx.guild, channel.id, msg.id, view.render.digest)
 
         await ctx.send(f"Dashboard created in {channel.mention}.")
 
@@ -284,8 +326,6 @@ class StockCommands(UnicorniaMixinBase):
             await ctx.send("This command must be run in a server.")
             return
 
-        cog = ctx.cog
-        await cog.config.guild(guild).market_channel.clear()
-        await cog.config.guild(guild).market_message.clear()
+        await self.market_system.clear_dashboard(guild)
 
         await ctx.send("Dashboard configuration cleared for this server. The bot will stop trying to update it.")
@@ -3,6 +3,8 @@ Database models and operations for Unicornia
 """
 
 import logging
+from collections import Counter
+from collections.abc import Iterable
 
 from .db import (
     ClubRepository,
@@ -38,3 +40,19 @@ class DatabaseManager(CoreDB):
         self.waifu = WaifuRepository(self)
         self.shop = ShopRepository(self)
         self.stock = StockRepository(self)
+
+    async def close(self) -> None:
+        """Fold buffered gambling statistics, then close the connection."""
+        if self._conn is not None:
+            try:
+                await self.economy.flush_stats()
+            except Exception as e:
+                # The deltas stay journaled in EconomyOperations and are replayed on the next flush
+                log.error(f"Failed to flush gambling statistics on close: {e}")
+        await super().close()
+
+    async def delete_users_data(self, user_ids: Iterable[int], *, dry_run: bool = False) -> Counter[str]:
+        if not dry_run:
+            # Fold buffered bet statistics first so a later flush cannot recreate the users' rows
+            await self.economy.flush_stats()
+        return await super().delete_users_data(user_ids, dry_run=dry_run)
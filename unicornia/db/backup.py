@@ -0,0 +1,240 @@
+"""
+Online snapshots of the Unicornia database.
+
+Snapshots are taken with SQLite's online backup API from a dedicated
+read-only connection running in a worker thread, a bounded number of pages
+per step. That connection holds one read transaction for the whole copy, so
+the snapshot is consistent and writers on the shared connection are never
+blocked (WAL readers do not block writers). Snapshots are rotated by count,
+optionally gzip-compressed off the event loop, and can be verified against
+the live database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core import CoreDB
+
+log = logging.getLogger("red.kirin_cogs.unicornia.database")
+
+# Pages copied per backup step, and the pause between steps
+BACKUP_STEP_PAGES = 256
+BACKUP_STEP_PAUSE_SECONDS = 0.005
+SNAPSHOT_PREFIX = "unicornia-"
+SNAPSHOT_SUFFIXES = (".db", ".db.gz")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """A snapshot file in the backup directory."""
+
+    path: Path
+    created: datetime
+    size: int
+
+    @property
+    def compressed(self) -> bool:
+        return self.path.suffix == ".gz"
+
+
+@dataclass
+class VerificationReport:
+    """Result of checking a snapshot against the live database."""
+
+    snapshot: Path
+    integrity: str = "not checked"
+    # table -> (rows in snapshot, rows in live database); None where the table is missing
+    tables: dict[str, tuple[int | None, int | None]] = field(default_factory=dict)
+
+    @property
+    def missing_tables(self) -> list[str]:
+        return sorted(name for name, (snapshot, _live) in self.tables.items() if snapshot is None)
+
+    @property
+    def changed_tables(self) -> list[str]:
+        return sorted(
+            name
+            for name, (snapshot, live) in self.tables.items()
+            if snapshot is not None and live is not None and snapshot != live
+        )
+
+    @property
+    def ok(self) -> bool:
+        """Readable, intact and with every live table present; row counts may have moved on since."""
+        return self.integrity == "ok" and not self.missing_tables
+
+
+def _parse_created(path: Path) -> datetime | None:
+    stem = path.name.removeprefix(SNAPSHOT_PREFIX).split(".", 1)[0]
+    try:
+        return datetime.strptime(stem, "%Y%m%d-%H%M%S").replace(tzinfo=UTC)
+    except ValueError:
+        return None
+
+
+def _table_counts(connection: sqlite3.Connection) -> dict[str, int]:
+    cursor = connection.execute(
+        "SELECT name FROM sqlite_schema WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )
+    names = [row[0] for row in cursor.fetchall()]
+    return {
+        name: connection.execute(f'SELECT COUNT(*) FROM "{name.replace(chr(34), chr(34) * 2)}"').fetchone()[0]
+        for name in names
+    }
+
+
+def _open_read_only(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True, isolation_level=None)
+
+
+class BackupManager:
+    """Creates, rotates and verifies snapshots of one database."""
+
+    def __init__(
+        self,
+        db: CoreDB,
+        directory: Path | None = None,
+        *,
+        step_pages: int = BACKUP_STEP_PAGES,
+        step_pause: float = BACKUP_STEP_PAUSE_SECONDS,
+    ):
+        self.db = db
+        self.directory = directory or db.db_path.parent / "backups"
+        self.step_pages = step_pages
+        self.step_pause = step_pause
+        self._lock = asyncio.Lock()
+
+    def snapshots(self) -> list[Snapshot]:
+        """Snapshots in the backup directory, newest first."""
+        if not self.directory.is_dir():
+            return []
+        found = []
+        for path in self.directory.iterdir():
+            if not path.name.startswith(SNAPSHOT_PREFIX) or not path.name.endswith(SNAPSHOT_SUFFIXES):
+                continue
+            created = _parse_created(path)
+            if created is not None:
+                found.append(Snapshot(path, created, path.stat().st_size))
+        return sorted(found, key=lambda snapshot: snapshot.created, reverse=True)
+
+    def find(self, name: str) -> Snapshot | None:
+        """A snapshot by file name, or the newest one for ``"latest"``."""
+        snapshots = self.snapshots()
+        if name == "latest":
+            return snapshots[0] if snapshots else None
+        return next((snapshot for snapshot in snapshots if snapshot.path.name == name), None)
+
+    async def create(self, *, compress: bool = False, keep: int | None = None) -> Snapshot:
+        """Take a snapshot, optionally compress it, then prune to the newest ``keep``."""
+        async with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            created = datetime.now(UTC).replace(microsecond=0)
+            target = self.directory / f"{SNAPSHOT_PREFIX}{created:%Y%m%d-%H%M%S}.db"
+            partial = target.with_name(target.name + ".partial")
+
+            start = time.perf_counter()
+            try:
+                pages = await asyncio.to_thread(self._copy, partial)
+                partial.replace(target)
+                if compress:
+                    target = await asyncio.to_thread(self._compress, target)
+            finally:
+                partial.unlink(missing_ok=True)
+            log.info(
+                f"Database snapshot {target.name}: {pages} page(s) in {time.perf_counter() - start:.2f}s"
+                f"{' (compressed)' if compress else ''}"
+            )
+
+            snapshot = Snapshot(target, created, target.stat().st_size)
+            if keep is not None:
+                self.prune(keep)
+            return snapshot
+
+    def _copy(self, target: Path) -> int:
+        """Copy the database into ``target`` step by step; runs in a worker thread."""
+        source = _open_read_only(self.db.db_path)
+        destination = sqlite3.connect(target)
+        copied = 0
+
+        def progress(_status: int, remaining: int, total: int) -> None:
+            nonlocal copied
+            copied = total - remaining
+            if remaining and self.step_pause:
+                time.sleep(self.step_pause)
+
+        try:
+            # Pin one read snapshot for every step, so writes made meanwhile neither
+            # restart the copy nor leak into it
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_schema").fetchone()
+            source.backup(destination, pages=self.step_pages, progress=progress)
+            source.execute("COMMIT")
+            # A standalone file: no -wal/-shm needed to open the snapshot
+            destination.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            destination.close()
+            source.close()
+        return copied
+
+    @staticmethod
+    def _compress(path: Path) -> Path:
+        compressed = path.with_name(path.name + ".gz")
+        with path.open("rb") as raw, gzip.open(compressed, "wb", compresslevel=6) as packed:
+            shutil.copyfileobj(raw, packed, 1024 * 1024)
+        path.unlink()
+        return compressed
+
+    def prune(self, keep: int) -> list[Path]:
+        """Delete all but the newest ``keep`` snapshots (at least one); returns the deleted paths."""
+        removed = [snapshot.path for snapshot in self.snapshots()[max(1, keep) :]]
+        for path in removed:
+            path.unlink(missing_ok=True)
+        return removed
+
+    async def verify(self, snapshot: Snapshot) -> VerificationReport:
+        """Open a snapshot read-only, check it, and compare its row counts with the live database."""
+        return await asyncio.to_thread(self._verify, snapshot.path)
+
+    def _verify(self, path: Path) -> VerificationReport:
+        report = VerificationReport(path)
+        with tempfile.TemporaryDirectory() as scratch:
+            readable = path
+            if path.suffix == ".gz":
+                readable = Path(scratch) / path.stem
+                with gzip.open(path, "rb") as packed, readable.open("wb") as raw:
+                    shutil.copyfileobj(packed, raw, 1024 * 1024)
+
+            snapshot_counts: dict[str, int] = {}
+            try:
+                snapshot = _open_read_only(readable)
+                try:
+                    report.integrity = snapshot.execute("PRAGMA quick_check").fetchone()[0]
+                    snapshot_counts = _table_counts(snapshot)
+                finally:
+                    snapshot.close()
+            except sqlite3.DatabaseError as e:
+                report.integrity = str(e)
+
+        live = _open_read_only(self.db.db_path)
+        try:
+            live.execute("BEGIN")
+            live_counts = _table_counts(live)
+            live.execute("COMMIT")
+        finally:
+            live.close()
+
+        for name in sorted(snapshot_counts.keys() | live_counts.keys()):
+            report.tables[name] = (snapshot_counts.get(name), live_counts.get(name))
+        return report
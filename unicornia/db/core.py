@@ -6,13 +6,20 @@ import asyncio
 import json
 import logging
 import math
-from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager, suppress
+from collections import Counter
+from collections.abc import AsyncGenerator, Iterable
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import aiosqlite
 
 from ..types import LevelStats
+from .backup import BackupManager
+from .deletion import delete_users
+from .export import UserDataExporter
+from .maintenance import MaintenanceScheduler
+from .schema import SchemaReport, convert_command_items
+from .schema import migrate as migrate_schema
 
 log = logging.getLogger("red.kirin_cogs.unicornia.database")
 
@@ -33,6 +40,12 @@ class CoreDB:
         self.reconcile_reserved_on_initialize = reconcile_reserved_on_initialize
         self._conn: aiosqlite.Connection | None = None
         self._lock = asyncio.Lock()
+        self.maintenance = MaintenanceScheduler(self)
+        self.backups = BackupManager(self)
+        self.exports = UserDataExporter(self)
+        self.schema_report: SchemaReport | None = None
+        self._deletion_lock = asyncio.Lock()
+        self._pending_deletions: dict[int, asyncio.Future[None]] = {}
 
     async def connect(self) -> None:
         """Establish a persistent database connection.
@@ -48,6 +61,7 @@ class CoreDB:
 
     async def close(self) -> None:
         """Close the persistent database connection."""
+        await self.maintenance.close()
         if self._conn:
             await self._conn.close()
             self._conn = None
@@ -68,6 +82,10 @@ class CoreDB:
         Args:
             db: The database connection to configure.
         """
+        # Page size and auto_vacuum only take effect before the file header is written,
+        # which enabling WAL does on a new database
+        await db.execute("PRAGMA page_size=4096")  # 4KB page size
+        await db.execute("PRAGMA auto_vacuum=INCREMENTAL")  # Incremental vacuum
         await db.execute("PRAGMA journal_mode=WAL")
         await db.execute("PRAGMA foreign_keys=ON")
         await db.execute("PRAGMA synchronous=NORMAL")
@@ -76,514 +94,26 @@ class CoreDB:
         )  # Negative value = pages in KiB (4000KB ~ 4MB) -> actually let's use pages. Positive = pages. 4000 pages * 4KB = 16MB.
         await db.execute("PRAGMA temp_store=MEMORY")
         await db.execute("PRAGMA mmap_size=33554432")  # 32MB memory mapping (Safe for 1GB VPS)
-        await db.execute("PRAGMA page_size=4096")  # 4KB page size
-        await db.execute("PRAGMA auto_vacuum=INCREMENTAL")  # Incremental vacuum
 
     async def check_wal_integrity(self) -> bool:
-        """Check WAL mode integrity and perform maintenance if needed.
+        """Run a maintenance pass with an integrity check.
+
+        The check runs on the maintenance scheduler's read-only connection, so
+        it does not block other database work.
 
         Returns:
             bool: True if integrity check passed, False otherwise.
         """
         try:
-            async with self._get_connection() as db:
-                # Set up WAL mode and optimizations
-                await self._setup_wal_mode(db)
-
-                # Check if WAL mode is active
-                cursor = await db.execute("PRAGMA journal_mode")
-                mode = await cursor.fetchone()
-                if mode and mode[0] != "wal":
-                    log.warning("Database not in WAL mode, attempting to enable...")
-                    await db.execute("PRAGMA journal_mode=WAL")
-                    await db.commit()
-
-                # Check database integrity
-                cursor = await db.execute("PRAGMA integrity_check")
-                result = await cursor.fetchone()
-                if result and result[0] != "ok":
-                    log.error(f"Database integrity check failed: {result[0]}")
-                    return False
-
-                # Perform WAL checkpoint to prevent WAL file from growing too large
-                # Using PASSIVE to avoid locking the database
-                await db.execute("PRAGMA wal_checkpoint(PASSIVE)")
-
-                return True
+            report = await self.maintenance.run(force_integrity=True)
+            return bool(report.integrity_ok)
         except Exception as e:
             log.error(f"WAL integrity check failed: {e}")
             return False
 
     async def initialize(self) -> None:
-        """Initialize the database with all required tables."""
+        """Bring the schema up to date and reconcile interrupted reservations."""
         async with self._get_connection() as db:
-            # Create tables matching Nadeko's structure
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS DiscordUser (
-                    UserId INTEGER PRIMARY KEY,
-                    Username TEXT,
-                    AvatarId TEXT,
-                    ClubId INTEGER,
-                    IsClubAdmin INTEGER DEFAULT 0,
-                    TotalXp INTEGER DEFAULT 0,
-                    CurrencyAmount INTEGER DEFAULT 0
-                )
-            """)
-
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS UserXpStats (
-                    UserId INTEGER,
-                    GuildId INTEGER,
-                    Xp INTEGER DEFAULT 0,
-                    PRIMARY KEY (UserId, GuildId)
-                )
-            """)
-
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS PlantedCurrency (
-                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    GuildId INTEGER,
-                    ChannelId INTEGER,
-                    UserId INTEGER,
-                    MessageId INTEGER,
-                    Amount INTEGER,
-                    Password TEXT
-                )
-            """)
-
-            # XP Shop Owned Items table (matching Nadeko's XpShopOwnedItem)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS XpShopOwnedItem (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                UserId INTEGER,
-                ItemType INTEGER,
-                ItemKey TEXT,
-                IsUsing BOOLEAN DEFAULT FALSE,
-                UNIQUE(UserId, ItemType, ItemKey)
-            )
-            """)
-
-            # Currency Transaction table (matching Nadeko's CurrencyTransaction)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS CurrencyTransactions (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                UserId INTEGER NOT NULL,
-                Type TEXT NOT NULL,
-                Amount INTEGER NOT NULL,
-                Reason TEXT,
-                OtherId INTEGER,
-                Extra TEXT,
-                DateAdded TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-
-            # Bank User table (matching Nadeko's BankUser)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS BankUsers (
-                UserId INTEGER PRIMARY KEY,
-                Balance INTEGER NOT NULL DEFAULT 0
-            )
-            """)
-
-            # Idempotent economy operations (additive; keyed by caller-supplied
-            # idempotency key so retries never repeat a balance effect)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS EconomyOperations (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                OperationKey TEXT NOT NULL UNIQUE,
-                GuildId INTEGER,
-                UserId INTEGER NOT NULL,
-                Source TEXT NOT NULL,
-                Direction TEXT NOT NULL,
-                Amount INTEGER NOT NULL,
-                State TEXT NOT NULL,
-                Result TEXT,
-                CreatedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                SettledAt TEXT
-            )
-            """)
-
-            # Gambling Stats table (matching Nadeko's GamblingStats)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS GamblingStats (
-                Feature TEXT PRIMARY KEY,
-                BetAmount INTEGER NOT NULL DEFAULT 0,
-                WinAmount INTEGER NOT NULL DEFAULT 0,
-                LossAmount INTEGER NOT NULL DEFAULT 0,
-                Rounds INTEGER NOT NULL DEFAULT 0,
-                StakedSinceEpoch INTEGER NOT NULL DEFAULT 0,
-                PaidOut INTEGER NOT NULL DEFAULT 0,
-                RakebackPaid INTEGER NOT NULL DEFAULT 0,
-                EpochStart TEXT
-            )
-            """)
-
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS YieldPool (
-                Id INTEGER PRIMARY KEY CHECK (Id = 1),
-                Balance INTEGER NOT NULL DEFAULT 0,
-                LifetimeHouseBanked INTEGER NOT NULL DEFAULT 0,
-                LifetimePooled INTEGER NOT NULL DEFAULT 0,
-                LifetimeTradeTax INTEGER NOT NULL DEFAULT 0,
-                NextDistributionAt TEXT,
-                UpdatedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            await db.execute("""
-                INSERT OR IGNORE INTO YieldPool
-                    (Id, Balance, LifetimeHouseBanked, LifetimePooled, LifetimeTradeTax)
-                VALUES (1, 0, 0, 0, 0)
-            """)
-
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS DividendRuns (
-                PeriodEnd TEXT PRIMARY KEY,
-                Distributed INTEGER NOT NULL,
-                Recipients INTEGER NOT NULL,
-                CompletedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS DividendPayouts (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                PeriodEnd TEXT NOT NULL,
-                UserId INTEGER NOT NULL,
-                Symbol TEXT NOT NULL,
-                Weight REAL NOT NULL,
-                Amount INTEGER NOT NULL,
-                DateAdded TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            await db.execute(
-                "CREATE INDEX IF NOT EXISTS idx_dividend_payouts_user_period ON DividendPayouts(UserId, PeriodEnd)"
-            )
-
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS SpectatorMarkets (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                HandKey TEXT NOT NULL UNIQUE,
-                State TEXT NOT NULL,
-                OpenedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                ClosedAt TEXT,
-                Outcome TEXT
-            )
-            """)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS SpectatorBets (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                MarketId INTEGER NOT NULL,
-                UserId INTEGER NOT NULL,
-                Side TEXT NOT NULL,
-                Amount INTEGER NOT NULL,
-                StakeKey TEXT NOT NULL UNIQUE,
-                UNIQUE(MarketId, UserId),
-                FOREIGN KEY (MarketId) REFERENCES SpectatorMarkets(Id) ON DELETE CASCADE
-            )
-            """)
-
-            # User Bet Stats table (matching Nadeko's UserBetStats)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS UserBetStats (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                UserId INTEGER NOT NULL,
-                Game TEXT NOT NULL,
-                BetAmount INTEGER NOT NULL DEFAULT 0,
-                WinAmount INTEGER NOT NULL DEFAULT 0,
-                LossAmount INTEGER NOT NULL DEFAULT 0,
-                MaxWin INTEGER NOT NULL DEFAULT 0,
-                UNIQUE(UserId, Game)
-            )
-            """)
-
-            # XP Excluded Item table (matching Nadeko's XpExcludedItem)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS XpExcludedItem (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                GuildId INTEGER NOT NULL,
-                ItemId INTEGER NOT NULL,
-                ItemType INTEGER NOT NULL
-            )
-            """)
-
-            # XP Settings table (matching Nadeko's XpSettings)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS XpSettings (
-                GuildId INTEGER PRIMARY KEY,
-                XpRateMultiplier REAL NOT NULL DEFAULT 1.0,
-                XpPerMessage INTEGER NOT NULL DEFAULT 3,
-                XpMinutesTimeout INTEGER NOT NULL DEFAULT 5
-            )
-            """)
-
-            # XP Role Reward table (matching Nadeko's XpRoleReward)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS XpRoleReward (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                GuildId INTEGER NOT NULL,
-                Level INTEGER NOT NULL,
-                RoleId INTEGER NOT NULL,
-                Remove BOOLEAN NOT NULL DEFAULT FALSE
-            )
-            """)
-
-            # Club Info table (matching Nadeko's ClubInfo)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS Clubs (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                Name TEXT NOT NULL,
-                Description TEXT,
-                ImageUrl TEXT DEFAULT '',
-                BannerUrl TEXT DEFAULT '',
-                Xp INTEGER DEFAULT 0,
-                OwnerId INTEGER,
-                DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(Name)
-            )
-            """)
-
-            # Club Applicants table (matching Nadeko's ClubApplicants)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS ClubApplicants (
-                ClubId INTEGER,
-                UserId INTEGER,
-                DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (ClubId, UserId),
-                FOREIGN KEY (ClubId) REFERENCES Clubs(Id) ON DELETE CASCADE
-            )
-            """)
-
-            # Club Bans table (matching Nadeko's ClubBans)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS ClubBans (
-                ClubId INTEGER,
-                UserId INTEGER,
-                DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (ClubId, UserId),
-                FOREIGN KEY (ClubId) REFERENCES Clubs(Id) ON DELETE CASCADE
-            )
-            """)
-
-            # Club Invitations table
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS ClubInvitations (
-                ClubId INTEGER,
-                UserId INTEGER,
-                DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (ClubId, UserId),
-                FOREIGN KEY (ClubId) REFERENCES Clubs(Id) ON DELETE CASCADE
-            )
-            """)
-
-            # Event table for currency events (matching Nadeko's Event)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS Event (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                GuildId INTEGER NOT NULL,
-                ChannelId INTEGER NOT NULL,
-                Event TEXT NOT NULL
-            )
-            """)
-
-            # Rakeback table (matching Nadeko's Rakeback)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS Rakeback (
-                UserId INTEGER PRIMARY KEY,
-                RakebackBalance INTEGER NOT NULL DEFAULT 0
-            )
-            """)
-
-            # Timely Cooldown table for daily/timely rewards
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS TimelyCooldown (
-                UserId INTEGER PRIMARY KEY,
-                LastClaim TEXT NOT NULL,
-                Streak INTEGER NOT NULL DEFAULT 0
-            )
-            """)
-
-            # Shop system tables (matching Nadeko structure)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS ShopEntry (
-                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    GuildId INTEGER,
-                    `Index` INTEGER,
-                    Price INTEGER,
-                    Name TEXT,
-                    AuthorId INTEGER,
-                    Type INTEGER,
-                    RoleName TEXT,
-                    RoleId INTEGER,
-                    RoleRequirement INTEGER,
-                    Command TEXT
-                )
-            """)
-
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS ShopEntryItem (
-                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ShopEntryId INTEGER,
-                    Text TEXT,
-                    FOREIGN KEY (ShopEntryId) REFERENCES ShopEntry(Id) ON DELETE CASCADE
-                )
-            """)
-
-            # Waifu tables (matching Nadeko structure)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS WaifuInfo (
-                    WaifuId INTEGER PRIMARY KEY,
-                    ClaimerId INTEGER,
-                    Affinity INTEGER,
-                    Price INTEGER DEFAULT 50,
-                    DateAdded TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS WaifuItem (
-                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    WaifuInfoId INTEGER,
-                    ItemEmoji TEXT,
-                    Name TEXT,
-                    DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (WaifuInfoId) REFERENCES WaifuInfo(WaifuId) ON DELETE CASCADE
-                )
-            """)
-
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS WaifuUpdates (
-                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    UserId INTEGER,
-                    OldId INTEGER,
-                    NewId INTEGER,
-                    UpdateType INTEGER,
-                    DateAdded TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # XP Currency Rewards table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS XpCurrencyReward (
-                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    XpSettingsId INTEGER,
-                    Level INTEGER,
-                    Amount INTEGER
-                )
-            """)
-
-            # Currency Generation Channels table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS GCChannelId (
-                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    GuildId INTEGER,
-                    ChannelId INTEGER,
-                    UNIQUE(GuildId, ChannelId)
-                )
-            """)
-
-            # Bot Configuration table (For system persistence)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS BotConfig (
-                    Key TEXT PRIMARY KEY,
-                    Value TEXT,
-                    Description TEXT
-                )
-            """)
-
-            await db.executemany(
-                """
-                INSERT OR IGNORE INTO BotConfig (Key, Value, Description)
-                VALUES (?, ?, ?)
-                """,
-                [
-                    ("LastMarketTick", None, "Timestamp of last completed market tick"),
-                    ("StockLedgerBackfilled", "0", "Whether legacy stock transactions were imported"),
-                    ("DividendAccumulationStart", None, "Start of the retained dividend usage window"),
-                ],
-            )
-
-            # User Inventory table (New for v2 - converting Command items)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS UserInventory (
-                UserId INTEGER,
-                GuildId INTEGER,
-                ShopEntryId INTEGER,
-                Quantity INTEGER DEFAULT 1,
-                DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (UserId, GuildId, ShopEntryId),
-                FOREIGN KEY (ShopEntryId) REFERENCES ShopEntry(Id) ON DELETE CASCADE
-            )
-            """)
-
-            # Create Indices for Performance
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_xp_guild_xp ON UserXpStats(GuildId, Xp DESC)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_currency_amount ON DiscordUser(CurrencyAmount DESC)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_transactions_user ON CurrencyTransactions(UserId)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_club_xp ON Clubs(Xp DESC)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_user_club ON DiscordUser(ClubId)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_economy_operations_user ON EconomyOperations(UserId)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_economy_operations_state ON EconomyOperations(State)")
-
-            # Optimized indices for Shop System and XP Caching
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_shop_entry_items ON ShopEntryItem(ShopEntryId)")
-            await db.execute(
-                "CREATE INDEX IF NOT EXISTS idx_xp_exclusions ON XpExcludedItem(GuildId, ItemId, ItemType)"
-            )
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_shop_entry_guild ON ShopEntry(GuildId, `Index`)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_user_inventory ON UserInventory(UserId, GuildId)")
-
-            # Stock Market tables
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS Stocks (
-                    Symbol TEXT PRIMARY KEY,
-                    Name TEXT,
-                    Emoji TEXT,
-                    CurrentPrice INTEGER,
-                    PreviousPrice INTEGER,
-                    TotalShares INTEGER DEFAULT 0,
-                    ShareReserve REAL DEFAULT 100000,
-                    SmoothedUsage REAL DEFAULT 0,
-                    PeriodUsage INTEGER NOT NULL DEFAULT 0,
-                    Volatility REAL DEFAULT 1.0,
-                    Hidden INTEGER DEFAULT 0
-                )
-            """)
-
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS StockHoldings (
-                    UserId INTEGER,
-                    Symbol TEXT,
-                    Amount INTEGER,
-                    AverageCost REAL,
-                    PRIMARY KEY (UserId, Symbol),
-                    FOREIGN KEY (Symbol) REFERENCES Stocks(Symbol) ON DELETE CASCADE
-                )
-            """)
-
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS StockTransactions (
-                    Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    UserId INTEGER NOT NULL,
-                    Symbol TEXT NOT NULL,
-                    Side TEXT NOT NULL CHECK (Side IN ('buy', 'sell')),
-                    Kind TEXT NOT NULL DEFAULT 'trade',
-                    Shares INTEGER NOT NULL,
-                    ExecPrice REAL NOT NULL,
-                    Tax INTEGER NOT NULL,
-                    TotalAmount INTEGER NOT NULL,
-                    IsImported INTEGER NOT NULL DEFAULT 0,
-                    DateAdded TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            await db.execute(
-                "CREATE INDEX IF NOT EXISTS idx_stock_transactions_user_symbol ON StockTransactions(UserId, Symbol)"
-            )
-            await db.execute(
-                "CREATE INDEX IF NOT EXISTS idx_stock_transactions_symbol_date ON StockTransactions(Symbol, DateAdded)"
-            )
-
-            await db.commit()
-
-            # Run schema updates for existing databases
             await self._update_database_schema(db)
             if self.reconcile_reserved_on_initialize:
                 # Compatibility for direct DatabaseManager consumers. The live
@@ -643,112 +173,10 @@ class CoreDB:
             log.warning("Refunded %s interrupted gambling stake reservation(s)", reconciled)
         return reconciled
 
-    async def _update_database_schema(self, db):
-        """Update existing database schema to add missing columns"""
-        try:
-            # Check if IsUsing column exists in XpShopOwnedItem table
-            cursor = await db.execute("PRAGMA table_info(XpShopOwnedItem)")
-            columns = await cursor.fetchall()
-            column_names = [col[1] for col in columns]  # Column name is at index 1
-
-            if "IsUsing" not in column_names:
-                log.info("Adding IsUsing column to XpShopOwnedItem table")
-                await db.execute("ALTER TABLE XpShopOwnedItem ADD COLUMN IsUsing BOOLEAN DEFAULT FALSE")
-                await db.commit()
-                log.info("Successfully added IsUsing column")
-
-            cursor = await db.execute("PRAGMA table_info(Stocks)")
-            stock_columns = {row[1] for row in await cursor.fetchall()}
-            if "ShareReserve" not in stock_columns:
-                await db.execute("ALTER TABLE Stocks ADD COLUMN ShareReserve REAL DEFAULT 100000")
-            if "SmoothedUsage" not in stock_columns:
-                await db.execute("ALTER TABLE Stocks ADD COLUMN SmoothedUsage REAL DEFAULT 0")
-            if "PeriodUsage" not in stock_columns:
-                await db.execute("ALTER TABLE Stocks ADD COLUMN PeriodUsage INTEGER NOT NULL DEFAULT 0")
-
-            cursor = await db.execute("PRAGMA table_info(GamblingStats)")
-            gambling_columns = {row[1] for row in await cursor.fetchall()}
-            for column_name, declaration in (
-                ("Rounds", "INTEGER NOT NULL DEFAULT 0"),
-                ("StakedSinceEpoch", "INTEGER NOT NULL DEFAULT 0"),
-                ("PaidOut", "INTEGER NOT NULL DEFAULT 0"),
-                ("RakebackPaid", "INTEGER NOT NULL DEFAULT 0"),
-                ("EpochStart", "TEXT"),
-            ):
-                if column_name not in gambling_columns:
-                    await db.execute(f"ALTER TABLE GamblingStats ADD COLUMN {column_name} {declaration}")
-
-            cursor = await db.execute("PRAGMA table_info(StockTransactions)")
-            transaction_columns = {row[1] for row in await cursor.fetchall()}
-            if "Kind" not in transaction_columns:
-                await db.execute("ALTER TABLE StockTransactions ADD COLUMN Kind TEXT NOT NULL DEFAULT 'trade'")
-            await db.commit()
-
-            # Create UserInventory table if it doesn't exist (for existing DBs that missed init)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS UserInventory (
-                UserId INTEGER,
-                GuildId INTEGER,
-                ShopEntryId INTEGER,
-                Quantity INTEGER DEFAULT 1,
-                DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (UserId, GuildId, ShopEntryId),
-                FOREIGN KEY (ShopEntryId) REFERENCES ShopEntry(Id) ON DELETE CASCADE
-            )
-            """)
-
-            # Create BotConfig table if it doesn't exist
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS BotConfig (
-                    Key TEXT PRIMARY KEY,
-                    Value TEXT,
-                    Description TEXT
-                )
-            """)
-
-            # Create ClubInvitations table if it doesn't exist
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS ClubInvitations (
-                ClubId INTEGER,
-                UserId INTEGER,
-                DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (ClubId, UserId),
-                FOREIGN KEY (ClubId) REFERENCES Clubs(Id) ON DELETE CASCADE
-            )
-            """)
-
-            # Create EconomyOperations table if it doesn't exist (existing DBs)
-            await db.execute("""
-            CREATE TABLE IF NOT EXISTS EconomyOperations (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                OperationKey TEXT NOT NULL UNIQUE,
-                GuildId INTEGER,
-                UserId INTEGER NOT NULL,
-                Source TEXT NOT NULL,
-                Direction TEXT NOT NULL,
-                Amount INTEGER NOT NULL,
-                State TEXT NOT NULL,
-                Result TEXT,
-                CreatedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                SettledAt TEXT
-            )
-            """)
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_economy_operations_user ON EconomyOperations(UserId)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_economy_operations_state ON EconomyOperations(State)")
-
-            # Migrate Command items (Type 1) to Items (Type 4)
-            # Check if there are any Type 1 items first
-            cursor = await db.execute("SELECT COUNT(*) FROM ShopEntry WHERE Type = 1")
-            count = (await cursor.fetchone())[0]
-
-            if count > 0:
-                log.info(f"Migrating {count} 'Command' shop items to 'Item' type...")
-                await db.execute("UPDATE ShopEntry SET Type = 4, Command = NULL WHERE Type = 1")
-                await db.commit()
-                log.info("Migration complete.")
-
-        except Exception as e:
-            log.error(f"Error updating database schema: {e}")
+    async def _update_database_schema(self, db: aiosqlite.Connection) -> SchemaReport:
+        """Apply pending schema migrations; a no-op when the schema fingerprint matches."""
+        self.schema_report = await migrate_schema(db)
+        return self.schema_report
 
     # Level calculation methods (using Nadeko's exact formula)
     @staticmethod
@@ -995,6 +423,11 @@ class CoreDB:
         except Exception as e:
             log.info(f"ShopEntryItem table not found or empty: {e}")
 
+        # Nadeko's command items are imported as-is; convert them like the schema step does
+        async with self._get_connection() as db:
+            await convert_command_items(db)
+            await db.commit()
+
         # Migrate XpShopOwnedItem
         try:
             cursor = await nadeko_db.execute("SELECT COUNT(*) FROM XpShopOwnedItem")
@@ -1398,78 +831,41 @@ class CoreDB:
 
     # Data deletion methods for Red bot compliance
     async def delete_user_data(self, user_id: int):
-        """Delete all data for a user (Red bot requirement)"""
-        async with self._get_connection() as db:
-            # Preserve accounting rows while removing direct identifiers and
-            # free-form metadata that may contain personal information.
-            await db.execute(
-                """
-                UPDATE CurrencyTransactions
-                SET UserId = 0, OtherId = CASE WHEN OtherId = ? THEN 0 ELSE OtherId END,
-                    Reason = '[deleted user]', Extra = NULL
-                WHERE UserId = ? OR OtherId = ?
-                """,
-                (user_id, user_id, user_id),
-            )
-            await db.execute(
-                """
-                UPDATE EconomyOperations
-                SET UserId = 0, OperationKey = 'deleted:' || lower(hex(randomblob(16))), Result = NULL
-                WHERE UserId = ?
-                """,
-                (user_id,),
-            )
-            with suppress(aiosqlite.OperationalError):
-                await db.execute("UPDATE StockTransactions SET UserId = 0 WHERE UserId = ?", (user_id,))
-            with suppress(aiosqlite.OperationalError):
-                await db.execute("UPDATE DividendPayouts SET UserId = 0 WHERE UserId = ?", (user_id,))
-
-            # Remove direct identifiers from retained shared records.
-            with suppress(aiosqlite.OperationalError):
-                await db.execute("UPDATE Clubs SET OwnerId = 0 WHERE OwnerId = ?", (user_id,))
-            with suppress(aiosqlite.OperationalError):
-                await db.execute("UPDATE ShopEntry SET AuthorId = 0 WHERE AuthorId = ?", (user_id,))
-            with suppress(aiosqlite.OperationalError):
-                await db.execute("UPDATE WaifuInfo SET ClaimerId = NULL WHERE ClaimerId = ?", (user_id,))
-            with suppress(aiosqlite.OperationalError):
-                await db.execute("UPDATE WaifuInfo SET Affinity = NULL WHERE Affinity = ?", (user_id,))
-            with suppress(aiosqlite.OperationalError):
-                await db.execute(
-                    """
-                    UPDATE WaifuUpdates
-                    SET UserId = CASE WHEN UserId = ? THEN 0 ELSE UserId END,
-                        OldId = CASE WHEN OldId = ? THEN 0 ELSE OldId END,
-                        NewId = CASE WHEN NewId = ? THEN 0 ELSE NewId END
-                    WHERE UserId = ? OR OldId = ? OR NewId = ?
-                    """,
-                    (user_id, user_id, user_id, user_id, user_id, user_id),
-                )
+        """Delete all data for a user (Red bot requirement)
+
+        Requests that arrive while a batch is running are deleted together in
+        the next batch, so a burst of requests shares a few transactions.
+        """
+        waiter = self._pending_deletions.get(user_id)
+        if waiter is None:
+            waiter = self._pending_deletions[user_id] = asyncio.get_running_loop().create_future()
+        async with self._deletion_lock:
+            if not waiter.done():
+                batch, self._pending_deletions = self._pending_deletions, {}
+                try:
+                    await self.delete_users_data(batch)
+                except asyncio.CancelledError:
+                    # Leave the batch to whoever runs next
+                    self._pending_deletions.update(batch)
+                    raise
+                except Exception as e:
+                    for future in batch.values():
+                        future.set_exception(e)
+                else:
+                    for future in batch.values():
+                        future.set_result(None)
+        await waiter
 
-            # Delete non-audit state whose ownership is solely this user.
-            for table in (
-                "UserXpStats",
-                "PlantedCurrency",
-                "XpShopOwnedItem",
-                "BankUsers",
-                "UserBetStats",
-                "ClubApplicants",
-                "ClubBans",
-                "ClubInvitations",
-                "Rakeback",
-                "TimelyCooldown",
-                "UserInventory",
-                "StockHoldings",
-                "SpectatorBets",
-            ):
-                with suppress(aiosqlite.OperationalError):
-                    await db.execute(f"DELETE FROM {table} WHERE UserId = ?", (user_id,))
-
-            # A WaifuInfo row is itself keyed by a Discord user ID. Deleting it
-            # also removes dependent WaifuItem rows through the foreign key.
-            with suppress(aiosqlite.OperationalError):
-                await db.execute("DELETE FROM WaifuInfo WHERE WaifuId = ?", (user_id,))
-            with suppress(aiosqlite.OperationalError):
-                await db.execute("DELETE FROM DiscordUser WHERE UserId = ?", (user_id,))
+    async def delete_users_data(self, user_ids: Iterable[int], *, dry_run: bool = False) -> Counter[str]:
+        """Delete all data for many users in one transaction.
 
-            await db.commit()
-            log.info(f"Deleted all data for user {user_id}")
+        With ``dry_run`` nothing is changed. Returns the rows affected (or that
+        would be) per table. Owner export files holding any of the users are
+        removed as well.
+        """
+        user_ids = list(user_ids)
+        async with self._get_connection() as db:
+            rows = await delete_users(db, user_ids, dry_run=dry_run)
+        if not dry_run:
+            await self.exports.forget(user_ids)
+        return rows
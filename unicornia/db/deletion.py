@@ -0,0 +1,143 @@
+"""
+Batched deletion of everything the Unicornia database holds about users.
+
+The user IDs of a batch go into a temporary table, and each step below is a
+single statement joined against it, so deleting a thousand users costs the
+same number of statements as deleting one. Every step runs in one
+transaction. A dry run counts the rows each step would touch and changes
+nothing.
+
+Financial audit rows are kept with their identifiers and free-form metadata
+removed. Shared records (clubs, shop entries, other users' waifus) lose the
+user's ID. State that belongs only to the user is deleted.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import Iterable
+from contextlib import suppress
+from dataclasses import dataclass
+
+import aiosqlite
+
+log = logging.getLogger("red.kirin_cogs.unicornia.database")
+
+# {users} in a step expands to this subquery; UserId is the temp table's primary key
+BATCH_TABLE = "DeletedUsers"
+_USERS = f"(SELECT UserId FROM temp.{BATCH_TABLE})"
+
+
+@dataclass(frozen=True)
+class DeletionStep:
+    """One statement of a batch deletion."""
+
+    table: str
+    where: str
+    set: str | None = None  # None deletes the matching rows
+
+    def sql(self, *, count: bool = False) -> str:
+        where = self.where.format(users=_USERS)
+        if count:
+            return f"SELECT COUNT(*) FROM {self.table} WHERE {where}"
+        if self.set is None:
+            return f"DELETE FROM {self.table} WHERE {where}"
+        return f"UPDATE {self.table} SET {self.set.format(users=_USERS)} WHERE {where}"
+
+
+def _owned(table: str) -> DeletionStep:
+    return DeletionStep(table, "UserId IN {users}")
+
+
+USER_DELETION_STEPS: tuple[DeletionStep, ...] = (
+    # Preserve accounting rows while removing direct identifiers and
+    # free-form metadata that may contain personal information.
+    DeletionStep(
+        "CurrencyTransactions",
+        "UserId IN {users} OR OtherId IN {users}",
+        "UserId = 0, OtherId = CASE WHEN OtherId IN {users} THEN 0 ELSE OtherId END, "
+        "Reason = '[deleted user]', Extra = NULL",
+    ),
+    DeletionStep(
+        "EconomyOperations",
+        "UserId IN {users}",
+        "UserId = 0, OperationKey = 'deleted:' || lower(hex(randomblob(16))), Result = NULL",
+    ),
+    DeletionStep("StockTransactions", "UserId IN {users}", "UserId = 0"),
+    DeletionStep("DividendPayouts", "UserId IN {users}", "UserId = 0"),
+    # Remove direct identifiers from retained shared records.
+    DeletionStep("Clubs", "OwnerId IN {users}", "OwnerId = 0"),
+    DeletionStep("ShopEntry", "AuthorId IN {users}", "AuthorId = 0"),
+    DeletionStep("WaifuInfo", "ClaimerId IN {users}", "ClaimerId = NULL"),
+    DeletionStep("WaifuInfo", "Affinity IN {users}", "Affinity = NULL"),
+    DeletionStep(
+        "WaifuUpdates",
+        "UserId IN {users} OR OldId IN {users} OR NewId IN {users}",
+        "UserId = CASE WHEN UserId IN {users} THEN 0 ELSE UserId END, "
+        "OldId = CASE WHEN OldId IN {users} THEN 0 ELSE OldId END, "
+        "NewId = CASE WHEN NewId IN {users} THEN 0 ELSE NewId END",
+    ),
+    # Delete non-audit state whose ownership is solely the user's.
+    _owned("UserXpStats"),
+    _owned("PlantedCurrency"),
+    _owned("XpShopOwnedItem"),
+    _owned("BankUsers"),
+    _owned("UserBetStats"),
+    _owned("ClubApplicants"),
+    _owned("ClubBans"),
+    _owned("ClubInvitations"),
+    _owned("Rakeback"),
+    _owned("TimelyCooldown"),
+    _owned("UserInventory"),
+    _owned("StockHoldings"),
+    _owned("SpectatorBets"),
+    # A WaifuInfo row is itself keyed by a Discord user ID. Its items would go
+    # through the foreign key anyway; deleting them first keeps the counts honest.
+    DeletionStep("WaifuItem", "WaifuInfoId IN {users}"),
+    DeletionStep("WaifuInfo", "WaifuId IN {users}"),
+    _owned("DiscordUser"),
+)
+
+
+async def delete_users(
+    db: aiosqlite.Connection,
+    user_ids: Iterable[int],
+    *,
+    dry_run: bool = False,
+    steps: tuple[DeletionStep, ...] = USER_DELETION_STEPS,
+) -> Counter[str]:
+    """Run every step for a batch of users in one transaction.
+
+    Returns rows affected per table (or that would be, for a dry run). Steps
+    for tables missing from this database are skipped.
+    """
+    users = sorted(set(user_ids))
+    rows: Counter[str] = Counter()
+    if not users:
+        return rows
+
+    await db.commit()
+    await db.execute("BEGIN" if dry_run else "BEGIN IMMEDIATE")
+    try:
+        await db.execute(f"CREATE TEMP TABLE IF NOT EXISTS {BATCH_TABLE} (UserId INTEGER PRIMARY KEY)")
+        await db.execute(f"DELETE FROM temp.{BATCH_TABLE}")
+        await db.executemany(f"INSERT INTO temp.{BATCH_TABLE} (UserId) VALUES (?)", [(user_id,) for user_id in users])
+        for step in steps:
+            with suppress(aiosqlite.OperationalError):
+                if dry_run:
+                    cursor = await db.execute(step.sql(count=True))
+                    rows[step.table] += (await cursor.fetchone())[0]
+                else:
+                    cursor = await db.execute(step.sql())
+                    rows[step.table] += max(cursor.rowcount, 0)
+        await db.execute(f"DROP TABLE temp.{BATCH_TABLE}")
+    except BaseException:
+        await db.rollback()
+        raise
+    if dry_run:
+        await db.rollback()
+    else:
+        await db.commit()
+        log.info(f"Deleted data for {len(users)} user(s): {sum(rows.values())} row(s) changed")
+    return +rows
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from typing import Any, Literal
 
 from ..gambling import RAKEBACK_RATE, pooled_rake
+from .stats_buffer import GamblingStatsBuffer
 
 log = logging.getLogger("red.kirin_cogs.unicornia.database")
 
@@ -85,12 +86,19 @@ class EconomyRepository:
 
     def __init__(self, db):
         self.db = db
+        # Statistics deltas committed by settlements but not yet folded into their tables
+        self.stats = GamblingStatsBuffer()
+        self._stats_recovered = False
 
-    async def get_yield_pool(self, db=None) -> dict[str, Any]:
-        """Read the single yield-pool row, optionally inside a caller transaction."""
+    async def get_yield_pool(self, db=None, *, include_pending: bool = True) -> dict[str, Any]:
+        """Read the single yield-pool row, optionally inside a caller transaction.
+
+        Pending settlement accruals are added unless ``include_pending`` is False,
+        which callers spending the stored balance use.
+        """
         if db is None:
             async with self.db._get_connection() as connection:
-                return await self.get_yield_pool(connection)
+                return await self.get_yield_pool(connection, include_pending=include_pending)
         row = await (
             await db.execute(
                 """
@@ -102,12 +110,13 @@ class EconomyRepository:
         ).fetchone()
         if row is None:
             await db.execute("INSERT OR IGNORE INTO YieldPool (Id) VALUES (1)")
-            return await self.get_yield_pool(db)
+            return await self.get_yield_pool(db, include_pending=include_pending)
+        pending = self.stats.pool if include_pending else {}
         return {
-            "balance": int(row[0]),
-            "lifetime_house_banked": int(row[1]),
-            "lifetime_pooled": int(row[2]),
-            "lifetime_trade_tax": int(row[3]),
+            "balance": int(row[0]) + pending.get("balance", 0),
+            "lifetime_house_banked": int(row[1]) + pending.get(POOL_SOURCE_HOUSE_BANKED, 0),
+            "lifetime_pooled": int(row[2]) + pending.get(POOL_SOURCE_POOLED, 0),
+            "lifetime_trade_tax": int(row[3]) + pending.get(POOL_SOURCE_TRADE_TAX, 0),
             "next_distribution_at": row[4],
             "updated_at": row[5],
         }
@@ -141,7 +150,104 @@ class EconomyRepository:
                 FROM GamblingStats ORDER BY Feature
                 """
             )
-            return await cursor.fetchall()
+            rows = await cursor.fetchall()
+            if not self.stats.games:
+                return rows
+            merged = {row[0]: tuple(row) for row in rows}
+            for game, d in self.stats.games.items():
+                stored = merged.get(game, (game, 0, 0, 0, 0, 0, 0, 0, None))
+                merged[game] = (
+                    game,
+                    stored[1] + d.bet,
+                    stored[2] + d.win,
+                    stored[3] + d.loss,
+                    stored[4] + d.rounds,
+                    stored[5] + d.staked,
+                    stored[6] + d.paid_out,
+                    stored[7] + d.rakeback,
+                    stored[8] or d.first_seen,
+                )
+            return [merged[game] for game in sorted(merged)]
+
+    async def flush_stats(self) -> None:
+        """Fold pending gambling statistics into their tables in one transaction.
+
+        On failure the deltas stay both in memory and in EconomyOperations.PendingStats.
+        """
+        async with self.db._get_connection() as db:
+            if not self._stats_recovered:
+                # Deltas journaled by a previous process that never reached a flush
+                recovered = GamblingStatsBuffer()
+                cursor = await db.execute("SELECT PendingStats FROM EconomyOperations WHERE PendingStats IS NOT NULL")
+                for (raw,) in await cursor.fetchall():
+                    recovered.merge(GamblingStatsBuffer.from_json(raw))
+                self.stats = recovered
+                self._stats_recovered = True
+            if not self.stats:
+                return
+
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                await db.executemany(
+                    """
+                    INSERT INTO GamblingStats
+                        (Feature, BetAmount, WinAmount, LossAmount, Rounds,
+                         StakedSinceEpoch, PaidOut, RakebackPaid, EpochStart)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(Feature) DO UPDATE SET
+                        BetAmount = BetAmount + excluded.BetAmount,
+                        WinAmount = WinAmount + excluded.WinAmount,
+                        LossAmount = LossAmount + excluded.LossAmount,
+                        Rounds = Rounds + excluded.Rounds,
+                        StakedSinceEpoch = StakedSinceEpoch + excluded.StakedSinceEpoch,
+                        PaidOut = PaidOut + excluded.PaidOut,
+                        RakebackPaid = RakebackPaid + excluded.RakebackPaid,
+                        EpochStart = COALESCE(GamblingStats.EpochStart, excluded.EpochStart)
+                    """,
+                    [
+                        (game, d.bet, d.win, d.loss, d.rounds, d.staked, d.paid_out, d.rakeback, d.first_seen)
+                        for game, d in self.stats.games.items()
+                    ],
+                )
+                await db.executemany(
+                    """
+                    INSERT INTO UserBetStats (UserId, Game, BetAmount, WinAmount, LossAmount, MaxWin)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(UserId, Game) DO UPDATE SET
+                        BetAmount = BetAmount + excluded.BetAmount,
+                        WinAmount = WinAmount + excluded.WinAmount,
+                        LossAmount = LossAmount + excluded.LossAmount,
+                        MaxWin = MAX(MaxWin, excluded.MaxWin)
+                    """,
+                    [
+                        (user_id, game, d.bet, d.win, d.loss, d.max_win)
+                        for (user_id, game), d in self.stats.users.items()
+                    ],
+                )
+                pool = self.stats.pool
+                if any(pool.values()):
+                    await db.execute("INSERT OR IGNORE INTO YieldPool (Id) VALUES (1)")
+                    await db.execute(
+                        """
+                        UPDATE YieldPool
+                        SET Balance = Balance + ?, LifetimeHouseBanked = LifetimeHouseBanked + ?,
+                            LifetimePooled = LifetimePooled + ?, LifetimeTradeTax = LifetimeTradeTax + ?,
+                            UpdatedAt = datetime('now')
+                        WHERE Id = 1
+                        """,
+                        (
+                            pool.get("balance", 0),
+                            pool.get(POOL_SOURCE_HOUSE_BANKED, 0),
+                            pool.get(POOL_SOURCE_POOLED, 0),
+                            pool.get(POOL_SOURCE_TRADE_TAX, 0),
+                        ),
+                    )
+                await db.execute("UPDATE EconomyOperations SET PendingStats = NULL WHERE PendingStats IS NOT NULL")
+                await db.commit()
+            except Exception:
+                await db.execute("ROLLBACK")
+                raise
+            self.stats.clear()
 
     async def get_dividend_history(self, user_id: int, limit: int = 50) -> list[dict[str, Any]]:
         """Return one user's dividend ledger, newest first."""
@@ -198,7 +304,8 @@ class EconomyRepository:
                     await db.execute("ROLLBACK")
                     return DividendRunOutcome(period_key, OUTCOME_DUPLICATE, int(existing[0]), int(existing[1]))
 
-                pool = await self.get_yield_pool(db)
+                # Only the stored balance can be spent; pending accruals land after the next flush
+                pool = await self.get_yield_pool(db, include_pending=False)
                 usage_rows = await (
                     await db.execute("SELECT Symbol, PeriodUsage FROM Stocks WHERE PeriodUsage > 0")
                 ).fetchall()
@@ -1147,7 +1254,7 @@ class EconomyRepository:
             await db.commit()
 
     async def get_user_bet_stats(self, user_id: int) -> list[tuple]:
-        """Get user betting statistics.
+        """Get user betting statistics, including pending settlements.
 
         Args:
             user_id: User ID.
@@ -1163,7 +1270,15 @@ class EconomyRepository:
             """,
                 (user_id,),
             )
-            return await cursor.fetchall()
+            rows = await cursor.fetchall()
+            pending = {game: d for (uid, game), d in self.stats.users.items() if uid == user_id}
+            if not pending:
+                return rows
+            merged = {row[0]: tuple(row) for row in rows}
+            for game, d in pending.items():
+                _game, bet, win, loss, max_win = merged.get(game, (game, 0, 0, 0, 0))
+                merged[game] = (game, bet + d.bet, win + d.win, loss + d.loss, max(max_win, d.max_win))
+            return sorted(merged.values(), key=lambda row: row[1], reverse=True)
 
     # Rakeback Methods
     async def get_rakeback_balance(self, user_id: int) -> int:
@@ -1680,14 +1795,23 @@ class EconomyRepository:
             await db.execute("BEGIN")
             try:
                 reserved_operation = await self._get_operation_row(key, db)
-                # Claim the reservation atomically; only one settler wins.
+                stats = GamblingStatsBuffer()
+                if reserved_operation is not None and not exclude_from_rtp:
+                    stake = int(reserved_operation["Amount"])
+                    rakeback = int(max(0, stake - payout) * RAKEBACK_RATE)
+                    game = str(self._decode_result(reserved_operation["Result"]).get("game") or transaction_type)
+                    stats.record_round(game, int(reserved_operation["UserId"]), stake, payout, rakeback)
+                    stats.accrue_pool(stake - payout - rakeback, POOL_SOURCE_HOUSE_BANKED)
+
+                # Claim the reservation atomically; only one settler wins. The
+                # statistics delta rides along so it survives until the next flush.
                 cursor = await db.execute(
                     """
                     UPDATE EconomyOperations
-                    SET State = ?, SettledAt = datetime('now'), Result = ?
+                    SET State = ?, SettledAt = datetime('now'), Result = ?, PendingStats = ?
                     WHERE OperationKey = ? AND State = ?
                 """,
-                    (OP_STATE_SETTLED, payload, key, OP_STATE_RESERVED),
+                    (OP_STATE_SETTLED, payload, stats.to_json() if stats else None, key, OP_STATE_RESERVED),
                 )
 
                 if cursor.rowcount == 0:
@@ -1706,11 +1830,8 @@ class EconomyRepository:
 
                 assert reserved_operation is not None, "reserved operation vanished during settlement"
                 user_id: int = reserved_operation["UserId"]
-                stake: int = reserved_operation["Amount"]
-                reservation_result = self._decode_result(reserved_operation["Result"])
-                game = str(reservation_result.get("game") or transaction_type)
+                stake = int(reserved_operation["Amount"])
                 loss = max(0, stake - payout)
-                win_amount = payout if payout > stake else 0
 
                 if payout > 0:
                     await db.execute(
@@ -1740,44 +1861,8 @@ class EconomyRepository:
                         (user_id, rakeback_amount),
                     )
 
-                if not exclude_from_rtp:
-                    await db.execute(
-                        """
-                        INSERT INTO GamblingStats
-                            (Feature, BetAmount, WinAmount, LossAmount, Rounds,
-                             StakedSinceEpoch, PaidOut, RakebackPaid, EpochStart)
-                        VALUES (?, ?, ?, ?, 1, ?, ?, ?, datetime('now'))
-                        ON CONFLICT(Feature) DO UPDATE SET
-                            BetAmount = BetAmount + excluded.BetAmount,
-                            WinAmount = WinAmount + excluded.WinAmount,
-                            LossAmount = LossAmount + excluded.LossAmount,
-                            Rounds = Rounds + 1,
-                            StakedSinceEpoch = StakedSinceEpoch + excluded.StakedSinceEpoch,
-                            PaidOut = PaidOut + excluded.PaidOut,
-                            RakebackPaid = RakebackPaid + excluded.RakebackPaid,
-                            EpochStart = COALESCE(GamblingStats.EpochStart, excluded.EpochStart)
-                        """,
-                        (game, stake, win_amount, loss, stake, payout, rakeback_amount),
-                    )
-                    await db.execute(
-                        """
-                        INSERT INTO UserBetStats (UserId, Game, BetAmount, WinAmount, LossAmount, MaxWin)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(UserId, Game) DO UPDATE SET
-                            BetAmount = BetAmount + excluded.BetAmount,
-                            WinAmount = WinAmount + excluded.WinAmount,
-                            LossAmount = LossAmount + excluded.LossAmount,
-                            MaxWin = MAX(MaxWin, excluded.MaxWin)
-                        """,
-                        (user_id, game, stake, win_amount, loss, win_amount),
-                    )
-                    await self.accrue_yield_pool(
-                        db,
-                        stake - payout - rakeback_amount,
-                        POOL_SOURCE_HOUSE_BANKED,
-                    )
-
                 await db.commit()
+                self.stats.merge(stats)
                 return OperationOutcome(
                     key=key,
                     state=OUTCOME_SETTLED,
@@ -1888,9 +1973,14 @@ class EconomyRepository:
                     "rake": rake,
                     "pool_accrual": pool_accrual,
                 }
+                stats = GamblingStatsBuffer()
+                if not void:
+                    for key, operation in operations.items():
+                        stats.record_round(game, int(operation["UserId"]), amounts[key], payouts[key], rakebacks[key])
+                    stats.accrue_pool(pool_accrual, POOL_SOURCE_POOLED)
                 await db.execute(
-                    "UPDATE EconomyOperations SET Result = ? WHERE OperationKey = ?",
-                    (json.dumps(summary), marker_key),
+                    "UPDATE EconomyOperations SET Result = ?, PendingStats = ? WHERE OperationKey = ?",
+                    (json.dumps(summary), stats.to_json() if stats else None, marker_key),
                 )
                 tx_type = transaction_type or game
 
@@ -1933,45 +2023,8 @@ class EconomyRepository:
                             """,
                             (user_id, rakeback_amount),
                         )
-                    if not void:
-                        stake = amounts[key]
-                        loss = max(0, stake - payout)
-                        win_amount = payout if payout > stake else 0
-                        await db.execute(
-                            """
-                            INSERT INTO GamblingStats
-                                (Feature, BetAmount, WinAmount, LossAmount, Rounds,
-                                 StakedSinceEpoch, PaidOut, RakebackPaid, EpochStart)
-                            VALUES (?, ?, ?, ?, 1, ?, ?, ?, datetime('now'))
-                            ON CONFLICT(Feature) DO UPDATE SET
-                                BetAmount = BetAmount + excluded.BetAmount,
-                                WinAmount = WinAmount + excluded.WinAmount,
-                                LossAmount = LossAmount + excluded.LossAmount,
-                                Rounds = Rounds + 1,
-                                StakedSinceEpoch = StakedSinceEpoch + excluded.StakedSinceEpoch,
-                                PaidOut = PaidOut + excluded.PaidOut,
-                                RakebackPaid = RakebackPaid + excluded.RakebackPaid,
-                                EpochStart = COALESCE(GamblingStats.EpochStart, excluded.EpochStart)
-                            """,
-                            (game, stake, win_amount, loss, stake, payout, rakeback_amount),
-                        )
-                        await db.execute(
-                            """
-                            INSERT INTO UserBetStats
-                                (UserId, Game, BetAmount, WinAmount, LossAmount, MaxWin)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                            ON CONFLICT(UserId, Game) DO UPDATE SET
-                                BetAmount = BetAmount + excluded.BetAmount,
-                                WinAmount = WinAmount + excluded.WinAmount,
-                                LossAmount = LossAmount + excluded.LossAmount,
-                                MaxWin = MAX(MaxWin, excluded.MaxWin)
-                            """,
-                            (user_id, game, stake, win_amount, loss, win_amount),
-                        )
-
-                if pool_accrual:
-                    await self.accrue_yield_pool(db, pool_accrual, POOL_SOURCE_POOLED)
                 await db.commit()
+                self.stats.merge(stats)
                 return PoolSettlementOutcome(
                     settlement_id=settlement_id,
                     state=OUTCOME_SETTLED,
@@ -0,0 +1,294 @@
+"""
+Streaming export of everything the Unicornia database holds about users.
+
+Every user-linked table is read in keyset-paged chunks of a few hundred rows,
+each page a range search on an index that already returns rows in rowid order.
+The shared connection is only held while a chunk is fetched, so other
+commands keep running during a large export. Each chunk is encoded as JSON
+lines and written (and gzip-compressed) in a worker thread, so memory stays
+bounded by one chunk however long a user's history is. The same exporter
+serves Red's per-user data requests and owner bulk exports to disk.
+
+Chunks are read as separate statements, so rows written while an export runs
+may or may not be included.
+
+Export files on disk are copies of user data: they are pruned after
+``EXPORT_RETENTION`` and removed when any user in them is deleted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import io
+import json
+import logging
+from collections import Counter
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+import aiosqlite
+
+if TYPE_CHECKING:
+    from .core import CoreDB
+
+log = logging.getLogger("red.kirin_cogs.unicornia.database")
+
+# Rows fetched per query, and so the most held in memory at once
+EXPORT_CHUNK_ROWS = 500
+EXPORT_FORMAT = "unicornia-user-export"
+EXPORT_VERSION = 1
+# Owner exports older than this are removed the next time an export is written
+EXPORT_RETENTION = timedelta(days=7)
+
+
+@dataclass(frozen=True)
+class UserTable:
+    """A table holding user data, and the predicate selecting one user's rows (``:user``).
+
+    ``where`` may instead be a tuple of disjoint predicates, each paged as its
+    own pass, so that every pass can use an index rather than one ``OR``
+    walking the whole table.
+
+    Rows matched only through a counterpart column (a transfer received, a
+    waifu claimed) belong to someone else. Unless ``owner`` matches them, the
+    ``counterparts`` columns holding other users' IDs and the ``private``
+    columns are blanked before writing.
+    """
+
+    name: str
+    where: str | tuple[str, ...]
+    owner: str | None = None
+    counterparts: tuple[str, ...] = ()
+    private: tuple[str, ...] = ()
+
+    @property
+    def passes(self) -> tuple[str, ...]:
+        return self.where if isinstance(self.where, tuple) else (self.where,)
+
+    def redact(self, row: dict, user_id: int) -> dict:
+        for column in self.counterparts:
+            if row.get(column) != user_id:
+                row[column] = None
+        for column in self.private:
+            row[column] = None
+        return row
+
+
+# Every table delete_user_data touches, plus the records it anonymizes
+USER_TABLES: tuple[UserTable, ...] = (
+    UserTable("DiscordUser", "UserId = :user"),
+    UserTable("UserXpStats", "UserId = :user"),
+    UserTable("XpShopOwnedItem", "UserId = :user"),
+    UserTable("BankUsers", "UserId = :user"),
+    UserTable(
+        "CurrencyTransactions",
+        ("UserId = :user", "OtherId = :user AND UserId != :user"),
+        owner="UserId = :user",
+        counterparts=("UserId",),
+        private=("Reason", "Extra"),
+    ),
+    UserTable("EconomyOperations", "UserId = :user"),
+    UserTable("Rakeback", "UserId = :user"),
+    UserTable("TimelyCooldown", "UserId = :user"),
+    UserTable("PlantedCurrency", "UserId = :user"),
+    UserTable("UserBetStats", "UserId = :user"),
+    UserTable("SpectatorBets", "UserId = :user"),
+    UserTable("StockHoldings", "UserId = :user"),
+    UserTable("StockTransactions", "UserId = :user"),
+    UserTable("DividendPayouts", "UserId = :user"),
+    UserTable("UserInventory", "UserId = :user"),
+    UserTable("ShopEntry", "AuthorId = :user"),
+    UserTable(
+        "Clubs",
+        "OwnerId = :user OR Id IN (SELECT ClubId FROM DiscordUser WHERE UserId = :user)",
+        owner="OwnerId = :user",
+        counterparts=("OwnerId",),
+    ),
+    UserTable("ClubApplicants", "UserId = :user"),
+    UserTable("ClubBans", "UserId = :user"),
+    UserTable("ClubInvitations", "UserId = :user"),
+    # Other users' affinity towards the user is theirs, not the user's
+    UserTable(
+        "WaifuInfo",
+        "WaifuId = :user OR ClaimerId = :user",
+        owner="WaifuId = :user",
+        counterparts=("Affinity",),
+    ),
+    UserTable("WaifuItem", "WaifuInfoId = :user"),
+    UserTable(
+        "WaifuUpdates",
+        "UserId = :user OR OldId = :user OR NewId = :user",
+        owner="UserId = :user",
+        counterparts=("OldId", "NewId"),
+    ),
+)
+
+
+@dataclass
+class ExportSummary:
+    """What an export wrote."""
+
+    users: list[int]
+    rows: Counter[str] = field(default_factory=Counter)  # table -> rows written
+    path: Path | None = None
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+
+def _page_sql(table: UserTable, where: str) -> str:
+    return f"""
+        SELECT rowid, {table.owner or 1}, * FROM {table.name}
+        WHERE ({where}) AND rowid > :after
+        ORDER BY rowid LIMIT :limit
+    """
+
+
+def _line(record: dict) -> bytes:
+    return json.dumps(record, default=str, ensure_ascii=False).encode() + b"\n"
+
+
+def _exported_users(path: Path) -> set[int]:
+    """The user IDs listed in an export file's header line."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    try:
+        with opener(path, "rb") as stream:
+            return set(json.loads(stream.readline()).get("users", []))
+    except (OSError, ValueError, AttributeError):
+        return set()
+
+
+class UserDataExporter:
+    """Writes users' rows from every user-linked table as JSON lines."""
+
+    def __init__(
+        self,
+        db: CoreDB,
+        directory: Path | None = None,
+        *,
+        chunk_rows: int = EXPORT_CHUNK_ROWS,
+        tables: tuple[UserTable, ...] = USER_TABLES,
+    ):
+        self.db = db
+        self.directory = directory or db.db_path.parent / "exports"
+        self.chunk_rows = chunk_rows
+        self.tables = tables
+
+    async def chunks(self, user_id: int) -> AsyncIterator[tuple[str, list[dict]]]:
+        """Yield ``(table, rows)`` for one user, at most ``chunk_rows`` rows at a time."""
+        for table in self.tables:
+            for where in table.passes:
+                after = 0
+                while True:
+                    # Only hold the shared connection for the fetch itself
+                    async with self.db._get_connection() as db:
+                        try:
+                            cursor = await db.execute(
+                                _page_sql(table, where), {"user": user_id, "after": after, "limit": self.chunk_rows}
+                            )
+                        except aiosqlite.OperationalError:
+                            break  # Table not present in this database
+                        columns = [column[0] for column in cursor.description][2:]
+                        rows = await cursor.fetchall()
+                    if rows:
+                        records = []
+                        for _rowid, owned, *values in rows:
+                            record = dict(zip(columns, values, strict=True))
+                            records.append(record if owned else table.redact(record, user_id))
+                        yield table.name, records
+                    if len(rows) < self.chunk_rows:
+                        break
+                    after = rows[-1][0]
+
+    async def write(self, stream: BinaryIO, user_ids: Iterable[int]) -> ExportSummary:
+        """Write a header line, then one line per row, to a binary stream."""
+        summary = ExportSummary(users=list(dict.fromkeys(user_ids)))
+        header = {
+            "format": EXPORT_FORMAT,
+            "version": EXPORT_VERSION,
+            "created": datetime.now(UTC).isoformat(),
+            "users": summary.users,
+        }
+        await asyncio.to_thread(stream.write, _line(header))
+        for user_id in summary.users:
+            async for table, rows in self.chunks(user_id):
+                payload = b"".join(_line({"user_id": user_id, "table": table, "row": row}) for row in rows)
+                # Encoding above is cheap; compression and disk writes happen off the event loop
+                await asyncio.to_thread(stream.write, payload)
+                summary.rows[table] += len(rows)
+        return summary
+
+    async def export_user(self, user_id: int) -> io.BytesIO:
+        """One user's data as gzip-compressed JSON lines, for Red's data requests."""
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode="wb") as stream:
+            await self.write(stream, [user_id])
+        buffer.seek(0)
+        return buffer
+
+    async def export_to_file(self, user_ids: Iterable[int], *, compress: bool = True) -> ExportSummary:
+        """Export users to a new file in the export directory, pruning expired ones."""
+        await asyncio.to_thread(self.directory.mkdir, parents=True, exist_ok=True)
+        await self.prune()
+        stamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
+        suffix = ".jsonl.gz" if compress else ".jsonl"
+        path = self.directory / f"unicornia-users-{stamp}{suffix}"
+        # Never overwrite an export taken in the same second
+        copy = 1
+        while path.exists():
+            copy += 1
+            path = self.directory / f"unicornia-users-{stamp}-{copy}{suffix}"
+        partial = path.with_name(path.name + ".partial")
+        opener = gzip.open if compress else open
+        stream = await asyncio.to_thread(opener, partial, "wb")
+        try:
+            summary = await self.write(stream, user_ids)
+        except BaseException:
+            await asyncio.to_thread(stream.close)
+            await asyncio.to_thread(partial.unlink, missing_ok=True)
+            raise
+        await asyncio.to_thread(stream.close)
+        await asyncio.to_thread(partial.replace, path)
+        summary.path = path
+        log.info(f"Exported {summary.total_rows} row(s) for {len(summary.users)} user(s) to {path.name}")
+        return summary
+
+    def _files(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [path for path in self.directory.glob("unicornia-users-*") if not path.name.endswith(".partial")]
+
+    async def prune(self, max_age: timedelta = EXPORT_RETENTION) -> list[Path]:
+        """Remove export files older than ``max_age``; returns what was removed."""
+
+        def prune() -> list[Path]:
+            cutoff = datetime.now(UTC).timestamp() - max_age.total_seconds()
+            removed = [path for path in self._files() if path.stat().st_mtime < cutoff]
+            for path in removed:
+                path.unlink(missing_ok=True)
+            return removed
+
+        removed = await asyncio.to_thread(prune)
+        if removed:
+            log.info(f"Removed {len(removed)} export file(s) older than {max_age.days} day(s)")
+        return removed
+
+    async def forget(self, user_ids: Iterable[int]) -> list[Path]:
+        """Remove every export file that contains any of these users."""
+        users = set(user_ids)
+
+        def forget() -> list[Path]:
+            removed = [path for path in self._files() if _exported_users(path) & users]
+            for path in removed:
+                path.unlink(missing_ok=True)
+            return removed
+
+        removed = await asyncio.to_thread(forget)
+        if removed:
+            log.info(f"Removed {len(removed)} export file(s) containing deleted user(s)")
+        return removed
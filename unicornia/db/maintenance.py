@@ -0,0 +1,236 @@
+"""
+Database maintenance scheduler.
+
+Integrity checks run on a dedicated read-only connection, so they never hold
+the shared connection's lock. Every integrity pass runs ``quick_check``; the
+full ``integrity_check`` is spread over passes a few tables at a time, within
+a page budget. WAL checkpoints are driven by the WAL file's size (PASSIVE,
+then TRUNCATE once the database is idle) and free pages are reclaimed in
+small ``incremental_vacuum`` steps. Every phase is timed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import aiosqlite
+
+if TYPE_CHECKING:
+    from .core import CoreDB
+
+log = logging.getLogger("red.kirin_cogs.unicornia.database")
+
+# How often the maintenance loop runs a pass
+MAINTENANCE_INTERVAL_SECONDS = 300.0
+# How often a pass includes an integrity check
+INTEGRITY_INTERVAL_SECONDS = 3600.0
+# Pages the full integrity_check may cover in one pass
+FULL_CHECK_PAGE_BUDGET = 4096
+# WAL size that triggers a PASSIVE checkpoint
+CHECKPOINT_WAL_BYTES = 4 * 1024 * 1024
+# Free pages reclaimed per incremental_vacuum step, and steps per pass
+VACUUM_STEP_PAGES = 64
+VACUUM_MAX_STEPS = 16
+
+
+@dataclass
+class MaintenanceReport:
+    """Outcome of one maintenance pass, with each phase's duration in seconds."""
+
+    integrity_ok: bool | None = None  # None when no integrity check was due
+    problems: list[str] = field(default_factory=list)
+    checked_tables: list[str] = field(default_factory=list)
+    wal_bytes: int = 0
+    checkpoint: str | None = None
+    checkpoint_busy: bool = False
+    vacuumed_pages: int = 0
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class MaintenanceScheduler:
+    """Runs integrity checks, checkpoints and incremental vacuum for one database."""
+
+    def __init__(
+        self,
+        db: CoreDB,
+        *,
+        integrity_interval: float = INTEGRITY_INTERVAL_SECONDS,
+        page_budget: int = FULL_CHECK_PAGE_BUDGET,
+        checkpoint_bytes: int = CHECKPOINT_WAL_BYTES,
+    ):
+        self.db = db
+        self.integrity_interval = integrity_interval
+        self.page_budget = page_budget
+        self.checkpoint_bytes = checkpoint_bytes
+        self.last_report: MaintenanceReport | None = None
+        self._reader: aiosqlite.Connection | None = None
+        self._last_integrity: float | None = None
+        self._data_version: int | None = None
+        # Tables (with page counts) still to be fully checked in the current cycle
+        self._full_check_queue: list[tuple[str, int]] = []
+
+    @property
+    def wal_path(self) -> Path:
+        return self.db.db_path.with_name(self.db.db_path.name + "-wal")
+
+    def wal_bytes(self) -> int:
+        try:
+            return self.wal_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    async def _get_reader(self) -> aiosqlite.Connection:
+        if self._reader is None:
+            uri = self.db.db_path.resolve().as_uri() + "?mode=ro"
+            self._reader = await aiosqlite.connect(uri, uri=True)
+        return self._reader
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            await self._reader.close()
+            self._reader = None
+
+    @staticmethod
+    @contextmanager
+    def _timed(report: MaintenanceReport, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            report.timings[phase] = time.perf_counter() - start
+
+    async def run(self, *, force_integrity: bool = False) -> MaintenanceReport:
+        """Run one maintenance pass; the integrity check only runs when due or forced."""
+        report = MaintenanceReport()
+        now = time.monotonic()
+        if force_integrity or self._last_integrity is None or now - self._last_integrity >= self.integrity_interval:
+            await self.check_integrity(report)
+            self._last_integrity = now
+        with self._timed(report, "checkpoint"):
+            await self._checkpoint(report)
+        with self._timed(report, "vacuum"):
+            await self._vacuum(report)
+
+        self.last_report = report
+        timings = ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in report.timings.items())
+        if report.integrity_ok is None:
+            log.debug(f"Database maintenance: {timings}")
+        else:
+            log.info(
+                f"Database maintenance: integrity {'ok' if report.integrity_ok else 'FAILED'}, "
+                f"{len(report.checked_tables)} table(s) fully checked, {timings}"
+            )
+        return report
+
+    async def check_integrity(self, report: MaintenanceReport | None = None) -> MaintenanceReport:
+        """Run quick_check and the next slice of the full check on the read-only connection."""
+        report = report or MaintenanceReport()
+        reader = await self._get_reader()
+
+        with self._timed(report, "quick_check"):
+            mode = await (await reader.execute("PRAGMA journal_mode")).fetchone()
+            if mode and mode[0] != "wal":
+                log.warning("Database not in WAL mode, attempting to enable...")
+                async with self.db._get_connection() as db:
+                    await db.execute("PRAGMA journal_mode=WAL")
+
+            rows = await (await reader.execute("PRAGMA quick_check")).fetchall()
+            report.problems.extend(row[0] for row in rows if row[0] != "ok")
+
+        if not report.problems:
+            with self._timed(report, "full_check"):
+                await self._full_check_slice(reader, report)
+
+        report.integrity_ok = not report.problems
+        for problem in report.problems:
+            log.error(f"Database integrity check failed: {problem}")
+        return report
+
+    async def _full_check_slice(self, reader: aiosqlite.Connection, report: MaintenanceReport) -> None:
+        if not self._full_check_queue:
+            self._full_check_queue = await self._table_pages(reader)
+
+        spent = 0
+        while self._full_check_queue:
+            table, pages = self._full_check_queue[0]
+            # Always make progress, even on a table larger than the whole budget
+            if report.checked_tables and spent + pages > self.page_budget:
+                break
+            rows = await (await reader.execute(f"PRAGMA integrity_check({_quote(table)})")).fetchall()
+            report.problems.extend(f"{table}: {row[0]}" for row in rows if row[0] != "ok")
+            self._full_check_queue.pop(0)
+            report.checked_tables.append(table)
+            spent += pages
+
+    async def _table_pages(self, reader: aiosqlite.Connection) -> list[tuple[str, int]]:
+        """Tables in name order with their pages, indexes included."""
+        cursor = await reader.execute(
+            "SELECT name, tbl_name, type FROM sqlite_schema WHERE type IN ('table', 'index') ORDER BY name"
+        )
+        schema = await cursor.fetchall()
+        owners = {name: table for name, table, _type in schema}
+        pages = {name: 0 for name, _table, kind in schema if kind == "table" and not name.startswith("sqlite_")}
+        try:
+            cursor = await reader.execute("SELECT name, pageno FROM dbstat WHERE aggregate = 1")
+            for name, count in await cursor.fetchall():
+                if owners.get(name) in pages:
+                    pages[owners[name]] += count
+        except aiosqlite.OperationalError:
+            # No dbstat in this SQLite build: assume every table is the same size
+            total = (await (await reader.execute("PRAGMA page_count")).fetchone())[0]
+            pages = dict.fromkeys(pages, max(1, total // max(1, len(pages))))
+        return list(pages.items())
+
+    async def _checkpoint(self, report: MaintenanceReport) -> None:
+        report.wal_bytes = self.wal_bytes()
+        if report.wal_bytes == 0:
+            return
+
+        # data_version only moves when another connection commits, so an unchanged
+        # value means nothing was written since the previous pass
+        reader = await self._get_reader()
+        version = (await (await reader.execute("PRAGMA data_version")).fetchone())[0]
+        idle = version == self._data_version
+        self._data_version = version
+
+        if idle:
+            mode = "TRUNCATE"
+        elif report.wal_bytes >= self.checkpoint_bytes:
+            mode = "PASSIVE"
+        else:
+            return
+        async with self.db._get_connection() as db:
+            busy, _frames, _checkpointed = await (await db.execute(f"PRAGMA wal_checkpoint({mode})")).fetchone()
+        report.checkpoint = mode
+        report.checkpoint_busy = bool(busy)
+
+    async def _vacuum(self, report: MaintenanceReport) -> None:
+        reader = await self._get_reader()
+        auto_vacuum = (await (await reader.execute("PRAGMA auto_vacuum")).fetchone())[0]
+        if auto_vacuum != 2:  # Only databases created with auto_vacuum=INCREMENTAL
+            return
+
+        for _step in range(VACUUM_MAX_STEPS):
+            async with self.db._get_connection() as db:
+                before = (await (await db.execute("PRAGMA freelist_count")).fetchone())[0]
+                if before == 0:
+                    return
+                # executescript steps the pragma to completion; execute() frees a single page
+                await db.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})")
+                after = (await (await db.execute("PRAGMA freelist_count")).fetchone())[0]
+            report.vacuumed_pages += before - after
+            if after == 0 or after == before:
+                return
+            # Let queued database work in between steps
+            await asyncio.sleep(0)
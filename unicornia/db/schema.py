@@ -0,0 +1,666 @@
+"""
+Versioned schema migrations.
+
+The schema is built by numbered migration steps. ``PRAGMA user_version``
+records the last step applied and BotConfig stores a fingerprint of the
+schema it produced (the step count plus SQLite's schema cookie, which any
+DDL bumps). When both match on load, every ``CREATE ... IF NOT EXISTS`` and
+``PRAGMA table_info`` probe is skipped. On a mismatch (an older database, a
+restored or vacuumed file, DDL run by hand) the pending steps run, and since
+every step is idempotent a full replay is always safe.
+
+New schema changes go in a new step at the end of ``MIGRATIONS``; applied
+steps are never edited.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import aiosqlite
+
+log = logging.getLogger("red.kirin_cogs.unicornia.database")
+
+FINGERPRINT_KEY = "SchemaFingerprint"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+@dataclass
+class SchemaReport:
+    """What a schema check did on load."""
+
+    from_version: int
+    to_version: int
+    applied: list[int] = field(default_factory=list)
+    skipped: bool = False
+    elapsed: float = 0.0
+
+
+async def _create_baseline(db: aiosqlite.Connection) -> None:
+    # Create tables matching Nadeko's structure
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS DiscordUser (
+            UserId INTEGER PRIMARY KEY,
+            Username TEXT,
+            AvatarId TEXT,
+            ClubId INTEGER,
+            IsClubAdmin INTEGER DEFAULT 0,
+            TotalXp INTEGER DEFAULT 0,
+            CurrencyAmount INTEGER DEFAULT 0
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS UserXpStats (
+            UserId INTEGER,
+            GuildId INTEGER,
+            Xp INTEGER DEFAULT 0,
+            PRIMARY KEY (UserId, GuildId)
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS PlantedCurrency (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            GuildId INTEGER,
+            ChannelId INTEGER,
+            UserId INTEGER,
+            MessageId INTEGER,
+            Amount INTEGER,
+            Password TEXT
+        )
+    """)
+
+    # XP Shop Owned Items table (matching Nadeko's XpShopOwnedItem)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS XpShopOwnedItem (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        UserId INTEGER,
+        ItemType INTEGER,
+        ItemKey TEXT,
+        IsUsing BOOLEAN DEFAULT FALSE,
+        UNIQUE(UserId, ItemType, ItemKey)
+    )
+    """)
+
+    # Currency Transaction table (matching Nadeko's CurrencyTransaction)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS CurrencyTransactions (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        UserId INTEGER NOT NULL,
+        Type TEXT NOT NULL,
+        Amount INTEGER NOT NULL,
+        Reason TEXT,
+        OtherId INTEGER,
+        Extra TEXT,
+        DateAdded TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # Bank User table (matching Nadeko's BankUser)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS BankUsers (
+        UserId INTEGER PRIMARY KEY,
+        Balance INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+
+    # Idempotent economy operations (additive; keyed by caller-supplied
+    # idempotency key so retries never repeat a balance effect)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS EconomyOperations (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        OperationKey TEXT NOT NULL UNIQUE,
+        GuildId INTEGER,
+        UserId INTEGER NOT NULL,
+        Source TEXT NOT NULL,
+        Direction TEXT NOT NULL,
+        Amount INTEGER NOT NULL,
+        State TEXT NOT NULL,
+        Result TEXT,
+        CreatedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        SettledAt TEXT,
+        PendingStats TEXT
+    )
+    """)
+
+    # Gambling Stats table (matching Nadeko's GamblingStats)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS GamblingStats (
+        Feature TEXT PRIMARY KEY,
+        BetAmount INTEGER NOT NULL DEFAULT 0,
+        WinAmount INTEGER NOT NULL DEFAULT 0,
+        LossAmount INTEGER NOT NULL DEFAULT 0,
+        Rounds INTEGER NOT NULL DEFAULT 0,
+        StakedSinceEpoch INTEGER NOT NULL DEFAULT 0,
+        PaidOut INTEGER NOT NULL DEFAULT 0,
+        RakebackPaid INTEGER NOT NULL DEFAULT 0,
+        EpochStart TEXT
+    )
+    """)
+
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS YieldPool (
+        Id INTEGER PRIMARY KEY CHECK (Id = 1),
+        Balance INTEGER NOT NULL DEFAULT 0,
+        LifetimeHouseBanked INTEGER NOT NULL DEFAULT 0,
+        LifetimePooled INTEGER NOT NULL DEFAULT 0,
+        LifetimeTradeTax INTEGER NOT NULL DEFAULT 0,
+        NextDistributionAt TEXT,
+        UpdatedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    await db.execute("""
+        INSERT OR IGNORE INTO YieldPool
+            (Id, Balance, LifetimeHouseBanked, LifetimePooled, LifetimeTradeTax)
+        VALUES (1, 0, 0, 0, 0)
+    """)
+
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS DividendRuns (
+        PeriodEnd TEXT PRIMARY KEY,
+        Distributed INTEGER NOT NULL,
+        Recipients INTEGER NOT NULL,
+        CompletedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS DividendPayouts (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        PeriodEnd TEXT NOT NULL,
+        UserId INTEGER NOT NULL,
+        Symbol TEXT NOT NULL,
+        Weight REAL NOT NULL,
+        Amount INTEGER NOT NULL,
+        DateAdded TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_dividend_payouts_user_period ON DividendPayouts(UserId, PeriodEnd)"
+    )
+
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS SpectatorMarkets (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        HandKey TEXT NOT NULL UNIQUE,
+        State TEXT NOT NULL,
+        OpenedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        ClosedAt TEXT,
+        Outcome TEXT
+    )
+    """)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS SpectatorBets (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        MarketId INTEGER NOT NULL,
+        UserId INTEGER NOT NULL,
+        Side TEXT NOT NULL,
+        Amount INTEGER NOT NULL,
+        StakeKey TEXT NOT NULL UNIQUE,
+        UNIQUE(MarketId, UserId),
+        FOREIGN KEY (MarketId) REFERENCES SpectatorMarkets(Id) ON DELETE CASCADE
+    )
+    """)
+
+    # User Bet Stats table (matching Nadeko's UserBetStats)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS UserBetStats (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        UserId INTEGER NOT NULL,
+        Game TEXT NOT NULL,
+        BetAmount INTEGER NOT NULL DEFAULT 0,
+        WinAmount INTEGER NOT NULL DEFAULT 0,
+        LossAmount INTEGER NOT NULL DEFAULT 0,
+        MaxWin INTEGER NOT NULL DEFAULT 0,
+        UNIQUE(UserId, Game)
+    )
+    """)
+
+    # XP Excluded Item table (matching Nadeko's XpExcludedItem)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS XpExcludedItem (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        GuildId INTEGER NOT NULL,
+        ItemId INTEGER NOT NULL,
+        ItemType INTEGER NOT NULL
+    )
+    """)
+
+    # XP Settings table (matching Nadeko's XpSettings)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS XpSettings (
+        GuildId INTEGER PRIMARY KEY,
+        XpRateMultiplier REAL NOT NULL DEFAULT 1.0,
+        XpPerMessage INTEGER NOT NULL DEFAULT 3,
+        XpMinutesTimeout INTEGER NOT NULL DEFAULT 5
+    )
+    """)
+
+    # XP Role Reward table (matching Nadeko's XpRoleReward)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS XpRoleReward (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        GuildId INTEGER NOT NULL,
+        Level INTEGER NOT NULL,
+        RoleId INTEGER NOT NULL,
+        Remove BOOLEAN NOT NULL DEFAULT FALSE
+    )
+    """)
+
+    # Club Info table (matching Nadeko's ClubInfo)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS Clubs (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        Name TEXT NOT NULL,
+        Description TEXT,
+        ImageUrl TEXT DEFAULT '',
+        BannerUrl TEXT DEFAULT '',
+        Xp INTEGER DEFAULT 0,
+        OwnerId INTEGER,
+        DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(Name)
+    )
+    """)
+
+    # Club Applicants table (matching Nadeko's ClubApplicants)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS ClubApplicants (
+        ClubId INTEGER,
+        UserId INTEGER,
+        DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (ClubId, UserId),
+        FOREIGN KEY (ClubId) REFERENCES Clubs(Id) ON DELETE CASCADE
+    )
+    """)
+
+    # Club Bans table (matching Nadeko's ClubBans)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS ClubBans (
+        ClubId INTEGER,
+        UserId INTEGER,
+        DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (ClubId, UserId),
+        FOREIGN KEY (ClubId) REFERENCES Clubs(Id) ON DELETE CASCADE
+    )
+    """)
+
+    # Club Invitations table
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS ClubInvitations (
+        ClubId INTEGER,
+        UserId INTEGER,
+        DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (ClubId, UserId),
+        FOREIGN KEY (ClubId) REFERENCES Clubs(Id) ON DELETE CASCADE
+    )
+    """)
+
+    # Event table for currency events (matching Nadeko's Event)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS Event (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        GuildId INTEGER NOT NULL,
+        ChannelId INTEGER NOT NULL,
+        Event TEXT NOT NULL
+    )
+    """)
+
+    # Rakeback table (matching Nadeko's Rakeback)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS Rakeback (
+        UserId INTEGER PRIMARY KEY,
+        RakebackBalance INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+
+    # Timely Cooldown table for daily/timely rewards
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS TimelyCooldown (
+        UserId INTEGER PRIMARY KEY,
+        LastClaim TEXT NOT NULL,
+        Streak INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+
+    # Shop system tables (matching Nadeko structure)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS ShopEntry (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            GuildId INTEGER,
+            `Index` INTEGER,
+            Price INTEGER,
+            Name TEXT,
+            AuthorId INTEGER,
+            Type INTEGER,
+            RoleName TEXT,
+            RoleId INTEGER,
+            RoleRequirement INTEGER,
+            Command TEXT
+        )
+    """)
+
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS ShopEntryItem (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ShopEntryId INTEGER,
+            Text TEXT,
+            FOREIGN KEY (ShopEntryId) REFERENCES ShopEntry(Id) ON DELETE CASCADE
+        )
+    """)
+
+    # Waifu tables (matching Nadeko structure)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS WaifuInfo (
+            WaifuId INTEGER PRIMARY KEY,
+            ClaimerId INTEGER,
+            Affinity INTEGER,
+            Price INTEGER DEFAULT 50,
+            DateAdded TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS WaifuItem (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            WaifuInfoId INTEGER,
+            ItemEmoji TEXT,
+            Name TEXT,
+            DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (WaifuInfoId) REFERENCES WaifuInfo(WaifuId) ON DELETE CASCADE
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS WaifuUpdates (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            UserId INTEGER,
+            OldId INTEGER,
+            NewId INTEGER,
+            UpdateType INTEGER,
+            DateAdded TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # XP Currency Rewards table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS XpCurrencyReward (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            XpSettingsId INTEGER,
+            Level INTEGER,
+            Amount INTEGER
+        )
+    """)
+
+    # Currency Generation Channels table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS GCChannelId (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            GuildId INTEGER,
+            ChannelId INTEGER,
+            UNIQUE(GuildId, ChannelId)
+        )
+    """)
+
+    # Bot Configuration table (For system persistence)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS BotConfig (
+            Key TEXT PRIMARY KEY,
+            Value TEXT,
+            Description TEXT
+        )
+    """)
+
+    await db.executemany(
+        """
+        INSERT OR IGNORE INTO BotConfig (Key, Value, Description)
+        VALUES (?, ?, ?)
+        """,
+        [
+            ("LastMarketTick", None, "Timestamp of last completed market tick"),
+            ("StockLedgerBackfilled", "0", "Whether legacy stock transactions were imported"),
+            ("DividendAccumulationStart", None, "Start of the retained dividend usage window"),
+        ],
+    )
+
+    # User Inventory table (New for v2 - converting Command items)
+    await db.execute("""
+    CREATE TABLE IF NOT EXISTS UserInventory (
+        UserId INTEGER,
+        GuildId INTEGER,
+        ShopEntryId INTEGER,
+        Quantity INTEGER DEFAULT 1,
+        DateAdded TEXT DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (UserId, GuildId, ShopEntryId),
+        FOREIGN KEY (ShopEntryId) REFERENCES ShopEntry(Id) ON DELETE CASCADE
+    )
+    """)
+
+    # Create Indices for Performance
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_xp_guild_xp ON UserXpStats(GuildId, Xp DESC)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_currency_amount ON DiscordUser(CurrencyAmount DESC)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_transactions_user ON CurrencyTransactions(UserId)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_club_xp ON Clubs(Xp DESC)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_user_club ON DiscordUser(ClubId)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_economy_operations_user ON EconomyOperations(UserId)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_economy_operations_state ON EconomyOperations(State)")
+
+    # Optimized indices for Shop System and XP Caching
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_shop_entry_items ON ShopEntryItem(ShopEntryId)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_xp_exclusions ON XpExcludedItem(GuildId, ItemId, ItemType)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_shop_entry_guild ON ShopEntry(GuildId, `Index`)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_user_inventory ON UserInventory(UserId, GuildId)")
+
+    # Stock Market tables
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS Stocks (
+            Symbol TEXT PRIMARY KEY,
+            Name TEXT,
+            Emoji TEXT,
+            CurrentPrice INTEGER,
+            PreviousPrice INTEGER,
+            TotalShares INTEGER DEFAULT 0,
+            ShareReserve REAL DEFAULT 100000,
+            SmoothedUsage REAL DEFAULT 0,
+            PeriodUsage INTEGER NOT NULL DEFAULT 0,
+            Volatility REAL DEFAULT 1.0,
+            Hidden INTEGER DEFAULT 0
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS StockHoldings (
+            UserId INTEGER,
+            Symbol TEXT,
+            Amount INTEGER,
+            AverageCost REAL,
+            PRIMARY KEY (UserId, Symbol),
+            FOREIGN KEY (Symbol) REFERENCES Stocks(Symbol) ON DELETE CASCADE
+        )
+    """)
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS StockTransactions (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            UserId INTEGER NOT NULL,
+            Symbol TEXT NOT NULL,
+            Side TEXT NOT NULL CHECK (Side IN ('buy', 'sell')),
+            Kind TEXT NOT NULL DEFAULT 'trade',
+            Shares INTEGER NOT NULL,
+            ExecPrice REAL NOT NULL,
+            Tax INTEGER NOT NULL,
+            TotalAmount INTEGER NOT NULL,
+            IsImported INTEGER NOT NULL DEFAULT 0,
+            DateAdded TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_stock_transactions_user_symbol ON StockTransactions(UserId, Symbol)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_stock_transactions_symbol_date ON StockTransactions(Symbol, DateAdded)"
+    )
+
+    # Downsampled price history: one OHLC row per symbol, resolution
+    # and bucket, updated in place by each market tick
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS StockPriceCandles (
+            Symbol TEXT NOT NULL,
+            Resolution TEXT NOT NULL,
+            BucketStart INTEGER NOT NULL,
+            Open REAL NOT NULL,
+            High REAL NOT NULL,
+            Low REAL NOT NULL,
+            Close REAL NOT NULL,
+            Ticks INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (Symbol, Resolution, BucketStart)
+        ) WITHOUT ROWID
+    """)
+
+
+async def _add_columns(db: aiosqlite.Connection) -> None:
+    # Columns added after the baseline tables first shipped
+    cursor = await db.execute("PRAGMA table_info(XpShopOwnedItem)")
+    if "IsUsing" not in {row[1] for row in await cursor.fetchall()}:
+        log.info("Adding IsUsing column to XpShopOwnedItem table")
+        await db.execute("ALTER TABLE XpShopOwnedItem ADD COLUMN IsUsing BOOLEAN DEFAULT FALSE")
+
+    cursor = await db.execute("PRAGMA table_info(Stocks)")
+    stock_columns = {row[1] for row in await cursor.fetchall()}
+    if "ShareReserve" not in stock_columns:
+        await db.execute("ALTER TABLE Stocks ADD COLUMN ShareReserve REAL DEFAULT 100000")
+    if "SmoothedUsage" not in stock_columns:
+        await db.execute("ALTER TABLE Stocks ADD COLUMN SmoothedUsage REAL DEFAULT 0")
+    if "PeriodUsage" not in stock_columns:
+        await db.execute("ALTER TABLE Stocks ADD COLUMN PeriodUsage INTEGER NOT NULL DEFAULT 0")
+
+    cursor = await db.execute("PRAGMA table_info(GamblingStats)")
+    gambling_columns = {row[1] for row in await cursor.fetchall()}
+    for column_name, declaration in (
+        ("Rounds", "INTEGER NOT NULL DEFAULT 0"),
+        ("StakedSinceEpoch", "INTEGER NOT NULL DEFAULT 0"),
+        ("PaidOut", "INTEGER NOT NULL DEFAULT 0"),
+        ("RakebackPaid", "INTEGER NOT NULL DEFAULT 0"),
+        ("EpochStart", "TEXT"),
+    ):
+        if column_name not in gambling_columns:
+            await db.execute(f"ALTER TABLE GamblingStats ADD COLUMN {column_name} {declaration}")
+
+    cursor = await db.execute("PRAGMA table_info(StockTransactions)")
+    if "Kind" not in {row[1] for row in await cursor.fetchall()}:
+        await db.execute("ALTER TABLE StockTransactions ADD COLUMN Kind TEXT NOT NULL DEFAULT 'trade'")
+
+    # Gambling statistics journaled by settlements until the next batched flush
+    cursor = await db.execute("PRAGMA table_info(EconomyOperations)")
+    if "PendingStats" not in {row[1] for row in await cursor.fetchall()}:
+        await db.execute("ALTER TABLE EconomyOperations ADD COLUMN PendingStats TEXT")
+    await db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_economy_operations_pending_stats
+        ON EconomyOperations(Id) WHERE PendingStats IS NOT NULL
+        """
+    )
+
+
+async def convert_command_items(db: aiosqlite.Connection) -> None:
+    """Turn command shop items (Type 1) into inventory Items (Type 4).
+
+    Also run after a Nadeko import, which copies shop entries with their original type.
+    """
+    cursor = await db.execute("UPDATE ShopEntry SET Type = 4, Command = NULL WHERE Type = 1")
+    if cursor.rowcount > 0:
+        log.info(f"Migrated {cursor.rowcount} 'Command' shop items to 'Item' type")
+
+
+# Plain single-column indices serve a user's rows in rowid order, so exports page them without a sort
+_USER_INDICES = (
+    ("idx_transactions_other", "CurrencyTransactions", "OtherId"),
+    ("idx_xp_user", "UserXpStats", "UserId"),
+    ("idx_xp_shop_owned_user", "XpShopOwnedItem", "UserId"),
+    ("idx_bet_stats_user", "UserBetStats", "UserId"),
+    ("idx_stock_holdings_user", "StockHoldings", "UserId"),
+    ("idx_stock_transactions_user", "StockTransactions", "UserId"),
+    ("idx_dividend_payouts_user", "DividendPayouts", "UserId"),
+    ("idx_user_inventory_user", "UserInventory", "UserId"),
+)
+
+
+async def _index_user_columns(db: aiosqlite.Connection) -> None:
+    for name, table, column in _USER_INDICES:
+        await db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({column})")
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "baseline tables and indices", _create_baseline),
+    Migration(2, "columns added since the baseline", _add_columns),
+    Migration(3, "command shop items become inventory items", convert_command_items),
+    Migration(4, "per-user indices for exports", _index_user_columns),
+)
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+async def _fingerprint(db: aiosqlite.Connection, version: int) -> str:
+    cookie = (await (await db.execute("PRAGMA schema_version")).fetchone())[0]
+    return f"{version}:{cookie}"
+
+
+async def _stored_fingerprint(db: aiosqlite.Connection) -> str | None:
+    try:
+        cursor = await db.execute("SELECT Value FROM BotConfig WHERE Key = ?", (FINGERPRINT_KEY,))
+    except aiosqlite.OperationalError:
+        return None  # No BotConfig yet: a new database
+    row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def migrate(db: aiosqlite.Connection, migrations: tuple[Migration, ...] = MIGRATIONS) -> SchemaReport:
+    """Apply pending migrations, or skip them all when the stored fingerprint matches.
+
+    Each step runs in its own transaction together with the ``user_version``
+    bump, so a failed step rolls back and is retried on the next load.
+    """
+    start = time.perf_counter()
+    target = migrations[-1].version
+    await db.commit()
+    current = (await (await db.execute("PRAGMA user_version")).fetchone())[0]
+    report = SchemaReport(from_version=current, to_version=target)
+
+    if current == target and await _stored_fingerprint(db) == await _fingerprint(db, target):
+        report.skipped = True
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    # A fingerprint mismatch at the current version replays every (idempotent) step
+    pending = [m for m in migrations if m.version > current] if current < target else list(migrations)
+    for migration in pending:
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            await migration.apply(db)
+            await db.execute(f"PRAGMA user_version = {max(migration.version, current)}")
+            await db.commit()
+        except Exception:
+            await db.execute("ROLLBACK")
+            log.error(f"Schema migration {migration.version} ({migration.description}) failed")
+            raise
+        report.applied.append(migration.version)
+
+    await db.execute(
+        """
+        INSERT INTO BotConfig (Key, Value, Description)
+        VALUES (?, ?, 'Schema version and cookie of the last completed migration')
+        ON CONFLICT(Key) DO UPDATE SET Value = excluded.Value
+        """,
+        (FINGERPRINT_KEY, await _fingerprint(db, target)),
+    )
+    await db.commit()
+    report.elapsed = time.perf_counter() - start
+    log.info(f"Database schema v{current} -> v{target}: applied step(s) {report.applied} in {report.elapsed:.3f}s")
+    return report
@@ -0,0 +1,136 @@
+"""
+Buffered gambling statistics.
+
+Every settlement used to upsert the game's GamblingStats row, the player's
+UserBetStats row and the single YieldPool row inside its own transaction.
+Those statistics deltas are now summed in memory and folded into the tables
+in one batched transaction. Each settlement also stores its own delta as JSON
+in the PendingStats column of the EconomyOperations row it already updates,
+so deltas that never reached a flush are replayed after a restart.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+# How often pending statistics are folded into their tables
+FLUSH_INTERVAL_SECONDS = 30.0
+
+
+def _sqlite_now() -> str:
+    return datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@dataclass
+class GameStatsDelta:
+    """Pending additions to one GamblingStats row."""
+
+    bet: int = 0
+    win: int = 0
+    loss: int = 0
+    rounds: int = 0
+    staked: int = 0
+    paid_out: int = 0
+    rakeback: int = 0
+    first_seen: str = field(default_factory=_sqlite_now)
+
+    def add(self, other: GameStatsDelta) -> None:
+        self.bet += other.bet
+        self.win += other.win
+        self.loss += other.loss
+        self.rounds += other.rounds
+        self.staked += other.staked
+        self.paid_out += other.paid_out
+        self.rakeback += other.rakeback
+        self.first_seen = min(self.first_seen, other.first_seen)
+
+
+@dataclass
+class UserBetDelta:
+    """Pending additions to one UserBetStats row."""
+
+    bet: int = 0
+    win: int = 0
+    loss: int = 0
+    max_win: int = 0
+
+    def add(self, other: UserBetDelta) -> None:
+        self.bet += other.bet
+        self.win += other.win
+        self.loss += other.loss
+        self.max_win = max(self.max_win, other.max_win)
+
+
+class GamblingStatsBuffer:
+    """Statistics deltas not yet written to GamblingStats, UserBetStats and YieldPool."""
+
+    def __init__(self) -> None:
+        self.games: dict[str, GameStatsDelta] = {}
+        self.users: dict[tuple[int, str], UserBetDelta] = {}
+        # YieldPool columns: Balance and the Lifetime* counter for each source
+        self.pool: dict[str, int] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.games or self.users or any(self.pool.values()))
+
+    def record_round(self, game: str, user_id: int, stake: int, payout: int, rakeback: int) -> None:
+        """Record one settled stake exactly as the per-settlement upserts counted it."""
+        loss = max(0, stake - payout)
+        win = payout if payout > stake else 0
+        self.games.setdefault(game, GameStatsDelta()).add(
+            GameStatsDelta(stake, win, loss, 1, stake, payout, rakeback, _sqlite_now())
+        )
+        self.users.setdefault((user_id, game), UserBetDelta()).add(UserBetDelta(stake, win, loss, win))
+
+    def accrue_pool(self, amount: int, source: str) -> None:
+        if amount:
+            self.pool["balance"] = self.pool.get("balance", 0) + amount
+            self.pool[source] = self.pool.get(source, 0) + amount
+
+    def merge(self, other: GamblingStatsBuffer) -> None:
+        for game, delta in other.games.items():
+            self.games.setdefault(game, GameStatsDelta(first_seen=delta.first_seen)).add(delta)
+        for key, user_delta in other.users.items():
+            self.users.setdefault(key, UserBetDelta()).add(user_delta)
+        for column, amount in other.pool.items():
+            self.pool[column] = self.pool.get(column, 0) + amount
+
+    def clear(self) -> None:
+        self.games.clear()
+        self.users.clear()
+        self.pool.clear()
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "games": {
+                    game: [d.bet, d.win, d.loss, d.rounds, d.staked, d.paid_out, d.rakeback, d.first_seen]
+                    for game, d in self.games.items()
+                },
+                "users": [
+                    [user_id, game, d.bet, d.win, d.loss, d.max_win] for (user_id, game), d in self.users.items()
+                ],
+                "pool": self.pool,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str | None) -> GamblingStatsBuffer:
+        """Parse a stored delta; malformed payloads yield an empty buffer."""
+        buffer = cls()
+        try:
+            data: dict[str, Any] = json.loads(raw or "{}")
+            for game, values in data.get("games", {}).items():
+                *counts, first_seen = values
+                if len(counts) != 7:
+                    raise ValueError(f"bad delta for {game}")
+                buffer.games[str(game)] = GameStatsDelta(*(int(v) for v in counts), first_seen=str(first_seen))
+            for user_id, game, *counts in data.get("users", []):
+                buffer.users[(int(user_id), str(game))] = UserBetDelta(*(int(v) for v in counts))
+            buffer.pool = {str(k): int(v) for k, v in data.get("pool", {}).items()}
+        except (TypeError, ValueError, AttributeError):
+            return cls()
+        return buffer
@@ -9,7 +9,14 @@ from datetime import datetime
 
 import aiosqlite
 
-from ..stock_market import INITIAL_SHARE_RESERVE, P_BASE
+from ..stock_market import (
+    CANDLE_RESOLUTIONS,
+    CANDLE_RETENTION,
+    INITIAL_SHARE_RESERVE,
+    P_BASE,
+    Candle,
+    candle_start,
+)
 from .core import CoreDB
 from .economy import POOL_SOURCE_TRADE_TAX
 
@@ -504,7 +511,7 @@ class StockRepository:
 
         When supplied, ``completed_at`` is persisted in the same transaction
         so a committed economic tick can never be replayed after a later UI
-        failure.
+        failure, and the tick is folded into the price-history candles.
         """
         async with self.db._get_connection() as db:
             await db.execute("BEGIN")
@@ -528,11 +535,87 @@ class StockRepository:
                         """,
                         (str(completed_at),),
                     )
+                    await self._record_candles(db, [(s, pp, p) for s, p, pp, _usage, _raw in normalized], completed_at)
                 await db.commit()
             except Exception:
                 await db.execute("ROLLBACK")
                 raise
 
+    async def _record_candles(
+        self,
+        db: aiosqlite.Connection,
+        prices: Sequence[tuple[str, float, float]],
+        timestamp: int,
+    ) -> None:
+        """Fold one tick of (Symbol, OpenPrice, ClosePrice) into every candle tier.
+
+        Each tier's current bucket is upserted in place, so downsampling costs
+        one row write per symbol and tier and never rescans older history.
+        Buckets older than the tier's retention are pruned.
+        """
+        for resolution in CANDLE_RESOLUTIONS:
+            bucket = candle_start(timestamp, resolution)
+            await db.executemany(
+                """
+                INSERT INTO StockPriceCandles
+                    (Symbol, Resolution, BucketStart, Open, High, Low, Close, Ticks)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+                ON CONFLICT(Symbol, Resolution, BucketStart) DO UPDATE SET
+                    High = MAX(High, excluded.High),
+                    Low = MIN(Low, excluded.Low),
+                    Close = excluded.Close,
+                    Ticks = Ticks + 1
+                """,
+                [
+                    (symbol.upper(), resolution, bucket, open_, max(open_, close), min(open_, close), close)
+                    for symbol, open_, close in prices
+                ],
+            )
+            retention = CANDLE_RETENTION[resolution]
+            if retention is not None:
+                await db.execute(
+                    "DELETE FROM StockPriceCandles WHERE Resolution = ? AND BucketStart < ?",
+                    (resolution, candle_start(timestamp - retention, resolution)),
+                )
+
+    async def get_candles(
+        self,
+        symbol: str,
+        resolution: str = "hour",
+        *,
+        start: int | None = None,
+        end: int | None = None,
+        limit: int | None = None,
+    ) -> list[Candle]:
+        """Return a symbol's OHLC candles in ``[start, end]``, oldest first.
+
+        With ``limit``, only the most recent ``limit`` candles in range are
+        returned. Served straight from the primary key range.
+        """
+        if resolution not in CANDLE_RESOLUTIONS:
+            raise ValueError(f"Unknown candle resolution: {resolution}")
+        async with self.db._get_connection() as db:
+            cursor = await db.execute(
+                """
+                SELECT BucketStart, Open, High, Low, Close, Ticks
+                FROM StockPriceCandles
+                WHERE Symbol = ? AND Resolution = ? AND BucketStart BETWEEN ? AND ?
+                ORDER BY BucketStart DESC
+                LIMIT ?
+                """,
+                (
+                    symbol.upper(),
+                    resolution,
+                    start if start is not None else 0,
+                    end if end is not None else 2**62,
+                    limit if limit is not None else -1,
+                ),
+            )
+            rows = await cursor.fetchall()
+        return [
+            Candle(int(r[0]), float(r[1]), float(r[2]), float(r[3]), float(r[4]), int(r[5])) for r in reversed(rows)
+        ]
+
     async def update_shares_and_price(self, symbol: str, shares_delta: int, price_delta: float) -> bool:
         """Atomic update for transactions (buy/sell)."""
         async with self.db._get_connection() as db:
@@ -669,6 +752,7 @@ class StockRepository:
         """Delete a stock."""
         async with self.db._get_connection() as db:
             await db.execute("DELETE FROM Stocks WHERE Symbol = ?", (symbol.upper(),))
+            await db.execute("DELETE FROM StockPriceCandles WHERE Symbol = ?", (symbol.upper(),))
             await db.commit()
             return True
 
@@ -0,0 +1,147 @@
+"""Emoji usage scanning for the stock market."""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from collections.abc import Iterator, Mapping
+
+# Custom Discord emoji as they appear in message content: <:name:id> or <a:name:id>
+CUSTOM_EMOJI_RE = re.compile(r"<a?:[A-Za-z0-9_~]+:(\d+)>")
+
+
+class _Automaton:
+    """Aho-Corasick automaton over Unicode code points.
+
+    Matches are reported leftmost-longest and non-overlapping, the same result
+    a longest-first regex alternation gives, but scanning cost depends only on
+    the text length and not on how many patterns are tracked.
+    """
+
+    __slots__ = ("_fail", "_goto", "_out", "_starts")
+
+    def __init__(self, patterns: Mapping[str, str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # state -> (pattern length, value) of the longest pattern ending here
+        self._out: list[tuple[int, str] | None] = [None]
+        for pattern, value in patterns.items():
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                state = nxt
+            self._out[state] = (len(pattern), value)
+        self._starts = frozenset(self._goto[0])
+
+        # Breadth-first failure links; each state inherits the longest output
+        # of its failure chain so suffix matches are never missed.
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[nxt] is None:
+                    self._out[nxt] = self._out[self._fail[nxt]]
+
+    def _matches(self, text: str) -> Iterator[tuple[int, int, str]]:
+        """Yield every ``(start, end, value)`` match, including overlaps."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            probe = state
+            while probe:
+                hit = out[probe]
+                if hit is None:
+                    break
+                length, value = hit
+                yield index + 1 - length, index + 1, value
+                # Shorter patterns ending here live further down the fail chain
+                probe = fail[probe]
+                while probe and (out[probe] is None or out[probe][0] >= length):
+                    probe = fail[probe]
+
+    def findall(self, text: str) -> list[str]:
+        """Return matched values, leftmost-longest and non-overlapping."""
+        if not self._starts or self._starts.isdisjoint(text):
+            return []
+        best: dict[int, tuple[int, str]] = {}
+        for start, end, value in self._matches(text):
+            if start not in best or end > best[start][0]:
+                best[start] = (end, value)
+        found: list[str] = []
+        position = 0
+        for start in sorted(best):
+            if start < position:
+                continue
+            end, value = best[start]
+            found.append(value)
+            position = end
+        return found
+
+
+class EmojiUsageScanner:
+    """
+    Counts tracked emoji in messages and reactions.
+
+    Custom emoji are matched by ID with a dict lookup, so a renamed or
+    animated variant of the same emoji still counts. Everything else is
+    matched by the Unicode automaton.
+    """
+
+    def __init__(self, emoji_map: Mapping[str, str] | None = None):
+        self._custom: dict[int, str] = {}
+        self._unicode: dict[str, str] = {}
+        self._automaton: _Automaton | None = None
+        self.rebuild(emoji_map or {})
+
+    def rebuild(self, emoji_map: Mapping[str, str]) -> None:
+        """Replace the tracked emoji (emoji string -> stock symbol)."""
+        custom: dict[int, str] = {}
+        unicode: dict[str, str] = {}
+        for emoji, symbol in emoji_map.items():
+            match = CUSTOM_EMOJI_RE.fullmatch(emoji.strip())
+            if match:
+                custom[int(match.group(1))] = symbol
+            elif emoji:
+                unicode[emoji] = symbol
+        self._custom = custom
+        self._unicode = unicode
+        self._automaton = _Automaton(unicode) if unicode else None
+
+    def __bool__(self) -> bool:
+        return bool(self._custom or self._unicode)
+
+    def scan(self, content: str) -> Counter[str]:
+        """Return per-symbol usage counts for a message's content."""
+        counts: Counter[str] = Counter()
+        if self._custom and "<" in content:
+            for match in CUSTOM_EMOJI_RE.finditer(content):
+                symbol = self._custom.get(int(match.group(1)))
+                if symbol:
+                    counts[symbol] += 1
+        if self._automaton is not None:
+            counts.update(self._automaton.findall(content))
+        return counts
+
+    def symbol_for_reaction(self, emoji_id: int | None, name: str | None) -> str | None:
+        """Return the tracked symbol for a reaction's emoji, if any."""
+        if emoji_id is not None:
+            return self._custom.get(emoji_id)
+        if name:
+            return self._unicode.get(name)
+        return None
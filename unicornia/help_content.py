@@ -136,6 +136,7 @@ HELP_CONTENT = {
             "`[p]stock buy <ticker> <amount>` - Buy shares.",
             "`[p]stock sell <ticker> <amount>` - Sell shares.",
             "`[p]stock portfolio` - View your holdings.",
+            "`[p]stock history <ticker> [hour|day|week]` - View a price chart and trend.",
             "`[p]stock dividends` - View your dividend history by stock and period.",
         ],
     },
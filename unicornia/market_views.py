@@ -2,6 +2,9 @@
 Market UI Components for Unicornia Stock Exchange
 """
 
+import hashlib
+from dataclasses import dataclass
+
 import discord
 from discord import ui
 
@@ -460,13 +463,71 @@ class StockListView(ui.LayoutView):
 # --- Step 1: Main Dashboard ---
 
 
+@dataclass(frozen=True)
+class DashboardRender:
+    """Dashboard text rendered once per market tick and shared by every guild."""
+
+    sections: tuple[str, ...]
+    updated_at: int
+    # Hash of the visible market data; excludes the update timestamp
+    digest: str
+
+
+def render_dashboard(market_system, event_name: str | None = None) -> DashboardRender:
+    """Render the dashboard sections from the market system's cached stats."""
+
+    def generate_list_text(stocks_list, metric_func):
+        text = ""
+        for s in stocks_list:
+            price = s["price"]
+            prev = s["previous_price"]
+            change = price - prev
+            change_pct = (change / prev * 100) if prev > 0 else 0
+            arrow = "🟢" if change >= 0 else "🔴"
+
+            # Format: Emoji Symbol: Price Arrow (Change%) | Metric
+            extra_info = metric_func(s)
+            line = f"{s['emoji']} **{s['symbol']}**: {format_stock_price(price)} {market_system.currency_symbol} {arrow} ({change_pct:+.1f}%) {extra_info}\n"
+            text += line
+        return text if text else "None"
+
+    sections = [
+        "## 🏙️ Unicornia Stock Exchange\nWelcome to the Market! Use the buttons below to trade.\nPrices update hourly. More info about the stock system can be found [here.](https://canary.discord.com/channels/684360255798509578/1456926874050625638/1456926874050625638)"
+    ]
+
+    # Event News
+    if event_name:
+        sections.append(f"### 📢 MARKET NEWS\n**{event_name}**")
+
+    # 1. Top 10 Most Expensive
+    if market_system.top_expensive:
+        expensive_text = generate_list_text(market_system.top_expensive, lambda s: "")
+        sections.append(f"### 💎 Top 10 Most Expensive\n{expensive_text}")
+
+    # 2. Top 10 Most Changed (Last Hour)
+    if market_system.top_changed:
+        changed_text = generate_list_text(market_system.top_changed, lambda s: "")
+        sections.append(f"### ⚡ Top 10 Movers (1h)\n{changed_text}")
+
+    # 3. Top 10 In Circulation (Held)
+    if market_system.top_held:
+        held_text = generate_list_text(market_system.top_held, lambda s: f"| 👥 Circ: {s.get('held_shares', 0):,}")
+        sections.append(f"### 🐋 In Circulation (Top 10)\n{held_text}")
+    else:
+        sections.append("### 📊 Market Status\nMarket is initializing or empty.")
+
+    digest = hashlib.sha256("\x00".join(sections).encode()).hexdigest()
+    return DashboardRender(tuple(sections), int(discord.utils.utcnow().timestamp()), digest)
+
+
 class StockDashboardView(ui.LayoutView):
     """Components V2 Dashboard for Unicornia Stock Exchange."""
 
-    def __init__(self, market_system, event_name: str | None = None):
+    def __init__(self, market_system, event_name: str | None = None, *, render: DashboardRender | None = None):
         super().__init__(timeout=None)  # Persistent view
         self.market_system = market_system
         self.event_name = event_name
+        self.render = render or render_dashboard(market_system, event_name)
         self.update_components()
 
     def update_components(self):
@@ -475,61 +536,13 @@ class StockDashboardView(ui.LayoutView):
         # Main Container
         container = ui.Container(accent_color=discord.Color.purple())
 
-        # Header
-        container.add_item(
-            ui.TextDisplay(
-                content="## 🏙️ Unicornia Stock Exchange\nWelcome to the Market! Use the buttons below to trade.\nPrices update hourly. More info about the stock system can be found [here.](https://canary.discord.com/channels/684360255798509578/1456926874050625638/1456926874050625638)"
-            )
-        )
-        container.add_item(ui.Separator())
-
-        # Event News
-        if self.event_name:
-            container.add_item(ui.TextDisplay(content=f"### 📢 MARKET NEWS\n**{self.event_name}**"))
+        for section in self.render.sections:
+            container.add_item(ui.TextDisplay(content=section))
             container.add_item(ui.Separator())
 
-        # Helper for generating list text
-        def generate_list_text(stocks_list, metric_func):
-            text = ""
-            for s in stocks_list:
-                price = s["price"]
-                prev = s["previous_price"]
-                change = price - prev
-                change_pct = (change / prev * 100) if prev > 0 else 0
-                arrow = "🟢" if change >= 0 else "🔴"
-
-                # Format: Emoji Symbol: Price Arrow (Change%) | Metric
-                extra_info = metric_func(s)
-                line = f"{s['emoji']} **{s['symbol']}**: {format_stock_price(price)} {self.market_system.currency_symbol} {arrow} ({change_pct:+.1f}%) {extra_info}\n"
-                text += line
-            return text if text else "None"
-
-        # 1. Top 10 Most Expensive
-        if self.market_system.top_expensive:
-            expensive_text = generate_list_text(self.market_system.top_expensive, lambda s: "")
-            container.add_item(ui.TextDisplay(content=f"### 💎 Top 10 Most Expensive\n{expensive_text}"))
-            container.add_item(ui.Separator())
-
-        # 2. Top 10 Most Changed (Last Hour)
-        if self.market_system.top_changed:
-            changed_text = generate_list_text(self.market_system.top_changed, lambda s: "")
-            container.add_item(ui.TextDisplay(content=f"### ⚡ Top 10 Movers (1h)\n{changed_text}"))
-            container.add_item(ui.Separator())
-
-        # 3. Top 10 In Circulation (Held)
-        if self.market_system.top_held:
-            held_text = generate_list_text(
-                self.market_system.top_held, lambda s: f"| 👥 Circ: {s.get('held_shares', 0):,}"
-            )
-            container.add_item(ui.TextDisplay(content=f"### 🐋 In Circulation (Top 10)\n{held_text}"))
-        else:
-            container.add_item(ui.TextDisplay(content="### 📊 Market Status\nMarket is initializing or empty."))
-
         # Footer-ish
-        container.add_item(ui.Separator())
         # Use Discord Timestamp <t:TIMESTAMP:R> for relative time
-        ts = int(discord.utils.utcnow().timestamp())
-        container.add_item(ui.TextDisplay(content=f"*Last Update: <t:{ts}:R>*"))
+        container.add_item(ui.TextDisplay(content=f"*Last Update: <t:{self.render.updated_at}:R>*"))
 
         # Interactive Controls (Must be wrapped in ActionRow)
 
@@ -20,6 +20,14 @@ P_MAX = 1_000_000.0
 INITIAL_SHARE_RESERVE = 100_000.0
 TRADE_IMPACT_LIMIT = 0.10
 
+# Price-history candle widths in seconds, and how long each tier is kept
+# (``None`` keeps the tier forever).
+CANDLE_RESOLUTIONS: dict[str, int] = {"hour": 3_600, "day": 86_400, "week": 604_800}
+CANDLE_RETENTION: dict[str, int | None] = {"hour": 14 * 86_400, "day": 400 * 86_400, "week": None}
+# The Unix epoch fell on a Thursday; shift so weekly candles start on Monday.
+_WEEK_ALIGNMENT = 3 * 86_400
+_SPARK_BARS = "▁▂▃▄▅▆▇█"
+
 
 @dataclass(frozen=True, slots=True)
 class TradeQuote:
@@ -76,6 +84,42 @@ class UnwindOutcome:
     run_id: str | None = None
 
 
+@dataclass(frozen=True, slots=True)
+class Candle:
+    """One OHLC bucket of a stock's price history."""
+
+    start: int
+    open: float
+    high: float
+    low: float
+    close: float
+    ticks: int
+
+    @property
+    def change_pct(self) -> float:
+        return (self.close - self.open) / self.open * 100 if self.open > 0 else 0.0
+
+
+def candle_start(timestamp: int, resolution: str) -> int:
+    """Return the UTC bucket start containing ``timestamp`` for a resolution."""
+    width = CANDLE_RESOLUTIONS.get(resolution)
+    if width is None:
+        raise ValueError(f"unknown candle resolution: {resolution}")
+    offset = _WEEK_ALIGNMENT if resolution == "week" else 0
+    return (timestamp + offset) // width * width - offset
+
+
+def sparkline(values: Sequence[float]) -> str:
+    """Render values as a one-line block chart."""
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    if high == low:
+        return _SPARK_BARS[len(_SPARK_BARS) // 2] * len(values)
+    scale = (len(_SPARK_BARS) - 1) / (high - low)
+    return "".join(_SPARK_BARS[round((value - low) * scale)] for value in values)
+
+
 def update_smoothed_usage(previous: float, usage: int | float) -> float:
     """Advance the persisted usage EMA by one market tick."""
     return LAMBDA * max(0.0, previous) + (1.0 - LAMBDA) * max(0.0, float(usage))
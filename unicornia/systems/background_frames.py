@@ -0,0 +1,125 @@
+"""
+Pre-decoded XP card backgrounds.
+
+Backgrounds are decoded, converted to RGBA and fitted to the card size once,
+then kept in a memory-budgeted LRU so a card request only composites its
+own overlay onto ready frames.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import pairwise
+
+from PIL import Image, ImageOps, ImageSequence
+
+# Frame count above which animated backgrounds are thinned out
+DEFAULT_MAX_FRAMES = 120
+# Budget for decoded frames across all cached backgrounds
+DEFAULT_CACHE_BYTES = 96 * 1024 * 1024
+DEFAULT_FRAME_DURATION = 100
+
+
+@dataclass(frozen=True, slots=True)
+class BackgroundFrames:
+    """A background fitted to the card, one or more RGBA frames with their durations (ms)."""
+
+    frames: tuple[Image.Image, ...]
+    durations: tuple[int, ...]
+
+    @property
+    def is_animated(self) -> bool:
+        return len(self.frames) > 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(frame.width * frame.height * 4 for frame in self.frames)
+
+
+def _kept_indices(count: int, max_frames: int) -> list[int]:
+    if max_frames < 1 or count <= max_frames:
+        return list(range(count))
+    step = count / max_frames
+    return sorted({int(i * step) for i in range(max_frames)})
+
+
+def thin_frames(
+    frames: list[Image.Image], durations: list[int], max_frames: int
+) -> tuple[list[Image.Image], list[int]]:
+    """Keep at most ``max_frames`` evenly spaced frames, folding dropped frames' time into the kept ones."""
+    keep = _kept_indices(len(frames), max_frames)
+    bounds = [*keep, len(frames)]
+    return [frames[i] for i in keep], [sum(durations[start:end]) for start, end in pairwise(bounds)]
+
+
+def decode_background(data: bytes, size: tuple[int, int], max_frames: int = DEFAULT_MAX_FRAMES) -> BackgroundFrames:
+    """Decode image bytes into card-sized RGBA frames."""
+    image = Image.open(io.BytesIO(data))
+    if not getattr(image, "is_animated", False):
+        return BackgroundFrames((ImageOps.fit(image.convert("RGBA"), size),), (0,))
+
+    default_duration = image.info.get("duration") or DEFAULT_FRAME_DURATION
+    keep = set(_kept_indices(getattr(image, "n_frames", 1), max_frames))
+    frames: list[Image.Image] = []
+    durations: list[int] = []
+    for index, frame in enumerate(ImageSequence.Iterator(image)):
+        duration = int(frame.info.get("duration") or default_duration)
+        if index in keep or not frames:
+            # Only kept frames are converted and resized; skipped ones lend their time
+            frames.append(ImageOps.fit(frame.convert("RGBA"), size))
+            durations.append(duration)
+        else:
+            durations[-1] += duration
+    return BackgroundFrames(tuple(frames), tuple(durations))
+
+
+class BackgroundFrameCache:
+    """Thread-safe LRU of decoded backgrounds, bounded by decoded pixel bytes."""
+
+    def __init__(self, budget_bytes: int = DEFAULT_CACHE_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries: OrderedDict[tuple[bytes, tuple[int, int], int], BackgroundFrames] = OrderedDict()
+        self._used = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def used_bytes(self) -> int:
+        return self._used
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, data: bytes, size: tuple[int, int], max_frames: int = DEFAULT_MAX_FRAMES) -> BackgroundFrames:
+        key = (hashlib.blake2b(data, digest_size=16).digest(), size, max_frames)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Decode outside the lock; a concurrent miss on the same image just decodes twice
+        entry = decode_background(data, size, max_frames)
+        if entry.nbytes > self.budget_bytes:
+            return entry
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._used += entry.nbytes
+            while self._used > self.budget_bytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self._used -= evicted.nbytes
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
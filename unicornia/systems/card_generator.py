@@ -11,6 +11,7 @@ import ipaddress
 import logging
 import os
 import socket
+import threading
 from collections import OrderedDict
 from collections.abc import Coroutine
 from typing import Any
@@ -18,10 +19,18 @@ from urllib.parse import urlparse
 
 import aiohttp
 import yaml
-from PIL import Image, ImageDraw, ImageFont, ImageOps, ImageSequence
+from PIL import Image, ImageDraw, ImageFont
+
+from .background_frames import DEFAULT_CACHE_BYTES, DEFAULT_MAX_FRAMES, BackgroundFrameCache, thin_frames
+from .font_coverage import GlyphCoverage, load_coverage
 
 log = logging.getLogger("red.kirin_cogs.unicornia.xp_card")
 
+# Segmented draw runs kept for recently rendered usernames and club names
+TEXT_RUN_CACHE_SIZE = 512
+# Animated cards above this size are re-encoded with fewer frames
+DEFAULT_MAX_OUTPUT_BYTES = 8 * 1024 * 1024
+
 
 class XPCardGenerator:
     """Handles XP card generation with custom backgrounds and frames"""
@@ -33,6 +42,16 @@ class XPCardGenerator:
         self.images_cache = OrderedDict()
         self.default_font_size = 25
         self.fallback_fonts_cache: dict[Any, Any] = {}
+        # Font path -> cmap coverage (None when the cmap can't be read)
+        self._glyph_coverage: dict[str, GlyphCoverage | None] = {}
+        # (text, font size, font path) -> [(segment, font, width)]
+        self._text_runs: OrderedDict[tuple[str, int, str | None], list[tuple[str, Any, float]]] = OrderedDict()
+        # Cards are drawn in executor threads
+        self._text_lock = threading.Lock()
+        # Decoded, card-sized background frames (tunable under "card:" in xp_config.yml)
+        self.background_frames = BackgroundFrameCache(DEFAULT_CACHE_BYTES)
+        self.max_animated_frames = DEFAULT_MAX_FRAMES
+        self.max_animated_bytes = DEFAULT_MAX_OUTPUT_BYTES
         self._background_tasks: set[asyncio.Task[Any]] = set()
 
         # Card dimensions (matching Nadeko's template)
@@ -101,6 +120,26 @@ class XPCardGenerator:
             log.error(f"Error loading XP config: {e}")
             self.xp_config = self._get_default_config()
 
+        self._apply_card_options()
+
+    def _apply_card_options(self):
+        """Apply optional animated-card limits from the "card" section of the XP config"""
+        options = (self.xp_config or {}).get("card") or {}
+        if not isinstance(options, dict):
+            return
+        try:
+            if "max_frames" in options:
+                self.max_animated_frames = max(1, int(options["max_frames"]))
+            if "max_output_kb" in options:
+                self.max_animated_bytes = max(0, int(options["max_output_kb"])) * 1024
+            if "frame_cache_mb" in options:
+                budget = max(0, int(options["frame_cache_mb"])) * 1024 * 1024
+                if budget != self.background_frames.budget_bytes:
+                    self.background_frames.budget_bytes = budget
+                    self.background_frames.clear()
+        except (TypeError, ValueError) as e:
+            log.error(f"Invalid card option in XP config: {e}")
+
     async def _save_default_config(self):
         """Save default configuration to local file"""
         try:
@@ -220,8 +259,26 @@ class XPCardGenerator:
         self.fallback_fonts_cache[size] = loaded_fonts
         return loaded_fonts
 
+    def _font_coverage(self, font: ImageFont.FreeTypeFont) -> GlyphCoverage | None:
+        """Return the font's cmap coverage, read once per font file"""
+        path = getattr(font, "path", None)
+        if not isinstance(path, str):
+            return None
+        with self._text_lock:
+            if path in self._glyph_coverage:
+                return self._glyph_coverage[path]
+        coverage = load_coverage(path, getattr(font, "index", 0))
+        with self._text_lock:
+            self._glyph_coverage[path] = coverage
+        return coverage
+
     def _has_glyph(self, font: ImageFont.FreeTypeFont, char: str) -> bool:
         """Check if a font supports a specific character"""
+        coverage = self._font_coverage(font)
+        if coverage is not None:
+            return coverage.covers(char)
+
+        # No readable cmap (e.g. a bitmap font): probe by rendering
         try:
             # Get mask of the character
             mask = font.getmask(char)
@@ -238,32 +295,21 @@ class XPCardGenerator:
         except Exception:
             return False
 
-    def _draw_text_with_fallback(
+    def _segment_text(
         self,
-        draw: ImageDraw.ImageDraw,
-        xy: tuple[int, int],
         text: str,
         primary_font: ImageFont.FreeTypeFont,
         fallback_fonts: list[ImageFont.FreeTypeFont],
-        fill: Any,
-        anchor: str | None = None,
-    ):
-        """Draw text handling missing glyphs by switching to fallback fonts"""
-        # Fast Path: If text is purely ASCII, skip expensive checks and draw directly
-        if text.isascii():
-            draw.text(xy, text, font=primary_font, fill=fill, anchor=anchor)
-            return
+    ) -> list[tuple[str, Any, float]]:
+        """Split text into (chunk, font, width) runs, cached per (text, font size)"""
+        cache_key = (text, getattr(primary_font, "size", 0), getattr(primary_font, "path", None))
+        with self._text_lock:
+            runs = self._text_runs.get(cache_key)
+            if runs is not None:
+                self._text_runs.move_to_end(cache_key)
+                return runs
 
-        x, y = xy
-
-        # Current drawing position
-
-        # We need to handle anchors manually if we draw segment by segment
-        # For simplicity, we'll calculate total width first if anchor is involved
-        # But 'mm' (middle-middle) and 'rs' (right-baseline) are used in this file
-
-        # 1. Segment the text by font availability
-        segments = []  # List of (text_chunk, font_to_use)
+        segments: list[tuple[str, Any]] = []  # List of (text_chunk, font_to_use)
 
         current_segment = ""
         current_font = primary_font
@@ -281,7 +327,6 @@ class XPCardGenerator:
                 # Find a font that has it
                 found_font = primary_font  # Default back to primary if none found
 
-                # Check primary again (redundant but clean logic) -> already checked above
                 # Check fallbacks
                 for fb_font in fallback_fonts:
                     if self._has_glyph(fb_font, char):
@@ -296,18 +341,36 @@ class XPCardGenerator:
         if current_segment:
             segments.append((current_segment, current_font))
 
-        # 2. Calculate offsets for anchors
-        total_width = 0
-        segment_widths = []
+        runs = [(seg_text, seg_font, seg_font.getlength(seg_text)) for seg_text, seg_font in segments]
+        with self._text_lock:
+            self._text_runs[cache_key] = runs
+            if len(self._text_runs) > TEXT_RUN_CACHE_SIZE:
+                self._text_runs.popitem(last=False)
+        return runs
+
+    def _draw_text_with_fallback(
+        self,
+        draw: ImageDraw.ImageDraw,
+        xy: tuple[int, int],
+        text: str,
+        primary_font: ImageFont.FreeTypeFont,
+        fallback_fonts: list[ImageFont.FreeTypeFont],
+        fill: Any,
+        anchor: str | None = None,
+    ):
+        """Draw text handling missing glyphs by switching to fallback fonts"""
+        # Fast Path: If text is purely ASCII, skip expensive checks and draw directly
+        if text.isascii():
+            draw.text(xy, text, font=primary_font, fill=fill, anchor=anchor)
+            return
 
-        for seg_text, seg_font in segments:
-            w = seg_font.getlength(seg_text)
-            segment_widths.append(w)
-            total_width += w
+        x, y = xy
+
+        # 1. Segment the text by font availability (cached, so repeat renders skip glyph probing)
+        runs = self._segment_text(text, primary_font, fallback_fonts)
 
-            # Height approximation (ascent - descent)
-            # ascent, descent = seg_font.getmetrics()
-            # max_height = max(max_height, ascent + descent)
+        # 2. Calculate offsets for anchors
+        total_width = sum(width for _seg_text, _seg_font, width in runs)
 
         # Adjust starting X based on anchor
         # Pillow anchors:
@@ -330,7 +393,7 @@ class XPCardGenerator:
         # 3. Draw segments
         current_draw_x = start_x
 
-        for i, (seg_text, seg_font) in enumerate(segments):
+        for seg_text, seg_font, seg_width in runs:
             # We use 'ls' (Left, Baseline) or 'la' (Left, Ascender) equivalent
 
             draw_anchor = "ls"  # Left, Baseline (standard)
@@ -348,7 +411,7 @@ class XPCardGenerator:
                 pass
 
             draw.text((current_draw_x, draw_y), seg_text, font=seg_font, fill=fill, anchor=draw_anchor)
-            current_draw_x += segment_widths[i]
+            current_draw_x += seg_width
 
     async def _download_image(self, url: str, cache_to_disk: bool = False) -> bytes | None:
         """Download and cache image bytes from URL (with SSRF protection and Cache Limit)"""
@@ -628,58 +691,23 @@ class XPCardGenerator:
             avatar, level, current_xp, required_xp, rank, username, club_icon, club_name, fonts, fallback_fonts
         )
 
-        # 2. Handle Background
+        # 2. Handle Background (decoded and resized once, then cached)
         if background_bytes:
             try:
-                bg_image = Image.open(io.BytesIO(background_bytes))
-
-                # Check if animated GIF
-                is_animated = getattr(bg_image, "is_animated", False)
-
-                if is_animated:
-                    frames = []
-                    duration = bg_image.info.get("duration", 100)
-
-                    for frame in ImageSequence.Iterator(bg_image):
-                        frame = frame.convert("RGBA")
-                        # Resize frame to card size (cover)
-                        frame = ImageOps.fit(frame, (self.card_width, self.card_height))
-
-                        # Composite overlay on top
-                        frame.alpha_composite(overlay)
-
-                        frames.append(frame)
-
-                    output = io.BytesIO()
-                    # Save as WebP (Lossless for quality, method=3 for speed balance)
-                    frames[0].save(
-                        output,
-                        format="WEBP",
-                        save_all=True,
-                        append_images=frames[1:],
-                        loop=0,
-                        duration=duration,
-                        lossless=False,
-                        quality=90,
-                        method=3,
-                    )
-                    output.seek(0)
-                    return output, "webp"
-
-                else:
-                    # Static Image
-                    bg_image = bg_image.convert("RGBA")
-                    bg_resized = ImageOps.fit(bg_image, (self.card_width, self.card_height))
-
-                    # Create base
-                    card = Image.new("RGBA", (self.card_width, self.card_height))
-                    card.paste(bg_resized, (0, 0))
-                    card.alpha_composite(overlay)
-
-                    output = io.BytesIO()
-                    card.save(output, format="PNG")
-                    output.seek(0)
-                    return output, "png"
+                background = self.background_frames.get(
+                    background_bytes, (self.card_width, self.card_height), self.max_animated_frames
+                )
+
+                if background.is_animated:
+                    return self._encode_animated_card(list(background.frames), list(background.durations), overlay)
+
+                # Static Image
+                card = Image.alpha_composite(background.frames[0], overlay)
+
+                output = io.BytesIO()
+                card.save(output, format="PNG")
+                output.seek(0)
+                return output, "png"
 
             except Exception as e:
                 log.error(f"Error processing background image: {e}")
@@ -695,6 +723,34 @@ class XPCardGenerator:
 
         return output, "png"
 
+    def _encode_animated_card(
+        self, frames: list[Image.Image], durations: list[int], overlay: Image.Image
+    ) -> tuple[io.BytesIO, str]:
+        """Composite the overlay onto pre-decoded frames and encode an animated WebP"""
+        cards = [Image.alpha_composite(frame, overlay) for frame in frames]
+
+        while True:
+            output = io.BytesIO()
+            # Save as WebP (Lossless for quality, method=3 for speed balance)
+            cards[0].save(
+                output,
+                format="WEBP",
+                save_all=True,
+                append_images=cards[1:],
+                loop=0,
+                duration=durations,
+                lossless=False,
+                quality=90,
+                method=3,
+            )
+            if not self.max_animated_bytes or output.tell() <= self.max_animated_bytes or len(cards) <= 2:
+                break
+            # Too big to upload comfortably: halve the frame count and try again
+            cards, durations = thin_frames(cards, durations, len(cards) // 2)
+
+        output.seek(0)
+        return output, "webp"
+
     async def generate_xp_card(
         self,
         user_id: int,
@@ -0,0 +1,94 @@
+"""
+Preloaded currency drop images.
+
+The PNGs in ``data/currency_images`` are listed and read once, in a worker
+thread, and kept in memory up to a byte budget. A drop then only picks one
+at random and wraps its bytes in a ``discord.File``, with no filesystem
+calls on the event loop. A watch task reloads the catalog when the files
+change.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+import discord
+
+# Bytes of image data kept in memory; images past it are read on demand
+IMAGE_BUDGET_BYTES = 16 * 1024 * 1024
+# How often the directory is checked for added, removed or edited images
+WATCH_INTERVAL_SECONDS = 60.0
+
+Signature = tuple[tuple[str, int, int], ...]  # (name, size, mtime_ns) per image
+
+
+@dataclass(frozen=True)
+class CurrencyImage:
+    """One drop image; ``data`` is None when it did not fit the memory budget."""
+
+    path: Path
+    data: bytes | None
+
+
+class CurrencyImageCatalog:
+    """The drop images of one directory, held in memory."""
+
+    def __init__(self, directory: Path, budget_bytes: int = IMAGE_BUDGET_BYTES):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.images: tuple[CurrencyImage, ...] = ()
+        self._signature: Signature | None = None
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    @property
+    def cached_bytes(self) -> int:
+        return sum(len(image.data) for image in self.images if image.data is not None)
+
+    def _scan(self) -> tuple[Signature, list[Path]]:
+        if not self.directory.is_dir():
+            return (), []
+        paths = sorted(path for path in self.directory.iterdir() if path.suffix.lower() == ".png" and path.is_file())
+        signature = []
+        for path in paths:
+            stat = path.stat()
+            signature.append((path.name, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature), paths
+
+    def _read(self) -> tuple[Signature, tuple[CurrencyImage, ...]]:
+        signature, paths = self._scan()
+        images = []
+        used = 0
+        for path, (_name, size, _mtime) in zip(paths, signature, strict=True):
+            data = None
+            if used + size <= self.budget_bytes:
+                data = path.read_bytes()
+                used += len(data)
+            images.append(CurrencyImage(path, data))
+        return signature, tuple(images)
+
+    async def load(self) -> None:
+        """(Re)read every image off the event loop."""
+        self._signature, self.images = await asyncio.to_thread(self._read)
+
+    async def reload_if_changed(self) -> bool:
+        """Reload when an image was added, removed or modified; True if it reloaded."""
+        signature, _paths = await asyncio.to_thread(self._scan)
+        if signature == self._signature:
+            return False
+        await self.load()
+        return True
+
+    def pick(self) -> CurrencyImage | None:
+        return random.choice(self.images) if self.images else None
+
+    async def file(self, image: CurrencyImage, filename: str = "currency.png") -> discord.File:
+        data = image.data
+        if data is None:
+            data = await asyncio.to_thread(image.path.read_bytes)
+        return discord.File(io.BytesIO(data), filename=filename)
@@ -7,12 +7,15 @@ import os
 import random
 import time
 from collections.abc import Coroutine
+from pathlib import Path
 from typing import Any
 
 import discord
 
 from ..database import DatabaseManager
 from ..types import DecayStats
+from .cooldowns import CooldownTracker
+from .currency_images import WATCH_INTERVAL_SECONDS, CurrencyImageCatalog
 
 
 class CurrencyGeneration:
@@ -22,9 +25,14 @@ class CurrencyGeneration:
         self.db = db
         self.config = config
         self.bot = bot
-        self.generation_cooldowns = {}  # {user_id: timestamp}
+        self.generation_cooldowns: CooldownTracker[int] = CooldownTracker(10)  # user_id -> last generation
         self.active_plants = {}  # {guild_id: {channel_id: plant_data}}
 
+        # Drop images, preloaded by start_image_watch
+        cog_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.images = CurrencyImageCatalog(Path(cog_dir) / "data" / "currency_images")
+        self._image_task = None
+
         # Config cache
         self.gen_enabled = False
         self.gen_channels = set()
@@ -43,11 +51,38 @@ class CurrencyGeneration:
         self._background_tasks.add(task)
         task.add_done_callback(self._background_tasks.discard)
 
+    async def start_image_watch(self):
+        """Load the drop images and reload them whenever the files change"""
+        try:
+            await self.images.load()
+        except Exception as e:
+            # Drops work without images; the watch loop retries on its next pass
+            print(f"Error loading currency generation images: {e}")
+        if not self._image_task:
+            self._image_task = asyncio.create_task(self._image_watch_loop())
+
+    async def stop_image_watch(self):
+        """Stop watching the drop images"""
+        if self._image_task:
+            self._image_task.cancel()
+            self._image_task = None
+
+    async def _image_watch_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(WATCH_INTERVAL_SECONDS)
+                await self.images.reload_if_changed()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Error reloading currency generation images: {e}")
+
     async def refresh_config_cache(self):
         """Refresh configuration cache"""
         self.gen_enabled = await self.config.currency_generation_enabled()
         self.gen_channels = set(await self.config.generation_channels())
         self.gen_cooldown = await self.config.generation_cooldown()
+        self.generation_cooldowns.cooldown = self.gen_cooldown
         self.gen_chance = await self.config.generation_chance()
         self.gen_min = await self.config.generation_min_amount()
         self.gen_max = await self.config.generation_max_amount()
@@ -72,12 +107,7 @@ class CurrencyGeneration:
 
         # Check cooldown
         user_id = message.author.id
-        current_time = time.time()
-
-        if (
-            user_id in self.generation_cooldowns
-            and current_time - self.generation_cooldowns[user_id] < self.gen_cooldown
-        ):
+        if self.generation_cooldowns.active(user_id):
             return
 
         # Check generation chance
@@ -94,15 +124,8 @@ class CurrencyGeneration:
         # Store the plant for pickup
         plant_id = await self._create_plant(message.guild.id, message.channel.id, amount, password)
 
-        # Get random image
-        cog_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        images_dir = os.path.join(cog_dir, "data", "currency_images")
-        image_file = None
-
-        if os.path.exists(images_dir):
-            images = [f for f in os.listdir(images_dir) if f.lower().endswith(".png")]
-            if images:
-                image_file = random.choice(images)
+        # Get random image (preloaded)
+        image = self.images.pick()
 
         if is_fake:
             msg_content = (
@@ -114,10 +137,9 @@ class CurrencyGeneration:
             )
 
         sent_message = None
-        if image_file:
-            image_path = os.path.join(images_dir, image_file)
+        if image:
             try:
-                file = discord.File(image_path, filename="currency.png")
+                file = await self.images.file(image)
                 sent_message = await message.channel.send(content=msg_content, file=file)
             except Exception as e:
                 print(f"Error sending currency generation image: {e}")
@@ -129,7 +151,7 @@ class CurrencyGeneration:
             await self._update_plant_message_id(plant_id, sent_message.id)
 
         # Update cooldown
-        self.generation_cooldowns[user_id] = current_time
+        self.generation_cooldowns.start(user_id)
 
     async def _create_plant(self, guild_id: int, channel_id: int, amount: int, password: str = "") -> int:
         """Create a currency plant"""
@@ -0,0 +1,166 @@
+"""
+Glyph coverage read straight from a font's cmap table.
+
+Pillow has no API for asking which characters a font can draw, so the XP card
+generator used to render every character against a known-missing glyph and
+compare masks. Reading the cmap once gives the same answer as a range lookup.
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+from bisect import bisect_right
+from collections.abc import Iterable
+
+log = logging.getLogger("red.kirin_cogs.unicornia.font_coverage")
+
+# (platform, encoding) pairs whose subtables are keyed by Unicode code points
+_UNICODE_ENCODINGS = {(0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (0, 6), (3, 1), (3, 10)}
+
+
+class GlyphCoverage:
+    """Set of code points a font maps to a real glyph, stored as sorted ranges."""
+
+    __slots__ = ("_ends", "_starts")
+
+    def __init__(self, ranges: Iterable[tuple[int, int]]):
+        starts: list[int] = []
+        ends: list[int] = []
+        for start, end in sorted(ranges):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts = starts
+        self._ends = ends
+
+    def __contains__(self, codepoint: object) -> bool:
+        if not isinstance(codepoint, int):
+            return False
+        index = bisect_right(self._starts, codepoint) - 1
+        return index >= 0 and codepoint <= self._ends[index]
+
+    def __len__(self) -> int:
+        return sum(end - start + 1 for start, end in zip(self._starts, self._ends, strict=True))
+
+    def covers(self, char: str) -> bool:
+        return ord(char) in self
+
+
+def _ranges_from_codes(codes: Iterable[int]) -> list[tuple[int, int]]:
+    ranges: list[tuple[int, int]] = []
+    for code in codes:
+        if ranges and code == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], code)
+        else:
+            ranges.append((code, code))
+    return ranges
+
+
+def _format4(data: bytes, offset: int) -> list[tuple[int, int]]:
+    seg_count = struct.unpack_from(">H", data, offset + 6)[0] // 2
+    ends_at = offset + 14
+    starts_at = ends_at + seg_count * 2 + 2
+    deltas_at = starts_at + seg_count * 2
+    range_offsets_at = deltas_at + seg_count * 2
+    ends = struct.unpack_from(f">{seg_count}H", data, ends_at)
+    starts = struct.unpack_from(f">{seg_count}H", data, starts_at)
+    deltas = struct.unpack_from(f">{seg_count}h", data, deltas_at)
+    range_offsets = struct.unpack_from(f">{seg_count}H", data, range_offsets_at)
+
+    ranges: list[tuple[int, int]] = []
+    for seg, (start, end, delta, range_offset) in enumerate(zip(starts, ends, deltas, range_offsets, strict=True)):
+        end = min(end, 0xFFFE)  # 0xFFFF is the mandatory terminator segment
+        if start > end:
+            continue
+        if range_offset == 0:
+            # Every code maps to (code + delta); only the one landing on glyph 0 is missing
+            missing = (-delta) & 0xFFFF
+            if start <= missing <= end:
+                if start < missing:
+                    ranges.append((start, missing - 1))
+                if missing < end:
+                    ranges.append((missing + 1, end))
+            else:
+                ranges.append((start, end))
+            continue
+        slot_base = range_offsets_at + seg * 2 + range_offset
+        mapped = []
+        for code in range(start, end + 1):
+            slot = slot_base + (code - start) * 2
+            if slot + 2 > len(data):
+                break
+            if struct.unpack_from(">H", data, slot)[0]:
+                mapped.append(code)
+        ranges.extend(_ranges_from_codes(mapped))
+    return ranges
+
+
+def _format6(data: bytes, offset: int) -> list[tuple[int, int]]:
+    first, count = struct.unpack_from(">HH", data, offset + 6)
+    glyphs = struct.unpack_from(f">{count}H", data, offset + 10)
+    return _ranges_from_codes(first + i for i, glyph in enumerate(glyphs) if glyph)
+
+
+def _format12(data: bytes, offset: int) -> list[tuple[int, int]]:
+    groups = struct.unpack_from(">L", data, offset + 12)[0]
+    ranges = []
+    for group in range(groups):
+        start, end, glyph = struct.unpack_from(">LLL", data, offset + 16 + group * 12)
+        if glyph == 0:
+            start += 1  # The first code maps to .notdef
+        if start <= end:
+            ranges.append((start, min(end, 0x10FFFF)))
+    return ranges
+
+
+_PARSERS = {4: _format4, 6: _format6, 12: _format12}
+
+
+def parse_cmap(data: bytes, font_index: int = 0) -> GlyphCoverage | None:
+    """Build the coverage of a TrueType/OpenType font (or collection) from its bytes."""
+    base = 0
+    if data[:4] == b"ttcf":
+        num_fonts = struct.unpack_from(">L", data, 8)[0]
+        if font_index >= num_fonts:
+            return None
+        base = struct.unpack_from(">L", data, 12 + font_index * 4)[0]
+
+    num_tables = struct.unpack_from(">H", data, base + 4)[0]
+    cmap_offset = None
+    for table in range(num_tables):
+        tag, _checksum, table_offset, _length = struct.unpack_from(">4sLLL", data, base + 12 + table * 16)
+        if tag == b"cmap":
+            cmap_offset = table_offset
+            break
+    if cmap_offset is None:
+        return None
+
+    subtable_count = struct.unpack_from(">H", data, cmap_offset + 2)[0]
+    ranges: list[tuple[int, int]] = []
+    seen: set[int] = set()
+    for record in range(subtable_count):
+        platform, encoding, sub_offset = struct.unpack_from(">HHL", data, cmap_offset + 4 + record * 8)
+        if (platform, encoding) not in _UNICODE_ENCODINGS or sub_offset in seen:
+            continue
+        seen.add(sub_offset)
+        sub_at = cmap_offset + sub_offset
+        parser = _PARSERS.get(struct.unpack_from(">H", data, sub_at)[0])
+        if parser is not None:
+            ranges.extend(parser(data, sub_at))
+    if not ranges:
+        return None
+    return GlyphCoverage(ranges)
+
+
+def load_coverage(path: str, font_index: int = 0) -> GlyphCoverage | None:
+    """Read a font file's coverage, or None if it cannot be parsed."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        return parse_cmap(data, font_index)
+    except (OSError, struct.error, ValueError) as e:
+        log.debug(f"Could not read cmap from {path}: {e}")
+        return None
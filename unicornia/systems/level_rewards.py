@@ -0,0 +1,60 @@
+"""
+Per-guild level reward tables for level-up handling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+
+from ..database import DatabaseManager
+
+
+@dataclass(frozen=True)
+class LevelRewards:
+    """A guild's role and currency rewards, indexed by level."""
+
+    roles: dict[int, tuple[tuple[int, bool], ...]] = field(default_factory=dict)  # level -> ((role_id, remove), ...)
+    currency: dict[int, int] = field(default_factory=dict)  # level -> amount
+
+    def crossed(self, old_level: int, new_level: int) -> list[int]:
+        """Every level in (old_level, new_level] that has a reward, lowest first."""
+        return sorted(level for level in {*self.roles, *self.currency} if old_level < level <= new_level)
+
+
+class LevelRewardCache:
+    """Loads each guild's reward tables once; the reward admin commands invalidate them."""
+
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self._tables: dict[int, LevelRewards] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._generation: dict[int, int] = {}
+
+    async def get(self, guild_id: int) -> LevelRewards:
+        table = self._tables.get(guild_id)
+        if table is not None:
+            return table
+        async with self._locks.setdefault(guild_id, asyncio.Lock()):
+            table = self._tables.get(guild_id)
+            if table is None:
+                generation = self._generation.get(guild_id, 0)
+                table = await self._load(guild_id)
+                # A reward changed mid-load: serve this table once but do not keep it
+                if self._generation.get(guild_id, 0) == generation:
+                    self._tables[guild_id] = table
+            return table
+
+    async def _load(self, guild_id: int) -> LevelRewards:
+        roles: dict[int, list[tuple[int, bool]]] = {}
+        for level, role_id, remove in await self.db.xp.get_all_xp_role_rewards(guild_id):
+            roles.setdefault(int(level), []).append((int(role_id), bool(remove)))
+        currency: dict[int, int] = {}
+        for level, amount in await self.db.xp.get_xp_currency_rewards(guild_id):
+            if amount > 0:
+                currency[int(level)] = currency.get(int(level), 0) + int(amount)
+        return LevelRewards({level: tuple(rewards) for level, rewards in roles.items()}, currency)
+
+    def invalidate(self, guild_id: int) -> None:
+        self._generation[guild_id] = self._generation.get(guild_id, 0) + 1
+        self._tables.pop(guild_id, None)
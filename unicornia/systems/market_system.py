@@ -3,9 +3,9 @@ Market System for Unicornia Stock Exchange
 """
 
 import asyncio
+import contextlib
 import logging
 import random
-import re
 import time
 from collections import Counter
 from uuid import uuid4
@@ -13,8 +13,11 @@ from uuid import uuid4
 import discord
 
 from ..database import DatabaseManager
-from ..market_views import StockDashboardView
+from ..emoji_usage import EmojiUsageScanner
+from ..market_views import DashboardRender, StockDashboardView, render_dashboard
 from ..stock_market import (
+    CANDLE_RESOLUTIONS,
+    Candle,
     UnwindOutcome,
     buy_quote,
     fair_values,
@@ -24,10 +27,14 @@ from ..stock_market import (
     sell_quote,
     update_smoothed_usage,
 )
+from ..utils import PhaseTimer
 from .economy_system import EconomySystem
 
 log = logging.getLogger("red.kirin_cogs.unicornia.market")
 MARKET_TICK_INTERVAL = 3600
+# Concurrent dashboard edits per tick. Edits to different channels use separate
+# Discord rate-limit buckets; this keeps a large fan-out under the global limit.
+DASHBOARD_EDIT_CONCURRENCY = 5
 
 
 class MarketSystem:
@@ -43,7 +50,7 @@ class MarketSystem:
         self.emoji_buffer = Counter()
         self.stocks_cache: dict[str, dict] = {}  # Symbol -> Stock Dict
         self.emoji_map: dict[str, str] = {}  # Emoji String -> Symbol
-        self.regex_pattern: re.Pattern | None = None
+        self.emoji_scanner = EmojiUsageScanner()
         self.market_channel_id: int | None = None
         self.dashboard_message_id: int | None = None
         self.lock = asyncio.Lock()
@@ -53,53 +60,66 @@ class MarketSystem:
         self.top_expensive: list[dict] = []
         self.top_changed: list[dict] = []
         self.top_held: list[dict] = []
-
-    async def initialize(self):
-        """Load stocks into cache and prepare regex."""
+        # Guild ID -> (channel ID, message ID), loaded from Config on first use
+        self._dashboard_targets: dict[int, tuple[int, int]] | None = None
+        # Guild ID -> digest of the content last shown on its dashboard
+        self._dashboard_digests: dict[int, str] = {}
+        # Background ledger backfill started by the cog, see start_warm_up
+        self._warm_up_task: asyncio.Task[None] | None = None
+
+    async def initialize(self, timer: PhaseTimer | None = None, *, warm_up: bool = True):
+        """Load stocks into cache and prepare the emoji scanner.
+
+        With ``warm_up=False`` the ledger backfill and dashboard statistics are
+        left to ``start_warm_up``, so the cog is usable before they finish.
+        """
         self.currency_symbol = await self.config.currency_symbol()
         stocks = await self.db.stock.get_all_stocks(include_hidden=False)
         self.stocks_cache = {s["symbol"]: s for s in stocks}
         self.emoji_map = {s["emoji"]: s["symbol"] for s in stocks}
-        self._update_regex()
+        self.emoji_scanner.rebuild(self.emoji_map)
+
+        if warm_up:
+            await self.warm_up(timer)
 
-        await self.db.stock.backfill_legacy_transactions()
+    async def warm_up(self, timer: PhaseTimer | None = None):
+        """Import the legacy stock ledger (once) and compute the dashboard statistics."""
+        with timer.phase("backfill") if timer else contextlib.nullcontext():
+            await self.db.stock.backfill_legacy_transactions()
 
         # Initial Dashboard Stats calculation
         await self._update_dashboard_stats()
 
-        # Load config
-        # Assuming single guild/global market for simplicity as per "server-wide"
-        # Ideally we check config.
-        pass
-
-    def _update_regex(self):
-        """Compile regex pattern for all tracked emojis."""
-        if not self.emoji_map:
-            self.regex_pattern = None
-            return
+    def start_warm_up(self, timer: PhaseTimer | None = None) -> asyncio.Task[None]:
+        """Run ``warm_up`` in the background; ledger readers wait for it."""
+        self._warm_up_task = asyncio.create_task(self.warm_up(timer))
+        return self._warm_up_task
 
-        # Escape emojis for regex safety
-        sorted_emojis = sorted(self.emoji_map.keys(), key=len, reverse=True)  # Longest first to avoid partial matches
-        pattern_str = "|".join(re.escape(e) for e in sorted_emojis)
-        try:
-            self.regex_pattern = re.compile(pattern_str)
-        except re.error as e:
-            log.error(f"Failed to compile market regex: {e}")
-            self.regex_pattern = None
+    async def _wait_for_ledger(self) -> None:
+        task = self._warm_up_task
+        if task is not None and not task.done():
+            # A failed warm-up is logged by whoever started it; serve what the ledger has
+            with contextlib.suppress(Exception):
+                await asyncio.shield(task)
 
     async def process_message(self, message: discord.Message):
         """Track emoji usage."""
-        if not self.regex_pattern or message.author.bot:
+        if not self.emoji_scanner or message.author.bot:
             return
 
-        # Simple count of occurrences
         # Note: This counts every occurrence. ":joy: :joy:" = 2
-        matches = self.regex_pattern.findall(message.content)
-        if matches:
-            for match in matches:
-                symbol = self.emoji_map.get(match)
-                if symbol:
-                    self.emoji_buffer[symbol] += 1
+        self.emoji_buffer.update(self.emoji_scanner.scan(message.content))
+
+    async def process_reaction(self, payload: discord.RawReactionActionEvent):
+        """Track emoji usage from a reaction."""
+        if not self.emoji_scanner or payload.guild_id is None:
+            return
+        if payload.member is not None and payload.member.bot:
+            return
+
+        symbol = self.emoji_scanner.symbol_for_reaction(payload.emoji.id, payload.emoji.name)
+        if symbol:
+            self.emoji_buffer[symbol] += 1
 
     async def market_tick(self):
         """Hourly update of stock prices."""
@@ -244,40 +264,88 @@ class MarketSystem:
 
         self.top_held = sorted(top_held_list, key=lambda s: s["held_shares"], reverse=True)[:10]
 
-    async def update_dashboard(self, event_name: str | None = None):
-        """Update the dashboard message in all configured guilds."""
-        for guild in self.bot.guilds:
-            channel_id = await self.config.guild(guild).market_channel()
-            message_id = await self.config.guild(guild).market_message()
+    async def _get_dashboard_targets(self) -> dict[int, tuple[int, int]]:
+        """Return configured dashboards, reading Config once and caching the result."""
+        if self._dashboard_targets is None:
+            all_guilds = await self.config.all_guilds()
+            self._dashboard_targets = {
+                guild_id: (data["market_channel"], data["market_message"])
+                for guild_id, data in all_guilds.items()
+                if data.get("market_channel") and data.get("market_message")
+            }
+        return self._dashboard_targets
+
+    async def set_dashboard(
+        self, guild: discord.Guild, channel_id: int, message_id: int, digest: str | None = None
+    ) -> None:
+        """Persist a guild's dashboard message and track it for updates."""
+        await self.config.guild(guild).market_channel.set(channel_id)
+        await self.config.guild(guild).market_message.set(message_id)
+        targets = await self._get_dashboard_targets()
+        targets[guild.id] = (channel_id, message_id)
+        self._dashboard_digests.pop(guild.id, None)
+        if digest is not None:
+            self._dashboard_digests[guild.id] = digest
+
+    async def clear_dashboard(self, guild: discord.Guild) -> None:
+        """Forget a guild's dashboard message."""
+        await self.config.guild(guild).market_channel.clear()
+        await self.config.guild(guild).market_message.clear()
+        if self._dashboard_targets is not None:
+            self._dashboard_targets.pop(guild.id, None)
+        self._dashboard_digests.pop(guild.id, None)
 
-            if not channel_id or not message_id:
-                continue
+    async def update_dashboard(self, event_name: str | None = None):
+        """Update the dashboard message in all configured guilds.
+
+        The layout is rendered once and shared. Guilds whose dashboard already
+        shows the same content are skipped, and the remaining edits run
+        concurrently (bounded by ``DASHBOARD_EDIT_CONCURRENCY``).
+        """
+        targets = await self._get_dashboard_targets()
+        if not targets:
+            return
 
-            channel = guild.get_channel(channel_id)
-            if not channel:
-                continue
+        render = render_dashboard(self, event_name)
+        semaphore = asyncio.Semaphore(DASHBOARD_EDIT_CONCURRENCY)
+        await asyncio.gather(
+            *(
+                self._edit_dashboard(guild_id, channel_id, message_id, render, semaphore)
+                for guild_id, (channel_id, message_id) in list(targets.items())
+                if self._dashboard_digests.get(guild_id) != render.digest
+            )
+        )
+
+    async def _edit_dashboard(
+        self,
+        guild_id: int,
+        channel_id: int,
+        message_id: int,
+        render: DashboardRender,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        channel = guild.get_channel(channel_id)
+        if not isinstance(channel, discord.TextChannel | discord.Thread):
+            return
 
+        # A partial message is enough to edit; no fetch_message round trip
+        message = channel.get_partial_message(message_id)
+        async with semaphore:
             try:
-                message = await channel.fetch_message(message_id)
+                # IMPORTANT: When editing to V2, we must clear embeds if we used them before.
+                await message.edit(embed=None, view=StockDashboardView(self, render=render))
             except (discord.NotFound, discord.Forbidden):
                 # Auto-cleanup if message/channel is gone
-                await self.config.guild(guild).market_channel.clear()
-                await self.config.guild(guild).market_message.clear()
+                await self.clear_dashboard(guild)
                 log.info(f"Dashboard message not found in {guild.name}, clearing config.")
-                continue
-
-            # Rebuild V2 Dashboard
-            try:
-                # Update using the View which handles layout internally
-                # The view's __init__ triggers update_components()
-                view = StockDashboardView(self, event_name)
-
-                # IMPORTANT: When editing to V2, we must clear embeds if we used them before,
-                # but discord.py V2 handles message structure.
-                # If we send a V2 view, we shouldn't send an embed.
-                await message.edit(embed=None, view=view)
+                return
             except Exception as e:
                 log.error(f"Failed to update dashboard in {guild.name}: {e}")
+                return
+        self._dashboard_digests[guild_id] = render.digest
 
     async def buy_stock(self, user: discord.Member, symbol: str, amount: int) -> tuple[bool, str]:
         """Buy stocks."""
@@ -285,6 +353,8 @@ class MarketSystem:
             return False, "Amount must be positive."
 
         symbol = symbol.upper()
+        # A trade written before the legacy backfill runs would be imported a second time
+        await self._wait_for_ledger()
 
         async with self.lock:
             if symbol not in self.stocks_cache:
@@ -332,6 +402,8 @@ class MarketSystem:
             return False, "Amount must be positive."
 
         symbol = symbol.upper()
+        # A trade written before the legacy backfill runs would be imported a second time
+        await self._wait_for_ledger()
 
         async with self.lock:
             if symbol not in self.stocks_cache:
@@ -380,6 +452,7 @@ class MarketSystem:
 
     async def plan_unwind(self):
         """Read and plan every current holding without mutating market state."""
+        await self._wait_for_ledger()
         holdings, ledger = await self.db.stock.get_unwind_records()
         return plan_stock_unwind(holdings, ledger)
 
@@ -438,6 +511,7 @@ class MarketSystem:
 
     async def get_portfolio_data(self, user_id: int):
         """Fetch portfolio and transaction history for a user."""
+        await self._wait_for_ledger()
         holdings = await self.db.stock.get_user_holdings(user_id)
 
         stock_txs: dict[str, list[dict]] = {}
@@ -448,6 +522,12 @@ class MarketSystem:
 
         return holdings, stock_txs
 
+    async def get_price_history(self, symbol: str, resolution: str = "day", periods: int = 30) -> list[Candle]:
+        """Return the latest ``periods`` OHLC candles for a symbol, oldest first."""
+        if resolution not in CANDLE_RESOLUTIONS:
+            raise ValueError(f"Resolution must be one of: {', '.join(CANDLE_RESOLUTIONS)}")
+        return await self.db.stock.get_candles(symbol, resolution, limit=max(1, periods))
+
     async def register_stock(self, symbol: str, name: str, emoji: str, price: int) -> bool:
         """IPO a new stock."""
         success = await self.db.stock.create_stock(symbol, name, emoji, price)
@@ -0,0 +1,100 @@
+"""
+Per-guild shop catalogs.
+
+A guild's shop is built from one joined query into an immutable catalog with
+index and ID lookup maps, and kept until an admin edit through ShopSystem
+invalidates it. Browsing, item lookups and purchase pre-checks then read
+the catalog instead of the database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+from ..database import DatabaseManager
+from ..types import ShopItem
+
+
+@dataclass(frozen=True)
+class ShopCatalog:
+    """A guild's shop items in display order; the items are shared and must not be mutated."""
+
+    items: tuple[ShopItem, ...] = ()
+    by_index: Mapping[int, ShopItem] = field(default_factory=lambda: MappingProxyType({}))
+    by_id: Mapping[int, ShopItem] = field(default_factory=lambda: MappingProxyType({}))
+
+    @classmethod
+    def from_rows(cls, rows) -> ShopCatalog:
+        """Build a catalog from ``get_shop_entries_with_items`` rows."""
+        items_map: dict[int, ShopItem] = {}
+
+        for row in rows:
+            # row: 0=Id, 1=Index, 2=Price, 3=Name, 4=AuthorId, 5=Type,
+            #      6=RoleName, 7=RoleId, 8=RoleRequirement, 9=Command,
+            #      10=ItemId, 11=ItemText
+            entry_id = row[0]
+
+            if entry_id not in items_map:
+                items_map[entry_id] = {
+                    "id": entry_id,
+                    "index": row[1],
+                    "price": row[2],
+                    "name": row[3],
+                    "author_id": row[4],
+                    "type": row[5],
+                    "role_name": row[6],
+                    "role_id": row[7],
+                    "role_requirement": row[8],
+                    "command": row[9],
+                    "additional_items": [],
+                }
+
+            # If there's an associated item (ItemId is not None)
+            if row[10] is not None:
+                items_map[entry_id]["additional_items"].append((row[10], row[11]))
+
+        items = tuple(sorted(items_map.values(), key=lambda item: item["index"]))
+        by_index: dict[int, ShopItem] = {}
+        for item in items:
+            by_index.setdefault(item["index"], item)
+        return cls(items, MappingProxyType(by_index), MappingProxyType(items_map))
+
+    def lookup(self, item_id: int) -> ShopItem | None:
+        """Find an item by display index first, then by ID."""
+        return self.by_index.get(item_id) or self.by_id.get(item_id)
+
+
+class ShopCatalogCache:
+    """Loads each guild's catalog once; ShopSystem's write paths invalidate it."""
+
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self._catalogs: dict[int, ShopCatalog] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._generation: dict[int, int] = {}
+
+    async def get(self, guild_id: int) -> ShopCatalog:
+        catalog = self._catalogs.get(guild_id)
+        if catalog is not None:
+            return catalog
+        async with self._locks.setdefault(guild_id, asyncio.Lock()):
+            catalog = self._catalogs.get(guild_id)
+            if catalog is None:
+                generation = self._generation.get(guild_id, 0)
+                catalog = ShopCatalog.from_rows(await self.db.shop.get_shop_entries_with_items(guild_id))
+                # An edit landed mid-load: serve this catalog once but do not keep it
+                if self._generation.get(guild_id, 0) == generation:
+                    self._catalogs[guild_id] = catalog
+            return catalog
+
+    def invalidate(self, guild_id: int) -> None:
+        self._generation[guild_id] = self._generation.get(guild_id, 0) + 1
+        self._catalogs.pop(guild_id, None)
+
+    def clear(self) -> None:
+        """Drop every catalog (bulk changes such as migrations or data deletion)."""
+        for guild_id in list(self._catalogs.keys() | self._generation.keys()):
+            self.invalidate(guild_id)
@@ -6,6 +6,7 @@ import discord
 
 from ..database import DatabaseManager
 from ..types import ShopItem, UserInventoryItem
+from .shop_catalog import ShopCatalogCache
 
 
 class ShopSystem:
@@ -15,6 +16,8 @@ class ShopSystem:
         self.db = db
         self.config = config
         self.bot = bot
+        # Per-guild catalogs, invalidated by the add/update/delete methods below
+        self.catalogs = ShopCatalogCache(db)
 
     async def get_shop_items(self, guild_id: int) -> list[ShopItem]:
         """Get all shop items for a guild.
@@ -25,41 +28,8 @@ class ShopSystem:
         Returns:
             List of ShopItem objects.
         """
-        # Use optimized query to fetch everything in one go
-        rows = await self.db.shop.get_shop_entries_with_items(guild_id)
-
-        items_map = {}
-
-        for row in rows:
-            # row: 0=Id, 1=Index, 2=Price, 3=Name, 4=AuthorId, 5=Type,
-            #      6=RoleName, 7=RoleId, 8=RoleRequirement, 9=Command,
-            #      10=ItemId, 11=ItemText
-            entry_id = row[0]
-
-            if entry_id not in items_map:
-                items_map[entry_id] = {
-                    "id": entry_id,
-                    "index": row[1],
-                    "price": row[2],
-                    "name": row[3],
-                    "author_id": row[4],
-                    "type": row[5],
-                    "role_name": row[6],
-                    "role_id": row[7],
-                    "role_requirement": row[8],
-                    "command": row[9],
-                    "additional_items": [],
-                }
-
-            # If there's an associated item (ItemId is not None)
-            if row[10] is not None:
-                items_map[entry_id]["additional_items"].append((row[10], row[11]))
-
-        # Convert map to list and sort by index
-        items = list(items_map.values())
-        items.sort(key=lambda x: x["index"])
-
-        return items
+        catalog = await self.catalogs.get(guild_id)
+        return list(catalog.items)
 
     async def get_shop_item(self, guild_id: int, item_id: int) -> ShopItem | None:
         """Get a specific shop item (by Index or ID).
@@ -71,32 +41,9 @@ class ShopSystem:
         Returns:
             ShopItem object or None.
         """
-        # Try by Index first
-        entry = await self.db.shop.get_shop_entry_by_index(guild_id, item_id)
-
-        # If not found, try by ID
-        if not entry:
-            entry = await self.db.shop.get_shop_entry(guild_id, item_id)
-
-        if not entry:
-            return None
-
-        entry_id, index, price, name, author_id, entry_type, role_name, role_id, role_requirement, command = entry
-        additional_items = await self.db.shop.get_shop_entry_items(entry_id)
-
-        return {
-            "id": entry_id,
-            "index": index,
-            "price": price,
-            "name": name,
-            "author_id": author_id,
-            "type": entry_type,
-            "role_name": role_name,
-            "role_id": role_id,
-            "role_requirement": role_requirement,
-            "command": command,
-            "additional_items": additional_items,
-        }
+        # By Index first, then by ID
+        catalog = await self.catalogs.get(guild_id)
+        return catalog.lookup(item_id)
 
     async def purchase_item(self, user: discord.Member, guild_id: int, item_id: int) -> tuple[bool, str, dict]:
         """Purchase a shop item.
@@ -202,9 +149,12 @@ class ShopSystem:
         Returns:
             New item ID.
         """
-        return await self.db.shop.add_shop_entry(
-            guild_id, index, price, name, author_id, item_type, role_name, role_id, role_requirement, command
-        )
+        try:
+            return await self.db.shop.add_shop_entry(
+                guild_id, index, price, name, author_id, item_type, role_name, role_id, role_requirement, command
+            )
+        finally:
+            self.catalogs.invalidate(guild_id)
 
     async def update_shop_item(self, guild_id: int, item_id: int, **kwargs) -> bool:
         """Update a shop item.
@@ -217,7 +167,10 @@ class ShopSystem:
         Returns:
             Success boolean.
         """
-        return await self.db.shop.update_shop_entry(guild_id, item_id, **kwargs)
+        try:
+            return await self.db.shop.update_shop_entry(guild_id, item_id, **kwargs)
+        finally:
+            self.catalogs.invalidate(guild_id)
 
     async def delete_shop_item(self, guild_id: int, item_id: int) -> bool:
         """Delete a shop item.
@@ -229,7 +182,10 @@ class ShopSystem:
         Returns:
             Success boolean.
         """
-        return await self.db.shop.delete_shop_entry(guild_id, item_id)
+        try:
+            return await self.db.shop.delete_shop_entry(guild_id, item_id)
+        finally:
+            self.catalogs.invalidate(guild_id)
 
     def get_type_name(self, item_type: int) -> str:
         """Get human-readable type name.
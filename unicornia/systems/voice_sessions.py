@@ -0,0 +1,140 @@
+"""
+Voice XP sessions.
+
+Voice state events maintain the set of members currently eligible for voice
+XP, each with the time its session started and the multiplier of its
+channel. The minute tick only credits that set, and a session is settled for
+its whole elapsed minutes when it ends or changes rate, so the periodic cost
+follows the number of eligible members in voice instead of guild size.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import discord
+
+# Voice XP per eligible minute, before the double XP multiplier
+XP_PER_MINUTE = 1
+
+SessionKey = tuple[int, int]  # (user_id, guild_id)
+
+
+@dataclass(frozen=True)
+class VoiceXpSettings:
+    """A guild's voice XP channel whitelist, double XP channels and excluded roles."""
+
+    included_channels: frozenset[int] = frozenset()
+    double_channels: frozenset[int] = frozenset()
+    excluded_roles: frozenset[int] = frozenset()
+
+    def multiplier(self, member: discord.Member) -> int:
+        """XP multiplier for a member's current voice state; 0 when not eligible."""
+        voice = member.voice
+        channel = voice.channel if voice else None
+        if member.bot or not isinstance(channel, discord.VoiceChannel):
+            return 0
+        if channel.id not in self.included_channels:
+            return 0
+        # Skip deafened members (anti-abuse)
+        if voice.self_deaf or voice.deaf:
+            return 0
+        if self.excluded_roles and any(role.id in self.excluded_roles for role in member.roles):
+            return 0
+        return 2 if channel.id in self.double_channels else 1
+
+
+@dataclass
+class VoiceSession:
+    """An eligible member's time in voice at one multiplier."""
+
+    started: float
+    multiplier: int
+    credited_until: float
+
+
+class VoiceSessionTracker:
+    """Eligible voice sessions and the XP they have earned but not yet been credited."""
+
+    def __init__(self, config, clock: Callable[[], float] = time.monotonic):
+        self.config = config
+        self.clock = clock
+        self.sessions: dict[SessionKey, VoiceSession] = {}
+        self._settings: dict[int, VoiceXpSettings] = {}
+        # XP from sessions that ended or changed rate since the last collection
+        self._settled: dict[SessionKey, int] = {}
+
+    async def settings(self, guild: discord.Guild) -> VoiceXpSettings:
+        settings = self._settings.get(guild.id)
+        if settings is None:
+            guild_config = self.config.guild(guild)
+            settings = VoiceXpSettings(
+                frozenset(await guild_config.xp_included_channels()),
+                frozenset(await guild_config.xp_double_channels()),
+                frozenset(await guild_config.excluded_roles()),
+            )
+            self._settings[guild.id] = settings
+        return settings
+
+    async def update(self, member: discord.Member) -> None:
+        """Re-evaluate one member after a voice state or role change."""
+        settings = await self.settings(member.guild)
+        self._apply(member.id, member.guild.id, settings.multiplier(member))
+
+    async def rebuild_guild(self, guild: discord.Guild) -> None:
+        """Resynchronise a guild's sessions from its voice channels (startup and settings changes)."""
+        self._settings.pop(guild.id, None)
+        settings = await self.settings(guild)
+        present = set()
+        for channel in guild.voice_channels:
+            for member in channel.members:
+                present.add(member.id)
+                self._apply(member.id, guild.id, settings.multiplier(member))
+        for key in [key for key in self.sessions if key[1] == guild.id and key[0] not in present]:
+            self._apply(key[0], guild.id, 0)
+
+    def forget_guild(self, guild_id: int) -> None:
+        """Close every session in a guild the bot left; earned minutes are still credited."""
+        for key in [key for key in self.sessions if key[1] == guild_id]:
+            self._apply(key[0], guild_id, 0)
+        self._settings.pop(guild_id, None)
+
+    def _apply(self, user_id: int, guild_id: int, multiplier: int) -> None:
+        key = (user_id, guild_id)
+        session = self.sessions.get(key)
+        if session is not None and session.multiplier == multiplier:
+            return
+        now = self.clock()
+        if session is not None:
+            self._settle(key, session, now)
+            del self.sessions[key]
+        if multiplier:
+            self.sessions[key] = VoiceSession(now, multiplier, now)
+
+    def _settle(self, key: SessionKey, session: VoiceSession, now: float) -> None:
+        minutes = int((now - session.credited_until) // 60)
+        if minutes > 0:
+            self._settled[key] = self._settled.get(key, 0) + minutes * XP_PER_MINUTE * session.multiplier
+            session.credited_until += minutes * 60
+
+    def collect(self, *, credit: bool = True) -> list[tuple[int, int, int]]:
+        """Whole minutes earned since the last collection, as ``(user_id, guild_id, xp)``.
+
+        With ``credit=False`` (XP disabled) the minutes are consumed without
+        being returned, so re-enabling XP does not back-pay them.
+        """
+        now = self.clock()
+        for key, session in self.sessions.items():
+            self._settle(key, session, now)
+        settled, self._settled = self._settled, {}
+        if not credit:
+            return []
+        return [(user_id, guild_id, amount) for (user_id, guild_id), amount in settled.items()]
+
+    def restore(self, updates: list[tuple[int, int, int]]) -> None:
+        """Put back XP whose database write failed so the next tick retries it."""
+        for user_id, guild_id, amount in updates:
+            key = (user_id, guild_id)
+            self._settled[key] = self._settled.get(key, 0) + amount
@@ -3,17 +3,22 @@ XP and Leveling system for Unicornia
 """
 
 import asyncio
+import importlib
 import os
-import time
 from collections import OrderedDict
 from collections.abc import Coroutine
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import discord
 
 from ..database import DatabaseManager
 from ..types import LevelStats
-from .card_generator import XPCardGenerator
+from .cooldowns import CooldownTracker
+from .level_rewards import LevelRewardCache
+from .voice_sessions import VoiceSessionTracker
+
+if TYPE_CHECKING:
+    from .card_generator import XPCardGenerator
 
 
 class XPSystem:
@@ -23,7 +28,7 @@ class XPSystem:
         self.db = db
         self.config = config
         self.bot = bot
-        self.xp_cooldowns = {}  # {user_id: timestamp}
+        self.xp_cooldowns: CooldownTracker[int] = CooldownTracker(60)  # user_id -> last XP gain
         self.xp_buffer = {}  # {(user_id, guild_id): amount}
         # Config Cache
         self._config_cache = {"xp_enabled": True, "xp_cooldown": 60, "xp_per_message": 1}
@@ -33,14 +38,20 @@ class XPSystem:
         self.user_xp_cache = OrderedDict()
         self.user_xp_cache_size = 5000
 
+        # Role and currency rewards per guild, indexed by level
+        self.level_rewards = LevelRewardCache(db)
+
+        # Members currently eligible for voice XP, kept current by voice state events
+        self.voice_sessions = VoiceSessionTracker(config)
+
         self._voice_xp_task = None
         self._message_xp_task = None
         self._background_tasks: set[asyncio.Task[Any]] = set()
 
-        # Initialize XP card generator
+        # The XP card generator (and Pillow) is built on first use or by warm_up
         # Pass the cog root directory (parent of 'systems')
-        cog_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.card_generator = XPCardGenerator(cog_dir)
+        self._cog_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._card_generator: XPCardGenerator | None = None
 
         # Start loops
         self.start_loops()
@@ -48,6 +59,19 @@ class XPSystem:
         # Initialize Config Cache
         self._create_task(self._init_config_cache())
 
+    @property
+    def card_generator(self) -> "XPCardGenerator":
+        if self._card_generator is None:
+            from .card_generator import XPCardGenerator
+
+            self._card_generator = XPCardGenerator(self._cog_dir)
+        return self._card_generator
+
+    async def warm_up(self) -> None:
+        """Import Pillow and the card generator off the event loop, then build it."""
+        await asyncio.to_thread(importlib.import_module, f"{__package__}.card_generator")
+        _ = self.card_generator
+
     def _create_task(self, coro: Coroutine[Any, Any, Any]) -> None:
         task = asyncio.create_task(coro)
         self._background_tasks.add(task)
@@ -57,6 +81,7 @@ class XPSystem:
         """Initialize configuration cache"""
         self._config_cache["xp_enabled"] = await self.config.xp_enabled()
         self._config_cache["xp_cooldown"] = await self.config.xp_cooldown()
+        self.xp_cooldowns.cooldown = self._config_cache["xp_cooldown"]
         self._config_cache["xp_per_message"] = await self.config.xp_per_message()
 
     def start_loops(self):
@@ -75,61 +100,38 @@ class XPSystem:
             self._message_xp_task.cancel()
             self._message_xp_task = None
 
+        # Credit whole minutes already spent in voice
+        for user_id, guild_id, amount in self.voice_sessions.collect(credit=self._config_cache.get("xp_enabled", True)):
+            key = (user_id, guild_id)
+            self.xp_buffer[key] = self.xp_buffer.get(key, 0) + amount
+
         # Flush remaining buffer
         if self.xp_buffer:
             self._create_task(self._flush_buffer())
 
     async def _voice_xp_loop(self):
-        """Background task to award XP to users in voice channels"""
+        """Background task to credit XP to members in eligible voice sessions"""
         await self.bot.wait_until_ready()
 
+        # One full scan to pick up members already in voice; events keep the sessions current after this
+        for guild in self.bot.guilds:
+            await self.voice_sessions.rebuild_guild(guild)
+
         while True:
             try:
                 # Wait for 1 minute
                 await asyncio.sleep(60)
 
                 # Check global enable (Cached)
-                if not self._config_cache.get("xp_enabled", True):
-                    continue
-
-                xp_amount = 1  # Trickle amount per minute
-                pending_updates = []
-
-                for guild in self.bot.guilds:
-                    # Get whitelist and exclusions (Config)
-                    included_channels = set(await self.config.guild(guild).xp_included_channels())
-                    double_xp_channels = set(await self.config.guild(guild).xp_double_channels())
-                    excluded_roles = set(await self.config.guild(guild).excluded_roles())
-
-                    for channel in guild.voice_channels:
-                        # Skip if channel is not in whitelist
-                        if channel.id not in included_channels:
-                            continue
-
-                        # Calculate XP amount for this channel
-                        current_xp_amount = xp_amount
-                        if channel.id in double_xp_channels:
-                            current_xp_amount *= 2
-
-                        # Process members
-                        for member in channel.members:
-                            if member.bot:
-                                continue
-
-                            # Skip self-deafened or afk (optional, but good for anti-abuse)
-                            if member.voice.self_deaf or member.voice.deaf:
-                                continue
-
-                            # Skip excluded roles
-                            if any(role.id in excluded_roles for role in member.roles):
-                                continue
-
-                            # Add to batch
-                            pending_updates.append((member.id, guild.id, current_xp_amount))
+                pending_updates = self.voice_sessions.collect(credit=self._config_cache.get("xp_enabled", True))
 
                 # Process bulk update
                 if pending_updates:
-                    await self.db.xp.add_xp_bulk(pending_updates)
+                    try:
+                        await self.db.xp.add_xp_bulk(pending_updates)
+                    except Exception:
+                        self.voice_sessions.restore(pending_updates)
+                        raise
 
             except asyncio.CancelledError:
                 break
@@ -137,40 +139,34 @@ class XPSystem:
                 print(f"Error in voice XP loop: {e}")
                 await asyncio.sleep(60)  # Wait before retry
 
+    async def on_voice_state_update(self, member: discord.Member) -> None:
+        """Start, end or re-rate a member's voice XP session"""
+        if member.bot:
+            return
+        await self.voice_sessions.update(member)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        """Role changes can make a member in voice (in)eligible for voice XP"""
+        if after.voice is not None and before.roles != after.roles:
+            await self.voice_sessions.update(after)
+
+    async def refresh_voice_settings(self, guild: discord.Guild) -> None:
+        """Reload a guild's voice XP settings after they change"""
+        await self.voice_sessions.rebuild_guild(guild)
+
     async def _message_xp_loop(self):
-        """Background task to flush message XP buffer and clean memory"""
-        counter = 0
+        """Background task to flush message XP buffer"""
         while True:
             try:
                 await asyncio.sleep(30)  # Flush every 30 seconds
                 await self._flush_buffer()
 
-                # Cleanup cooldowns every 10 minutes (20 iterations)
-                counter += 1
-                if counter >= 20:
-                    self._cleanup_cooldowns()
-                    counter = 0
-
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 print(f"Error in message XP loop: {e}")
                 await asyncio.sleep(30)
 
-    def _cleanup_cooldowns(self):
-        """Remove stale cooldown entries to prevent memory leaks"""
-        current_time = time.time()
-        # Default cooldown 60s, checking 120s ensures we don't delete active cooldowns
-        # Using 3600 (1 hour) as a safe stale threshold
-        stale_threshold = 3600
-
-        to_remove = [
-            user_id for user_id, timestamp in self.xp_cooldowns.items() if current_time - timestamp > stale_threshold
-        ]
-
-        for user_id in to_remove:
-            del self.xp_cooldowns[user_id]
-
     async def _flush_buffer(self):
         """Flush the XP buffer to the database"""
         if not self.xp_buffer:
@@ -233,10 +229,7 @@ class XPSystem:
 
         # Check cooldown
         user_id = message.author.id
-        current_time = time.time()
-        cooldown = self._config_cache.get("xp_cooldown", 60)
-
-        if user_id in self.xp_cooldowns and current_time - self.xp_cooldowns[user_id] < cooldown:
+        if self.xp_cooldowns.active(user_id):
             return
 
         guild_id = message.guild.id
@@ -348,15 +341,14 @@ class XPSystem:
             self.xp_buffer[key] = xp_amount
 
         # Update cooldown
-        self.xp_cooldowns[user_id] = current_time
+        self.xp_cooldowns.start(user_id)
 
     async def _handle_role_rewards(self, message, level: int):
         """Handle role rewards for reaching a level"""
         try:
-            # Get role rewards for this level
-            role_rewards = await self.db.xp.get_xp_role_rewards(message.guild.id, level)
+            rewards = await self.level_rewards.get(message.guild.id)
 
-            for role_id, remove in role_rewards:
+            for role_id, remove in rewards.roles.get(level, ()):
                 role = message.guild.get_role(role_id)
                 if not role:
                     continue
@@ -377,10 +369,51 @@ class XPSystem:
             log = logging.getLogger("red.kirin_cogs.unicornia.xp")
             log.error(f"Error handling role rewards for level {level}: {e}")
 
+    async def _apply_level_rewards(self, member, old_level: int, new_level: int) -> list[str]:
+        """Grant the role and currency rewards of every level crossed; returns footer lines.
+
+        Levels are applied lowest first, so a later level can remove a role an
+        earlier one gave. ``member.roles`` is not updated by role edits, so the
+        roles held are tracked locally across levels.
+        """
+        rewards = await self.level_rewards.get(member.guild.id)
+        footer_texts = []
+        currency_gained = 0
+        held = {role.id for role in member.roles}
+
+        for level in rewards.crossed(old_level, new_level):
+            for role_id, remove in rewards.roles.get(level, ()):
+                role = member.guild.get_role(role_id)
+                if not role:
+                    continue
+
+                try:
+                    if remove and role_id in held:
+                        await member.remove_roles(role, reason=f"XP level {level} role removal")
+                        held.discard(role_id)
+                        footer_texts.append(f"Removed role: {role.name}")
+                    elif not remove and role_id not in held:
+                        await member.add_roles(role, reason=f"XP level {level} role reward")
+                        held.add(role_id)
+                        footer_texts.append(f"Gained role: {role.name}")
+                except discord.Forbidden:
+                    pass
+
+            amount = rewards.currency.get(level, 0)
+            if amount > 0:
+                await self.db.economy.add_currency(
+                    member.id, amount, "level_reward", f"level_{level}", note=f"Level {level} reward"
+                )
+                currency_gained += amount
+
+        if currency_gained > 0:
+            currency_name = await self.config.currency_name()
+            footer_texts.append(f"Gained {currency_gained} {currency_name}")
+        return footer_texts
+
     async def _handle_level_up(self, message, old_level: int, new_level: int):
         """Handle level up rewards and notifications"""
         user = message.author
-        guild = message.guild
 
         channel = message.channel
 
@@ -394,40 +427,8 @@ class XPSystem:
             description=f"Congratulations {user.mention}, you have reached level **{new_level}**!", color=embed_color
         )
 
-        # Footer text building
-        footer_texts = []
-
-        # Check for role rewards (from DB)
-
-        role_rewards = await self.db.xp.get_xp_role_rewards(guild.id, new_level)
-        for role_id, remove in role_rewards:
-            role = guild.get_role(role_id)
-            if not role:
-                continue
-
-            try:
-                if remove and role in user.roles:
-                    await user.remove_roles(role, reason=f"XP level {new_level} role removal")
-                    footer_texts.append(f"Removed role: {role.name}")
-                elif not remove and role not in user.roles:
-                    await user.add_roles(role, reason=f"XP level {new_level} role reward")
-                    footer_texts.append(f"Gained role: {role.name}")
-            except discord.Forbidden:
-                pass
-
-        # Check for currency rewards (from DB)
-        currency_rewards = await self.db.xp.get_xp_currency_rewards(guild.id)
-        currency_gained = 0
-        for level, amount in currency_rewards:
-            if level == new_level and amount > 0:
-                await self.db.economy.add_currency(
-                    user.id, amount, "level_reward", f"level_{new_level}", note=f"Level {new_level} reward"
-                )
-                currency_gained += amount
-
-        if currency_gained > 0:
-            currency_name = await self.config.currency_name()
-            footer_texts.append(f"Gained {currency_gained} {currency_name}")
+        # Role and currency rewards (from the cached reward tables)
+        footer_texts = await self._apply_level_rewards(user, old_level, new_level)
 
         if footer_texts:
             embed.set_footer(text=" • ".join(footer_texts))
@@ -513,8 +514,28 @@ class XPSystem:
         if amount <= 0:
             return False
 
+        key = (user_id, guild_id)
         try:
+            old_xp = await self.db.xp.get_user_xp(user_id, guild_id) + self.xp_buffer.get(key, 0)
             await self.db.xp.add_xp(user_id, guild_id, amount)
-            return True
         except Exception:
             return False
+
+        old_level = self.db.calculate_level_stats(old_xp).level
+        new_stats = self.db.calculate_level_stats(old_xp + amount)
+        if key in self.user_xp_cache:
+            self._set_user_cache_data(
+                user_id, guild_id, {"xp": old_xp + amount, "level": new_stats.level, "req_xp": new_stats.required_xp}
+            )
+
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(user_id) if guild else None
+        if member is not None and new_stats.level > old_level:
+            try:
+                await self._apply_level_rewards(member, old_level, new_stats.level)
+            except Exception as e:
+                import logging
+
+                log = logging.getLogger("red.kirin_cogs.unicornia.xp")
+                log.error(f"Error applying level rewards after XP award to {user_id}: {e}")
+        return True
@@ -0,0 +1,66 @@
+"""Timing-wheel cooldown tracker."""
+
+from __future__ import annotations
+
+from unicornia.systems.cooldowns import CooldownTracker
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 5000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cooldown_check_and_start() -> None:
+    clock = Clock()
+    cooldowns: CooldownTracker[int] = CooldownTracker(60, clock=clock)
+
+    assert not cooldowns.active(1)
+    assert cooldowns.try_start(1)
+    assert not cooldowns.try_start(1)
+    clock.now += 59.5
+    assert cooldowns.remaining(1) == 0.5
+    clock.now += 0.5
+    assert not cooldowns.active(1)
+    assert cooldowns.try_start(1)
+
+    # Changing the cooldown applies to running entries
+    cooldowns.cooldown = 10
+    clock.now += 10
+    assert not cooldowns.active(1)
+
+
+def test_memory_is_bounded_by_the_window() -> None:
+    clock = Clock()
+    cooldowns: CooldownTracker[int] = CooldownTracker(10, clock=clock)
+    for user_id in range(1000):
+        cooldowns.start(user_id)
+        clock.now += 0.1  # 100 seconds of steady traffic
+
+    # Only users seen in roughly the last window (plus one bucket) are still held
+    assert 100 <= len(cooldowns) <= 110
+    assert len(cooldowns._wheel) <= 12
+
+    clock.now += 3600
+    assert not cooldowns.active(999)
+    assert len(cooldowns) == 0
+    assert not cooldowns._wheel
+
+
+def test_restart_moves_a_key_to_the_newest_bucket() -> None:
+    clock = Clock()
+    cooldowns: CooldownTracker[str] = CooldownTracker(5, clock=clock)
+    cooldowns.start("a")
+    clock.now += 4
+    cooldowns.start("a")  # Restarted before expiring
+    clock.now += 4
+    assert cooldowns.active("a")  # The old bucket expiring must not drop the restarted key
+    assert "a" in cooldowns
+
+    cooldowns.discard("a")
+    assert not cooldowns.active("a")
+    cooldowns.start("b")
+    cooldowns.clear()
+    assert len(cooldowns) == 0
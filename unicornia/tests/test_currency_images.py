@@ -0,0 +1,147 @@
+"""Preloaded currency drop image catalog."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from unicornia.systems.currency_images import CurrencyImageCatalog
+from unicornia.systems.currency_systems import CurrencyGeneration
+
+
+def _write(directory: Path, name: str, size: int) -> Path:
+    path = directory / name
+    path.write_bytes(name.encode()[:1] * size)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_catalog_loads_pngs_within_budget(tmp_path: Path) -> None:
+    _write(tmp_path, "a.png", 40)
+    _write(tmp_path, "b.PNG", 40)
+    _write(tmp_path, "c.png", 40)
+    _write(tmp_path, "notes.txt", 10)
+    catalog = CurrencyImageCatalog(tmp_path, budget_bytes=100)
+    await catalog.load()
+
+    assert [image.path.name for image in catalog.images] == ["a.png", "b.PNG", "c.png"]
+    assert [image.data is not None for image in catalog.images] == [True, True, False]
+    assert catalog.cached_bytes == 80
+
+    # Images past the budget are still served, read on demand
+    file = await catalog.file(catalog.images[2])
+    assert file.filename == "currency.png"
+    assert file.fp.read() == b"c" * 40
+
+    missing = CurrencyImageCatalog(tmp_path / "missing")
+    await missing.load()
+    assert len(missing) == 0
+    assert missing.pick() is None
+    assert not await missing.reload_if_changed()
+
+
+@pytest.mark.asyncio
+async def test_catalog_reloads_only_when_files_change(tmp_path: Path) -> None:
+    first = _write(tmp_path, "a.png", 10)
+    catalog = CurrencyImageCatalog(tmp_path)
+    await catalog.load()
+    assert not await catalog.reload_if_changed()
+
+    _write(tmp_path, "b.png", 10)
+    assert await catalog.reload_if_changed()
+    assert len(catalog) == 2
+
+    first.write_bytes(b"new image")
+    os.utime(first, ns=(1, 1))
+    assert await catalog.reload_if_changed()
+    assert catalog.images[0].data == b"new image"
+
+    first.unlink()
+    assert await catalog.reload_if_changed()
+    assert [image.path.name for image in catalog.images] == ["b.png"]
+
+
+def _generation() -> CurrencyGeneration:
+    config = MagicMock()
+    for name in (
+        "currency_generation_enabled",
+        "generation_channels",
+        "generation_cooldown",
+        "generation_chance",
+        "generation_min_amount",
+        "generation_max_amount",
+        "currency_symbol",
+    ):
+        setattr(config, name, AsyncMock(return_value=None))
+    bot = MagicMock()
+    bot.get_context = AsyncMock(return_value=SimpleNamespace(valid=False))
+    return CurrencyGeneration(MagicMock(), config, bot)
+
+
+@pytest.mark.asyncio
+async def test_failed_image_load_does_not_stop_the_watch(tmp_path: Path) -> None:
+    _write(tmp_path, "coin.png", 32)
+    generation = _generation()
+    generation.images = CurrencyImageCatalog(tmp_path)
+    load = generation.images.load
+    attempts = 0
+
+    async def flaky_load() -> None:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise OSError("unreadable")
+        await load()
+
+    with (
+        patch.object(generation.images, "load", side_effect=flaky_load),
+        patch("unicornia.systems.currency_systems.WATCH_INTERVAL_SECONDS", 0),
+    ):
+        await generation.start_image_watch()
+        assert len(generation.images) == 0
+        assert generation._image_task is not None
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if generation.images:
+                break
+    await generation.stop_image_watch()
+
+    assert [image.path.name for image in generation.images.images] == ["coin.png"]
+
+
+@pytest.mark.asyncio
+async def test_drop_sends_a_preloaded_image_without_touching_the_filesystem(tmp_path: Path) -> None:
+    _write(tmp_path, "coin.png", 32)
+    generation = _generation()
+    generation.images = CurrencyImageCatalog(tmp_path)
+    await generation.images.load()
+    generation.gen_enabled = True
+    generation.gen_channels = {10}
+    generation.gen_chance = 1.0
+    generation.gen_cooldown = 10
+    generation.gen_min = generation.gen_max = 100
+    generation._create_plant = AsyncMock(return_value=1)
+    generation._update_plant_message_id = AsyncMock()
+
+    message = MagicMock()
+    message.author.bot = False
+    message.author.id = 5
+    message.channel.id = 10
+    message.channel.send = AsyncMock()
+
+    with (
+        patch.object(os, "listdir", side_effect=AssertionError("listdir on the hot path")),
+        patch.object(Path, "read_bytes", side_effect=AssertionError("disk read on the hot path")),
+        patch.object(Path, "iterdir", side_effect=AssertionError("scan on the hot path")),
+    ):
+        await generation.process_message(message)
+
+    sent = message.channel.send.await_args.kwargs["file"]
+    assert sent.filename == "currency.png"
+    assert sent.fp.read() == b"c" * 32
+    await generation.stop_image_watch()
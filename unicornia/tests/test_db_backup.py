@@ -0,0 +1,123 @@
+"""Online database snapshots: stepping, rotation, compression and verification."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import sqlite3
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from unicornia.database import DatabaseManager
+from unicornia.db.backup import SNAPSHOT_PREFIX, BackupManager
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> AsyncGenerator[DatabaseManager, None]:
+    manager = DatabaseManager(str(tmp_path / "data" / "unicornia.db"), reconcile_reserved_on_initialize=False)
+    await manager.connect()
+    await manager.initialize()
+    for user_id in range(1, 201):
+        await manager.economy.add_currency(user_id, 100, "test", "test")
+    yield manager
+    await manager.close()
+
+
+def _rows(path: Path, sql: str) -> list[tuple]:
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(sql).fetchall()
+    finally:
+        connection.close()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_consistent_while_writes_continue(db: DatabaseManager) -> None:
+    backups = BackupManager(db, step_pages=1, step_pause=0.002)
+    writes = 0
+
+    async def keep_writing() -> None:
+        nonlocal writes
+        while True:
+            await db.economy.add_currency(1000 + writes, 1, "test", "test")
+            writes += 1
+            await asyncio.sleep(0)
+
+    writer = asyncio.create_task(keep_writing())
+    try:
+        snapshot = await backups.create()
+    finally:
+        writer.cancel()
+    assert writes > 0  # The event loop kept serving database work during the copy
+
+    assert snapshot.path.parent == db.db_path.parent / "backups"
+    assert _rows(snapshot.path, "PRAGMA journal_mode") == [("delete",)]
+    assert _rows(snapshot.path, "PRAGMA integrity_check") == [("ok",)]
+    # One read snapshot: the seeded users plus a gap-free prefix of the concurrent writes
+    (count,) = _rows(snapshot.path, "SELECT COUNT(*) FROM DiscordUser")[0]
+    assert 200 <= count <= 200 + writes
+    assert _rows(snapshot.path, "SELECT COUNT(*) FROM DiscordUser WHERE UserId >= 1000") == [(count - 200,)]
+    if count > 200:
+        assert _rows(snapshot.path, "SELECT MAX(UserId) FROM DiscordUser") == [(1000 + count - 201,)]
+
+
+@pytest.mark.asyncio
+async def test_compressed_snapshots_rotate_and_verify(db: DatabaseManager) -> None:
+    backups = db.backups
+    backups.directory.mkdir(parents=True)
+    # Older snapshots left by previous runs
+    for days in (3, 2, 1):
+        stamp = datetime.now(UTC) - timedelta(days=days)
+        (backups.directory / f"{SNAPSHOT_PREFIX}{stamp:%Y%m%d-%H%M%S}.db").write_bytes(b"old")
+    (backups.directory / "notes.txt").write_text("not a snapshot")
+
+    snapshot = await backups.create(compress=True, keep=2)
+    assert snapshot.compressed
+    assert backups.snapshots()[0].path == snapshot.path
+    assert len(backups.snapshots()) == 2
+    assert (backups.directory / "notes.txt").exists()
+    with gzip.open(snapshot.path, "rb") as packed:
+        assert packed.read(16) == b"SQLite format 3\x00"
+
+    report = await backups.verify(snapshot)
+    assert report.ok
+    assert report.integrity == "ok"
+    assert report.tables["DiscordUser"] == (200, 200)
+    assert report.changed_tables == []
+
+    await db.economy.add_currency(999, 5, "test", "test")
+    report = await backups.verify(backups.find("latest"))
+    assert report.ok
+    assert "DiscordUser" in report.changed_tables
+    assert report.tables["DiscordUser"] == (200, 201)
+
+
+@pytest.mark.asyncio
+async def test_keep_zero_still_keeps_the_new_snapshot(db: DatabaseManager) -> None:
+    backups = db.backups
+    backups.directory.mkdir(parents=True)
+    stamp = datetime.now(UTC) - timedelta(days=1)
+    (backups.directory / f"{SNAPSHOT_PREFIX}{stamp:%Y%m%d-%H%M%S}.db").write_bytes(b"old")
+
+    snapshot = await backups.create(keep=0)
+    assert [existing.path for existing in backups.snapshots()] == [snapshot.path]
+    assert snapshot.size == snapshot.path.stat().st_size
+
+
+@pytest.mark.asyncio
+async def test_verify_flags_unreadable_snapshots(db: DatabaseManager) -> None:
+    stale = db.backups.snapshots()
+    assert stale == []
+    db.backups.directory.mkdir(parents=True)
+    broken = db.backups.directory / f"{SNAPSHOT_PREFIX}20240101-000000.db"
+    broken.write_bytes(b"definitely not sqlite" * 100)
+
+    report = await db.backups.verify(db.backups.find(broken.name))
+    assert not report.ok
+    assert report.integrity != "ok"
+    assert "DiscordUser" in report.missing_tables
+    assert db.backups.find("nope.db") is None
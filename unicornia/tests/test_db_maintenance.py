@@ -0,0 +1,106 @@
+"""Database maintenance scheduler: off-lock integrity checks, checkpoints and vacuum."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from unicornia.database import DatabaseManager
+from unicornia.db.maintenance import MaintenanceScheduler
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> AsyncGenerator[DatabaseManager, None]:
+    manager = DatabaseManager(str(tmp_path / "maintenance.db"), reconcile_reserved_on_initialize=False)
+    await manager.connect()
+    await manager.initialize()
+    yield manager
+    await manager.close()
+
+
+async def _fill(db: DatabaseManager, rows: int = 400) -> None:
+    async with db._get_connection() as connection:
+        await connection.execute("CREATE TABLE IF NOT EXISTS Filler (Id INTEGER PRIMARY KEY, Data BLOB)")
+        await connection.executemany("INSERT INTO Filler (Data) VALUES (?)", [(b"x" * 3000,)] * rows)
+        await connection.commit()
+
+
+@pytest.mark.asyncio
+async def test_integrity_check_does_not_take_the_connection_lock(db: DatabaseManager) -> None:
+    async with db._lock:
+        report = await asyncio.wait_for(db.maintenance.check_integrity(), timeout=5)
+    assert report.integrity_ok
+    assert {"quick_check", "full_check"} <= report.timings.keys()
+
+
+@pytest.mark.asyncio
+async def test_full_check_is_spread_over_passes(db: DatabaseManager) -> None:
+    async with db._get_connection() as connection:
+        cursor = await connection.execute(
+            "SELECT name FROM sqlite_schema WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )
+        tables = {row[0] for row in await cursor.fetchall()}
+
+    scheduler = MaintenanceScheduler(db, page_budget=1)
+    checked: list[str] = []
+    try:
+        for _ in range(len(tables)):
+            report = await scheduler.check_integrity()
+            assert report.integrity_ok
+            assert len(report.checked_tables) == 1
+            checked.extend(report.checked_tables)
+    finally:
+        await scheduler.close()
+    assert sorted(checked) == sorted(tables)
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_follow_wal_size_and_truncate_when_idle(db: DatabaseManager) -> None:
+    scheduler = MaintenanceScheduler(db, checkpoint_bytes=64 * 1024 * 1024)
+    try:
+        report = await scheduler.run()
+        assert report.wal_bytes > 0
+        assert report.checkpoint is None  # WAL below the threshold and not known to be idle
+
+        await _fill(db)
+        scheduler.checkpoint_bytes = report.wal_bytes + 1
+        report = await scheduler.run()
+        assert report.wal_bytes >= scheduler.checkpoint_bytes
+        assert report.checkpoint == "PASSIVE"
+        assert report.integrity_ok is None  # Not due again yet
+
+        report = await scheduler.run()
+        assert report.checkpoint == "TRUNCATE"
+        assert not report.checkpoint_busy
+        assert scheduler.wal_bytes() == 0
+        assert {"checkpoint", "vacuum"} <= report.timings.keys()
+    finally:
+        await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_free_pages_are_reclaimed_in_small_steps(db: DatabaseManager) -> None:
+    await _fill(db)
+    async with db._get_connection() as connection:
+        assert (await (await connection.execute("PRAGMA auto_vacuum")).fetchone())[0] == 2
+        await connection.execute("DELETE FROM Filler")
+        await connection.commit()
+        free = (await (await connection.execute("PRAGMA freelist_count")).fetchone())[0]
+    assert free > 64 * 2
+
+    report = await db.maintenance.run()
+    assert 0 < report.vacuumed_pages <= free
+    async with db._get_connection() as connection:
+        remaining = (await (await connection.execute("PRAGMA freelist_count")).fetchone())[0]
+    assert remaining == free - report.vacuumed_pages
+
+
+@pytest.mark.asyncio
+async def test_check_wal_integrity_reports_through_the_scheduler(db: DatabaseManager) -> None:
+    assert await db.check_wal_integrity()
+    assert db.maintenance.last_report is not None
+    assert db.maintenance.last_report.integrity_ok
@@ -0,0 +1,150 @@
+"""Versioned schema migrations and the load-time fingerprint skip."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import aiosqlite
+import pytest
+
+from unicornia.database import DatabaseManager
+from unicornia.db.schema import FINGERPRINT_KEY, MIGRATIONS, SCHEMA_VERSION, Migration, migrate
+from unicornia.utils import PhaseTimer
+
+
+async def _open(path: Path) -> DatabaseManager:
+    manager = DatabaseManager(str(path), reconcile_reserved_on_initialize=False)
+    await manager.connect()
+    return manager
+
+
+async def _user_version(db: aiosqlite.Connection) -> int:
+    return (await (await db.execute("PRAGMA user_version")).fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_new_database_applies_every_step_then_reloads_skip_ddl(tmp_path: Path) -> None:
+    path = tmp_path / "schema.db"
+    manager = await _open(path)
+    await manager.initialize()
+    assert manager.schema_report.applied == [m.version for m in MIGRATIONS]
+    await manager.close()
+
+    manager = await _open(path)
+    statements: list[str] = []
+    async with manager._get_connection() as db:
+        await db.set_trace_callback(statements.append)
+    await manager.initialize()
+    async with manager._get_connection() as db:
+        await db.set_trace_callback(None)
+        assert await _user_version(db) == SCHEMA_VERSION
+
+    assert manager.schema_report.skipped
+    assert manager.schema_report.applied == []
+    assert not [s for s in statements if "CREATE" in s or "table_info" in s or "ALTER" in s]
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_unversioned_database_is_upgraded_in_place(tmp_path: Path) -> None:
+    manager = await _open(tmp_path / "legacy.db")
+    async with manager._get_connection() as db:
+        await db.execute("CREATE TABLE GamblingStats (Feature TEXT PRIMARY KEY, BetAmount INTEGER)")
+        await db.execute("INSERT INTO GamblingStats VALUES ('slots', 10)")
+        await db.execute(
+            "CREATE TABLE ShopEntry (Id INTEGER PRIMARY KEY, GuildId INTEGER, `Index` INTEGER, Type INTEGER, Command TEXT)"
+        )
+        await db.execute("INSERT INTO ShopEntry VALUES (1, 5, 1, 1, '.ping')")
+        await db.commit()
+
+    await manager.initialize()
+    async with manager._get_connection() as db:
+        columns = {row[1] for row in await (await db.execute("PRAGMA table_info(GamblingStats)")).fetchall()}
+        entry = await (await db.execute("SELECT Type, Command FROM ShopEntry")).fetchone()
+        stats = await (await db.execute("SELECT BetAmount, Rounds FROM GamblingStats")).fetchone()
+    assert manager.schema_report.from_version == 0
+    assert {"Rounds", "EpochStart"} <= columns
+    assert entry == (4, None)
+    assert stats == (10, 0)
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_outside_ddl_invalidates_the_fingerprint(tmp_path: Path) -> None:
+    manager = await _open(tmp_path / "edited.db")
+    await manager.initialize()
+    async with manager._get_connection() as db:
+        await db.execute("DROP INDEX idx_shop_entry_guild")
+        await db.commit()
+
+    await manager.initialize()
+    report = manager.schema_report
+    assert not report.skipped
+    assert report.applied == [m.version for m in MIGRATIONS]
+    async with manager._get_connection() as db:
+        index = await (await db.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_shop_entry_guild'")).fetchone()
+        assert index is not None
+        assert await _user_version(db) == SCHEMA_VERSION
+
+    await manager.initialize()
+    assert manager.schema_report.skipped
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_step_rolls_back_and_is_retried(tmp_path: Path) -> None:
+    async def create_a(db: aiosqlite.Connection) -> None:
+        await db.execute("CREATE TABLE IF NOT EXISTS BotConfig (Key TEXT PRIMARY KEY, Value TEXT, Description TEXT)")
+        await db.execute("CREATE TABLE IF NOT EXISTS A (Id INTEGER)")
+
+    async def broken(db: aiosqlite.Connection) -> None:
+        await db.execute("CREATE TABLE B (Id INTEGER)")
+        raise RuntimeError("boom")
+
+    async def create_b(db: aiosqlite.Connection) -> None:
+        await db.execute("CREATE TABLE IF NOT EXISTS B (Id INTEGER)")
+
+    async with aiosqlite.connect(tmp_path / "steps.db") as db:
+        with pytest.raises(RuntimeError):
+            await migrate(db, (Migration(1, "a", create_a), Migration(2, "b", broken)))
+        tables = {row[0] for row in await (await db.execute("SELECT name FROM sqlite_master")).fetchall()}
+        assert "A" in tables and "B" not in tables
+        assert await _user_version(db) == 1
+
+        report = await migrate(db, (Migration(1, "a", create_a), Migration(2, "b", create_b)))
+        assert report.applied == [2]
+        assert await _user_version(db) == 2
+        stored = await (await db.execute("SELECT Value FROM BotConfig WHERE Key = ?", (FINGERPRINT_KEY,))).fetchone()
+        assert stored[0].startswith("2:")
+
+
+@pytest.mark.asyncio
+async def test_nadeko_import_converts_command_items(tmp_path: Path) -> None:
+    manager = await _open(tmp_path / "import.db")
+    await manager.initialize()
+    async with aiosqlite.connect(tmp_path / "nadeko.db") as nadeko:
+        await nadeko.execute(
+            """CREATE TABLE ShopEntry (Id INTEGER, GuildId INTEGER, `Index` INTEGER, Price INTEGER, Name TEXT,
+            AuthorId INTEGER, Type INTEGER, RoleName TEXT, RoleId INTEGER, RoleRequirement INTEGER, Command TEXT)"""
+        )
+        await nadeko.execute("INSERT INTO ShopEntry VALUES (1, 5, 1, 10, 'Ping', 2, 1, NULL, NULL, NULL, '.ping')")
+        await nadeko.execute("INSERT INTO ShopEntry VALUES (2, 5, 2, 10, 'Role', 2, 0, 'VIP', 3, NULL, NULL)")
+        await nadeko.commit()
+        await manager._migrate_shop(nadeko)
+
+    async with manager._get_connection() as db:
+        entries = await (await db.execute("SELECT Id, Type, Command FROM ShopEntry ORDER BY Id")).fetchall()
+    assert entries == [(1, 4, None), (2, 0, None)]
+    await manager.close()
+
+
+def test_phase_timer_accumulates_named_phases() -> None:
+    timer = PhaseTimer()
+    with timer.phase("schema"):
+        pass
+    with timer.phase("schema"):
+        pass
+    with timer.phase("market"):
+        pass
+    assert list(timer.timings) == ["schema", "market"]
+    assert "schema" in timer.summary() and timer.summary().endswith("ms)")
@@ -0,0 +1,116 @@
+"""Emoji usage scanner tests."""
+
+from __future__ import annotations
+
+import re
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from unicornia.emoji_usage import EmojiUsageScanner
+from unicornia.systems.market_system import MarketSystem
+
+
+def _listing(count: int) -> dict[str, str]:
+    """Half custom, half Unicode emoji, like a real server's listings."""
+    emoji_map = {}
+    for index in range(count):
+        if index % 2:
+            emoji_map[f"<:stock{index}:{10**17 + index}>"] = f"C{index}"
+        else:
+            emoji_map[chr(0x1F300 + index)] = f"U{index}"
+    return emoji_map
+
+
+def test_scan_counts_unicode_and_custom_tokens() -> None:
+    scanner = EmojiUsageScanner({"🚀": "ROCKET", "<:pepe:123>": "PEPE", "👨‍👩‍👧": "FAM", "👨": "MAN"})
+
+    counts = scanner.scan("🚀🚀 to the moon <:pepe:123> <a:pepe_dance:123> <:other:999> 👨‍👩‍👧 👨")
+
+    assert counts == {"ROCKET": 2, "PEPE": 2, "FAM": 1, "MAN": 1}
+    assert scanner.scan("plain text, no emoji") == {}
+
+
+def test_scan_matches_longest_first_regex() -> None:
+    """The automaton gives the same counts as the old longest-first alternation."""
+    emoji_map = {"👍": "UP", "👍🏽": "UPTONE", "❤️": "HEART", "❤️‍🔥": "FIRE", "🏽": "TONE"}
+    text = "👍🏽👍 ❤️‍🔥 ❤️ 🏽 👍🏽🏽"
+    pattern = re.compile("|".join(re.escape(e) for e in sorted(emoji_map, key=len, reverse=True)))
+    expected: dict[str, int] = {}
+    for match in pattern.findall(text):
+        expected[emoji_map[match]] = expected.get(emoji_map[match], 0) + 1
+
+    assert EmojiUsageScanner(emoji_map).scan(text) == expected
+
+
+def test_reaction_lookup() -> None:
+    scanner = EmojiUsageScanner({"🚀": "ROCKET", "<a:pepe:123>": "PEPE"})
+    assert scanner.symbol_for_reaction(None, "🚀") == "ROCKET"
+    assert scanner.symbol_for_reaction(123, "renamed") == "PEPE"
+    assert scanner.symbol_for_reaction(456, "pepe") is None
+    assert scanner.symbol_for_reaction(None, "🌙") is None
+
+
+@pytest.mark.asyncio
+async def test_market_counts_messages_and_reactions() -> None:
+    market = MarketSystem(MagicMock(), MagicMock(), MagicMock(), MagicMock())
+    market.emoji_scanner.rebuild({"🚀": "ROCKET", "<:pepe:123>": "PEPE"})
+
+    await market.process_message(SimpleNamespace(content="🚀 <:pepe:123> 🚀", author=SimpleNamespace(bot=False)))
+    await market.process_message(SimpleNamespace(content="🚀", author=SimpleNamespace(bot=True)))
+
+    def reaction(emoji_id: int | None, name: str, *, bot: bool = False, guild_id: int | None = 1) -> SimpleNamespace:
+        return SimpleNamespace(
+            guild_id=guild_id,
+            member=SimpleNamespace(bot=bot),
+            emoji=SimpleNamespace(id=emoji_id, name=name),
+        )
+
+    await market.process_reaction(reaction(123, "pepe"))  # type: ignore[arg-type]
+    await market.process_reaction(reaction(None, "🚀"))  # type: ignore[arg-type]
+    await market.process_reaction(reaction(None, "🚀", bot=True))  # type: ignore[arg-type]
+    await market.process_reaction(reaction(None, "🚀", guild_id=None))  # type: ignore[arg-type]
+
+    assert market.emoji_buffer == {"ROCKET": 3, "PEPE": 2}
+
+
+class _CountingState(dict):
+    """An automaton state that counts how often it is consulted."""
+
+    lookups = 0
+
+    def __contains__(self, key: object) -> bool:
+        _CountingState.lookups += 1
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        _CountingState.lookups += 1
+        return super().get(key, default)
+
+
+def _transitions(scanner: EmojiUsageScanner, messages: list[str]) -> int:
+    """Count automaton state lookups while scanning ``messages``."""
+    automaton = scanner._automaton
+    assert automaton is not None
+    automaton._goto = [_CountingState(state) for state in automaton._goto]
+    _CountingState.lookups = 0
+    for content in messages:
+        scanner.scan(content)
+    return _CountingState.lookups
+
+
+def test_per_message_work_is_flat_from_10_to_1000_stocks() -> None:
+    """Scanning work depends on message length, not on the number of listings."""
+    messages = [
+        "just chatting about the market today, nothing to see here",
+        "lol 🌀🌀 <:stock1:100000000000000001> that pump was wild",
+        "<a:stock3:100000000000000003> " * 3 + "🌂 and some more words after the emoji",
+        "a much longer message with 🌀 in it " * 20,
+    ]
+    small = _transitions(EmojiUsageScanner(_listing(10)), messages)
+    large = _transitions(EmojiUsageScanner(_listing(1_000)), messages)
+
+    # Aho-Corasick follows at most two links per character
+    assert 0 < large <= 2 * sum(len(content) for content in messages)
+    assert large == small
@@ -132,6 +132,7 @@ async def test_settlement_retry_does_not_duplicate_rakeback_or_stats(db: Databas
     assert await db.economy.get_rakeback_balance(USER) == 5
     assert await db.economy.get_user_bet_stats(USER) == [("slots", 100, 0, 100, 0)]
 
+    await db.economy.flush_stats()
     async with db._get_connection() as connection:
         row = await (
             await connection.execute(
@@ -0,0 +1,139 @@
+"""Buffered GamblingStats / UserBetStats / YieldPool statistics."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from unicornia.database import DatabaseManager
+from unicornia.db.stats_buffer import GamblingStatsBuffer
+
+
+async def _open(path: Path) -> DatabaseManager:
+    manager = DatabaseManager(str(path), reconcile_reserved_on_initialize=False)
+    await manager.connect()
+    await manager.initialize()
+    return manager
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> AsyncGenerator[DatabaseManager, None]:
+    manager = await _open(tmp_path / "stats.db")
+    yield manager
+    await manager.close()
+
+
+async def _stored(db: DatabaseManager) -> tuple[list[tuple], list[tuple], int]:
+    async with db._get_connection() as connection:
+        games = await (
+            await connection.execute("SELECT Feature, BetAmount, WinAmount, LossAmount, Rounds FROM GamblingStats")
+        ).fetchall()
+        users = await (await connection.execute("SELECT UserId, Game, BetAmount, MaxWin FROM UserBetStats")).fetchall()
+        balance = (await (await connection.execute("SELECT Balance FROM YieldPool WHERE Id = 1")).fetchone())[0]
+    return list(games), list(users), int(balance)
+
+
+async def _play(db: DatabaseManager, key: str, user_id: int, stake: int, payout: int) -> None:
+    await db.economy.reserve_stake(key=key, user_id=user_id, amount=stake, game="slots")
+    await db.economy.settle_stake(key=key, payout=payout, transaction_type="slots")
+
+
+@pytest.mark.asyncio
+async def test_settlements_buffer_stats_and_reads_merge_pending(db: DatabaseManager) -> None:
+    await db.economy.add_currency(1, 1000, "test", "test")
+    await _play(db, "slots:1", 1, 100, 0)
+    await _play(db, "slots:2", 1, 100, 250)
+
+    # Balances are written immediately; statistics wait for a flush
+    assert await db.economy.get_user_currency(1) == 1050
+    assert await _stored(db) == ([], [], 0)
+
+    assert await db.economy.get_user_bet_stats(1) == [("slots", 200, 250, 100, 250)]
+    (row,) = await db.economy.get_global_gambling_stats()
+    assert row[:8] == ("slots", 200, 250, 100, 2, 200, 250, 5)
+    pool = await db.economy.get_yield_pool()
+    assert pool["balance"] == pool["lifetime_house_banked"] == 100 - 5 - 150
+
+    await db.economy.flush_stats()
+    assert await _stored(db) == ([("slots", 200, 250, 100, 2)], [(1, "slots", 200, 250)], -55)
+    assert not db.economy.stats
+    assert await db.economy.get_user_bet_stats(1) == [("slots", 200, 250, 100, 250)]
+    assert (await db.economy.get_yield_pool())["balance"] == -55
+
+
+@pytest.mark.asyncio
+async def test_pool_settlements_are_buffered(db: DatabaseManager) -> None:
+    await db.economy.add_currency(1, 2000, "test", "test")
+    await db.economy.add_currency(2, 2000, "test", "test")
+    await db.economy.reserve_stakes(stakes=(("duel:a", 1, 1000), ("duel:b", 2, 1000)), game="duel")
+    await db.economy.settle_pool(
+        settlement_id="duel", stakes={"duel:a": "w", "duel:b": "l"}, winning_side="w", game="duel"
+    )
+
+    assert (await db.economy.get_yield_pool())["lifetime_pooled"] == 50
+    await db.economy.flush_stats()
+    games, users, balance = await _stored(db)
+    assert games == [("duel", 2000, 1900, 1000, 2)]
+    assert sorted(users) == [(1, "duel", 1000, 1900), (2, "duel", 1000, 0)]
+    assert balance == 50
+
+
+@pytest.mark.asyncio
+async def test_unflushed_stats_survive_a_crash(tmp_path: Path) -> None:
+    path = tmp_path / "crash.db"
+    first = await _open(path)
+    await first.economy.add_currency(1, 1000, "test", "test")
+    await _play(first, "slots:1", 1, 100, 0)
+    # Simulate a crash: close the connection without the flush close() performs
+    assert first._conn is not None
+    await first._conn.close()
+    first._conn = None
+
+    second = await _open(path)
+    try:
+        assert await _stored(second) == ([], [], 0)
+        await second.economy.flush_stats()
+        assert await _stored(second) == ([("slots", 100, 0, 100, 1)], [(1, "slots", 100, 0)], 95)
+        # Replayed deltas are folded exactly once
+        await second.economy.flush_stats()
+        assert (await _stored(second))[2] == 95
+    finally:
+        await second.close()
+
+
+@pytest.mark.asyncio
+async def test_close_and_user_deletion_flush_first(tmp_path: Path) -> None:
+    path = tmp_path / "close.db"
+    manager = await _open(path)
+    await manager.economy.add_currency(1, 1000, "test", "test")
+    await manager.economy.add_currency(2, 1000, "test", "test")
+    await _play(manager, "slots:1", 1, 100, 0)
+    await _play(manager, "slots:2", 2, 100, 0)
+
+    await manager.delete_user_data(1)
+    assert await manager.economy.get_user_bet_stats(1) == []
+    await manager.close()
+
+    reopened = await _open(path)
+    try:
+        games, users, balance = await _stored(reopened)
+        assert games == [("slots", 200, 0, 200, 2)]
+        assert users == [(2, "slots", 100, 0)]
+        assert balance == 190
+    finally:
+        await reopened.close()
+
+
+def test_buffer_json_round_trip() -> None:
+    buffer = GamblingStatsBuffer()
+    buffer.record_round("mines", 7, 50, 120, 0)
+    buffer.accrue_pool(-70, "house_banked")
+    restored = GamblingStatsBuffer.from_json(buffer.to_json())
+    assert restored.games == buffer.games
+    assert restored.users == buffer.users
+    assert restored.pool == {"balance": -70, "house_banked": -70}
+    assert not GamblingStatsBuffer.from_json("not json {")
+    assert not GamblingStatsBuffer.from_json('{"games": {"x": [1]}}')
@@ -0,0 +1,37 @@
+"""Heavy dependencies stay out of the cog's import path."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from unicornia.systems.xp_system import XPSystem
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _loaded_after_import(module: str, candidates: tuple[str, ...]) -> list[str]:
+    script = f"import sys, {module}; print(','.join(m for m in {candidates!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.strip().split(",") if name]
+
+
+def test_importing_the_cog_does_not_load_pillow() -> None:
+    assert _loaded_after_import("unicornia.unicornia", ("PIL", "unicornia.systems.card_generator")) == []
+
+
+def test_card_generator_is_built_once_on_first_use(tmp_path: Path) -> None:
+    xp = XPSystem.__new__(XPSystem)
+    xp._cog_dir = str(tmp_path)
+    xp._card_generator = None
+
+    class Generator:
+        def __init__(self, cog_dir: str) -> None:
+            self.cog_dir = cog_dir
+
+    with patch("unicornia.systems.card_generator.XPCardGenerator", Generator):
+        first = xp.card_generator
+        assert first is xp.card_generator
+    assert first.cog_dir == str(tmp_path)
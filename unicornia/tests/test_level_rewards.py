@@ -0,0 +1,115 @@
+"""Cached per-guild level reward tables."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+
+from unicornia.database import DatabaseManager
+from unicornia.systems.level_rewards import LevelRewardCache, LevelRewards
+from unicornia.systems.xp_system import XPSystem
+
+GUILD = 100
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> AsyncGenerator[DatabaseManager, None]:
+    manager = DatabaseManager(str(tmp_path / "rewards.db"), reconcile_reserved_on_initialize=False)
+    await manager.connect()
+    await manager.initialize()
+    yield manager
+    await manager.close()
+
+
+def _xp_system(db: DatabaseManager) -> XPSystem:
+    # Skip the loops and card generator; only the reward path is exercised
+    xp = XPSystem.__new__(XPSystem)
+    xp.db = db
+    xp.config = SimpleNamespace(currency_name=AsyncMock(return_value="Slut points"))
+    xp.level_rewards = LevelRewardCache(db)
+    return xp
+
+
+def _member(roles: dict[int, SimpleNamespace], held: list[SimpleNamespace]) -> MagicMock:
+    member = MagicMock()
+    member.id = 7
+    member.roles = held
+    member.guild.id = GUILD
+    member.guild.get_role = roles.get
+    member.add_roles = AsyncMock(side_effect=lambda role, reason: held.append(role))
+    member.remove_roles = AsyncMock(side_effect=lambda role, reason: held.remove(role))
+    return member
+
+
+def test_crossed_levels_are_sorted_and_half_open() -> None:
+    rewards = LevelRewards(roles={5: ((1, False),), 10: ((2, True),)}, currency={3: 50, 10: 100})
+    assert rewards.crossed(0, 10) == [3, 5, 10]
+    assert rewards.crossed(3, 9) == [5]
+    assert rewards.crossed(10, 10) == []
+
+
+@pytest.mark.asyncio
+async def test_tables_load_once_until_invalidated(db: DatabaseManager) -> None:
+    await db.xp.add_xp_role_reward(GUILD, 5, 555)
+    await db.xp.add_xp_currency_reward(GUILD, 5, 200)
+    cache = LevelRewardCache(db)
+
+    with patch.object(db.xp, "get_all_xp_role_rewards", wraps=db.xp.get_all_xp_role_rewards) as load_roles:
+        first = await cache.get(GUILD)
+        assert await cache.get(GUILD) is first
+        assert load_roles.call_count == 1
+        assert first.roles == {5: ((555, False),)}
+        assert first.currency == {5: 200}
+
+        await db.xp.remove_xp_role_reward(GUILD, 5, 555)
+        cache.invalidate(GUILD)
+        assert (await cache.get(GUILD)).roles == {}
+        assert load_roles.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_multi_level_jump_grants_every_crossed_reward(db: DatabaseManager) -> None:
+    await db.xp.add_xp_role_reward(GUILD, 2, 20)
+    await db.xp.add_xp_role_reward(GUILD, 4, 40)
+    await db.xp.add_xp_role_reward(GUILD, 4, 20, remove=True)
+    await db.xp.add_xp_currency_reward(GUILD, 3, 30)
+    await db.xp.add_xp_currency_reward(GUILD, 9, 90)
+    xp = _xp_system(db)
+    roles = {20: SimpleNamespace(name="Bronze"), 40: SimpleNamespace(name="Silver")}
+    member = _member(roles, [])
+
+    await xp.level_rewards.get(GUILD)
+    with (
+        patch.object(db.xp, "get_all_xp_role_rewards") as load_roles,
+        patch.object(db.xp, "get_xp_currency_rewards") as load_currency,
+    ):
+        footer = await xp._apply_level_rewards(member, 1, 5)
+    load_roles.assert_not_called()
+    load_currency.assert_not_called()
+
+    assert member.roles == [roles[40]]
+    assert footer == ["Gained role: Bronze", "Gained role: Silver", "Removed role: Bronze", "Gained 30 Slut points"]
+    assert await db.economy.get_user_currency(member.id) == 30
+
+
+@pytest.mark.asyncio
+async def test_later_level_removes_a_role_granted_earlier_in_the_same_jump(db: DatabaseManager) -> None:
+    await db.xp.add_xp_role_reward(GUILD, 2, 20)
+    await db.xp.add_xp_role_reward(GUILD, 4, 20, remove=True)
+    xp = _xp_system(db)
+    bronze = SimpleNamespace(id=20, name="Bronze")
+    # Like discord.py, role edits do not update the cached member.roles
+    member = _member({20: bronze}, [])
+    member.add_roles = AsyncMock()
+    member.remove_roles = AsyncMock()
+
+    footer = await xp._apply_level_rewards(member, 1, 5)
+
+    member.add_roles.assert_awaited_once_with(bronze, reason="XP level 2 role reward")
+    member.remove_roles.assert_awaited_once_with(bronze, reason="XP level 4 role removal")
+    assert footer == ["Gained role: Bronze", "Removed role: Bronze"]
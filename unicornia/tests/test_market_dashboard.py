@@ -0,0 +1,147 @@
+"""Stock dashboard fan-out tests."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+
+from unicornia.market_views import StockDashboardView, render_dashboard
+from unicornia.systems.market_system import DASHBOARD_EDIT_CONCURRENCY, MarketSystem
+
+
+class FakeMessage:
+    def __init__(self, tracker: EditTracker, message_id: int) -> None:
+        self.tracker = tracker
+        self.id = message_id
+
+    async def edit(self, **kwargs: Any) -> None:
+        await self.tracker.edit(self.id, kwargs)
+
+
+class EditTracker:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.edits: list[tuple[int, Any]] = []
+        self.in_flight = 0
+        self.peak = 0
+        self.missing: set[int] = set()
+
+    async def edit(self, message_id: int, kwargs: dict[str, Any]) -> None:
+        if message_id in self.missing:
+            raise discord.NotFound(MagicMock(status=404), "Unknown Message")
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            self.edits.append((message_id, kwargs["view"]))
+        finally:
+            self.in_flight -= 1
+
+
+def make_market(guild_count: int, tracker: EditTracker) -> tuple[MarketSystem, MagicMock]:
+    guilds = {}
+    for guild_id in range(1, guild_count + 1):
+        channel = MagicMock(spec=discord.TextChannel)
+        channel.get_partial_message = lambda message_id: FakeMessage(tracker, message_id)
+        channel.fetch_message = AsyncMock()
+        guilds[guild_id] = SimpleNamespace(
+            id=guild_id, name=f"guild-{guild_id}", get_channel=lambda _cid, channel=channel: channel
+        )
+
+    config = MagicMock()
+    config.all_guilds = AsyncMock(
+        return_value={
+            guild_id: {"market_channel": guild_id * 10, "market_message": guild_id * 100} for guild_id in guilds
+        }
+    )
+    bot = MagicMock()
+    bot.get_guild = guilds.get
+    market = MarketSystem(MagicMock(), config, bot, MagicMock())
+    market.currency_symbol = "$"
+    market.top_expensive = [{"symbol": "ABC", "emoji": "📈", "price": 110.0, "previous_price": 100.0}]
+    return market, config
+
+
+def test_render_digest_ignores_timestamp() -> None:
+    market, _config = make_market(0, EditTracker())
+    first = render_dashboard(market)
+    with patch("unicornia.market_views.discord.utils.utcnow") as utcnow:
+        utcnow.return_value.timestamp.return_value = 2_000_000_000
+        second = render_dashboard(market)
+    assert second.updated_at != first.updated_at
+    assert second.digest == first.digest
+    assert render_dashboard(market, "BULL RUN! 🐂").digest != first.digest
+
+
+@pytest.mark.asyncio
+async def test_dashboard_renders_once_and_edits_every_guild_concurrently() -> None:
+    tracker = EditTracker(delay=0.02)
+    market, config = make_market(40, tracker)
+
+    with patch("unicornia.systems.market_system.render_dashboard", wraps=render_dashboard) as render:
+        started = time.monotonic()
+        await market.update_dashboard()
+        elapsed = time.monotonic() - started
+
+    render.assert_called_once()
+    assert sorted(message_id for message_id, _view in tracker.edits) == [g * 100 for g in range(1, 41)]
+    assert tracker.peak == DASHBOARD_EDIT_CONCURRENCY
+    assert elapsed < 40 * 0.02  # well under a sequential fan-out
+    digests = {view.render.digest for _message_id, view in tracker.edits}
+    assert len(digests) == 1
+    assert all(isinstance(view, StockDashboardView) for _message_id, view in tracker.edits)
+    config.all_guilds.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_dashboards_are_skipped() -> None:
+    tracker = EditTracker()
+    market, config = make_market(3, tracker)
+
+    await market.update_dashboard()
+    await market.update_dashboard()
+    assert len(tracker.edits) == 3
+
+    market.top_expensive[0]["price"] = 120.0
+    await market.update_dashboard()
+    assert len(tracker.edits) == 6
+    config.all_guilds.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_missing_dashboard_is_forgotten() -> None:
+    tracker = EditTracker()
+    market, config = make_market(2, tracker)
+    config.guild.return_value.market_channel.clear = AsyncMock()
+    config.guild.return_value.market_message.clear = AsyncMock()
+    tracker.missing.add(200)
+
+    await market.update_dashboard()
+
+    assert [message_id for message_id, _view in tracker.edits] == [100]
+    config.guild.return_value.market_message.clear.assert_awaited_once()
+    assert 2 not in await market._get_dashboard_targets()
+
+
+@pytest.mark.asyncio
+async def test_new_dashboard_is_tracked_without_rereading_config() -> None:
+    tracker = EditTracker()
+    market, config = make_market(1, tracker)
+    config.guild.return_value.market_channel.set = AsyncMock()
+    config.guild.return_value.market_message.set = AsyncMock()
+    view = StockDashboardView(market)
+
+    await market.set_dashboard(SimpleNamespace(id=1), 10, 555, view.render.digest)  # type: ignore[arg-type]
+    await market.update_dashboard()
+    assert tracker.edits == []
+
+    market.top_expensive[0]["price"] = 90.0
+    await market.update_dashboard()
+    assert [message_id for message_id, _view in tracker.edits] == [555]
+    config.all_guilds.assert_awaited_once()
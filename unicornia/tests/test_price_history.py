@@ -0,0 +1,136 @@
+"""Stock price-history candle tests."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from itertools import pairwise
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+
+from unicornia.database import DatabaseManager
+from unicornia.stock_market import CANDLE_RETENTION, candle_start, sparkline
+from unicornia.systems.market_system import MarketSystem
+
+HOUR = 3_600
+DAY = 86_400
+# 2024-01-01 00:00 UTC, a Monday
+MONDAY = 1_704_067_200
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> AsyncGenerator[DatabaseManager, None]:
+    manager = DatabaseManager(str(tmp_path / "history.db"))
+    await manager.connect()
+    await manager.initialize()
+    await manager.stock.create_stock("ABC", "Example", "📈", 100)
+    await manager.stock.create_stock("XYZ", "Other", "📉", 50)
+    yield manager
+    await manager.close()
+
+
+async def _tick(db: DatabaseManager, at: int, prices: dict[str, tuple[float, float]]) -> None:
+    await db.stock.bulk_update_prices(
+        [(symbol, new, previous, 0.0) for symbol, (previous, new) in prices.items()],
+        completed_at=at,
+    )
+
+
+def test_candle_start_alignment() -> None:
+    assert candle_start(MONDAY + 5 * HOUR + 17, "hour") == MONDAY + 5 * HOUR
+    assert candle_start(MONDAY + DAY + 5, "day") == MONDAY + DAY
+    assert candle_start(MONDAY + 6 * DAY + 23 * HOUR, "week") == MONDAY
+    assert candle_start(MONDAY + 7 * DAY, "week") == MONDAY + 7 * DAY
+    with pytest.raises(ValueError):
+        candle_start(MONDAY, "minute")
+
+
+def test_sparkline() -> None:
+    assert sparkline([]) == ""
+    assert sparkline([1, 2, 3, 4, 5, 6, 7, 8]) == "▁▂▃▄▅▆▇█"
+    assert len(set(sparkline([5, 5, 5]))) == 1
+
+
+@pytest.mark.asyncio
+async def test_ticks_downsample_into_ohlc_tiers(db: DatabaseManager) -> None:
+    path = [100.0, 110.0, 95.0, 105.0, 120.0]
+    for hour, (previous, new) in enumerate(pairwise(path)):
+        await _tick(db, MONDAY + hour * HOUR + 1, {"ABC": (previous, new), "XYZ": (50.0, 50.0)})
+
+    hourly = await db.stock.get_candles("ABC", "hour")
+    assert [c.start for c in hourly] == [MONDAY + h * HOUR for h in range(4)]
+    assert [(c.open, c.close) for c in hourly] == [(100, 110), (110, 95), (95, 105), (105, 120)]
+
+    (daily,) = await db.stock.get_candles("abc", "day")
+    assert (daily.start, daily.open, daily.high, daily.low, daily.close, daily.ticks) == (
+        MONDAY,
+        100.0,
+        120.0,
+        95.0,
+        120.0,
+        4,
+    )
+    assert daily.change_pct == pytest.approx(20.0)
+    (weekly,) = await db.stock.get_candles("ABC", "week")
+    assert (weekly.open, weekly.high, weekly.low, weekly.close) == (100.0, 120.0, 95.0, 120.0)
+
+
+@pytest.mark.asyncio
+async def test_range_queries_and_limit(db: DatabaseManager) -> None:
+    for hour in range(10):
+        await _tick(db, MONDAY + hour * HOUR, {"ABC": (100.0 + hour, 101.0 + hour)})
+
+    window = await db.stock.get_candles("ABC", "hour", start=MONDAY + 2 * HOUR, end=MONDAY + 5 * HOUR)
+    assert [c.start for c in window] == [MONDAY + h * HOUR for h in range(2, 6)]
+
+    latest = await db.stock.get_candles("ABC", "hour", limit=3)
+    assert [c.close for c in latest] == [108.0, 109.0, 110.0]
+    assert await db.stock.get_candles("XYZ", "hour") == []
+    with pytest.raises(ValueError):
+        await db.stock.get_candles("ABC", "minute")
+
+
+@pytest.mark.asyncio
+async def test_retention_prunes_old_buckets(db: DatabaseManager) -> None:
+    hourly_retention = CANDLE_RETENTION["hour"]
+    assert hourly_retention is not None
+    await _tick(db, MONDAY, {"ABC": (100.0, 101.0)})
+    later = MONDAY + hourly_retention + DAY
+    await _tick(db, later, {"ABC": (101.0, 102.0)})
+
+    assert [c.start for c in await db.stock.get_candles("ABC", "hour")] == [candle_start(later, "hour")]
+    # Coarser tiers still cover the pruned hour
+    assert len(await db.stock.get_candles("ABC", "day")) == 2
+    assert [c.start for c in await db.stock.get_candles("ABC", "week")] == [MONDAY, MONDAY + 14 * DAY]
+
+
+@pytest.mark.asyncio
+async def test_delist_removes_history(db: DatabaseManager) -> None:
+    await _tick(db, MONDAY, {"ABC": (100.0, 101.0)})
+    await db.stock.delete_stock("ABC")
+    assert await db.stock.get_candles("ABC", "day") == []
+
+
+@pytest.mark.asyncio
+async def test_market_tick_records_history(db: DatabaseManager) -> None:
+    config = MagicMock()
+    config.currency_symbol = AsyncMock(return_value="$")
+    market = MarketSystem(db, config, MagicMock(guilds=[]), MagicMock())
+    await market.initialize()
+    market.update_dashboard = AsyncMock()  # type: ignore[method-assign]
+
+    with (
+        patch("unicornia.systems.market_system.random.random", return_value=1.0),
+        patch("unicornia.systems.market_system.random.gauss", return_value=0.0),
+        patch("unicornia.systems.market_system.time.time", return_value=MONDAY + 60),
+    ):
+        await market.market_tick()
+
+    (candle,) = await market.get_price_history("ABC", "hour")
+    assert candle.start == MONDAY
+    assert candle.open == 100.0
+    assert candle.close == pytest.approx(market.stocks_cache["ABC"]["price"])
+    with pytest.raises(ValueError):
+        await market.get_price_history("ABC", "minute")
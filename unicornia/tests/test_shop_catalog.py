@@ -0,0 +1,119 @@
+"""Cached per-guild shop catalogs."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+import pytest_asyncio
+
+from unicornia.database import DatabaseManager
+from unicornia.systems.shop_catalog import ShopCatalog
+from unicornia.systems.shop_system import ShopSystem
+
+GUILD = 100
+OTHER_GUILD = 200
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> AsyncGenerator[DatabaseManager, None]:
+    manager = DatabaseManager(str(tmp_path / "shop.db"), reconcile_reserved_on_initialize=False)
+    await manager.connect()
+    await manager.initialize()
+    yield manager
+    await manager.close()
+
+
+@pytest_asyncio.fixture
+async def shop(db: DatabaseManager) -> ShopSystem:
+    system = ShopSystem(db, MagicMock(), MagicMock())
+    await system.add_shop_item(GUILD, 20, 500, "Role", 1, db.shop.SHOP_TYPE_ROLE, "VIP", 55)
+    entry_id = await system.add_shop_item(GUILD, 10, 100, "Key", 1, db.shop.SHOP_TYPE_ITEM)
+    await db.shop.add_shop_entry_item(entry_id, "code-1")
+    await db.shop.add_shop_entry_item(entry_id, "code-2")
+    await system.add_shop_item(OTHER_GUILD, 1, 10, "Elsewhere", 1, db.shop.SHOP_TYPE_ROLE)
+    system.catalogs.clear()
+    return system
+
+
+def test_catalog_groups_rows_and_is_read_only() -> None:
+    rows = [
+        (7, 2, 50, "B", 1, 0, None, None, None, None, None, None),
+        (3, 1, 10, "A", 1, 1, None, None, None, None, 11, "x"),
+        (3, 1, 10, "A", 1, 1, None, None, None, None, 12, "y"),
+    ]
+    catalog = ShopCatalog.from_rows(rows)
+
+    assert [item["id"] for item in catalog.items] == [3, 7]
+    assert catalog.items[0]["additional_items"] == [(11, "x"), (12, "y")]
+    # Index wins over ID when both match
+    assert catalog.lookup(2)["id"] == 7
+    assert catalog.lookup(3)["id"] == 3
+    assert catalog.lookup(99) is None
+    with pytest.raises(TypeError):
+        catalog.by_id[99] = catalog.items[0]  # type: ignore[index]
+
+
+@pytest.mark.asyncio
+async def test_browsing_reads_each_guild_once(shop: ShopSystem, db: DatabaseManager) -> None:
+    with patch.object(db.shop, "get_shop_entries_with_items", wraps=db.shop.get_shop_entries_with_items) as query:
+        items, *_ = await asyncio.gather(*(shop.get_shop_items(GUILD) for _ in range(5)))
+        assert [item["name"] for item in items] == ["Key", "Role"]
+        assert (await shop.get_shop_item(GUILD, 10))["name"] == "Key"
+        assert (await shop.get_shop_item(GUILD, items[1]["id"]))["name"] == "Role"
+        assert [item["name"] for item in await shop.get_shop_items(OTHER_GUILD)] == ["Elsewhere"]
+
+    assert [call.args for call in query.await_args_list] == [(GUILD,), (OTHER_GUILD,)]
+
+
+@pytest.mark.asyncio
+async def test_write_paths_invalidate_only_their_guild(shop: ShopSystem, db: DatabaseManager) -> None:
+    await shop.get_shop_items(OTHER_GUILD)
+    key = await shop.get_shop_item(GUILD, 10)
+
+    await shop.update_shop_item(GUILD, key["id"], price=150)
+    assert (await shop.get_shop_item(GUILD, 10))["price"] == 150
+
+    await shop.add_shop_item(GUILD, 30, 5, "Cheap", 1, db.shop.SHOP_TYPE_ROLE)
+    assert [item["name"] for item in await shop.get_shop_items(GUILD)] == ["Key", "Role", "Cheap"]
+
+    await shop.delete_shop_item(GUILD, key["id"])
+    assert await shop.get_shop_item(GUILD, 10) is None
+    assert await shop.get_shop_item(GUILD, key["id"]) is None
+    assert len(await shop.get_shop_items(GUILD)) == 2
+    assert OTHER_GUILD in shop.catalogs._catalogs
+
+
+@pytest.mark.asyncio
+async def test_edit_during_load_is_not_cached(shop: ShopSystem, db: DatabaseManager) -> None:
+    load = db.shop.get_shop_entries_with_items
+
+    async def racing_load(guild_id: int) -> list[tuple]:
+        rows = await load(guild_id)
+        shop.catalogs.invalidate(guild_id)
+        return rows
+
+    with patch.object(db.shop, "get_shop_entries_with_items", side_effect=racing_load):
+        assert len(await shop.get_shop_items(GUILD)) == 2
+    assert GUILD not in shop.catalogs._catalogs
+
+
+@pytest.mark.asyncio
+async def test_purchase_pre_checks_use_the_catalog(shop: ShopSystem, db: DatabaseManager) -> None:
+    await shop.get_shop_items(GUILD)
+    role = SimpleNamespace(id=55, name="VIP")
+    user = MagicMock()
+    user.id = 9
+    user.roles = [role]
+    user.guild.get_role = {55: role}.get
+
+    with patch.object(db.shop, "get_shop_entries_with_items", side_effect=AssertionError("catalog re-read")):
+        assert await shop.purchase_item(user, GUILD, 7) == (False, "Shop item not found", {})
+        success, message, _ = await shop.purchase_item(user, GUILD, 10)
+        assert not success and message.startswith("Insufficient")
+        await db.economy.add_currency(user.id, 1000, "test")
+        assert await shop.purchase_item(user, GUILD, 20) == (False, "You already have this role", {})
@@ -106,3 +106,48 @@ async def test_backfill_is_flagged_and_not_repeated(db: DatabaseManager) -> None
     assert len(history) == 1
     assert history[0]["symbol"] == "OLD"
     assert history[0]["imported"] is True
+
+
+@pytest.mark.asyncio
+async def test_deferred_backfill_runs_in_warm_up_and_ledger_reads_wait(db: DatabaseManager) -> None:
+    async with db._get_connection() as connection:
+        await connection.execute("UPDATE BotConfig SET Value = '0' WHERE Key = 'StockLedgerBackfilled'")
+        await connection.execute(
+            """
+            INSERT INTO CurrencyTransactions (UserId, Type, Amount, Reason, DateAdded)
+            VALUES (?, 'stock_buy', -505, 'Bought 5 OLD @ 100 (Tax: 5)', datetime('now'))
+            """,
+            (USER,),
+        )
+        await connection.commit()
+    config = MagicMock()
+    config.currency_symbol = AsyncMock(return_value="$")
+    market = MarketSystem(db, config, MagicMock(guilds=[]), MagicMock())
+
+    await market.initialize(warm_up=False)
+    assert await db.stock.get_transactions(USER) == []
+
+    market.start_warm_up()
+    _holdings, history = await market.get_portfolio_data(USER)
+    assert history["OLD"][0]["imported"] is True
+
+
+@pytest.mark.asyncio
+async def test_trades_wait_for_the_deferred_backfill(db: DatabaseManager) -> None:
+    await db.stock.create_stock("ABC", "Example", "📈", 100)
+    await db.economy.add_currency(USER, 10_000, "test", "test")
+    async with db._get_connection() as connection:
+        await connection.execute("UPDATE BotConfig SET Value = '0' WHERE Key = 'StockLedgerBackfilled'")
+        await connection.commit()
+    config = MagicMock()
+    config.currency_symbol = AsyncMock(return_value="$")
+    market = MarketSystem(db, config, MagicMock(guilds=[]), MagicMock())
+    await market.initialize(warm_up=False)
+
+    market.start_warm_up()
+    bought, _ = await market.buy_stock(SimpleNamespace(id=USER), "ABC", 10)  # type: ignore[arg-type]
+
+    assert bought
+    # The trade's "Bought 10 ABC (Tax: x)" ledger note must not be imported as a second trade
+    history = await db.stock.get_transactions(USER)
+    assert [(row["symbol"], row["shares"], row["imported"]) for row in history] == [("ABC", 10, False)]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import io
 import sys
 from collections.abc import AsyncGenerator
 from pathlib import Path
@@ -120,23 +121,16 @@ async def test_check_systems_ready_requires_all_systems(cog: Unicornia) -> None:
 
 
 @pytest.mark.asyncio
-async def test_red_get_data_for_user_collects_available_sections(cog: Unicornia) -> None:
+async def test_red_get_data_for_user_returns_the_streamed_export(cog: Unicornia) -> None:
     db = MagicMock()
-    db.xp.get_all_user_xp = AsyncMock(return_value=[(123, 10), (456, 20)])
-    db.economy.get_user_currency = AsyncMock(return_value=500)
-    db.economy.get_bank_user = AsyncMock(return_value={"balance": 2000})
-    db.waifu.get_user_waifus = AsyncMock(return_value=[{"waifu_id": 1}])
-    db.economy.get_currency_transactions = AsyncMock(return_value=[{"amount": 100}])
+    archive = io.BytesIO(b"export")
+    db.exports.export_user = AsyncMock(return_value=archive)
     _mark_systems_ready(cog, db=db)
 
     data = await cog.red_get_data_for_user(user_id=42)
 
-    assert data["xp"] == [{"guild_id": 123, "xp": 10}, {"guild_id": 456, "xp": 20}]
-    assert data["currency"] == 500
-    assert data["bank"] == {"balance": 2000}
-    assert data["waifus"] == [{"waifu_id": 1}]
-    assert data["transactions"] == [{"amount": 100}]
-    db.economy.get_currency_transactions.assert_awaited_once_with(42, limit=None)
+    assert data == {"unicornia_user_42.jsonl.gz": archive}
+    db.exports.export_user.assert_awaited_once_with(42)
 
 
 @pytest.mark.asyncio
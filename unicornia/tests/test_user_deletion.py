@@ -0,0 +1,117 @@
+"""Batched user deletion and its dry run."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from unittest.mock import patch
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+
+from unicornia.database import DatabaseManager
+from unicornia.db.deletion import USER_DELETION_STEPS, DeletionStep, delete_users
+
+KEPT = 1
+DELETED = [10, 11, 12]
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> AsyncGenerator[DatabaseManager, None]:
+    manager = DatabaseManager(str(tmp_path / "delete.db"), reconcile_reserved_on_initialize=False)
+    await manager.connect()
+    await manager.initialize()
+    async with manager._get_connection() as connection:
+        for user_id in [KEPT, *DELETED]:
+            await connection.execute(
+                "INSERT INTO DiscordUser (UserId, Username, CurrencyAmount) VALUES (?, 'name', 5)", (user_id,)
+            )
+            await connection.execute("INSERT INTO UserXpStats (UserId, GuildId, Xp) VALUES (?, 1, 10)", (user_id,))
+            await connection.execute("INSERT INTO Rakeback (UserId, RakebackBalance) VALUES (?, 3)", (user_id,))
+            await connection.execute(
+                "INSERT INTO CurrencyTransactions (UserId, OtherId, Amount, Type, Reason) VALUES (?, ?, 1, 'give', 'x')",
+                (user_id, KEPT),
+            )
+        await connection.execute("INSERT INTO WaifuInfo (WaifuId, ClaimerId) VALUES (10, ?)", (KEPT,))
+        await connection.execute("INSERT INTO WaifuItem (WaifuInfoId, Name) VALUES (10, 'ring'), (10, 'rose')")
+        await connection.execute("INSERT INTO WaifuInfo (WaifuId, ClaimerId) VALUES (?, 11)", (KEPT,))
+        await connection.commit()
+    yield manager
+    await manager.close()
+
+
+async def _snapshot(db: DatabaseManager) -> dict[str, list[tuple]]:
+    async with db._get_connection() as connection:
+        return {
+            table: await (await connection.execute(f"SELECT * FROM {table} ORDER BY rowid")).fetchall()
+            for table in sorted({step.table for step in USER_DELETION_STEPS})
+        }
+
+
+@pytest.mark.asyncio
+async def test_dry_run_counts_match_the_real_run_and_change_nothing(db: DatabaseManager) -> None:
+    before = await _snapshot(db)
+    preview = await db.delete_users_data(DELETED, dry_run=True)
+    assert await _snapshot(db) == before
+
+    assert preview == {
+        "DiscordUser": 3,
+        "UserXpStats": 3,
+        "Rakeback": 3,
+        "CurrencyTransactions": 3,
+        "WaifuInfo": 2,  # 10's own row, and 11's claim on 1
+        "WaifuItem": 2,
+    }
+    assert await db.delete_users_data(DELETED) == preview
+
+
+@pytest.mark.asyncio
+async def test_batch_deletes_and_anonymizes_only_listed_users(db: DatabaseManager) -> None:
+    await db.delete_users_data([*DELETED, 999])
+
+    async with db._get_connection() as connection:
+        users = await (await connection.execute("SELECT UserId FROM DiscordUser")).fetchall()
+        xp = await (await connection.execute("SELECT UserId FROM UserXpStats")).fetchall()
+        transactions = await (
+            await connection.execute("SELECT UserId, OtherId, Reason FROM CurrencyTransactions ORDER BY Id")
+        ).fetchall()
+        waifus = await (await connection.execute("SELECT WaifuId, ClaimerId FROM WaifuInfo")).fetchall()
+        items = await (await connection.execute("SELECT COUNT(*) FROM WaifuItem")).fetchone()
+        leftover = await (await connection.execute("SELECT name FROM temp.sqlite_master")).fetchall()
+    assert users == [(KEPT,)] and xp == [(KEPT,)]
+    assert transactions == [(KEPT, KEPT, "x")] + [(0, KEPT, "[deleted user]")] * 3
+    assert waifus == [(KEPT, None)]
+    assert items == (0,)
+    assert leftover == []
+
+
+@pytest.mark.asyncio
+async def test_failed_step_rolls_back_the_whole_batch(db: DatabaseManager) -> None:
+    before = await _snapshot(db)
+    # Renumbering the deleted users onto a kept one violates the primary key
+    broken = (*USER_DELETION_STEPS[:-1], DeletionStep("DiscordUser", "UserId IN {users}", f"UserId = {KEPT}"))
+    async with db._get_connection() as connection:
+        with pytest.raises(aiosqlite.IntegrityError):
+            await delete_users(connection, DELETED, steps=broken)
+    assert await _snapshot(db) == before
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_batches(db: DatabaseManager) -> None:
+    batches: list[list[int]] = []
+    real = db.delete_users_data
+
+    async def recording(user_ids, *, dry_run=False):
+        batches.append(sorted(user_ids))
+        await asyncio.sleep(0.01)
+        return await real(user_ids, dry_run=dry_run)
+
+    with patch.object(db, "delete_users_data", side_effect=recording):
+        await asyncio.gather(*(db.delete_user_data(user_id) for user_id in [*DELETED, *DELETED]))
+
+    # The first request runs alone; everything queued behind it, including 10 again, shares one batch
+    assert batches == [[10], [10, 11, 12]]
+    async with db._get_connection() as connection:
+        assert await (await connection.execute("SELECT UserId FROM DiscordUser")).fetchall() == [(KEPT,)]
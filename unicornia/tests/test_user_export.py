@@ -0,0 +1,171 @@
+"""Streaming user data exports."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from unicornia.database import DatabaseManager
+from unicornia.db.export import EXPORT_FORMAT, USER_TABLES, UserDataExporter, _page_sql
+
+USER = 42
+OTHER = 7
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path: Path) -> AsyncGenerator[DatabaseManager, None]:
+    manager = DatabaseManager(str(tmp_path / "export.db"), reconcile_reserved_on_initialize=False)
+    await manager.connect()
+    await manager.initialize()
+    async with manager._get_connection() as connection:
+        await connection.execute(
+            "INSERT INTO Clubs (Id, Name, OwnerId) VALUES (1, 'Owned', ?), (2, 'Joined', ?)", (OTHER, OTHER)
+        )
+        await connection.execute(
+            "INSERT INTO DiscordUser (UserId, Username, ClubId, CurrencyAmount) VALUES (?, 'me', 2, 50)", (USER,)
+        )
+        await connection.execute(
+            "INSERT INTO DiscordUser (UserId, Username, CurrencyAmount) VALUES (?, 'them', 10)", (OTHER,)
+        )
+        await connection.executemany(
+            "INSERT INTO CurrencyTransactions (UserId, Amount, Type, Reason) VALUES (?, ?, 'test', ?)",
+            [(USER, amount, f"mine {amount}") for amount in range(11)] + [(OTHER, 1, "theirs")],
+        )
+        await connection.execute(
+            "INSERT INTO CurrencyTransactions (UserId, OtherId, Amount, Type, Reason) VALUES (?, ?, 5, 'give', 'gift')",
+            (OTHER, USER),
+        )
+        await connection.execute("INSERT INTO UserXpStats (UserId, GuildId, Xp) VALUES (?, 1, 300)", (USER,))
+        await connection.execute(
+            "INSERT INTO WaifuInfo (WaifuId, ClaimerId, Affinity, Price) VALUES (?, ?, 99, 100)", (OTHER, USER)
+        )
+        await connection.execute("INSERT INTO WaifuInfo (WaifuId, Affinity, Price) VALUES (98, ?, 10)", (USER,))
+        await connection.commit()
+    yield manager
+    await manager.close()
+
+
+def _read(data: bytes) -> tuple[dict, list[dict]]:
+    lines = [json.loads(line) for line in gzip.decompress(data).splitlines()]
+    return lines[0], lines[1:]
+
+
+@pytest.mark.asyncio
+async def test_export_covers_every_linked_row_in_chunks(db: DatabaseManager) -> None:
+    exporter = UserDataExporter(db, chunk_rows=4)
+    buffer = await exporter.export_user(USER)
+    header, records = _read(buffer.getvalue())
+
+    assert header["format"] == EXPORT_FORMAT and header["users"] == [USER]
+    tables = {}
+    for record in records:
+        assert record["user_id"] == USER
+        tables.setdefault(record["table"], []).append(record["row"])
+
+    # 11 own transactions over three chunks, plus the gift received
+    transactions = tables["CurrencyTransactions"]
+    assert [row["Reason"] for row in transactions[:11]] == [f"mine {amount}" for amount in range(11)]
+    # The sender's side of the gift: amount and recipient only
+    gift = transactions[11]
+    assert (gift["UserId"], gift["OtherId"], gift["Amount"], gift["Reason"], gift["Extra"]) == (
+        None,
+        USER,
+        5,
+        None,
+        None,
+    )
+    assert tables["DiscordUser"][0]["CurrencyAmount"] == 50
+    assert tables["UserXpStats"] == [{"UserId": USER, "GuildId": 1, "Xp": 300}]
+    assert [(row["Name"], row["OwnerId"]) for row in tables["Clubs"]] == [("Joined", None)]
+    # The claimed waifu's own affinity is not the user's data, nor is a third user's affinity for them
+    assert [(row["WaifuId"], row["ClaimerId"], row["Affinity"]) for row in tables["WaifuInfo"]] == [(OTHER, USER, None)]
+
+
+@pytest.mark.asyncio
+async def test_connection_is_released_between_chunks(db: DatabaseManager) -> None:
+    exporter = UserDataExporter(db, chunk_rows=2)
+    held_during_write: list[bool] = []
+
+    class Stream(io.BytesIO):
+        def write(self, data: bytes) -> int:
+            held_during_write.append(db._lock.locked())
+            return super().write(data)
+
+    fetches = 0
+    async for _table, rows in exporter.chunks(USER):
+        assert not db._lock.locked()
+        assert len(rows) <= 2
+        fetches += 1
+    assert fetches >= 6
+
+    summary = await exporter.write(Stream(), [USER])
+    assert held_during_write and not any(held_during_write)
+    assert summary.rows["CurrencyTransactions"] == 12
+
+
+@pytest.mark.asyncio
+async def test_bulk_export_to_file(db: DatabaseManager, tmp_path: Path) -> None:
+    exporter = UserDataExporter(db, tmp_path / "exports")
+    summary = await exporter.export_to_file([USER, OTHER, USER])
+
+    assert summary.users == [USER, OTHER]
+    assert summary.path is not None and summary.path.name.endswith(".jsonl.gz")
+    assert [path.name for path in (tmp_path / "exports").iterdir()] == [summary.path.name]
+    header, records = _read(summary.path.read_bytes())
+    assert header["users"] == [USER, OTHER]
+    assert len(records) == summary.total_rows
+    # The gift appears for each side of it, with the note only on the sender's
+    gifts = [
+        (r["user_id"], r["row"]["Reason"])
+        for r in records
+        if r["table"] == "CurrencyTransactions" and r["row"]["Type"] == "give"
+    ]
+    assert gifts == [(USER, None), (OTHER, "gift")]
+
+
+@pytest.mark.asyncio
+async def test_export_files_are_pruned_and_removed_with_their_users(db: DatabaseManager, tmp_path: Path) -> None:
+    directory = tmp_path / "exports"
+    exporter = db.exports = UserDataExporter(db, directory)
+    directory.mkdir()
+    expired = directory / "unicornia-users-20000101-000000.jsonl.gz"
+    expired.write_bytes(b"")
+    os.utime(expired, (0, 0))
+
+    mine = await exporter.export_to_file([USER])
+    assert not expired.exists()
+    theirs = await exporter.export_to_file([OTHER], compress=False)
+    assert theirs.path is not None and theirs.path != mine.path
+
+    # A dry run leaves the files alone
+    await db.delete_users_data([USER], dry_run=True)
+    assert mine.path is not None and mine.path.exists()
+    await db.delete_users_data([USER])
+    assert list(directory.glob("unicornia-users-*")) == [theirs.path]
+
+
+@pytest.mark.asyncio
+async def test_pages_are_served_in_index_order(db: DatabaseManager) -> None:
+    plans = {}
+    async with db._get_connection() as connection:
+        for table in USER_TABLES:
+            for where in table.passes:
+                cursor = await connection.execute(
+                    f"EXPLAIN QUERY PLAN {_page_sql(table, where)}", {"user": USER, "after": 0, "limit": 10}
+                )
+                plans[table.name, where] = " / ".join(row[3] for row in await cursor.fetchall())
+
+    assert not [key for key, plan in plans.items() if "TEMP B-TREE" in plan]
+    # Both sides of the ledger are searched by user, not walked from the first rowid
+    assert "idx_transactions_user (UserId=? AND rowid>?)" in plans["CurrencyTransactions", "UserId = :user"]
+    assert (
+        "idx_transactions_other (OtherId=? AND rowid>?)"
+        in plans["CurrencyTransactions", "OtherId = :user AND UserId != :user"]
+    )
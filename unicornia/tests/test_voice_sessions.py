@@ -0,0 +1,159 @@
+"""Event-driven voice XP sessions."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+from unicornia.systems.voice_sessions import VoiceSessionTracker
+
+GUILD = 10
+XP_CHANNEL = 100
+DOUBLE_CHANNEL = 200
+OTHER_CHANNEL = 300
+MUTED_ROLE = 7
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _config(included=(XP_CHANNEL, DOUBLE_CHANNEL), double=(DOUBLE_CHANNEL,), excluded=(MUTED_ROLE,)):
+    settings = SimpleNamespace(
+        xp_included_channels=AsyncMock(return_value=list(included)),
+        xp_double_channels=AsyncMock(return_value=list(double)),
+        excluded_roles=AsyncMock(return_value=list(excluded)),
+    )
+    return SimpleNamespace(guild=MagicMock(return_value=settings)), settings
+
+
+def _channel(channel_id: int, members: list | None = None) -> MagicMock:
+    channel = MagicMock(spec=discord.VoiceChannel)
+    channel.id = channel_id
+    channel.members = members or []
+    return channel
+
+
+def _member(user_id: int, channel=None, *, deaf=False, roles=(), bot=False) -> MagicMock:
+    member = MagicMock()
+    member.id = user_id
+    member.bot = bot
+    member.guild.id = GUILD
+    member.roles = [SimpleNamespace(id=role) for role in roles]
+    member.voice = None if channel is None else SimpleNamespace(channel=channel, self_deaf=deaf, deaf=False)
+    return member
+
+
+def _move(member: MagicMock, channel=None, *, deaf=False) -> None:
+    member.voice = None if channel is None else SimpleNamespace(channel=channel, self_deaf=deaf, deaf=False)
+
+
+@pytest.mark.asyncio
+async def test_only_eligible_members_get_sessions() -> None:
+    config, _ = _config()
+    tracker = VoiceSessionTracker(config, Clock())
+
+    await tracker.update(_member(1, _channel(XP_CHANNEL)))
+    await tracker.update(_member(2, _channel(DOUBLE_CHANNEL)))
+    await tracker.update(_member(3, _channel(OTHER_CHANNEL)))
+    await tracker.update(_member(4, _channel(XP_CHANNEL), deaf=True))
+    await tracker.update(_member(5, _channel(XP_CHANNEL), roles=(MUTED_ROLE,)))
+    await tracker.update(_member(6, _channel(XP_CHANNEL), bot=True))
+    stage = MagicMock(spec=discord.StageChannel)
+    stage.id = XP_CHANNEL
+    await tracker.update(_member(8, stage))
+
+    assert {key: session.multiplier for key, session in tracker.sessions.items()} == {(1, GUILD): 1, (2, GUILD): 2}
+
+
+@pytest.mark.asyncio
+async def test_ticks_credit_whole_minutes_and_settings_load_once() -> None:
+    config, settings = _config()
+    clock = Clock()
+    tracker = VoiceSessionTracker(config, clock)
+    alice = _member(1, _channel(XP_CHANNEL))
+    await tracker.update(alice)
+    await tracker.update(_member(2, _channel(DOUBLE_CHANNEL)))
+
+    clock.now += 59
+    assert tracker.collect() == []
+    clock.now += 62  # 121s in: two whole minutes, the spare second carries over
+    assert sorted(tracker.collect()) == [(1, GUILD, 2), (2, GUILD, 4)]
+    clock.now += 59
+    assert sorted(tracker.collect()) == [(1, GUILD, 1), (2, GUILD, 2)]
+
+    # Leaving settles the whole minutes of the session so far
+    clock.now += 150
+    _move(alice)
+    await tracker.update(alice)
+    assert (1, GUILD) not in tracker.sessions
+    clock.now += 600
+    assert sorted(tracker.collect()) == [(1, GUILD, 2), (2, GUILD, 24)]
+    assert settings.xp_included_channels.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_changes_settle_at_the_old_rate() -> None:
+    config, _ = _config()
+    clock = Clock()
+    tracker = VoiceSessionTracker(config, clock)
+    member = _member(1, _channel(XP_CHANNEL))
+    await tracker.update(member)
+
+    clock.now += 120
+    _move(member, _channel(DOUBLE_CHANNEL))
+    await tracker.update(member)
+    clock.now += 60
+    _move(member, _channel(DOUBLE_CHANNEL), deaf=True)
+    await tracker.update(member)
+    clock.now += 300
+    assert tracker.collect() == [(1, GUILD, 2 + 2)]
+    assert tracker.sessions == {}
+
+
+@pytest.mark.asyncio
+async def test_disabled_xp_and_failed_writes() -> None:
+    config, _ = _config()
+    clock = Clock()
+    tracker = VoiceSessionTracker(config, clock)
+    await tracker.update(_member(1, _channel(XP_CHANNEL)))
+
+    clock.now += 180
+    assert tracker.collect(credit=False) == []
+    clock.now += 60
+    updates = tracker.collect()
+    assert updates == [(1, GUILD, 1)]
+
+    tracker.restore(updates)
+    clock.now += 60
+    assert tracker.collect() == [(1, GUILD, 2)]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_scans_voice_channels_and_drops_stale_sessions() -> None:
+    config, settings = _config()
+    tracker = VoiceSessionTracker(config, Clock())
+    present = _member(1)
+    stale = _member(2, _channel(XP_CHANNEL))
+    await tracker.update(stale)
+
+    channel = _channel(XP_CHANNEL, [present])
+    _move(present, channel)
+    guild = SimpleNamespace(id=GUILD, voice_channels=[channel, _channel(OTHER_CHANNEL, [_member(3)])])
+    await tracker.rebuild_guild(guild)
+    assert set(tracker.sessions) == {(1, GUILD)}
+
+    # Settings are reloaded on rebuild: the channel is no longer whitelisted
+    settings.xp_included_channels.return_value = []
+    await tracker.rebuild_guild(guild)
+    assert tracker.sessions == {}
+
+    tracker.forget_guild(GUILD)
+    assert tracker.collect() == []
@@ -0,0 +1,135 @@
+"""XP card background frame cache tests."""
+
+from __future__ import annotations
+
+import io
+from unittest.mock import patch
+
+from PIL import Image, ImageFont
+
+from unicornia.systems import background_frames
+from unicornia.systems.background_frames import BackgroundFrameCache, decode_background, thin_frames
+from unicornia.systems.card_generator import XPCardGenerator
+
+CARD = (500, 245)
+
+
+def _gif(frame_count: int, duration: int = 40, size: tuple[int, int] = (120, 80)) -> bytes:
+    frames = [Image.new("RGB", size, (i * 7 % 256, i * 13 % 256, i * 29 % 256)) for i in range(frame_count)]
+    output = io.BytesIO()
+    frames[0].save(output, format="GIF", save_all=True, append_images=frames[1:], duration=duration, loop=0)
+    return output.getvalue()
+
+
+def _png(size: tuple[int, int] = (64, 64)) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", size, (10, 20, 30)).save(output, format="PNG")
+    return output.getvalue()
+
+
+def _generator() -> XPCardGenerator:
+    with patch.object(XPCardGenerator, "_create_task", side_effect=lambda coro: coro.close()):
+        return XPCardGenerator("/nonexistent")
+
+
+def _draw(generator: XPCardGenerator, background: bytes, username: str = "Rin") -> tuple[io.BytesIO, str]:
+    font = ImageFont.load_default(20)
+    fonts = {name: font for name in ("name", "level", "level_big", "label", "rank", "xp")}
+    avatar = Image.new("RGBA", (38, 38), (200, 0, 0, 255))
+    return generator._draw_card_sync(username, avatar, background, None, 5, 10, 100, 510, 3, None, fonts)  # type: ignore[arg-type]
+
+
+def test_decode_fits_frames_and_keeps_durations() -> None:
+    decoded = decode_background(_gif(6, duration=70), CARD)
+    assert decoded.is_animated
+    assert {frame.size for frame in decoded.frames} == {CARD}
+    assert {frame.mode for frame in decoded.frames} == {"RGBA"}
+    assert decoded.durations == (70,) * 6
+
+    static = decode_background(_png(), CARD)
+    assert not static.is_animated
+    assert static.frames[0].size == CARD
+
+
+def test_long_gifs_are_thinned_without_losing_time() -> None:
+    decoded = decode_background(_gif(300, duration=20), CARD, max_frames=50)
+    assert len(decoded.frames) == 50
+    assert sum(decoded.durations) == 300 * 20
+
+    frames, durations = thin_frames(list(range(10)), [10] * 10, 4)  # type: ignore[arg-type]
+    assert frames == [0, 2, 5, 7]
+    assert durations == [20, 30, 20, 30]
+
+
+def test_cache_decodes_once_and_respects_budget() -> None:
+    gif = _gif(4)
+    one_background = 4 * CARD[0] * CARD[1] * 4
+    cache = BackgroundFrameCache(budget_bytes=one_background + 1)
+
+    with patch.object(background_frames, "decode_background", wraps=decode_background) as decode:
+        first = cache.get(gif, CARD)
+        assert cache.get(gif, CARD) is first
+        assert decode.call_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        cache.get(_gif(4, duration=50), CARD)  # a second background evicts the first
+        assert len(cache) == 1
+        assert cache.used_bytes == one_background
+        cache.get(gif, CARD)
+        assert decode.call_count == 3
+
+    # Backgrounds bigger than the whole budget are decoded but never cached
+    tiny = BackgroundFrameCache(budget_bytes=1)
+    tiny.get(gif, CARD)
+    assert len(tiny) == 0 and tiny.used_bytes == 0
+
+
+def test_cards_reuse_decoded_frames_and_only_composite_the_overlay() -> None:
+    generator = _generator()
+    gif = _gif(8, duration=60)
+
+    with patch.object(background_frames, "decode_background", wraps=decode_background) as decode:
+        first, ext = _draw(generator, gif, "Rin")
+        second, _ext = _draw(generator, gif, "Someone else")
+    assert decode.call_count == 1
+    assert ext == "webp"
+
+    card = Image.open(first)
+    assert card.n_frames == 8
+    assert card.size == CARD
+    card.seek(3)
+    card.load()
+    assert card.info["duration"] == 60
+    assert first.getvalue() != second.getvalue()
+
+    static, ext = _draw(generator, _png())
+    assert ext == "png"
+    assert Image.open(static).size == CARD
+
+
+def test_output_cap_drops_frames() -> None:
+    generator = _generator()
+    gif = _gif(40)
+    uncapped = Image.open(_draw(generator, gif)[0])
+    assert uncapped.n_frames == 40
+
+    generator.max_animated_bytes = len(_draw(generator, gif)[0].getvalue()) // 3
+    capped, ext = _draw(generator, gif)
+    assert ext == "webp"
+    assert len(capped.getvalue()) <= generator.max_animated_bytes
+    assert 2 <= Image.open(capped).n_frames < 20
+
+
+def test_card_options_from_xp_config() -> None:
+    generator = _generator()
+    generator.xp_config = {"card": {"max_frames": 24, "max_output_kb": 2048, "frame_cache_mb": 16}}
+    generator._apply_card_options()
+
+    assert generator.max_animated_frames == 24
+    assert generator.max_animated_bytes == 2048 * 1024
+    assert generator.background_frames.budget_bytes == 16 * 1024 * 1024
+    assert Image.open(_draw(generator, _gif(60))[0]).n_frames == 24
+
+    generator.xp_config = {"card": {"max_frames": "lots"}}
+    generator._apply_card_options()
+    assert generator.max_animated_frames == 24
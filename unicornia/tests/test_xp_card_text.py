@@ -0,0 +1,154 @@
+"""XP card glyph coverage and fallback text segmentation tests."""
+
+from __future__ import annotations
+
+import os
+import struct
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from unicornia.systems.card_generator import XPCardGenerator
+from unicornia.systems.font_coverage import GlyphCoverage, load_coverage, parse_cmap
+
+DEJAVU = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+def _format4(segments: list[tuple[int, int, int, list[int] | None]]) -> bytes:
+    """segments: (start, end, delta, glyph ids or None for delta mapping); terminator added."""
+    segments = [*segments, (0xFFFF, 0xFFFF, 1, None)]
+    count = len(segments)
+    glyph_arrays = [ids or [] for _s, _e, _d, ids in segments]
+    range_offsets = []
+    extra = 0
+    for index, (_s, _e, _d, ids) in enumerate(segments):
+        if ids is None:
+            range_offsets.append(0)
+        else:
+            # Offset from this idRangeOffset slot to its glyph ids
+            range_offsets.append((count - index) * 2 + extra)
+            extra += len(ids) * 2
+    body = struct.pack(f">{count}H", *(e for _s, e, _d, _i in segments)) + b"\0\0"
+    body += struct.pack(f">{count}H", *(s for s, _e, _d, _i in segments))
+    body += struct.pack(f">{count}h", *(d for _s, _e, d, _i in segments))
+    body += struct.pack(f">{count}H", *range_offsets)
+    for ids in glyph_arrays:
+        body += struct.pack(f">{len(ids)}H", *ids)
+    header = struct.pack(">HHHHHHH", 4, 14 + len(body), 0, count * 2, 0, 0, 0)
+    return header + body
+
+
+def _format12(groups: list[tuple[int, int, int]]) -> bytes:
+    body = b"".join(struct.pack(">LLL", *group) for group in groups)
+    return struct.pack(">HHLLL", 12, 0, 16 + len(body), 0, len(groups)) + body
+
+
+def _font(subtables: list[tuple[int, int, bytes]]) -> bytes:
+    """A minimal sfnt holding only a cmap table."""
+    cmap = struct.pack(">HH", 0, len(subtables))
+    offset = 4 + 8 * len(subtables)
+    payload = b""
+    for platform, encoding, table in subtables:
+        cmap += struct.pack(">HHL", platform, encoding, offset + len(payload))
+        payload += table
+    cmap += payload
+    header = struct.pack(">LHHHH", 0x00010000, 1, 16, 0, 0)
+    record = struct.pack(">4sLLL", b"cmap", 0, 12 + 16, len(cmap))
+    return header + record + cmap
+
+
+def test_parse_cmap_formats() -> None:
+    table4 = _format4([(0x41, 0x43, -0x40, None), (0xE5, 0xE7, 0, [5, 0, 6])])
+    # A group starting at glyph 0 leaves its first code unmapped
+    table12 = _format12([(0x1F600, 0x1F602, 10), (0x4E2C, 0x4E2E, 0)])
+    coverage = parse_cmap(_font([(3, 1, table4), (3, 10, table12), (1, 0, b"\0\4junk")]))
+    assert coverage is not None
+
+    assert [c in coverage for c in (0x40, 0x41, 0x43, 0x44)] == [False, True, True, False]
+    assert [c in coverage for c in (0xE5, 0xE6, 0xE7)] == [True, False, True]
+    assert [c in coverage for c in (0x1F600, 0x1F602, 0x1F603)] == [True, True, False]
+    assert [c in coverage for c in (0x4E2C, 0x4E2D, 0x4E2E)] == [False, True, True]
+    assert 0xFFFF not in coverage
+    assert len(coverage) == 3 + 2 + 3 + 2
+
+
+def test_delta_segment_skips_code_mapping_to_notdef() -> None:
+    coverage = parse_cmap(_font([(0, 3, _format4([(0x10, 0x14, -0x12, None)]))]))
+    assert coverage is not None
+    assert [c in coverage for c in range(0x10, 0x15)] == [True, True, False, True, True]
+
+
+def test_unreadable_fonts_have_no_coverage(tmp_path: Path) -> None:
+    broken = tmp_path / "broken.ttf"
+    broken.write_bytes(b"\0\1\0\0\0")
+    assert load_coverage(str(broken)) is None
+    assert load_coverage(str(tmp_path / "missing.ttf")) is None
+    assert GlyphCoverage([(1, 3), (2, 6), (10, 10)]).covers("\x05")
+
+
+@pytest.mark.skipif(not os.path.exists(DEJAVU), reason="DejaVu Sans not installed")
+def test_real_font_coverage() -> None:
+    coverage = load_coverage(DEJAVU)
+    assert coverage is not None
+    assert all(coverage.covers(c) for c in "Az åé ß Ω")
+    assert not coverage.covers("中")
+    assert not coverage.covers("\U0001d409")  # Bold math J: why NotoSansMath is bundled
+
+
+class FakeFont:
+    def __init__(self, path: str, size: int, chars: str) -> None:
+        self.path = path
+        self.size = size
+        self.chars = chars
+
+    def getlength(self, text: str) -> float:
+        return 10.0 * len(text)
+
+
+def _generator(fonts: list[FakeFont]) -> XPCardGenerator:
+    with patch.object(XPCardGenerator, "_create_task", side_effect=lambda coro: coro.close()):
+        generator = XPCardGenerator("/nonexistent")
+    for font in fonts:
+        generator._glyph_coverage[font.path] = GlyphCoverage((ord(c), ord(c)) for c in font.chars)
+    return generator
+
+
+def test_segmentation_uses_fallbacks_and_is_cached() -> None:
+    primary = FakeFont("primary.ttf", 25, "abc ")
+    emoji = FakeFont("emoji.ttf", 25, "😀")
+    cjk = FakeFont("cjk.ttf", 25, "中文 ")
+    generator = _generator([primary, emoji, cjk])
+
+    with patch.object(generator, "_has_glyph", wraps=generator._has_glyph) as probe:
+        runs = generator._segment_text("ab 😀中文 c✗", primary, [emoji, cjk])  # type: ignore[arg-type]
+        probes = probe.call_count
+        assert generator._segment_text("ab 😀中文 c✗", primary, [emoji, cjk]) is runs  # type: ignore[arg-type]
+        assert probe.call_count == probes
+
+    assert [(text, font.path, width) for text, font, width in runs] == [
+        ("ab ", "primary.ttf", 30.0),
+        ("😀", "emoji.ttf", 10.0),
+        ("中文 ", "cjk.ttf", 30.0),
+        ("c", "primary.ttf", 10.0),
+        ("✗", "primary.ttf", 10.0),  # No font has it: drawn with the primary font
+    ]
+
+    # The same text at another size is segmented separately
+    small = FakeFont("primary.ttf", 20, "abc ")
+    assert generator._segment_text("ab 😀中文 c✗", small, [emoji, cjk]) is not runs  # type: ignore[arg-type]
+
+
+@pytest.mark.skipif(not os.path.exists(DEJAVU), reason="DejaVu Sans not installed")
+def test_draw_text_with_fallback_reads_each_cmap_once() -> None:
+    generator = _generator([])
+    font = ImageFont.truetype(DEJAVU, 25)
+    image = Image.new("RGBA", (300, 60))
+    draw = ImageDraw.Draw(image)
+
+    with patch("unicornia.systems.card_generator.load_coverage", wraps=load_coverage) as loader:
+        for _ in range(3):
+            generator._draw_text_with_fallback(draw, (5, 5), "Zoë ☃ 中", font, [font], (255, 255, 255, 255))
+    loader.assert_called_once()
+    assert image.getbbox() is not None
@@ -7,8 +7,10 @@ Includes XP gain, currency transactions, gambling, banking, shop, and more.
 
 import asyncio
 import contextlib
+import io
 import logging
 import os
+import time
 from datetime import datetime
 from typing import Any, Literal
 
@@ -29,6 +31,8 @@ from .commands import (
 )
 from .database import DatabaseManager
 from .db.economy import OperationDirection, OperationOutcome
+from .db.maintenance import MAINTENANCE_INTERVAL_SECONDS
+from .db.stats_buffer import FLUSH_INTERVAL_SECONDS as STATS_FLUSH_INTERVAL
 from .errors import SystemNotReadyError, UnicorniaError
 from .market_views import StockDashboardView
 from .systems import (
@@ -44,6 +48,7 @@ from .systems import (
     XPSystem,
     YieldSystem,
 )
+from .utils import PhaseTimer
 
 log = logging.getLogger("red.kirin_cogs.unicornia")
 
@@ -111,6 +116,11 @@ class Unicornia(
             "gambling_max_bet": 1000000,
             "reservation_recovery_seconds": 300,
             "dividend_period_hours": 168,
+            # Database snapshots
+            "backup_interval_hours": 24,  # 0 to disable
+            "backup_keep": 7,
+            "backup_compress": True,
+            "backup_last_run": 0,  # Timestamp of last scheduled snapshot
             # Migration
             "nadeko_db_path": None,
         }
@@ -137,16 +147,21 @@ class Unicornia(
         self.currency_decay = None  # type: ignore[assignment]
         self.nitro_system = None  # type: ignore[assignment]
         self.market_system = None  # type: ignore[assignment]
+        self.shop_system = None  # type: ignore[assignment]
         self.yield_system = None  # type: ignore[assignment]
         self.wal_task = None
         self.market_task = None
         self.yield_task = None
+        self.stats_task = None
+        self.backup_task = None
+        self.warm_up_task = None
         self.reservation_recovery_task = None
         self._whitelist_cache: dict[int, tuple[dict[str, list[int]], dict[str, list[int]]]] = {}
 
     async def cog_load(self):
         """Called when the cog is loaded - proper async initialization"""
         self._whitelist_cache.clear()
+        timer = PhaseTimer()
         try:
             # Initialize database first
             cog_dir = os.path.dirname(os.path.abspath(__file__))
@@ -159,8 +174,13 @@ class Unicornia(
                 nadeko_db_path,
                 reconcile_reserved_on_initialize=False,
             )
-            await self.db.connect()  # Establish persistent connection
-            await self.db.initialize()
+            with timer.phase("connect"):
+                await self.db.connect()  # Establish persistent connection
+            with timer.phase("schema"):
+                await self.db.initialize()
+            with timer.phase("stats flush"):
+                # Fold gambling statistics a previous run journaled but never flushed
+                await self.db.economy.flush_stats()
 
             # Initialize all systems
             self.xp_system = XPSystem(self.db, self.config, self.bot)
@@ -174,7 +194,8 @@ class Unicornia(
             self.nitro_system = NitroSystem(self.config, self.bot, self.economy_system)
             self.market_system = MarketSystem(self.db, self.config, self.bot, self.economy_system)
             self.yield_system = YieldSystem(self.db, self.config)
-            await self.market_system.initialize()
+            with timer.phase("market"):
+                await self.market_system.initialize(timer, warm_up=False)
 
             raw_recovery_age = await self.config.reservation_recovery_seconds()
             try:
@@ -186,7 +207,8 @@ class Unicornia(
                     raw_recovery_age,
                     recovery_age,
                 )
-            recovered_count, recovered_total = await self.db.economy.refund_stale_reservations(recovery_age)
+            with timer.phase("reservation sweep"):
+                recovered_count, recovered_total = await self.db.economy.refund_stale_reservations(recovery_age)
             log.info(
                 "Orphan reservation startup sweep: %s reservation(s), %s currency refunded",
                 recovered_count,
@@ -206,13 +228,20 @@ class Unicornia(
 
             # Start background tasks
             await self.currency_decay.start_decay_loop()
+            await self.currency_generation.start_image_watch()
 
             # Start WAL maintenance task
             self.wal_task = asyncio.create_task(self._wal_maintenance_loop())
             self.market_task = asyncio.create_task(self.market_loop())
             self.yield_task = asyncio.create_task(self.yield_loop())
-
-            log.info("Unicornia: All systems initialized successfully")
+            self.stats_task = asyncio.create_task(self._stats_flush_loop())
+            self.backup_task = asyncio.create_task(self._backup_loop())
+            # Ledger backfill, dashboard stats and Pillow load after the cog is usable
+            self.warm_up_task = asyncio.create_task(self._warm_up())
+
+            log.info(f"Unicornia: All systems initialized in {timer.summary()}")
+            if self.db.schema_report and self.db.schema_report.skipped:
+                log.debug(f"Database schema v{self.db.schema_report.to_version} fingerprint matched; DDL skipped")
         except Exception as e:
             log.error(f"Unicornia: Failed to initialize: {e}")
             raise
@@ -235,6 +264,21 @@ class Unicornia(
                 with contextlib.suppress(asyncio.CancelledError):
                     await self.yield_task
 
+            if self.stats_task:
+                self.stats_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self.stats_task
+
+            if self.backup_task:
+                self.backup_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self.backup_task
+
+            if self.warm_up_task:
+                self.warm_up_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self.warm_up_task
+
             if self.reservation_recovery_task:
                 self.reservation_recovery_task.cancel()
                 with contextlib.suppress(asyncio.CancelledError):
@@ -243,49 +287,25 @@ class Unicornia(
             if self.currency_decay:
                 await self.currency_decay.stop_decay_loop()
 
+            if self.currency_generation:
+                await self.currency_generation.stop_image_watch()
+
             if self.db:
-                await self.db.close()  # Close persistent connection
+                await self.db.close()  # Flushes pending gambling statistics, then closes the connection
 
             log.info("Unicornia: Cog unloaded successfully")
         except Exception as e:
             log.error(f"Unicornia: Error during unload: {e}")
 
-    async def red_get_data_for_user(self, *, user_id: int):
-        """Get user data for data export/deletion (Red bot requirement)"""
+    async def red_get_data_for_user(self, *, user_id: int) -> dict[str, io.BytesIO]:
+        """Get user data for data export (Red bot requirement)"""
         # See: https://docs.discord-red.com/en/stable/framework_commands.html
         try:
             if not self._check_systems_ready():
                 return {}
 
-            # Get user's data from all systems
-            data = {}
-
-            # XP data
-            xp_data = await self.db.xp.get_all_user_xp(user_id)
-            if xp_data:
-                data["xp"] = [{"guild_id": gid, "xp": xp} for gid, xp in xp_data]
-
-            # Currency data
-            currency = await self.db.economy.get_user_currency(user_id)
-            if currency > 0:
-                data["currency"] = currency
-
-            # Bank data
-            bank_data = await self.db.economy.get_bank_user(user_id)
-            if bank_data:
-                data["bank"] = bank_data
-
-            # Waifu data
-            waifus = await self.db.waifu.get_user_waifus(user_id)
-            if waifus:
-                data["waifus"] = waifus
-
-            # Transaction history
-            transactions = await self.db.economy.get_currency_transactions(user_id, limit=None)
-            if transactions:
-                data["transactions"] = transactions
-
-            return data
+            # Every user-linked table, streamed in chunks as gzip-compressed JSON lines
+            return {f"unicornia_user_{user_id}.jsonl.gz": await self.db.exports.export_user(user_id)}
 
         except Exception as e:
             log.error(f"Error getting user data for {user_id}: {e}")
@@ -305,6 +325,9 @@ class Unicornia(
 
             # Delete user data from all systems
             await self.db.delete_user_data(user_id)
+            # Shop entries the user authored were reassigned
+            if self.shop_system:
+                self.shop_system.catalogs.clear()
 
             log.info(f"Deleted data for user {user_id} (requested by {requester})")
 
@@ -584,13 +607,59 @@ class Unicornia(
                 log.error("Error in dividend loop: %s", e)
                 await asyncio.sleep(60)
 
+    async def _stats_flush_loop(self):
+        """Fold buffered gambling statistics into their tables on a fixed interval"""
+        while True:
+            try:
+                await asyncio.sleep(STATS_FLUSH_INTERVAL)
+                if self.db:
+                    await self.db.economy.flush_stats()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                # Pending deltas are kept and retried on the next pass
+                log.error(f"Gambling stats flush error: {e}")
+
+    async def _warm_up(self):
+        """Load what the first commands do not need, right after cog_load"""
+        timer = PhaseTimer()
+        try:
+            with timer.phase("market"):
+                await self.market_system.start_warm_up(timer)
+            with timer.phase("xp cards"):
+                await self.xp_system.warm_up()
+            log.info(f"Unicornia: warm-up finished in {timer.summary()}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error(f"Unicornia: warm-up failed: {e}")
+
+    async def _backup_loop(self):
+        """Take scheduled database snapshots and rotate old ones"""
+        while True:
+            try:
+                await asyncio.sleep(600)  # Check every 10 minutes
+                interval_hours = await self.config.backup_interval_hours()
+                if not self.db or interval_hours <= 0:
+                    continue
+                if time.time() - await self.config.backup_last_run() < interval_hours * 3600:
+                    continue
+                await self.db.backups.create(
+                    compress=await self.config.backup_compress(), keep=await self.config.backup_keep()
+                )
+                await self.config.backup_last_run.set(time.time())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                log.error(f"Database backup error: {e}")
+
     async def _wal_maintenance_loop(self):
-        """Periodic WAL maintenance to prevent corruption and optimize performance"""
+        """Periodic integrity checks, WAL checkpoints and incremental vacuum"""
         while True:
             try:
-                await asyncio.sleep(3600)  # Run every hour
+                await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
                 if self.db:
-                    await self.db.check_wal_integrity()
+                    await self.db.maintenance.run()
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -635,3 +704,30 @@ class Unicornia(
 
         # Process market tracking
         await self.market_system.process_message(message)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        """Track voice XP sessions"""
+        if not self._check_systems_ready():
+            return
+        await self.xp_system.on_voice_state_update(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        """Re-check voice XP eligibility when roles change"""
+        if not self._check_systems_ready():
+            return
+        await self.xp_system.on_member_update(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        """Close voice XP sessions in a guild the bot left"""
+        if self.xp_system:
+            self.xp_system.voice_sessions.forget_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        """Count reactions toward stock emoji usage"""
+        if not self._check_systems_ready():
+            return
+        await self.market_system.process_reaction(payload)
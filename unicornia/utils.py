@@ -1,3 +1,32 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """Wall-clock seconds per named phase, for logging where a slow load went."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        phases = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.timings.items())
+        return f"{self.total * 1000:.1f}ms ({phases})"
+
+
 def validate_url(url: str) -> bool:
     """Validate if a string is a valid HTTP/HTTPS URL"""
     return url.startswith(("http://", "https://")) and len(url) < 2000
@@ -1,9 +1,22 @@
+import asyncio
 import re
+import time
+from collections import OrderedDict
 
 import aiohttp
 import discord
 from redbot.core import Config, commands
 
+# Simple URL regex - find potential URLs
+URL_PATTERN = re.compile(r"https?://\S+")
+
+# Deadline for HEAD checks; every unknown URL in a message is checked at once
+HEAD_TIMEOUT = 3.0
+# How long URL verdicts are remembered (failed checks are retried sooner)
+VERDICT_TTL = 3600.0
+FAILED_VERDICT_TTL = 60.0
+VERDICT_CACHE_SIZE = 2048
+
 
 class ImageFilter(commands.Cog):
     """
@@ -35,21 +48,101 @@ class ImageFilter(commands.Cog):
         # Compile patterns for better performance
         self.compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.image_patterns]
 
+        self._session: aiohttp.ClientSession | None = None
+        # url -> (is_image, expires_at), least recently used first
+        self._verdicts: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+        # guild id -> target channel id, filled from Config on first use
+        self._target_channels: dict[int, int | None] = {}
+
+    async def cog_unload(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=HEAD_TIMEOUT))
+        return self._session
+
+    def _matches_pattern(self, url: str) -> bool:
+        return any(pattern.search(url) for pattern in self.compiled_patterns)
+
+    def _cached_verdict(self, url: str) -> bool | None:
+        entry = self._verdicts.get(url)
+        if entry is None:
+            return None
+        verdict, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._verdicts[url]
+            return None
+        self._verdicts.move_to_end(url)
+        return verdict
+
+    def _remember(self, url: str, verdict: bool, ttl: float) -> None:
+        self._verdicts[url] = (verdict, time.monotonic() + ttl)
+        self._verdicts.move_to_end(url)
+        while len(self._verdicts) > VERDICT_CACHE_SIZE:
+            self._verdicts.popitem(last=False)
+
     async def is_image_url(self, url):
         """Check if a URL points to an image based on headers or patterns."""
         # First check against known patterns
-        for pattern in self.compiled_patterns:
-            if pattern.search(url):
-                return True
+        if self._matches_pattern(url):
+            return True
+
+        cached = self._cached_verdict(url)
+        if cached is not None:
+            return cached
 
         # If not matched by pattern, try content-type check
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.head(url, allow_redirects=True, timeout=5) as response:
-                    content_type = response.headers.get("content-type", "")
-                    return content_type.startswith("image/")
+            async with self._get_session().head(url, allow_redirects=True, timeout=HEAD_TIMEOUT) as response:
+                content_type = response.headers.get("content-type", "")
+                verdict = content_type.startswith("image/")
         except Exception:
-            return False  # If request fails, don't treat as image
+            # If request fails, don't treat as image, but check again soon
+            self._remember(url, False, FAILED_VERDICT_TTL)
+            return False
+        self._remember(url, verdict, VERDICT_TTL)
+        return verdict
+
+    async def contains_image(self, urls: list[str]) -> bool:
+        """Return True if any URL is a non-Tenor image, checking unknown URLs concurrently."""
+        to_check = []
+        for url in dict.fromkeys(urls):
+            # Skip tenor links
+            if "tenor.com" in url:
+                continue
+            # Check against patterns first for efficiency
+            if self._matches_pattern(url):
+                return True
+            # If not matched by pattern but could still be an image, check headers
+            if "." in url.split("/")[-1]:
+                cached = self._cached_verdict(url)
+                if cached:
+                    return True
+                if cached is None:
+                    to_check.append(url)
+
+        if not to_check:
+            return False
+
+        checks = [asyncio.create_task(self.is_image_url(url)) for url in to_check]
+        try:
+            for check in asyncio.as_completed(checks, timeout=HEAD_TIMEOUT + 1):
+                if await check:
+                    return True
+        except TimeoutError:
+            pass
+        finally:
+            for check in checks:
+                check.cancel()
+        return False
+
+    async def _get_target_channel_id(self, guild: discord.Guild) -> int | None:
+        if guild.id not in self._target_channels:
+            self._target_channels[guild.id] = await self.config.guild(guild).target_channel_id()
+        return self._target_channels[guild.id]
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -62,15 +155,12 @@ class ImageFilter(commands.Cog):
         if not message.guild:
             return
 
-        target_channel_id = await self.config.guild(message.guild).target_channel_id()
+        target_channel_id = await self._get_target_channel_id(message.guild)
         if message.channel.id != target_channel_id:
             return
 
         # Get all URLs from the message
-        content = message.content
-        # Simple URL regex - find potential URLs
-        url_pattern = re.compile(r"https?://\S+")
-        urls = url_pattern.findall(content)
+        urls = URL_PATTERN.findall(message.content)
 
         # Also check message attachments
         attachment_urls = [attachment.url for attachment in message.attachments]
@@ -80,41 +170,19 @@ class ImageFilter(commands.Cog):
         if not all_urls:
             return
 
-        # Check each URL
-        for url in all_urls:
-            # Skip tenor links
-            if "tenor.com" in url:
-                continue
-
-            # Check if it's an image URL
-            is_image = False
-
-            # Check against patterns first for efficiency
-            for pattern in self.compiled_patterns:
-                if pattern.search(url):
-                    is_image = True
-                    break
-
-            # If not matched by pattern but could still be an image, check headers
-            if not is_image and "." in url.split("/")[-1]:
-                is_image = await self.is_image_url(url)
-
-            # If it's an image and not from tenor.com, delete the message
-            if is_image:
-                try:
-                    await message.delete()
-                    await message.channel.send(
-                        f"{message.author.mention}, only Tenor GIFs are allowed in this channel. "
-                        "Your message has been removed.",
-                        delete_after=10,
-                    )
-                except discord.Forbidden:
-                    pass  # Bot doesn't have permission to delete
-                except Exception as e:
-                    print(f"Error deleting message: {e}")
-
-                # No need to check other URLs in this message since it's deleted
-                break
+        # If any URL is an image and not from tenor.com, delete the message
+        if await self.contains_image(all_urls):
+            try:
+                await message.delete()
+                await message.channel.send(
+                    f"{message.author.mention}, only Tenor GIFs are allowed in this channel. "
+                    "Your message has been removed.",
+                    delete_after=10,
+                )
+            except discord.Forbidden:
+                pass  # Bot doesn't have permission to delete
+            except Exception as e:
+                print(f"Error deleting message: {e}")
 
     @commands.group()  # type: ignore[arg-type]
     @commands.admin_or_permissions(administrator=True)
@@ -153,4 +221,5 @@ class ImageFilter(commands.Cog):
         channel = channel or ctx.channel
 
         await self.config.guild(ctx.guild).target_channel_id.set(channel.id)
+        self._target_channels[ctx.guild.id] = channel.id
         await ctx.send(f"Image filter will now monitor {channel.mention}.")
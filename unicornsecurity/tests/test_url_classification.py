@@ -0,0 +1,102 @@
+"""Tests for pooled, cached and concurrent URL classification."""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from unittest.mock import MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from unicornsecurity import imagefilter
+from unicornsecurity.imagefilter import ImageFilter
+
+
+@pytest_asyncio.fixture
+async def server() -> AsyncGenerator[tuple[TestServer, list[str]], None]:
+    hits: list[str] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        hits.append(request.path)
+        await asyncio.sleep(0.2)
+        if request.path.startswith("/slow"):
+            await asyncio.sleep(10)
+        content_type = "image/png" if request.path.startswith("/img") else "text/html"
+        return web.Response(headers={"Content-Type": content_type})
+
+    app = web.Application()
+    app.router.add_route("HEAD", "/{name}", handler)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    yield test_server, hits
+    await test_server.close()
+
+
+@pytest_asyncio.fixture
+async def cog() -> AsyncGenerator[ImageFilter, None]:
+    with patch("unicornsecurity.imagefilter.Config.get_conf"):
+        instance = ImageFilter(MagicMock())
+    yield instance
+    await instance.cog_unload()
+
+
+@pytest.mark.asyncio
+async def test_unknown_urls_are_checked_concurrently_and_cached(
+    cog: ImageFilter, server: tuple[TestServer, list[str]]
+) -> None:
+    test_server, hits = server
+    urls = [str(test_server.make_url(f"/page{i}.html")) for i in range(5)]
+
+    started = time.monotonic()
+    assert await cog.contains_image(urls) is False
+    # Five 0.2s checks ran side by side, not one after another
+    assert time.monotonic() - started < 0.8
+    assert len(hits) == 5
+
+    assert await cog.contains_image(urls) is False
+    assert len(hits) == 5
+    assert cog._get_session() is cog._get_session()
+
+
+@pytest.mark.asyncio
+async def test_first_image_short_circuits_and_tenor_is_skipped(
+    cog: ImageFilter, server: tuple[TestServer, list[str]]
+) -> None:
+    test_server, hits = server
+    urls = [
+        "https://tenor.com/view/cat.gif",
+        str(test_server.make_url("/slow.bin")),
+        str(test_server.make_url("/img.bin")),
+    ]
+    started = time.monotonic()
+    assert await cog.contains_image(urls) is True
+    assert time.monotonic() - started < 1
+    assert sorted(hits) == ["/img.bin", "/slow.bin"]
+
+    # The remembered verdict answers without another request
+    assert await cog.contains_image([urls[2]]) is True
+    assert len(hits) == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_hosts_hit_the_deadline(cog: ImageFilter, server: tuple[TestServer, list[str]]) -> None:
+    test_server, _hits = server
+    with patch.object(imagefilter, "HEAD_TIMEOUT", 0.5):
+        started = time.monotonic()
+        assert await cog.contains_image([str(test_server.make_url("/slow.bin"))]) is False
+    assert time.monotonic() - started < 2
+
+
+def test_verdict_cache_expires_and_is_bounded(cog: ImageFilter) -> None:
+    cog._remember("https://a.example/x.png", True, 60)
+    cog._remember("https://b.example/x.png", False, -1)
+    assert cog._cached_verdict("https://a.example/x.png") is True
+    assert cog._cached_verdict("https://b.example/x.png") is None
+    assert "https://b.example/x.png" not in cog._verdicts
+
+    with patch.object(imagefilter, "VERDICT_CACHE_SIZE", 3):
+        for i in range(5):
+            cog._remember(f"https://c.example/{i}", False, 60)
+    assert list(cog._verdicts) == [f"https://c.example/{i}" for i in range(2, 5)]
@@ -0,0 +1,217 @@
+"""Bounded, prioritized queue for UniMod AI reviews."""
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import discord
+
+if TYPE_CHECKING:
+    from .unimod import BufferedMessage
+
+log = logging.getLogger("red.kirin_cogs.unimod.review_queue")
+
+URGENT = 0
+NORMAL = 1
+
+
+@dataclass
+class ReviewJob:
+    """A pending AI review of one channel's buffered messages."""
+
+    guild: discord.Guild
+    channel: discord.TextChannel | discord.Thread
+    messages: list["BufferedMessage"]
+    threshold: float
+    urgent: bool = False
+    enqueued_at: float = field(default_factory=time.monotonic)
+    merged: int = 0
+    claimed: bool = False
+    # Set when the job becomes urgent so a worker in the merge window starts it now
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def merge(self, messages: list["BufferedMessage"], threshold: float, urgent: bool) -> None:
+        """Fold another snapshot of the same channel into this job."""
+        seen = {m.id for m in self.messages}
+        self.messages.extend(m for m in messages if m.id not in seen)
+        # Snowflake IDs sort chronologically
+        self.messages.sort(key=lambda m: m.id)
+        self.threshold = threshold
+        self.merged += 1
+        if urgent and not self.urgent:
+            self.urgent = True
+            self.wake.set()
+
+
+@dataclass
+class ReviewMetrics:
+    """Counters and latency totals for the review queue."""
+
+    submitted: int = 0
+    merged: int = 0
+    dropped: int = 0
+    completed: int = 0
+    failed: int = 0
+    peak_depth: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    review_total: float = 0.0
+    review_max: float = 0.0
+
+    def record(self, wait: float, review: float) -> None:
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.review_total += review
+        self.review_max = max(self.review_max, review)
+
+    @property
+    def avg_wait(self) -> float:
+        finished = self.completed + self.failed
+        return self.wait_total / finished if finished else 0.0
+
+    @property
+    def avg_review(self) -> float:
+        finished = self.completed + self.failed
+        return self.review_total / finished if finished else 0.0
+
+
+class ReviewQueue:
+    """
+    Worker pool that runs AI reviews from a priority queue.
+
+    Urgent (extreme toxicity) jobs are taken before normal ones. A channel has
+    at most one job waiting: snapshots submitted while it is queued, or still
+    inside its merge window, are merged into it instead of costing another API
+    request. At most ``maxsize`` jobs wait at once; further ones are dropped
+    and counted.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[ReviewJob], Awaitable[None]],
+        *,
+        workers: int = 3,
+        maxsize: int = 50,
+        merge_window: float = 2.0,
+    ):
+        self._runner = runner
+        self.workers = workers
+        self.maxsize = maxsize
+        self.merge_window = merge_window
+        self._queue: asyncio.PriorityQueue[tuple[int, int, ReviewJob]] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        # Jobs not yet started, keyed by channel ID
+        self._pending: dict[int, ReviewJob] = {}
+        self._worker_tasks: list[asyncio.Task] = []
+        self.metrics = ReviewMetrics()
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting to start."""
+        return len(self._pending)
+
+    def submit(
+        self,
+        guild: discord.Guild,
+        channel: discord.TextChannel | discord.Thread,
+        messages: list["BufferedMessage"],
+        threshold: float,
+        *,
+        urgent: bool = False,
+    ) -> bool:
+        """
+        Queue a review of a channel snapshot.
+
+        Args:
+            guild: The guild the channel belongs to
+            channel: The reviewed channel
+            messages: Snapshot of the channel buffer
+            threshold: VADER threshold for the review
+            urgent: Whether the snapshot contains extreme toxicity
+
+        Returns:
+            bool: False if the queue was full and the review was dropped
+        """
+        self._start()
+        self.metrics.submitted += 1
+
+        job = self._pending.get(channel.id)
+        if job is not None:
+            was_urgent = job.urgent
+            job.merge(messages, threshold, urgent)
+            self.metrics.merged += 1
+            if job.urgent and not was_urgent and not job.claimed:
+                # Re-queue at the higher priority; the old entry is skipped
+                self._push(job)
+            return True
+
+        if len(self._pending) >= self.maxsize:
+            self.metrics.dropped += 1
+            log.warning(f"Review queue full ({self.maxsize}), dropping review for #{channel.name}")
+            return False
+
+        job = ReviewJob(guild, channel, list(messages), threshold, urgent=urgent)
+        self._pending[channel.id] = job
+        self._push(job)
+        self.metrics.peak_depth = max(self.metrics.peak_depth, len(self._pending))
+        return True
+
+    def _push(self, job: ReviewJob) -> None:
+        self._queue.put_nowait((URGENT if job.urgent else NORMAL, next(self._seq), job))
+
+    def _start(self) -> None:
+        if self._worker_tasks:
+            return
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            _priority, _seq, job = await self._queue.get()
+            try:
+                if job.claimed:
+                    continue
+                job.claimed = True
+
+                if not job.urgent:
+                    # Let near-simultaneous snapshots of the channel merge in
+                    delay = job.enqueued_at + self.merge_window - time.monotonic()
+                    if delay > 0:
+                        with contextlib.suppress(TimeoutError):
+                            await asyncio.wait_for(job.wake.wait(), delay)
+
+                if self._pending.get(job.channel.id) is job:
+                    del self._pending[job.channel.id]
+
+                started = time.monotonic()
+                try:
+                    await self._runner(job)
+                except Exception as e:
+                    self.metrics.failed += 1
+                    log.error(f"AI review for #{job.channel.name} failed: {type(e).__name__}: {e}")
+                else:
+                    self.metrics.completed += 1
+                finally:
+                    self.metrics.record(started - job.enqueued_at, time.monotonic() - started)
+            finally:
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        """Cancel the workers and discard jobs that have not started."""
+        for task in self._worker_tasks:
+            task.cancel()
+        if self._worker_tasks:
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if self._pending:
+            log.info(f"Discarding {len(self._pending)} queued AI review(s)")
+        self._pending.clear()
+        self._queue = asyncio.PriorityQueue()
@@ -53,7 +53,7 @@ async def test_analyze_with_ai_non_200_preserves_original_http_error(cog: UniMod
     error_text = "upstream bad request"
     response = FakeErrorResponse(status=500, body=error_text)
 
-    with patch("unimod.unimod.aiohttp.ClientSession", return_value=FakeSession(response)):
+    with patch.object(cog, "_get_session", return_value=FakeSession(response)):
         with pytest.raises(aiohttp.ClientResponseError) as exc_info:
             await cog._analyze_with_ai("system prompt", "user prompt")
 
@@ -6,7 +6,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from unimod.unimod import BufferedMessage, UniMod
+from unimod.unimod import BufferedMessage, ScoredBuffer, UniMod
 
 
 def make_cog() -> UniMod:
@@ -95,3 +95,41 @@ async def test_user_deletion_removes_only_matching_buffer_messages() -> None:
     await cog.red_delete_data_for_user(requester="user", user_id=42)
 
     assert [message.author_id for message in cog.channel_buffers[999]] == [99]
+
+
+def _scored(message_id: int, compound: float) -> BufferedMessage:
+    return BufferedMessage(
+        id=message_id,
+        author_id=1,
+        author_name="User",
+        content="content",
+        timestamp="now",
+        channel_id=999,
+        channel_name="test",
+        guild_id=1,
+        compound=compound,
+    )
+
+
+def test_scored_buffer_tracks_minimum_through_eviction() -> None:
+    buffer = ScoredBuffer(maxlen=3)
+    scores = [-0.9, 0.2, -0.4, 0.1, 0.3, -0.6, 0.5]
+    for index, score in enumerate(scores):
+        buffer.append(_scored(index, score))
+        window = scores[max(0, index - 2) : index + 1]
+        assert buffer.lowest_score == min(min(window), 0.0)
+
+
+def test_scored_buffer_flags_match_check_vader_scores() -> None:
+    cog = make_cog()
+    buffer = ScoredBuffer([_scored(1, 0.4), _scored(2, -0.85), _scored(3, -0.2)], maxlen=10)
+    assert buffer.vader_flags(-0.5) == cog.check_vader_scores(list(buffer), -0.5)
+    buffer.clear()
+    assert buffer.vader_flags(-0.5) == (False, 0.0, False)
+
+
+def test_scored_buffer_resize_keeps_scores() -> None:
+    buffer = ScoredBuffer([_scored(i, -0.1 * i) for i in range(6)], maxlen=10)
+    resized = ScoredBuffer(buffer, maxlen=3)
+    assert [message.id for message in resized] == [3, 4, 5]
+    assert resized.lowest_score == pytest.approx(-0.5)
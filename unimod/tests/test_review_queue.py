@@ -0,0 +1,198 @@
+"""Tests for the pooled, prioritized UniMod AI review queue."""
+
+import asyncio
+import json
+from collections.abc import AsyncGenerator
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from unimod.review_queue import ReviewJob, ReviewQueue
+from unimod.unimod import BufferedMessage, UniMod
+
+NO_VIOLATION = {
+    "is_violation": False,
+    "confidence": 0.9,
+    "violated_rules": [],
+    "severity": None,
+    "explanation": "Friendly banter.",
+    "primary_message_id": None,
+}
+
+GUILD = SimpleNamespace(id=300)
+
+
+class FakeNanoGPT:
+    """Local chat-completions server that records requests and their connections."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict[str, Any]] = []
+        self.peers: list[object] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.delay = 0.0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            self.requests.append(await request.json())
+            assert request.transport is not None
+            self.peers.append(request.transport.get_extra_info("peername"))
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            return web.json_response({"choices": [{"message": {"content": json.dumps(NO_VIOLATION)}}]})
+        finally:
+            self.in_flight -= 1
+
+
+@pytest_asyncio.fixture
+async def fake_api() -> AsyncGenerator[tuple[FakeNanoGPT, TestServer], None]:
+    api = FakeNanoGPT()
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", api.handle)
+    server = TestServer(app)
+    await server.start_server()
+    yield api, server
+    await server.close()
+
+
+@pytest_asyncio.fixture
+async def api_cog(
+    cog: UniMod, fake_api: tuple[FakeNanoGPT, TestServer]
+) -> AsyncGenerator[tuple[UniMod, FakeNanoGPT], None]:
+    api, server = fake_api
+    cog.NANOGPT_ENDPOINT = str(server.make_url("/v1/chat/completions"))
+    cog.review_queue.merge_window = 0.0
+    yield cog, api
+    await cog.review_queue.stop()
+    if cog._session is not None:
+        await cog._session.close()
+
+
+def _msg(message_id: int, channel_id: int = 200, compound: float = -0.9) -> BufferedMessage:
+    return BufferedMessage(
+        id=message_id,
+        author_id=100,
+        author_name="User",
+        content=f"message {message_id}",
+        timestamp="2024-01-01T00:00:00+00:00",
+        channel_id=channel_id,
+        channel_name=f"channel-{channel_id}",
+        guild_id=300,
+        compound=compound,
+    )
+
+
+def _channel(channel_id: int) -> Any:
+    return SimpleNamespace(id=channel_id, name=f"channel-{channel_id}")
+
+
+@pytest.mark.asyncio
+async def test_reviews_share_one_keep_alive_connection(api_cog: tuple[UniMod, FakeNanoGPT]) -> None:
+    cog, api = api_cog
+    for _ in range(3):
+        result = await cog._analyze_with_ai("system", "user")
+        assert result.is_violation is False
+
+    assert len(api.requests) == 3
+    assert len(set(api.peers)) == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_bounds_concurrent_requests(api_cog: tuple[UniMod, FakeNanoGPT]) -> None:
+    cog, api = api_cog
+    api.delay = 0.05
+    for channel_id in range(10):
+        cog.review_queue.submit(GUILD, _channel(channel_id), [_msg(channel_id, channel_id)], -0.5)  # type: ignore[arg-type]
+
+    await asyncio.wait_for(cog.review_queue.join(), timeout=5)
+
+    assert len(api.requests) == 10
+    assert api.peak_in_flight <= cog.REVIEW_WORKERS
+    metrics = cog.review_queue.metrics
+    assert metrics.completed == 10
+    assert metrics.peak_depth == 10
+    assert metrics.review_max >= 0.05
+    assert cog.review_queue.depth == 0
+
+
+@pytest.mark.asyncio
+async def test_urgent_jobs_run_first() -> None:
+    order: list[int] = []
+    gate = asyncio.Event()
+
+    async def runner(job: ReviewJob) -> None:
+        await gate.wait()
+        order.append(job.channel.id)
+
+    queue = ReviewQueue(runner, workers=1, merge_window=0.0)
+    queue.submit(GUILD, _channel(1), [_msg(1, 1)], -0.5)  # type: ignore[arg-type]
+    await asyncio.sleep(0)  # worker takes channel 1 and blocks on the gate
+    queue.submit(GUILD, _channel(2), [_msg(2, 2)], -0.5)  # type: ignore[arg-type]
+    queue.submit(GUILD, _channel(3), [_msg(3, 3)], -0.5)  # type: ignore[arg-type]
+    queue.submit(GUILD, _channel(4), [_msg(4, 4)], -0.5, urgent=True)  # type: ignore[arg-type]
+    # An urgent snapshot for a queued channel promotes its job
+    queue.submit(GUILD, _channel(3), [_msg(5, 3)], -0.5, urgent=True)  # type: ignore[arg-type]
+    gate.set()
+
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+
+    assert order == [1, 4, 3, 2]
+
+
+@pytest.mark.asyncio
+async def test_near_simultaneous_reviews_are_merged() -> None:
+    jobs: list[ReviewJob] = []
+
+    async def runner(job: ReviewJob) -> None:
+        jobs.append(job)
+
+    queue = ReviewQueue(runner, workers=2, merge_window=0.05)
+    channel = _channel(7)
+    queue.submit(GUILD, channel, [_msg(1, 7), _msg(2, 7)], -0.5)  # type: ignore[arg-type]
+    await asyncio.sleep(0.01)  # a worker has claimed the job and is in its merge window
+    queue.submit(GUILD, channel, [_msg(2, 7), _msg(3, 7)], -0.6)  # type: ignore[arg-type]
+
+    await asyncio.wait_for(queue.join(), timeout=5)
+    await queue.stop()
+
+    assert len(jobs) == 1
+    assert [m.id for m in jobs[0].messages] == [1, 2, 3]
+    assert jobs[0].threshold == -0.6
+    assert queue.metrics.merged == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_new_channels() -> None:
+    async def runner(job: ReviewJob) -> None:
+        await asyncio.sleep(1)
+
+    queue = ReviewQueue(runner, workers=1, maxsize=1, merge_window=10.0)
+    assert queue.submit(GUILD, _channel(1), [_msg(1, 1)], -0.5) is True  # type: ignore[arg-type]
+    assert queue.submit(GUILD, _channel(2), [_msg(2, 2)], -0.5) is False  # type: ignore[arg-type]
+    # Merging into the waiting job does not need a free slot
+    assert queue.submit(GUILD, _channel(1), [_msg(3, 1)], -0.5) is True  # type: ignore[arg-type]
+
+    assert queue.depth == 1
+    assert queue.metrics.dropped == 1
+    await queue.stop()
+    assert queue.depth == 0
+
+
+@pytest.mark.asyncio
+async def test_unload_closes_session(api_cog: tuple[UniMod, FakeNanoGPT]) -> None:
+    cog, _api = api_cog
+    await cog._analyze_with_ai("system", "user")
+    session = cog._session
+    assert session is not None
+
+    await cog.cog_unload()
+
+    assert session.closed
+    assert cog._session is None
@@ -32,3 +32,4 @@ async def test_event_loop_responsiveness(cog: UniMod):
     start = time.time()
     await cog.cog_load()
     assert time.time() - start < 1.0  # Should be fast and not block event loop
+    await cog.cog_unload()
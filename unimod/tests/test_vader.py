@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 
-from unimod.unimod import BufferedMessage, UniMod
+from unimod.unimod import BufferedMessage, ScoredBuffer, UniMod
 
 
 def _make_msg(content: str, msg_id: int = 1) -> BufferedMessage:
@@ -101,3 +101,138 @@ def test_check_vader_scores_extreme_flag(cog: UniMod) -> None:
     # Only assert is_extreme if score is below extreme threshold
     if score < -0.8:
         assert is_extreme is True
+
+
+# --- score-once pipeline ---
+
+
+def test_score_is_stored_and_not_recomputed(cog: UniMod) -> None:
+    msg = _make_msg("I hate you, you are terrible and disgusting!")
+    _, score, _ = cog._vader_check_single(msg, threshold=-0.5)
+    assert msg.compound == score
+
+    cog.vader_analyzer = MagicMock()
+    triggered, lowest, _ = cog.check_vader_scores([msg], threshold=-0.5)
+    cog.vader_analyzer.polarity_scores.assert_not_called()
+    assert triggered is True
+    assert lowest == score
+
+
+def test_compound_not_sent_in_prompt(cog: UniMod) -> None:
+    msg = _make_msg("Hello!")
+    cog._vader_check_single(msg, threshold=-0.5)
+    assert msg.compound is not None
+    assert "compound" not in msg.to_dict()
+
+
+@pytest.mark.asyncio
+async def test_ensure_scored_runs_in_worker_thread(cog: UniMod) -> None:
+    import threading
+
+    loop_thread = threading.get_ident()
+    scored_in: list[int] = []
+    analyzer = cog.vader_analyzer
+    assert analyzer is not None
+
+    def polarity_scores(text: str) -> dict[str, float]:
+        scored_in.append(threading.get_ident())
+        return analyzer.polarity_scores(text)
+
+    cog.vader_analyzer = MagicMock()
+    cog.vader_analyzer.polarity_scores.side_effect = polarity_scores
+    already = _make_msg("Hello!", 1)
+    already.compound = 0.5
+    fresh = _make_msg("I hate everything!", 2)
+
+    await cog._ensure_scored([already, fresh])
+
+    assert already.compound == 0.5
+    assert fresh.compound is not None and fresh.compound < 0.0
+    assert len(scored_in) == 1
+    assert scored_in[0] != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_cog_load_warms_up_vader_in_the_background(cog: UniMod) -> None:
+    import asyncio
+    import threading
+
+    release = threading.Event()
+    analyzer = cog.vader_analyzer
+    cog.vader_analyzer = None
+
+    def load_vader() -> SentimentIntensityAnalyzer:
+        release.wait(5)
+        return analyzer
+
+    with (
+        patch.object(cog, "_load_vader", side_effect=load_vader),
+        patch.object(cog, "_remove_diagnostic_log"),
+        patch("discord.ext.tasks.Loop.start"),
+    ):
+        await cog.cog_load()
+        # cog_load returned while the analyzer is still loading; messages go unscored meanwhile
+        assert cog.vader_analyzer is None
+        assert cog._vader_check_single(_make_msg("I hate you!"), threshold=-0.5) == (False, 0.0, False)
+
+        release.set()
+        await asyncio.wait(set(cog._background_tasks), timeout=5)
+    assert cog.vader_analyzer is analyzer
+
+
+def test_importing_the_cog_does_not_load_nltk() -> None:
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    script = "import sys, unimod.unimod; print('nltk' in sys.modules)"
+    root = Path(__file__).resolve().parents[2]
+    result = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+@pytest.mark.asyncio
+async def test_messages_buffered_during_warm_up_are_reviewed_once_vader_loads(cog: UniMod) -> None:
+    import asyncio
+    from unittest.mock import AsyncMock
+
+    import discord
+
+    analyzer = cog.vader_analyzer
+    cog.vader_analyzer = None
+    buffer = ScoredBuffer(maxlen=10)
+    buffer.append(_make_msg("have a nice day", msg_id=1))
+    buffer.append(_make_msg("I hate you, you worthless idiot!", msg_id=2))
+    buffer.append(_make_msg("ok", msg_id=3))
+    cog.channel_buffers[200] = buffer
+    cog.channel_locks[200] = asyncio.Lock()
+    channel = MagicMock(spec=discord.TextChannel)
+    cog.bot.get_channel = MagicMock(return_value=channel)
+    cog.config = MagicMock()
+    cog.config.guild.return_value.vader_threshold = AsyncMock(return_value=-0.5)
+    cog.review_queue = MagicMock()
+
+    await cog.idle_buffer_check.coro(cog)
+    cog.review_queue.submit.assert_not_called()
+
+    cog.vader_analyzer = analyzer
+    await cog.idle_buffer_check.coro(cog)
+
+    cog.review_queue.submit.assert_called_once()
+    assert [msg.id for msg in cog.review_queue.submit.call_args.args[2]] == [1, 2, 3]
+    assert not buffer
+
+
+def test_rescore_rebuilds_the_minimum_window() -> None:
+    buffer = ScoredBuffer(maxlen=2)
+    messages = [_make_msg(str(index), msg_id=index) for index in range(3)]
+    buffer.extend(messages)
+    assert buffer.lowest_score == 0.0
+
+    messages[0].compound = -0.9  # Already evicted by maxlen
+    messages[1].compound = -0.2
+    messages[2].compound = -0.6
+    buffer.rescore()
+    assert buffer.lowest_score == -0.6
+    buffer.append(_make_msg("x", msg_id=3))
+    assert buffer.lowest_score == -0.6
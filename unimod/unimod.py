@@ -13,18 +13,19 @@ import logging
 import re
 import time
 from collections import deque
-from dataclasses import asdict, dataclass
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
 
 import aiohttp
 import discord
-import nltk
 from discord.ext import tasks
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from redbot.core import Config, commands
 from redbot.core.bot import Red
 
+from .review_queue import ReviewJob, ReviewQueue
+
 log = logging.getLogger("red.kirin_cogs.unimod")
 
 
@@ -40,9 +41,79 @@ class BufferedMessage:
     channel_id: int
     channel_name: str
     guild_id: int
+    # VADER compound score, set once when the message is first scored
+    compound: float | None = field(default=None, compare=False)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        data = asdict(self)
+        data.pop("compound")
+        return data
+
+
+class ScoredBuffer(deque):
+    """
+    Message buffer that tracks the lowest VADER score of its contents.
+
+    The minimum is kept in a monotonic window as messages are appended or
+    evicted by ``maxlen``, so checking a buffer never rescans or rescores it.
+    Only ``append`` and ``clear`` are used on buffers; other deque mutators
+    bypass the tracking.
+    """
+
+    def __init__(self, iterable: Iterable = (), maxlen: int | None = None):
+        super().__init__(maxlen=maxlen)
+        self._appended = 0
+        # (sequence number, score) pairs with strictly increasing scores
+        self._window: deque[tuple[int, float]] = deque()
+        self.extend(iterable)
+
+    def append(self, item) -> None:
+        super().append(item)
+        seq = self._appended
+        self._appended += 1
+        # Drop window entries evicted from the front by maxlen
+        first_seq = self._appended - len(self)
+        while self._window and self._window[0][0] < first_seq:
+            self._window.popleft()
+        score = getattr(item, "compound", None)
+        if score is not None:
+            while self._window and self._window[-1][1] >= score:
+                self._window.pop()
+            self._window.append((seq, score))
+
+    def extend(self, iterable: Iterable) -> None:
+        for item in iterable:
+            self.append(item)
+
+    def clear(self) -> None:
+        super().clear()
+        self._window.clear()
+
+    @property
+    def has_unscored(self) -> bool:
+        return any(getattr(item, "compound", None) is None for item in self)
+
+    def rescore(self) -> None:
+        """Rebuild the window after messages buffered without a score were scored."""
+        self._window.clear()
+        first_seq = self._appended - len(self)
+        for offset, item in enumerate(self):
+            score = getattr(item, "compound", None)
+            if score is None:
+                continue
+            while self._window and self._window[-1][1] >= score:
+                self._window.pop()
+            self._window.append((first_seq + offset, score))
+
+    @property
+    def lowest_score(self) -> float:
+        """Lowest compound score in the buffer, capped at 0.0 like ``check_vader_scores``."""
+        return min(self._window[0][1], 0.0) if self._window else 0.0
+
+    def vader_flags(self, threshold: float) -> tuple[bool, float, bool]:
+        """Return ``(should_trigger, lowest_score, is_extreme)`` from the tracked minimum."""
+        lowest = self.lowest_score
+        return lowest < threshold, lowest, lowest < (threshold - 0.3)
 
 
 @dataclass
@@ -105,6 +176,11 @@ Analyze this conversation against the server rules, paying close attention to ch
     NANOGPT_ENDPOINT = "https://integrate.api.nvidia.com/v1/chat/completions"
     NANOGPT_MODEL = "z-ai/glm5"
 
+    # AI review pool: concurrent requests, waiting jobs, and per-channel merge window (seconds)
+    REVIEW_WORKERS = 3
+    REVIEW_QUEUE_SIZE = 50
+    REVIEW_MERGE_WINDOW = 2.0
+
     def __init__(self, bot: Red):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=9876543210, force_registration=True)
@@ -124,16 +200,28 @@ Analyze this conversation against the server rules, paying close attention to ch
         # Load server rules from file
         self.rules = self._load_rules()
 
-        # Initialize VADER analyzer later in cog_load
+        # VADER (and NLTK) load in a background task started by cog_load;
+        # until then messages are buffered unscored and scored once it is ready
         self.vader_analyzer = None
 
         # Per-channel message buffers
-        self.channel_buffers: dict[int, deque] = {}
+        self.channel_buffers: dict[int, ScoredBuffer] = {}
         self.channel_locks: dict[int, asyncio.Lock] = {}
 
         # Background task references (prevents GC)
         self._background_tasks: set[asyncio.Task] = set()
 
+        # Shared HTTP session for AI requests, created on first use
+        self._session: aiohttp.ClientSession | None = None
+
+        # Bounded worker pool for AI reviews
+        self.review_queue = ReviewQueue(
+            self._run_review,
+            workers=self.REVIEW_WORKERS,
+            maxsize=self.REVIEW_QUEUE_SIZE,
+            merge_window=self.REVIEW_MERGE_WINDOW,
+        )
+
         # Statistics
         self.stats = {
             "messages_processed": 0,
@@ -165,10 +253,10 @@ Analyze this conversation against the server rules, paying close attention to ch
             log.error(f"Failed to load rules.md: {e}")
             return "Failed to load server rules."
 
-    def _get_buffer(self, channel_id: int, max_size: int = 20) -> deque:
+    def _get_buffer(self, channel_id: int, max_size: int = 20) -> ScoredBuffer:
         """Get or create a message buffer for a channel."""
         if channel_id not in self.channel_buffers:
-            self.channel_buffers[channel_id] = deque(maxlen=max_size)
+            self.channel_buffers[channel_id] = ScoredBuffer(maxlen=max_size)
         return self.channel_buffers[channel_id]
 
     def _get_lock(self, channel_id: int) -> asyncio.Lock:
@@ -177,6 +265,31 @@ Analyze this conversation against the server rules, paying close attention to ch
             self.channel_locks[channel_id] = asyncio.Lock()
         return self.channel_locks[channel_id]
 
+    def _score_message(self, msg: BufferedMessage) -> float | None:
+        """
+        Return the message's VADER compound score, scoring it only once.
+
+        Returns None if the analyzer is unavailable.
+        """
+        if msg.compound is None and self.vader_analyzer is not None:
+            if msg.content.strip():
+                msg.compound = self.vader_analyzer.polarity_scores(msg.content)["compound"]
+            else:
+                msg.compound = 0.0
+        return msg.compound
+
+    def _score_unscored(self, messages: list[BufferedMessage]) -> None:
+        for msg in messages:
+            self._score_message(msg)
+
+    async def _ensure_scored(self, messages: list[BufferedMessage]) -> None:
+        """Score any messages that were buffered without a score, off the event loop."""
+        if self.vader_analyzer is None:
+            return
+        unscored = [msg for msg in messages if msg.compound is None]
+        if unscored:
+            await asyncio.to_thread(self._score_unscored, unscored)
+
     def _vader_check_single(self, msg: BufferedMessage, threshold: float) -> tuple[bool, float, bool]:
         """
         Check a single message for negative sentiment.
@@ -188,12 +301,10 @@ Analyze this conversation against the server rules, paying close attention to ch
         Returns:
             tuple: (should_trigger, score, is_extreme)
         """
-        if not msg.content.strip() or self.vader_analyzer is None:
+        compound = self._score_message(msg)
+        if compound is None:
             return False, 0.0, False
 
-        scores = self.vader_analyzer.polarity_scores(msg.content)
-        compound = scores["compound"]
-
         should_trigger = compound < threshold
         # Extreme threshold is 0.3 below the base threshold
         is_extreme = compound < (threshold - 0.3)
@@ -204,6 +315,9 @@ Analyze this conversation against the server rules, paying close attention to ch
         """
         Check each message individually for negative sentiment.
 
+        Stored scores are reused; only messages that were never scored are
+        run through VADER (call ``_ensure_scored`` first to do that off-loop).
+
         Args:
             messages: List of messages to check
             threshold: The VADER threshold (e.g., -0.5)
@@ -216,12 +330,9 @@ Analyze this conversation against the server rules, paying close attention to ch
         is_extreme = False
 
         for msg in messages:
-            if not msg.content.strip():
-                continue
-            if self.vader_analyzer is None:
+            compound = self._score_message(msg)
+            if compound is None:
                 continue
-            scores = self.vader_analyzer.polarity_scores(msg.content)
-            compound = scores["compound"]
 
             if compound < lowest_score:
                 lowest_score = compound
@@ -357,6 +468,12 @@ Analyze this conversation against the server rules, paying close attention to ch
 
         return f"{exc_type}: {exc_repr}"
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared keep-alive session, creating it if needed."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.REVIEW_WORKERS))
+        return self._session
+
     async def _analyze_with_ai(self, system_prompt: str, user_prompt: str) -> AIAnalysisResult:
         """Make async API call to NanoGPT using aiohttp."""
         # Get API key from Red's shared API tokens (same pattern as unicorn_ai)
@@ -380,32 +497,32 @@ Analyze this conversation against the server rules, paying close attention to ch
         timeout_seconds = 360  # 6 minutes for thinking model
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.NANOGPT_ENDPOINT,
-                    headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-                    json={
-                        "model": self.NANOGPT_MODEL,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt},
-                        ],
-                        "max_tokens": 1000,
-                        "temperature": 0.3,
-                    },
-                    timeout=aiohttp.ClientTimeout(total=timeout_seconds),
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        self._last_ai_error = f"API Error {response.status}: {error_text}"
-                        log.error(self._last_ai_error)
-                        raise aiohttp.ClientResponseError(
-                            request_info=response.request_info,
-                            history=response.history,
-                            status=response.status,
-                            message=f"NanoGPT API Error {response.status}: {error_text}",
-                        )
-                    result = await response.json()
+            session = self._get_session()
+            async with session.post(
+                self.NANOGPT_ENDPOINT,
+                headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+                json={
+                    "model": self.NANOGPT_MODEL,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    "max_tokens": 1000,
+                    "temperature": 0.3,
+                },
+                timeout=aiohttp.ClientTimeout(total=timeout_seconds),
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    self._last_ai_error = f"API Error {response.status}: {error_text}"
+                    log.error(self._last_ai_error)
+                    raise aiohttp.ClientResponseError(
+                        request_info=response.request_info,
+                        history=response.history,
+                        status=response.status,
+                        message=f"NanoGPT API Error {response.status}: {error_text}",
+                    )
+                result = await response.json()
 
             raw_content = result["choices"][0]["message"]["content"]
             request_duration = time.monotonic() - request_start
@@ -480,7 +597,9 @@ Analyze this conversation against the server rules, paying close attention to ch
         log.info(f"Processing buffer for #{channel.name} with {len(messages)} messages (threshold: {threshold})")
 
         try:
-            # Full VADER check on all messages (pass the threshold)
+            # Full VADER check on all messages (pass the threshold); scores are
+            # reused from on_message, anything unscored is scored off-loop
+            await self._ensure_scored(messages)
             should_review, lowest_score, _ = self.check_vader_scores(messages, threshold)
             log.info(f"VADER check result: should_review={should_review}, lowest_score={lowest_score}")
 
@@ -528,6 +647,12 @@ Analyze this conversation against the server rules, paying close attention to ch
 
             log.error(traceback.format_exc())
 
+    async def _run_review(self, job: ReviewJob) -> None:
+        """Review-queue runner: process one (possibly merged) channel snapshot."""
+        if job.merged:
+            log.info(f"Merged {job.merged} extra snapshot(s) into the review for #{job.channel.name}")
+        await self._process_buffer(job.guild, job.channel, job.messages, job.threshold)
+
     async def _send_alert(
         self,
         guild: discord.Guild,
@@ -666,26 +791,28 @@ Analyze this conversation against the server rules, paying close attention to ch
         buffer = self._get_buffer(channel.id, buffer_size)
         lock = self._get_lock(channel.id)
 
-        # 5. Add message to buffer and check VADER (inside lock)
+        # 5. Score the message, then add it to the buffer (inside lock)
         should_process = False
         messages_snapshot = []
 
+        buffered_msg = BufferedMessage(
+            id=message.id,
+            author_id=message.author.id,
+            author_name=message.author.display_name,
+            content=message.clean_content,
+            timestamp=message.created_at.isoformat(),
+            channel_id=channel.id,
+            channel_name=channel.name,
+            guild_id=message.guild.id,
+        )
+
+        # 6. Quick VADER check on THIS message only (pass the threshold). The
+        # score is stored on the message and never recomputed.
+        _should_trigger, score, is_extreme = self._vader_check_single(buffered_msg, threshold)
+
         async with lock:
-            buffered_msg = BufferedMessage(
-                id=message.id,
-                author_id=message.author.id,
-                author_name=message.author.display_name,
-                content=message.clean_content,
-                timestamp=message.created_at.isoformat(),
-                channel_id=channel.id,
-                channel_name=channel.name,
-                guild_id=message.guild.id,
-            )
             buffer.append(buffered_msg)
 
-            # 6. Quick VADER check on THIS message only (pass the threshold)
-            _should_trigger, score, is_extreme = self._vader_check_single(buffered_msg, threshold)
-
             # 7. Determine if we should process now
             if is_extreme:
                 should_process = True
@@ -698,11 +825,9 @@ Analyze this conversation against the server rules, paying close attention to ch
                 messages_snapshot = list(buffer)
                 buffer.clear()
 
-        # 9. Process outside the lock (non-blocking)
+        # 9. Queue for review outside the lock; extreme toxicity goes first
         if should_process:
-            task = asyncio.create_task(self._process_buffer(message.guild, channel, messages_snapshot, threshold))
-            self._background_tasks.add(task)
-            task.add_done_callback(self._task_done_callback)
+            self.review_queue.submit(message.guild, channel, messages_snapshot, threshold, urgent=is_extreme)
 
     @tasks.loop(minutes=2)
     async def idle_buffer_check(self):
@@ -737,7 +862,12 @@ Analyze this conversation against the server rules, paying close attention to ch
                         guild = channel_obj.guild
                         threshold = await self.config.guild(guild).vader_threshold()
 
-                        should_review, _score, _ = self.check_vader_scores(list(buffer), threshold)
+                        # Messages buffered while VADER was still loading
+                        if self.vader_analyzer is not None and buffer.has_unscored:
+                            await self._ensure_scored(list(buffer))
+                            buffer.rescore()
+
+                        should_review, _score, _ = buffer.vader_flags(threshold)
 
                         if should_review:
                             log.info(f"Processing idle buffer for channel {channel_id}")
@@ -746,37 +876,39 @@ Analyze this conversation against the server rules, paying close attention to ch
                             messages_snapshot = list(buffer)
                             buffer.clear()
 
-                            # Process in background (outside lock after this block)
-                            task = asyncio.create_task(
-                                self._process_buffer(guild, channel_obj, messages_snapshot, threshold)
-                            )
-                            self._background_tasks.add(task)
-                            task.add_done_callback(self._task_done_callback)
+                            # Queue for review; processing happens in the worker pool
+                            self.review_queue.submit(guild, channel_obj, messages_snapshot, threshold)
 
     @idle_buffer_check.before_loop
     async def before_idle_check(self):
         await self.bot.wait_until_ready()
 
-    def _task_done_callback(self, task: asyncio.Task):
-        self._background_tasks.discard(task)
-        if not task.cancelled() and task.exception():
-            log.error(f"Background task failed: {task.exception()}")
+    def _load_vader(self):
+        """Import NLTK, fetch the VADER lexicon if missing and build the analyzer (blocking)."""
+        import nltk
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
 
-    def _download_nltk_data(self):
         try:
             nltk.data.find("sentiment/vader_lexicon.zip")
         except LookupError:
             nltk.download("vader_lexicon", quiet=True)
+        return SentimentIntensityAnalyzer()
+
+    async def _warm_up_vader(self):
+        start = time.perf_counter()
+        try:
+            self.vader_analyzer = await asyncio.to_thread(self._load_vader)
+            log.info(f"VADER analyzer loaded in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            log.error(f"Failed to load NLTK data: {e}. VADER analysis will be unavailable.")
 
     async def cog_load(self):
         """Called when the cog is loaded."""
         # Diagnostic expiry is intentionally not persisted across restarts.
         self._remove_diagnostic_log()
-        try:
-            await asyncio.to_thread(self._download_nltk_data)
-            self.vader_analyzer = SentimentIntensityAnalyzer()
-        except Exception as e:
-            log.error(f"Failed to load NLTK data: {e}. VADER analysis will be unavailable.")
+        task = asyncio.create_task(self._warm_up_vader())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
         self.idle_buffer_check.start()
         log.info("UniMod cog loaded and idle buffer check started")
@@ -793,6 +925,11 @@ Analyze this conversation against the server rules, paying close attention to ch
             with contextlib.suppress(Exception):
                 await asyncio.wait(self._background_tasks, timeout=5)
 
+        await self.review_queue.stop()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
         self._remove_diagnostic_log()
 
         log.info("UniMod cog unloaded")
@@ -802,7 +939,7 @@ Analyze this conversation against the server rules, paying close attention to ch
     ) -> None:
         """Remove attributable messages from live buffers and discard diagnostics."""
         for channel_id, buffer in list(self.channel_buffers.items()):
-            self.channel_buffers[channel_id] = deque(
+            self.channel_buffers[channel_id] = ScoredBuffer(
                 (message for message in buffer if message.author_id != user_id),
                 maxlen=buffer.maxlen,
             )
@@ -937,6 +1074,20 @@ Analyze this conversation against the server rules, paying close attention to ch
         embed.add_field(name="Active Buffers", value=str(len(self.channel_buffers)), inline=True)
         embed.add_field(name="Rules Length", value=f"{len(self.rules)} chars", inline=True)
 
+        metrics = self.review_queue.metrics
+        embed.add_field(
+            name="Review Queue",
+            value=f"{self.review_queue.depth} waiting (peak {metrics.peak_depth})\n"
+            f"{metrics.merged} merged, {metrics.dropped} dropped",
+            inline=True,
+        )
+        embed.add_field(
+            name="Review Latency",
+            value=f"Wait {metrics.avg_wait:.1f}s avg / {metrics.wait_max:.1f}s max\n"
+            f"Review {metrics.avg_review:.1f}s avg / {metrics.review_max:.1f}s max",
+            inline=True,
+        )
+
         await ctx.send(embed=embed)
 
     @unimod_group.group(name="config")
@@ -975,7 +1126,7 @@ Analyze this conversation against the server rules, paying close attention to ch
         for channel_id, buffer in list(self.channel_buffers.items()):
             channel = self.bot.get_channel(channel_id)
             if isinstance(channel, (discord.TextChannel, discord.Thread)) and channel.guild.id == ctx.guild.id:
-                new_buffer = deque(buffer, maxlen=size)
+                new_buffer = ScoredBuffer(buffer, maxlen=size)
                 self.channel_buffers[channel_id] = new_buffer
 
         await ctx.send(f"✅ Buffer size set to {size} and active buffers resized.")